@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark conversion throughput as threads are added.
+
+On a free-threaded build (python3.14t) the threads convert in parallel, so
+throughput should grow with the thread count; with the GIL enabled it stays flat.
+Every threaded result is checked against a serial conversion first.
+
+    python3.14t benchmark_threads.py --threads 1,2,4,8
+    python benchmark_threads.py --backend rust --records 5000
+    python benchmark_threads.py --backend rust-release-gil
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import random
+import sys
+import sysconfig
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from benchmark_utils import Colors, colorize, format_time
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from json2xml import dicttoxml, dicttoxml_fast
+
+BACKENDS = ("python", "fast", "rust", "rust-release-gil")
+
+
+def gil_enabled() -> bool:
+    """Return whether this interpreter currently runs with the GIL."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def make_payload(records: int, seed: int = 7) -> list[dict[str, Any]]:
+    """Build deterministic record-shaped data so every thread converts the same bytes."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": index,
+            "name": f"user-{rng.randrange(10**6)}",
+            "active": rng.random() < 0.5,
+            "score": round(rng.uniform(0, 100), 2),
+            "tags": [f"t{rng.randrange(20)}" for _ in range(3)],
+            "address": {"city": f"city-{rng.randrange(50)}", "zip": f"{rng.randrange(10**5):05d}"},
+        }
+        for index in range(records)
+    ]
+
+
+def converter(backend: str) -> Callable[[Any], bytes]:
+    """Return the conversion function measured for a backend name."""
+    if backend == "python":
+        return dicttoxml.dicttoxml
+    if backend == "fast":
+        return dicttoxml_fast.dicttoxml
+    if backend in ("rust", "rust-release-gil"):
+        from json2xml_rs import dicttoxml as rust_dicttoxml
+
+        if backend == "rust-release-gil":
+            return functools.partial(rust_dicttoxml, release_gil=True)
+        return rust_dicttoxml
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def parse_threads(value: str) -> list[int]:
+    """Parse a comma-separated list of positive thread counts."""
+    try:
+        counts = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"invalid thread counts: {value!r}") from error
+    if not counts or min(counts) < 1:
+        raise argparse.ArgumentTypeError(f"invalid thread counts: {value!r}")
+    return counts
+
+
+def measure(
+    convert: Callable[[Any], bytes], payload: Any, threads: int, conversions: int
+) -> float:
+    """Return the wall time in seconds for ``conversions`` runs spread over ``threads``.
+
+    Raises:
+        AssertionError: If any threaded conversion differs from a serial one.
+    """
+    expected = convert(payload)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        # Start every worker before timing so thread creation is not measured.
+        list(pool.map(lambda _: None, range(threads)))
+        start = time.perf_counter()
+        results = list(pool.map(lambda _: convert(payload), range(conversions)))
+        elapsed = time.perf_counter() - start
+    if any(result != expected for result in results):
+        raise AssertionError(f"threaded output differs from serial output with {threads} threads")
+    return elapsed
+
+
+def run(
+    convert: Callable[[Any], bytes],
+    payload: Any,
+    thread_counts: list[int],
+    conversions: int,
+) -> list[dict[str, float]]:
+    """Measure each thread count and report throughput relative to the first."""
+    rows: list[dict[str, float]] = []
+    for threads in thread_counts:
+        elapsed = measure(convert, payload, threads, conversions)
+        throughput = conversions / elapsed
+        baseline = rows[0]["throughput"] if rows else throughput
+        rows.append(
+            {
+                "threads": threads,
+                "elapsed": elapsed,
+                "throughput": throughput,
+                "speedup": throughput / baseline,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> list[dict[str, float]]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=BACKENDS, default="python")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--conversions", type=int, default=64)
+    parser.add_argument("--threads", type=parse_threads, default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    build = "free-threaded" if sysconfig.get_config_var("Py_GIL_DISABLED") else "default"
+    print(colorize("=" * 60, Colors.BLUE))
+    print(colorize("  json2xml Benchmark: threaded throughput", Colors.BOLD))
+    print(colorize("=" * 60, Colors.BLUE))
+    print(f"Python {sys.version.split()[0]} ({build} build), GIL enabled: {gil_enabled()}")
+    print(f"Backend: {args.backend}, {args.records} records, {args.conversions} conversions\n")
+
+    rows = run(converter(args.backend), make_payload(args.records), args.threads, args.conversions)
+    for row in rows:
+        per_conversion = row["elapsed"] * 1000 / args.conversions
+        color = Colors.GREEN if row["speedup"] > 1.1 else Colors.YELLOW
+        print(
+            f"  {row['threads']:>3} threads: {row['throughput']:8.1f} conversions/s "
+            f"({format_time(per_conversion)} each) "
+            + colorize(f"{row['speedup']:.2f}x", color)
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ class ConversionRequest:
     obj: Any
     root: bool
     custom_root: str
-    ids: list[int] | None
+    ids: list[int] | bool | None
     attr_type: bool
     item_wrap: bool
     item_func: Any
@@ -19,6 +19,20 @@ class ConversionRequest:
     xml_namespaces: dict[str, Any] | None
     list_headers: bool
     xpath_format: bool
+    limits: Any = None
+    pretty: bool = False
+    indent: int = 2
+    id_strategy: str = "random"
+    id_seed: int = 0
+    release_gil: bool = False
+
+
+class BackendFallback(Exception):
+    """Raised by a backend that found, while rendering, a request it cannot preserve.
+
+    The selector then hands the request to the next backend that can handle it, so adapters
+    can render speculatively instead of scanning every payload up front.
+    """
 
 
 class BackendAdapter(Protocol):
@@ -44,20 +58,24 @@ class BackendSelector:
     def render(self, request: ConversionRequest) -> bytes:
         for backend in self._backends:
             if backend.can_handle(request):
-                return backend.render(request)
+                try:
+                    return backend.render(request)
+                except BackendFallback:
+                    continue
         raise RuntimeError("No XML backend can handle the requested conversion")
 
 
 def has_special_keys(obj: Any) -> bool:
     """Return True when the payload uses Python-only special key semantics."""
-    if isinstance(obj, dict):
-        return any(
-            (isinstance(key, str) and (key.startswith("@") or key.endswith("@flat")))
-            or has_special_keys(value)
-            for key, value in obj.items()
-        )
-
-    if isinstance(obj, list):
-        return any(has_special_keys(item) for item in obj)
-
+    # An explicit stack keeps deeply nested payloads clear of the recursion limit.
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            for key, child in value.items():
+                if isinstance(key, str) and (key.startswith("@") or key.endswith("@flat")):
+                    return True
+                stack.append(child)
+        elif isinstance(value, list):
+            stack.extend(value)
     return False
@@ -17,6 +17,10 @@ Flags:
     -s, --string string     Read JSON from string
     -c, --cdata             Wrap string values in CDATA sections
     -l, --list-headers      Repeat headers for each list item
+    --ndjson                Convert newline-delimited JSON, one XML record per line
+    --stream-root string    Wrap --ndjson records in one root element
+    -j, --jobs int          Workers converting --ndjson lines or a large top-level array or
+                            object (default 1)
     -h, --help              Show help message
     -v, --version           Show version information
 
@@ -38,17 +42,21 @@ Examples:
 
     # Use XPath 3.1 format
     json2xml-py -x data.json
+
+    # Convert JSON Lines into one document
+    json2xml-py --ndjson --stream-root records logs.jsonl
 """
 from __future__ import annotations
 
 import argparse
 import sys
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from pathlib import Path
-from typing import NoReturn
+from typing import IO, NoReturn
 
 from json2xml import __version__
-from json2xml.json2xml import Json2xml
+from json2xml.json2xml import Json2xml, convert_lines
 from json2xml.types import JSONValue
 from json2xml.utils import (
     JSONReadError,
@@ -79,6 +87,9 @@ class CLIConversionOptions:
     xpath_format: bool
     cdata: bool
     list_headers: bool
+    ndjson: bool = False
+    stream_root: str | None = None
+    jobs: int = 1
 
     @classmethod
     def from_namespace(cls, args: argparse.Namespace) -> "CLIConversionOptions":
@@ -95,6 +106,9 @@ class CLIConversionOptions:
             xpath_format=args.xpath_format,
             cdata=args.cdata,
             list_headers=args.list_headers,
+            ndjson=args.ndjson,
+            stream_root=args.stream_root,
+            jobs=args.jobs,
         )
 
 
@@ -163,8 +177,8 @@ class CLIApplication:
                 f"or pass a file/--string. ({error})"
             )
 
-    def convert(self, data: JSONValue, options: CLIConversionOptions) -> str | bytes:
-        converter = Json2xml(
+    def build_converter(self, data: JSONValue, options: CLIConversionOptions) -> Json2xml:
+        return Json2xml(
             data=data,
             wrapper=options.wrapper,
             root=options.root,
@@ -174,12 +188,85 @@ class CLIApplication:
             xpath_format=options.xpath_format,
             cdata=options.cdata,
             list_headers=options.list_headers,
+            workers=options.jobs,
         )
-        xml_output = converter.to_xml()
+
+    def convert(self, data: JSONValue, options: CLIConversionOptions) -> str | bytes:
+        xml_output = self.build_converter(data, options).to_xml()
         if xml_output is None:
             raise ValueError("Empty data, no XML generated")
         return xml_output
 
+    def read_lines(self, options: CLIConversionOptions) -> Iterable[str]:
+        if options.url:
+            exit_with_error("Error: --ndjson reads a file, stdin, or --string, not --url.")
+        if options.string:
+            return options.string.splitlines()
+        if options.input_file and options.input_file != "-":
+            if not Path(options.input_file).is_file():
+                exit_with_error(
+                    f"Error: JSON file not found: {options.input_file}. "
+                    "Check the path or use - to read JSON from stdin."
+                )
+            return _iter_file_lines(options.input_file)
+        if options.input_file == "-" or not sys.stdin.isatty():
+            return sys.stdin
+        exit_with_error(
+            "Error: No input provided. Pass a JSON Lines file, use - for stdin, "
+            "or provide --string."
+        )
+
+    def convert_ndjson(self, options: CLIConversionOptions) -> None:
+        """Stream one XML record per JSON line to the output file or stdout."""
+        if options.pretty:
+            exit_with_error("Error: --pretty is not supported with --ndjson.")
+        records = convert_lines(
+            self.read_lines(options),
+            wrapper=options.wrapper,
+            root=options.root,
+            attr_type=options.attr_type,
+            item_wrap=options.item_wrap,
+            xpath_format=options.xpath_format,
+            cdata=options.cdata,
+            list_headers=options.list_headers,
+            stream_root=options.stream_root,
+            workers=options.jobs,
+        )
+        if options.output:
+            def write_records(file_obj: IO[bytes]) -> None:
+                for record in records:
+                    file_obj.write(record + b"\n")
+
+            self.write_file(options.output, write_records)
+            return
+        for record in records:
+            print(record.decode("utf-8"))
+
+    def stream_to_file(
+        self, data: JSONValue, options: CLIConversionOptions, output_file: str
+    ) -> None:
+        """Serialize straight into the output file instead of building the XML in memory."""
+        if data is None:
+            raise ValueError("Empty data, no XML generated")
+        converter = self.build_converter(data, options)
+        self.write_file(output_file, converter.write_to)
+
+    def write_file(self, output_file: str, write: Callable[[IO[bytes]], object]) -> None:
+        try:
+            file_obj = open(output_file, "wb")
+        except OSError as error:
+            exit_with_error(f"Error writing to file: {error}")
+        try:
+            with file_obj:
+                write(file_obj)
+        except OSError as error:
+            Path(output_file).unlink(missing_ok=True)
+            exit_with_error(f"Error writing to file: {error}")
+        except Exception:
+            # Do not leave a truncated document behind when conversion fails midway.
+            Path(output_file).unlink(missing_ok=True)
+            raise
+
     def write_output(self, output: str | bytes, output_file: str | None) -> None:
         if isinstance(output, bytes):
             output = output.decode("utf-8")
@@ -196,6 +283,11 @@ class CLIApplication:
         print(output)
 
 
+def _iter_file_lines(filename: str) -> Iterable[str]:
+    with open(filename, encoding="utf-8") as lines:
+        yield from lines
+
+
 _APP = CLIApplication()
 
 
@@ -231,6 +323,12 @@ Examples:
 
   # Disable pretty printing and type attributes
   json2xml-py --no-pretty --no-type data.json
+
+  # Convert JSON Lines into one document using 4 processes
+  json2xml-py --ndjson --stream-root records -j 4 logs.jsonl
+
+  # Split a large top-level array across 8 workers
+  json2xml-py -j 8 -o export.xml export.json
 """,
     )
 
@@ -356,6 +454,33 @@ Examples:
         default=False,
         help="Repeat headers for each list item",
     )
+    conv_group.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=positive_int,
+        default=1,
+        help=(
+            "Workers converting --ndjson records, or the members of a top-level array or "
+            "object with at least 1024 members (default: 1)"
+        ),
+    )
+
+    # JSON Lines options
+    ndjson_group = parser.add_argument_group("JSON Lines Options")
+    ndjson_group.add_argument(
+        "--ndjson",
+        dest="ndjson",
+        action="store_true",
+        default=False,
+        help="Treat input as newline-delimited JSON and write one XML record per line",
+    )
+    ndjson_group.add_argument(
+        "--stream-root",
+        dest="stream_root",
+        default=None,
+        help="Wrap all --ndjson records in one root element with this name",
+    )
 
     # Other options
     parser.add_argument(
@@ -368,6 +493,17 @@ Examples:
     return parser
 
 
+def positive_int(value: str) -> int:
+    """Parse a command-line count that must be at least one."""
+    try:
+        count = int(value)
+    except ValueError:
+        count = 0
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value!r}")
+    return count
+
+
 # @lat: [[behavior#Input readers]]
 def read_input(args: argparse.Namespace | CLIConversionOptions) -> JSONValue:
     """Read JSON input from the specified source."""
@@ -389,8 +525,18 @@ def main(argv: list[str] | None = None) -> int:
     """Main entry point for the CLI."""
     parser = create_parser()
     args = parser.parse_args(argv)
+    if args.stream_root is not None and not args.ndjson:
+        parser.error("--stream-root requires --ndjson")
     options = CLIConversionOptions.from_namespace(args)
 
+    if options.ndjson:
+        try:
+            _APP.convert_ndjson(options)
+        except Exception as error:
+            print(f"Error converting to XML: {error}", file=sys.stderr)
+            return 1
+        return 0
+
     try:
         data = read_input(options)
     except Exception as error:
@@ -398,8 +544,10 @@ def main(argv: list[str] | None = None) -> int:
         return 1
 
     try:
-        xml_output = _APP.convert(data, options)
-        write_output(xml_output, options.output)
+        if options.output:
+            _APP.stream_to_file(data, options, options.output)
+        else:
+            write_output(_APP.convert(data, options), None)
     except Exception as error:
         print(f"Error converting to XML: {error}", file=sys.stderr)
         return 1
@@ -1,39 +1,376 @@
 from __future__ import annotations
 
 import datetime
+import errno
 import numbers
-from collections.abc import Callable, Sequence
+import os
+import queue
+import re
+import socket
+import threading
+from collections import namedtuple
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import suppress
 from dataclasses import dataclass
 from decimal import Decimal
 from fractions import Fraction
-from functools import lru_cache
-from io import BytesIO
+from functools import wraps
+from io import BytesIO, RawIOBase
 from random import SystemRandom
-from typing import Any, Union, cast
+from typing import TYPE_CHECKING, Any, ParamSpec, Protocol, TypeVar, Union, cast, overload
 
-__lazy_modules__ = ["defusedxml.minidom"]
+from .utils import InvalidDataError
+
+if TYPE_CHECKING:
+    from .types import JSONEvent, XMLSink
 
 # Create a safe random number generator
 _SAFE_RANDOM = SystemRandom()
 
 _XML_ESCAPE_CHARS = frozenset("&\"'<>")
 
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_INDENT = 2
+ID_STRATEGIES = ("random", "counter", "path", "seeded")
+
+_MASK_64 = (1 << 64) - 1
+
+
+@dataclass(frozen=True, slots=True)
+class ConversionLimits:
+    """Structural and output-size limits enforced while the serializer walks the data."""
+
+    max_depth: int
+    max_items: int
+    max_output_bytes: int
+
+
+class _ConversionBudget:
+    """Per-render depth and item counters charged as containers are entered."""
+
+    __slots__ = ("_max_depth", "_max_items", "_depth", "_items")
+
+    def __init__(self, limits: ConversionLimits) -> None:
+        self._max_depth = limits.max_depth
+        self._max_items = limits.max_items
+        self._depth = 0
+        self._items = 1
+
+    def enter(self, size: int) -> None:
+        # Children are charged when their container opens, so an oversized container fails
+        # before any of its members are rendered.
+        self._depth += 1
+        self._items += size
+        if self._items > self._max_items:
+            raise InvalidDataError("JSON item limit exceeded")
+        if size and self._depth > self._max_depth:
+            raise InvalidDataError("JSON nesting depth limit exceeded")
+
+    def leave(self) -> None:
+        self._depth -= 1
+
+    @property
+    def items(self) -> int:
+        """Values charged so far, counting the document itself."""
+        return self._items
+
 
 class _XMLWriter:
     """Small UTF-8 byte writer used by the internal streaming serializer."""
 
-    __slots__ = ("_buffer",)
+    __slots__ = ("_buffer", "budget")
 
     def __init__(self) -> None:
         self._buffer = BytesIO()
+        self.budget: _ConversionBudget | None = None
 
     def write(self, value: str) -> None:
         self._buffer.write(value.encode("utf-8"))
 
+    def start_element(self, markup: str) -> None:
+        """Write the opening tag of an element whose children follow."""
+        self.write(markup)
+
+    def end_element(self, markup: str) -> None:
+        """Write the closing tag matching the last :meth:`start_element`."""
+        self.write(markup)
+
+    def enter(self, size: int) -> None:
+        """Account for a container holding ``size`` members before they are written."""
+        if self.budget is not None:
+            self.budget.enter(size)
+
+    def leave(self) -> None:
+        if self.budget is not None:
+            self.budget.leave()
+
     def to_bytes(self) -> bytes:
         return self._buffer.getvalue()
 
 
+class _BoundedXMLWriter(_XMLWriter):
+    """Buffered writer that aborts as soon as the output exceeds a byte limit."""
+
+    __slots__ = ("_max_output_bytes",)
+
+    def __init__(self, max_output_bytes: int) -> None:
+        super().__init__()
+        self._max_output_bytes = max_output_bytes
+
+    def write(self, value: str) -> None:
+        buffer = self._buffer
+        buffer.write(value.encode("utf-8"))
+        if buffer.tell() > self._max_output_bytes:
+            raise InvalidDataError("XML output size limit exceeded")
+
+
+class _PrettyXMLWriter(_XMLWriter):
+    """Writer that indents elements as the walkers emit them, ``indent`` spaces per level.
+
+    Complete elements go on their own line, an element that only holds text keeps it inline,
+    and an element with no content is split into its opening and closing tags. Element names
+    and nesting are checked as they pass, so markup that is not well formed, or a DTD
+    declaration, is rejected instead of being indented.
+    """
+
+    __slots__ = ("_inner", "_indent", "_open", "_started", "_inline")
+
+    def __init__(self, inner: _XMLWriter, indent: int = DEFAULT_INDENT) -> None:
+        self._inner = inner
+        self._indent = " " * indent
+        self.budget = None
+        self._open: list[str] = []
+        self._started = False
+        self._inline = False
+
+    def _line(self, markup: str) -> None:
+        indent = self._indent * len(self._open)
+        self._inner.write(f"\n{indent}{markup}" if self._started else f"{indent}{markup}")
+        self._started = True
+        self._inline = False
+
+    def write(self, value: str) -> None:
+        if not value:
+            return
+        if value[0] != "<":
+            self._inner.write(value)
+            self._inline = True
+            return
+        if value.startswith("<?"):
+            self._line(value)
+            return
+        if value.startswith("<!"):
+            if value[2:].upper().startswith(("DOCTYPE", "ENTITY")):
+                raise InvalidDataError("Unsafe XML declaration rejected")
+            raise InvalidDataError("Malformed XML generated")
+        name = _tag_name(value)
+        content = value.find(">") + 1
+        if value.endswith("/>") and content == len(value):
+            self._line(value)
+        elif content and value.endswith(f"</{name}>"):
+            if content == len(value) - len(name) - 3:
+                self._line(value[:content])
+                self._line(value[content:])
+            else:
+                self._line(value)
+        else:
+            raise InvalidDataError("Malformed XML generated")
+
+    def start_element(self, markup: str) -> None:
+        name = _tag_name(markup)
+        self._line(markup)
+        self._open.append(name)
+
+    def end_element(self, markup: str) -> None:
+        if not self._open or markup != f"</{self._open.pop()}>":
+            raise InvalidDataError("Malformed XML generated")
+        if self._inline:
+            self._inner.write(markup)
+            self._inline = False
+        else:
+            self._line(markup)
+
+    def finish(self) -> None:
+        """Terminate the last line once every element is closed."""
+        if self._open:
+            raise InvalidDataError("Malformed XML generated")
+        self._inner.write("\n")
+
+
+class _ChunkedXMLWriter(_XMLWriter):
+    """Writer that hands fixed-size byte chunks to a callback as soon as they fill."""
+
+    __slots__ = ("_chunk_size", "_emit")
+
+    def __init__(self, chunk_size: int, emit: Callable[[bytes], None]) -> None:
+        super().__init__()
+        self._chunk_size = chunk_size
+        self._emit = emit
+
+    def write(self, value: str) -> None:
+        buffer = self._buffer
+        buffer.write(value.encode("utf-8"))
+        if buffer.tell() >= self._chunk_size:
+            self._drain()
+
+    def _drain(self) -> None:
+        chunk_size = self._chunk_size
+        buffer = self._buffer
+        with buffer.getbuffer() as view:
+            complete = len(view) - len(view) % chunk_size
+            for start in range(0, complete, chunk_size):
+                self._emit(bytes(view[start:start + chunk_size]))
+            remainder = bytes(view[complete:])
+        buffer.seek(0)
+        buffer.truncate()
+        buffer.write(remainder)
+
+    def close(self) -> None:
+        """Emit the final partial chunk, if any."""
+        remainder = self._buffer.getvalue()
+        self._buffer = BytesIO()
+        if remainder:
+            self._emit(remainder)
+
+
+def _limit_output(emit: Callable[[bytes], None], max_output_bytes: int) -> Callable[[bytes], None]:
+    """Wrap a chunk callback so no byte past ``max_output_bytes`` is ever handed on."""
+    written = 0
+
+    def bounded_emit(chunk: bytes) -> None:
+        nonlocal written
+        written += len(chunk)
+        if written > max_output_bytes:
+            raise InvalidDataError("XML output size limit exceeded")
+        emit(chunk)
+
+    return bounded_emit
+
+
+class _StreamClosed(Exception):
+    """Stop a background render after its chunk consumer went away."""
+
+
+_STREAM_END = object()
+
+
+def _iter_rendered_chunks(
+    render: Callable[[_XMLWriter], None], chunk_size: int, max_output_bytes: int | None = None
+) -> Iterator[bytes]:
+    """Yield the chunks produced by a writer-based render in document order.
+
+    The recursive walkers cannot suspend mid-document, so one worker thread renders into a
+    chunked writer while this generator hands chunks to the caller. The single-slot queue
+    keeps at most two chunks in flight however large the document grows.
+    """
+    chunks: queue.Queue[Any] = queue.Queue(maxsize=1)
+    closed = threading.Event()
+
+    def emit(chunk: bytes) -> None:
+        chunks.put(chunk)
+        if closed.is_set():
+            raise _StreamClosed
+
+    def produce() -> None:
+        try:
+            sink = emit if max_output_bytes is None else _limit_output(emit, max_output_bytes)
+            output = _ChunkedXMLWriter(chunk_size, sink)
+            render(output)
+            output.close()
+        except BaseException as error:
+            chunks.put(error)
+        else:
+            chunks.put(_STREAM_END)
+
+    worker = threading.Thread(target=produce, name="json2xml-stream", daemon=True)
+    worker.start()
+    finished = False
+    try:
+        while True:
+            item = chunks.get()
+            if item is _STREAM_END:
+                finished = True
+                return
+            if isinstance(item, BaseException):
+                finished = True
+                raise item
+            yield item
+    finally:
+        closed.set()
+        while not finished:
+            item = chunks.get()
+            finished = item is _STREAM_END or isinstance(item, BaseException)
+        worker.join()
+
+
+def sink_writer(sink: XMLSink) -> Callable[[bytes], None]:
+    """
+    Return a callable that writes every byte of a chunk to an output sink.
+
+    Args:
+        sink: A binary file object (anything with ``write(bytes)``), a raw file
+            descriptor, or a connected socket.
+
+    Returns:
+        Callable[[bytes], None]: A writer that retries partial writes until the chunk is sent.
+    """
+    if isinstance(sink, socket.socket):
+        return sink.sendall
+    if isinstance(sink, int) and not isinstance(sink, bool):
+        fd = sink
+
+        def write_fd(chunk: bytes) -> None:
+            view = memoryview(chunk)
+            while view:
+                written = os.write(fd, view)
+                if not written:
+                    raise OSError(errno.EIO, "sink accepted no bytes")
+                view = view[written:]
+
+        return write_fd
+    write = getattr(sink, "write", None)
+    if not callable(write):
+        raise TypeError("sink must be a binary file object, file descriptor, or socket")
+    # Raw streams return None when a non-blocking write would block; other file-like
+    # objects often return None once they consumed everything.
+    raw = isinstance(sink, RawIOBase)
+
+    def write_stream(chunk: bytes) -> None:
+        data: bytes | memoryview = chunk
+        while data:
+            # Only a count covering the whole remainder finishes the chunk; raw streams may
+            # accept a prefix.
+            written = write(data)
+            if written is None:
+                if raw:
+                    raise BlockingIOError(errno.EAGAIN, "sink is not ready for writing")
+                return
+            if written <= 0:
+                raise OSError(errno.EIO, "sink accepted no bytes")
+            data = memoryview(data)[written:]
+
+    return write_stream
+
+
+def _validate_indent(indent: int) -> int:
+    if isinstance(indent, bool) or not isinstance(indent, int) or indent < 0:
+        raise ValueError("indent must be a non-negative integer")
+    return indent
+
+
+def _validate_ids(id_strategy: str, id_seed: int) -> None:
+    if id_strategy not in ID_STRATEGIES:
+        raise ValueError(f"id_strategy must be one of: {', '.join(ID_STRATEGIES)}")
+    if isinstance(id_seed, bool) or not isinstance(id_seed, int) or not 0 <= id_seed <= _MASK_64:
+        raise ValueError("id_seed must be an integer between 0 and 2**64 - 1")
+
+
+def _validate_chunk_size(chunk_size: int) -> int:
+    if isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer")
+    return chunk_size
+
+
 def make_id(element: str, start: int = 100000, end: int = 999999) -> str:
     """
     Generate a random ID for a given element.
@@ -62,6 +399,53 @@ def get_unique_id(element: str) -> str:
     return make_id(element)
 
 
+class _IdGenerator:
+    """Produce the ``id`` attributes of one document.
+
+    ``random`` keeps the :func:`get_unique_id` values and ``counter`` numbers IDs through the
+    document. ``path`` derives them from the element's position, the parent tag plus the dict
+    key, so an ID only changes when its own key does; ``%`` and ``_`` in keys are
+    percent-encoded so no key can spell another member's ID. ``seeded`` draws six-digit
+    suffixes from a SplitMix64 stream, reproducible without an OS random call and computed
+    identically by the Rust backend.
+    """
+
+    __slots__ = ("_strategy", "_count", "_state")
+
+    def __init__(self, strategy: str, seed: int) -> None:
+        self._strategy = strategy
+        self._count = 0
+        self._state = seed
+
+    def next_id(self, parent: str, key: Any = None) -> str:
+        """Return the ID of a dict member named ``key``, or the base ID of a list's members."""
+        strategy = self._strategy
+        if strategy == "counter":
+            self._count += 1
+            return f"{parent}_{self._count}"
+        if strategy == "path":
+            if key is None:
+                return parent
+            return f"{parent}_{str(key).replace('%', '%25').replace('_', '%5F')}"
+        if strategy == "seeded":
+            return f"{parent}_{100000 + self._splitmix64() % 900000}"
+        return get_unique_id(parent)
+
+    def _splitmix64(self) -> int:
+        self._state = (self._state + 0x9E3779B97F4A7C15) & _MASK_64
+        value = self._state
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK_64
+        return value ^ (value >> 31)
+
+
+def _element_id(ids: Any, parent: str, key: Any = None) -> str:
+    """Return the next ID from a document's generator; legacy helpers draw random IDs."""
+    if isinstance(ids, _IdGenerator):
+        return ids.next_id(parent, key)
+    return get_unique_id(parent)
+
+
 ELEMENT = Union[
     str,
     int,
@@ -201,58 +585,169 @@ def make_typed_attrstring(attr: dict[str, Any], xml_type: str) -> str:
     return make_attrstring(typed_attr)
 
 
-def _is_fast_valid_xml_name(key: str) -> bool:
-    """Return True for ASCII XML names known to be accepted by the legacy parser."""
-    if not key or not key.isascii() or ":" in key:
-        return False
-    first = key[0]
-    if not (first.isalpha() or first == "_"):
-        return False
-    return all(char.isalnum() or char in {"-", "_", "."} for char in key[1:])
+# Name characters of XML 1.0 (Fourth Edition) Appendix B, limited to the Basic Multilingual
+# Plane: the names expat accepts, which is what these validators used to ask it about.
+_XML_NAME_START_CHARS = (
+    "A-Z_a-z\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u0131\u0134-\u013e\u0141-\u0148\u014a-\u017e"
+    "\u0180-\u01c3\u01cd-\u01f0\u01f4-\u01f5\u01fa-\u0217\u0250-\u02a8\u02bb-\u02c1\u0386"
+    "\u0388-\u038a\u038c\u038e-\u03a1\u03a3-\u03ce\u03d0-\u03d6\u03da\u03dc\u03de\u03e0"
+    "\u03e2-\u03f3\u0401-\u040c\u040e-\u044f\u0451-\u045c\u045e-\u0481\u0490-\u04c4"
+    "\u04c7-\u04c8\u04cb-\u04cc\u04d0-\u04eb\u04ee-\u04f5\u04f8-\u04f9\u0531-\u0556\u0559"
+    "\u0561-\u0586\u05d0-\u05ea\u05f0-\u05f2\u0621-\u063a\u0641-\u064a\u0671-\u06b7"
+    "\u06ba-\u06be\u06c0-\u06ce\u06d0-\u06d3\u06d5\u06e5-\u06e6\u0905-\u0939\u093d\u0958-\u0961"
+    "\u0985-\u098c\u098f-\u0990\u0993-\u09a8\u09aa-\u09b0\u09b2\u09b6-\u09b9\u09dc-\u09dd"
+    "\u09df-\u09e1\u09f0-\u09f1\u0a05-\u0a0a\u0a0f-\u0a10\u0a13-\u0a28\u0a2a-\u0a30"
+    "\u0a32-\u0a33\u0a35-\u0a36\u0a38-\u0a39\u0a59-\u0a5c\u0a5e\u0a72-\u0a74\u0a85-\u0a8b\u0a8d"
+    "\u0a8f-\u0a91\u0a93-\u0aa8\u0aaa-\u0ab0\u0ab2-\u0ab3\u0ab5-\u0ab9\u0abd\u0ae0\u0b05-\u0b0c"
+    "\u0b0f-\u0b10\u0b13-\u0b28\u0b2a-\u0b30\u0b32-\u0b33\u0b36-\u0b39\u0b3d\u0b5c-\u0b5d"
+    "\u0b5f-\u0b61\u0b85-\u0b8a\u0b8e-\u0b90\u0b92-\u0b95\u0b99-\u0b9a\u0b9c\u0b9e-\u0b9f"
+    "\u0ba3-\u0ba4\u0ba8-\u0baa\u0bae-\u0bb5\u0bb7-\u0bb9\u0c05-\u0c0c\u0c0e-\u0c10"
+    "\u0c12-\u0c28\u0c2a-\u0c33\u0c35-\u0c39\u0c60-\u0c61\u0c85-\u0c8c\u0c8e-\u0c90"
+    "\u0c92-\u0ca8\u0caa-\u0cb3\u0cb5-\u0cb9\u0cde\u0ce0-\u0ce1\u0d05-\u0d0c\u0d0e-\u0d10"
+    "\u0d12-\u0d28\u0d2a-\u0d39\u0d60-\u0d61\u0e01-\u0e2e\u0e30\u0e32-\u0e33\u0e40-\u0e45"
+    "\u0e81-\u0e82\u0e84\u0e87-\u0e88\u0e8a\u0e8d\u0e94-\u0e97\u0e99-\u0e9f\u0ea1-\u0ea3\u0ea5"
+    "\u0ea7\u0eaa-\u0eab\u0ead-\u0eae\u0eb0\u0eb2-\u0eb3\u0ebd\u0ec0-\u0ec4\u0f40-\u0f47"
+    "\u0f49-\u0f69\u10a0-\u10c5\u10d0-\u10f6\u1100\u1102-\u1103\u1105-\u1107\u1109\u110b-\u110c"
+    "\u110e-\u1112\u113c\u113e\u1140\u114c\u114e\u1150\u1154-\u1155\u1159\u115f-\u1161\u1163"
+    "\u1165\u1167\u1169\u116d-\u116e\u1172-\u1173\u1175\u119e\u11a8\u11ab\u11ae-\u11af"
+    "\u11b7-\u11b8\u11ba\u11bc-\u11c2\u11eb\u11f0\u11f9\u1e00-\u1e9b\u1ea0-\u1ef9\u1f00-\u1f15"
+    "\u1f18-\u1f1d\u1f20-\u1f45\u1f48-\u1f4d\u1f50-\u1f57\u1f59\u1f5b\u1f5d\u1f5f-\u1f7d"
+    "\u1f80-\u1fb4\u1fb6-\u1fbc\u1fbe\u1fc2-\u1fc4\u1fc6-\u1fcc\u1fd0-\u1fd3\u1fd6-\u1fdb"
+    "\u1fe0-\u1fec\u1ff2-\u1ff4\u1ff6-\u1ffc\u2126\u212a-\u212b\u212e\u2180-\u2182\u3007"
+    "\u3021-\u3029\u3041-\u3094\u30a1-\u30fa\u3105-\u312c\u4e00-\u9fa5\uac00-\ud7a3"
+)
+_XML_NAME_CHARS = _XML_NAME_START_CHARS + (
+    "\\-.0-9\u00b7\u02d0-\u02d1\u0300-\u0345\u0360-\u0361\u0387\u0483-\u0486\u0591-\u05a1"
+    "\u05a3-\u05b9\u05bb-\u05bd\u05bf\u05c1-\u05c2\u05c4\u0640\u064b-\u0652\u0660-\u0669\u0670"
+    "\u06d6-\u06e4\u06e7-\u06e8\u06ea-\u06ed\u06f0-\u06f9\u0901-\u0903\u093c\u093e-\u094d"
+    "\u0951-\u0954\u0962-\u0963\u0966-\u096f\u0981-\u0983\u09bc\u09be-\u09c4\u09c7-\u09c8"
+    "\u09cb-\u09cd\u09d7\u09e2-\u09e3\u09e6-\u09ef\u0a02\u0a3c\u0a3e-\u0a42\u0a47-\u0a48"
+    "\u0a4b-\u0a4d\u0a66-\u0a71\u0a81-\u0a83\u0abc\u0abe-\u0ac5\u0ac7-\u0ac9\u0acb-\u0acd"
+    "\u0ae6-\u0aef\u0b01-\u0b03\u0b3c\u0b3e-\u0b43\u0b47-\u0b48\u0b4b-\u0b4d\u0b56-\u0b57"
+    "\u0b66-\u0b6f\u0b82-\u0b83\u0bbe-\u0bc2\u0bc6-\u0bc8\u0bca-\u0bcd\u0bd7\u0be7-\u0bef"
+    "\u0c01-\u0c03\u0c3e-\u0c44\u0c46-\u0c48\u0c4a-\u0c4d\u0c55-\u0c56\u0c66-\u0c6f"
+    "\u0c82-\u0c83\u0cbe-\u0cc4\u0cc6-\u0cc8\u0cca-\u0ccd\u0cd5-\u0cd6\u0ce6-\u0cef"
+    "\u0d02-\u0d03\u0d3e-\u0d43\u0d46-\u0d48\u0d4a-\u0d4d\u0d57\u0d66-\u0d6f\u0e31\u0e34-\u0e3a"
+    "\u0e46-\u0e4e\u0e50-\u0e59\u0eb1\u0eb4-\u0eb9\u0ebb-\u0ebc\u0ec6\u0ec8-\u0ecd\u0ed0-\u0ed9"
+    "\u0f18-\u0f19\u0f20-\u0f29\u0f35\u0f37\u0f39\u0f3e-\u0f3f\u0f71-\u0f84\u0f86-\u0f8b"
+    "\u0f90-\u0f95\u0f97\u0f99-\u0fad\u0fb1-\u0fb7\u0fb9\u20d0-\u20dc\u20e1\u3005\u302a-\u302f"
+    "\u3031-\u3035\u3099-\u309a\u309d-\u309e\u30fc-\u30fe"
+)
+_XML_NCNAME = re.compile(f"[{_XML_NAME_START_CHARS}][{_XML_NAME_CHARS}]*")
+_TAG_NAME = re.compile(r"[^\s/>]*")
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R", covariant=True)
+# The fields of functools.lru_cache's cache_info().
+_CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _SharedCache(Protocol[_P, _R]):
+    """A function memoized by :func:`_shared_cache`."""
+
+    def __call__(self, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        raise NotImplementedError  # pragma: no cover
+
+    def cache_info(self) -> _CacheInfo:
+        raise NotImplementedError  # pragma: no cover
+
+    def cache_clear(self) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+
+def _shared_cache(maxsize: int) -> Callable[[Callable[_P, _R]], _SharedCache[_P, _R]]:
+    """Memoize a pure function in a plain dict shared by every thread.
+
+    ``functools.lru_cache`` locks on each call under free-threaded CPython, so threads
+    converting at once queue on the name caches. Dict lookups need no lock: two threads that
+    miss together both compute the same value, and a full cache evicts its oldest entry
+    rather than reordering entries on every hit. ``cache_info`` and ``cache_clear`` behave
+    like ``lru_cache``'s, though hit and miss counts may drift when threads race.
+    """
+
+    def decorate(function: Callable[_P, _R]) -> _SharedCache[_P, _R]:
+        cache: dict[Any, _R] = {}
+        stats = [0, 0]
+
+        @wraps(function)
+        def cached(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+            key = (args, tuple(kwargs.items())) if kwargs else args
+            try:
+                value = cache[key]
+            except KeyError:
+                pass
+            else:
+                stats[0] += 1
+                return value
+            stats[1] += 1
+            value = function(*args, **kwargs)
+            if len(cache) >= maxsize:
+                # Another thread may evict or insert concurrently; losing that race is harmless.
+                with suppress(KeyError, RuntimeError, StopIteration):
+                    del cache[next(iter(cache))]
+            cache[key] = value
+            return value
 
+        def cache_info() -> _CacheInfo:
+            return _CacheInfo(stats[0], stats[1], maxsize, len(cache))
 
-@lru_cache(maxsize=4096)
+        def cache_clear() -> None:
+            cache.clear()
+            stats[:] = [0, 0]
+
+        cached.cache_info = cache_info  # type: ignore[attr-defined]
+        cached.cache_clear = cache_clear  # type: ignore[attr-defined]
+        return cast("_SharedCache[_P, _R]", cached)
+
+    return decorate
+
+
+@_shared_cache(maxsize=4096)
 def key_is_valid_xml(key: str) -> bool:
     """
     Check if a key is a valid XML name.
 
+    Colons are rejected; :func:`make_valid_xml_name` decides whether a prefixed key is kept.
+
     Args:
         key (str): The key to check.
 
     Returns:
         bool: True if the key is a valid XML name, False otherwise.
     """
-    key = str(key)
-    if _is_fast_valid_xml_name(key):
-        return True
-    if not key or key.isdigit() or ":" in key:
-        return False
+    return _XML_NCNAME.fullmatch(str(key)) is not None
 
-    from defusedxml.minidom import parseString
 
-    test_xml = f'<?xml version="1.0" encoding="UTF-8" ?><{key}>foo</{key}>'
-    try:
-        parseString(test_xml)
-        return True
-    except Exception:  # minidom does not implement exceptions well
+@_shared_cache(maxsize=4096)
+def key_is_valid_xml_attr(key: str) -> bool:
+    """Return True when key can be emitted directly as an XML attribute name.
+
+    Like a namespace-aware parser, this accepts a name without colons or one prefixed with
+    ``xml:`` or ``xmlns:``; ``xmlns`` may not rebind ``xml`` or ``xmlns``.
+    """
+    prefix, colon, local = str(key).partition(":")
+    if not colon:
+        return _XML_NCNAME.fullmatch(prefix) is not None
+    if _XML_NCNAME.fullmatch(local) is None:
         return False
+    return prefix == "xml" or (prefix == "xmlns" and local not in ("xml", "xmlns"))
 
 
-@lru_cache(maxsize=4096)
-def key_is_valid_xml_attr(key: str) -> bool:
-    """Return True when key can be emitted directly as an XML attribute name."""
-    key = str(key)
-    if not key:
-        return False
+@_shared_cache(maxsize=4096)
+def _is_xml_tag_name(name: str) -> bool:
+    """Return True when name is an NCName, optionally prefixed by another NCName."""
+    prefix, colon, local = name.partition(":")
+    return _XML_NCNAME.fullmatch(prefix) is not None and (
+        not colon or _XML_NCNAME.fullmatch(local) is not None
+    )
 
-    from defusedxml.minidom import parseString
 
-    test_xml = f'<?xml version="1.0" encoding="UTF-8" ?><root {key}="value"></root>'
-    try:
-        parseString(test_xml)
-        return True
-    except Exception:  # minidom does not implement exceptions well
-        return False
+def _tag_name(markup: str) -> str:
+    """Return the name of the element a start tag opens, rejecting names XML does not allow."""
+    name = _TAG_NAME.match(markup, 1).group()  # type: ignore[union-attr]
+    if not _is_xml_tag_name(name):
+        raise InvalidDataError("Malformed XML generated")
+    return name
 
 
 def validate_xml_attr_names(attr: dict[str, Any]) -> None:
@@ -368,15 +863,19 @@ def _append_xpath31(
     elif tag_name == "string":
         output.write(f"<string{namespace_attr}{key_attr}>{escape_xml(str(obj))}</string>")
     elif tag_name == "map":
-        output.write(f"<map{namespace_attr}{key_attr}>")
+        output.start_element(f"<map{namespace_attr}{key_attr}>")
+        output.enter(len(obj))
         for key, val in obj.items():
             _append_xpath31(output, val, key)
-        output.write("</map>")
+        output.leave()
+        output.end_element("</map>")
     elif tag_name == "array":
-        output.write(f"<array{namespace_attr}{key_attr}>")
+        output.start_element(f"<array{namespace_attr}{key_attr}>")
+        output.enter(len(obj))
         for item in obj:
             _append_xpath31(output, item)
-        output.write("</array>")
+        output.leave()
+        output.end_element("</array>")
     else:
         output.write(f"<string{namespace_attr}{key_attr}>{escape_xml(str(obj))}</string>")
 
@@ -644,9 +1143,9 @@ def _append_dict2xml_str(
 
     if parentIsList and list_headers:
         if len(val_attr) > 0 and not item_wrap:
-            output.write(f"<{parent}{make_attrstring(val_attr)}>")
+            output.start_element(f"<{parent}{make_attrstring(val_attr)}>")
         else:
-            output.write(f"<{parent}>")
+            output.start_element(f"<{parent}>")
         _append_rawitem(
             output,
             rawitem,
@@ -658,7 +1157,7 @@ def _append_dict2xml_str(
             item_name,
             list_headers,
         )
-        output.write(f"</{parent}>")
+        output.end_element(f"</{parent}>")
     elif item.get("@flat", False) or (parentIsList and not item_wrap):
         _append_rawitem(
             output,
@@ -672,7 +1171,7 @@ def _append_dict2xml_str(
             list_headers,
         )
     else:
-        output.write(f"<{item_name}{make_attrstring(val_attr)}>")
+        output.start_element(f"<{item_name}{make_attrstring(val_attr)}>")
         _append_rawitem(
             output,
             rawitem,
@@ -684,7 +1183,7 @@ def _append_dict2xml_str(
             item_name,
             list_headers,
         )
-        output.write(f"</{item_name}>")
+        output.end_element(f"</{item_name}>")
 
 
 def _append_rawitem(
@@ -767,7 +1266,7 @@ def _append_list2xml_str(
         )
         return
 
-    output.write(f"<{item_name}{make_attrstring(attr)}>")
+    output.start_element(f"<{item_name}{make_attrstring(attr)}>")
     _append_convert_list(
         output,
         item,
@@ -779,7 +1278,7 @@ def _append_list2xml_str(
         item_wrap,
         list_headers=list_headers,
     )
-    output.write(f"</{item_name}>")
+    output.end_element(f"</{item_name}>")
 
 
 def _append_convert_dict(
@@ -794,11 +1293,15 @@ def _append_convert_dict(
     list_headers: bool = False,
 ) -> None:
     """Append a dict as XML without allocating a joined child subtree."""
+    output.enter(len(obj))
     for key, val in obj.items():
         val_type = type(val)
-        attr = {} if not ids else {"id": f"{get_unique_id(parent)}"}
         key_is_flat = isinstance(key, str) and key.endswith("@flat")
         xml_key = key[:-5] if key_is_flat else key
+        if not ids and (val_type in _CACHED_TAG_TYPES or val is None):
+            _append_scalar(output, str(xml_key), val, attr_type, cdata)
+            continue
+        attr = {} if not ids else {"id": _element_id(ids, parent, key)}
 
         key, attr = make_valid_xml_name(xml_key, attr)
 
@@ -880,6 +1383,7 @@ def _append_convert_dict(
             output.write(convert_none_valid_name(key, attr_type, attr))
         else:
             raise TypeError(f"Unsupported data type: {val} ({type(val).__name__})")
+    output.leave()
 
 
 def _append_convert_list(
@@ -894,16 +1398,34 @@ def _append_convert_list(
     list_headers: bool = False,
 ) -> None:
     """Append a list as XML without allocating a joined child subtree."""
-    item_name = item_func(parent)
-    if item_name.endswith("@flat"):
-        item_name = item_name[:-5]
-    item_name, item_name_attr = make_valid_xml_name(item_name, {})
-    scalar_key = item_name if item_wrap else parent
-    scalar_key, scalar_key_attr = make_valid_xml_name(scalar_key, {})
-    this_id = get_unique_id(parent) if ids else None
-
+    raw_item_name = item_func(parent)
+    if raw_item_name.endswith("@flat"):
+        raw_item_name = raw_item_name[:-5]
+    item_name, item_name_attr = make_valid_xml_name(raw_item_name, {})
+    raw_scalar_key = item_name if item_wrap else parent
+    scalar_key, scalar_key_attr = make_valid_xml_name(raw_scalar_key, {})
+    this_id = _element_id(ids, parent) if ids else None
+    # Records written by the emitter get no ids, and list headers rename each record.
+    emitter = None
+    if not ids and item_wrap and not list_headers:
+        if type(items) is Columns and not any(type(key) is not str or "@" in key for key in items.names):
+            output.enter(len(items))
+            _append_columns(output, items, item_func, attr_type, cdata, item_name, parent)
+            output.leave()
+            return
+        emitter = _infer_record_emitter(items, item_name, attr_type, cdata)
+
+    output.enter(len(items))
     for i, item in enumerate(items):
         item_type = type(item)
+        if emitter is not None and item_type is dict and emitter.matches(item):
+            emitter.write(output, item)
+            continue
+        if not ids and (item_type in _CACHED_TAG_TYPES or item is None):
+            # Booleans and None always use the item name; strings and numbers follow item_wrap.
+            tag_key = raw_item_name if item_type is bool or item is None else raw_scalar_key
+            _append_scalar(output, tag_key, item, attr_type, cdata)
+            continue
         base_attr: dict[str, Any] | None = None
         if ids:
             base_attr = {"id": f"{this_id}_{i + 1}"}
@@ -1015,6 +1537,7 @@ def _append_convert_list(
             output.write(convert_none_valid_name(item_name, attr_type, attr))
         else:
             raise TypeError(f"Unsupported data type: {item} ({type(item).__name__})")
+    output.leave()
 
 
 def convert_kv(
@@ -1101,6 +1624,300 @@ def convert_none_valid_name(
     return f"<{key}{attr_string}></{key}>"
 
 
+# Scalar types whose element tags depend only on the key, so they can be cached.
+_CACHED_TAG_TYPES = frozenset({str, int, float, bool})
+
+
+@_shared_cache(maxsize=4096)
+def _scalar_tags(key: str, xml_type: str | None) -> tuple[str, str]:
+    """Return the opening and closing tags of a scalar element named after a raw key.
+
+    ``xml_type`` is None when type attributes are off. Record-shaped data repeats a few
+    dozen keys, so name validation and attribute formatting run once per key and type.
+    """
+    name, attr = make_valid_xml_name(key, {})
+    if xml_type is not None:
+        attr["type"] = xml_type
+    return f"<{name}{make_attrstring(attr)}>", f"</{name}>"
+
+
+def _append_scalar(
+    output: _XMLWriter, key: str, val: Any, attr_type: bool, cdata: bool
+) -> None:
+    """Append a string, number, boolean or null element without an ``id``."""
+    open_tag, close_tag = _scalar_tags(key, get_xml_type(val) if attr_type else None)
+    if val is None:
+        output.write(f"{open_tag}{close_tag}")
+    elif val is True or val is False:
+        output.write(f"{open_tag}{'true' if val else 'false'}{close_tag}")
+    else:
+        output.write(f"{open_tag}{wrap_cdata(val) if cdata else escape_xml(val)}{close_tag}")
+
+
+# XML type names of the value types a record shape may hold.
+_SHAPE_TYPE_NAMES = {str: "str", int: "int", float: "float", bool: "bool", type(None): "null"}
+
+# Number of leading list items sampled for a record shape worth specializing.
+_SHAPE_SAMPLE_SIZE = 8
+
+
+def _format_bool(val: bool) -> str:
+    return "true" if val else "false"
+
+
+def _format_null(val: None) -> str:
+    return ""
+
+
+def _shape_formatter(val_type: type, cdata: bool) -> Callable[[Any], str]:
+    """Return the function formatting element text for values of one shape type."""
+    if val_type is bool:
+        return _format_bool
+    if val_type is type(None):
+        return _format_null
+    if cdata:
+        return wrap_cdata
+    # Integers and floats print without markup characters.
+    return escape_xml if val_type is str else str
+
+
+def _record_tags(item_name: str, attr_type: bool) -> tuple[str, str]:
+    """Return the opening and closing tags of a dict list item without an ``id``."""
+    return f"<{item_name}{make_attrstring({'type': 'dict'} if attr_type else {})}>", f"</{item_name}>"
+
+
+def _write_record(output: _XMLWriter, open_tag: str, close_tag: str, cells: Sequence[str]) -> None:
+    """Write a dict list item whose fields are already formatted scalar elements."""
+    output.enter(len(cells))
+    if type(output) is _PrettyXMLWriter:
+        # Pretty output places each element by its own write.
+        output.start_element(open_tag)
+        for cell in cells:
+            output.write(cell)
+        output.end_element(close_tag)
+    else:
+        output.write(f"{open_tag}{''.join(cells)}{close_tag}")
+    output.leave()
+
+
+class _RecordEmitter:
+    """Writes list items that are dicts of one shape: the same keys, in order, and value types.
+
+    Tags, type attributes and a value formatter are fixed per field when the emitter is built,
+    so each conforming record costs two tuple comparisons and one formatted string per field.
+    """
+
+    __slots__ = ("keys", "types", "_open", "_close", "_fields")
+
+    def __init__(
+        self,
+        item_name: str,
+        keys: tuple[str, ...],
+        types: tuple[type, ...],
+        attr_type: bool,
+        cdata: bool,
+    ) -> None:
+        self.keys = keys
+        self.types = types
+        self._open, self._close = _record_tags(item_name, attr_type)
+        self._fields = tuple(
+            (*_scalar_tags(key, _SHAPE_TYPE_NAMES[val_type] if attr_type else None),
+             _shape_formatter(val_type, cdata))
+            for key, val_type in zip(keys, types)
+        )
+
+    def matches(self, record: dict[str, Any]) -> bool:
+        return tuple(record) == self.keys and tuple(map(type, record.values())) == self.types
+
+    def write(self, output: _XMLWriter, record: dict[str, Any]) -> None:
+        cells = [
+            f"{open_tag}{formatter(val)}{close_tag}"
+            for (open_tag, close_tag, formatter), val in zip(self._fields, record.values())
+        ]
+        _write_record(output, self._open, self._close, cells)
+
+
+def _record_shape(record: Any) -> tuple[tuple[str, ...], tuple[type, ...]] | None:
+    """Return the keys and value types of a flat dict of plain keys, or None."""
+    if type(record) is not dict:
+        return None
+    keys = tuple(record)
+    types = tuple(map(type, record.values()))
+    for key in keys:
+        # Special @ keys and @flat suffixes need the generic dict walker.
+        if type(key) is not str or "@" in key:
+            return None
+    for val_type in types:
+        if val_type not in _SHAPE_TYPE_NAMES:
+            return None
+    return keys, types
+
+
+@_shared_cache(maxsize=256)
+def _record_emitter(
+    item_name: str,
+    keys: tuple[str, ...],
+    types: tuple[type, ...],
+    attr_type: bool,
+    cdata: bool,
+) -> _RecordEmitter:
+    return _RecordEmitter(item_name, keys, types, attr_type, cdata)
+
+
+def _infer_record_emitter(
+    items: Sequence[Any], item_name: str, attr_type: bool, cdata: bool
+) -> _RecordEmitter | None:
+    """Return an emitter for the most common record shape among the first list items.
+
+    The shape must repeat within the sample; lists of differently shaped or non-dict items
+    keep the generic walker.
+    """
+    counts: dict[tuple[tuple[str, ...], tuple[type, ...]], int] = {}
+    for item in items[:_SHAPE_SAMPLE_SIZE]:
+        shape = _record_shape(item)
+        if shape is not None:
+            counts[shape] = counts.get(shape, 0) + 1
+    if not counts:
+        return None
+    shape, count = max(counts.items(), key=lambda entry: entry[1])
+    if count < 2:
+        return None
+    return _record_emitter(item_name, *shape, attr_type, cdata)
+
+
+# Rows of a Columns container read and formatted per batch.
+_COLUMN_BATCH_ROWS = 4096
+
+
+def _column_values(column: Any, start: int, stop: int) -> list[Any]:
+    """Return rows ``start:stop`` of a column as Python values."""
+    values = column[start:stop]
+    # NumPy arrays convert their scalars to the equivalent Python values in one call.
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+class Columns(Sequence[dict[str, Any]]):
+    """Records stored column by column, converted like the list of row dicts they hold.
+
+    ``columns`` maps each field name to an equally long sequence of values. The serializer
+    formats each column in batches and writes the rows directly, so no row dicts are built for
+    plain string, number, boolean and null values. Columns with a ``tolist()`` method, such as
+    NumPy arrays, are read as the Python values ``tolist()`` returns.
+    """
+
+    __slots__ = ("names", "_columns", "_length")
+
+    def __init__(self, columns: dict[str, Any]) -> None:
+        self.names = tuple(columns)
+        self._columns = tuple(columns[name] for name in self.names)
+        lengths = {len(column) for column in self._columns}
+        if len(lengths) > 1:
+            raise ValueError("Columns must all have the same length")
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_array(cls, array: Any) -> Columns:
+        """Wrap a NumPy structured array, whose ``dtype.names`` lists its fields."""
+        names = array.dtype.names
+        if not names:
+            raise ValueError("Array has no named fields")
+        return cls({name: array[name] for name in names})
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(self, index: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step == 1:
+                return self._rows(start, stop)
+            return [self[row] for row in range(start, stop, step)]
+        row = index + self._length if index < 0 else index
+        if not 0 <= row < self._length:
+            raise IndexError("Columns index out of range")
+        return self._rows(row, row + 1)[0]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for start in range(0, self._length, _COLUMN_BATCH_ROWS):
+            yield from self._rows(start, min(start + _COLUMN_BATCH_ROWS, self._length))
+
+    def batches(self) -> Iterator[list[list[Any]]]:
+        """Yield the values of every column for successive batches of rows."""
+        for start in range(0, self._length, _COLUMN_BATCH_ROWS):
+            stop = min(start + _COLUMN_BATCH_ROWS, self._length)
+            yield [_column_values(column, start, stop) for column in self._columns]
+
+    def _rows(self, start: int, stop: int) -> list[dict[str, Any]]:
+        columns = [_column_values(column, start, stop) for column in self._columns]
+        return [dict(zip(self.names, row)) for row in zip(*columns)]
+
+
+def _format_column(key: str, values: list[Any], attr_type: bool, cdata: bool) -> list[str | None]:
+    """Format a batch of column values as scalar elements, with None for other values."""
+    value_types = set(map(type, values))
+    if len(value_types) == 1 and (val_type := value_types.pop()) in _SHAPE_TYPE_NAMES:
+        open_tag, close_tag = _scalar_tags(key, _SHAPE_TYPE_NAMES[val_type] if attr_type else None)
+        return [f"{open_tag}{text}{close_tag}" for text in map(_shape_formatter(val_type, cdata), values)]
+    fields: dict[type, tuple[str, str, Callable[[Any], str]]] = {}
+    cells: list[str | None] = []
+    for val in values:
+        val_type = type(val)
+        field = fields.get(val_type)
+        if field is None:
+            if val_type not in _SHAPE_TYPE_NAMES:
+                cells.append(None)
+                continue
+            field = fields[val_type] = (
+                *_scalar_tags(key, _SHAPE_TYPE_NAMES[val_type] if attr_type else None),
+                _shape_formatter(val_type, cdata),
+            )
+        open_tag, close_tag, formatter = field
+        cells.append(f"{open_tag}{formatter(val)}{close_tag}")
+    return cells
+
+
+def _append_columns(
+    output: _XMLWriter,
+    columns: Columns,
+    item_func: Callable[[str], str],
+    attr_type: bool,
+    cdata: bool,
+    item_name: str,
+    parent: str,
+) -> None:
+    """Append the rows of a Columns container as wrapped dict list items without ids."""
+    open_tag, close_tag = _record_tags(item_name, attr_type)
+    for values in columns.batches():
+        cells = [
+            _format_column(key, column, attr_type, cdata)
+            for key, column in zip(columns.names, values)
+        ]
+        for row, row_cells in enumerate(zip(*cells)):
+            if None in row_cells:
+                # Dates, decimals, nested values and other outliers take the generic walker.
+                record = dict(zip(columns.names, (column[row] for column in values)))
+                _append_dict2xml_str(
+                    output,
+                    attr_type=attr_type,
+                    attr={},
+                    item=record,
+                    item_func=item_func,
+                    cdata=cdata,
+                    item_name=item_name,
+                    item_wrap=True,
+                    parentIsList=True,
+                    parent=parent,
+                )
+            else:
+                _write_record(output, open_tag, close_tag, cast("tuple[str, ...]", row_cells))
+
+
 @dataclass(frozen=True, slots=True)
 class SerializerConfig:
     """Normalized options for the pure Python serializer engine."""
@@ -1108,7 +1925,7 @@ class SerializerConfig:
     obj: ELEMENT
     root: bool
     custom_root: str
-    ids: list[int] | None
+    ids: list[int] | bool | None
     attr_type: bool
     item_wrap: bool
     item_func: Callable[[str], str]
@@ -1116,6 +1933,15 @@ class SerializerConfig:
     xml_namespaces: dict[str, Any] | None
     list_headers: bool
     xpath_format: bool
+    limits: ConversionLimits | None = None
+    pretty: bool = False
+    indent: int = DEFAULT_INDENT
+    id_strategy: str = "random"
+    id_seed: int = 0
+
+    def document_ids(self) -> _IdGenerator | None:
+        """Return a fresh ID generator for one rendered document, or None without ``ids``."""
+        return _IdGenerator(self.id_strategy, self.id_seed) if self.ids else None
 
 
 class _XPathDocumentRenderer:
@@ -1124,17 +1950,15 @@ class _XPathDocumentRenderer:
     def __init__(self, config: SerializerConfig) -> None:
         self._config = config
 
-    def render(self) -> bytes:
-        output = _XMLWriter()
+    def render_into(self, output: _XMLWriter) -> None:
         output.write('<?xml version="1.0" encoding="UTF-8" ?>')
         tag_name = get_xpath31_tag_name(self._config.obj)
         if tag_name in {"map", "array"}:
             _append_xpath31(output, self._config.obj, namespace=True)
         else:
-            output.write(f'<map xmlns="{XPATH_FUNCTIONS_NS}">')
+            output.start_element(f'<map xmlns="{XPATH_FUNCTIONS_NS}">')
             _append_xpath31(output, self._config.obj)
-            output.write("</map>")
-        return output.to_bytes()
+            output.end_element("</map>")
 
 
 # @lat: [[behavior#XML output safety]]
@@ -1188,23 +2012,21 @@ class _StandardDocumentRenderer:
     def __init__(self, config: SerializerConfig) -> None:
         self._config = config
 
-    def render(self) -> bytes:
-        output = _XMLWriter()
+    def render_into(self, output: _XMLWriter) -> None:
         if self._config.root:
             self._render_with_root(output)
         else:
             self._render_fragment(output)
-        return output.to_bytes()
 
     def _render_with_root(self, output: _XMLWriter) -> None:
         custom_root, root_attr = make_valid_xml_name(self._config.custom_root, {})
         namespace_str = _NamespaceFormatter.format(self._config.xml_namespaces)
         output.write('<?xml version="1.0" encoding="UTF-8" ?>')
-        output.write(f"<{custom_root}{make_attrstring(root_attr)}{namespace_str}>")
+        output.start_element(f"<{custom_root}{make_attrstring(root_attr)}{namespace_str}>")
         _append_convert(
             output,
             self._config.obj,
-            self._config.ids,
+            self._config.document_ids(),
             self._config.attr_type,
             self._config.item_func,
             self._config.cdata,
@@ -1212,13 +2034,13 @@ class _StandardDocumentRenderer:
             parent=custom_root,
             list_headers=self._config.list_headers,
         )
-        output.write(f"</{custom_root}>")
+        output.end_element(f"</{custom_root}>")
 
     def _render_fragment(self, output: _XMLWriter) -> None:
         _append_convert(
             output,
             self._config.obj,
-            self._config.ids,
+            self._config.document_ids(),
             self._config.attr_type,
             self._config.item_func,
             self._config.cdata,
@@ -1228,16 +2050,364 @@ class _StandardDocumentRenderer:
         )
 
 
+_SCALAR_EVENTS = frozenset({"string", "number", "boolean", "null"})
+_SPECIAL_KEYS = frozenset({"@attrs", "@val", "@flat"})
+
+
+class _EventReader:
+    """One-event lookahead over a JSON event iterator."""
+
+    __slots__ = ("_events", "_peeked")
+
+    def __init__(self, events: Iterable[JSONEvent]) -> None:
+        self._events = iter(events)
+        self._peeked: JSONEvent | None = None
+
+    def next(self) -> JSONEvent:
+        event = self._peeked
+        if event is not None:
+            self._peeked = None
+            return event
+        try:
+            return next(self._events)
+        except StopIteration:
+            raise ValueError("Unexpected end of JSON events") from None
+
+    def peek(self) -> JSONEvent:
+        if self._peeked is None:
+            self._peeked = self.next()
+        return self._peeked
+
+
+def _unexpected_event(kind: str) -> ValueError:
+    return ValueError(f"Unexpected JSON event: {kind}")
+
+
+class _XPathEventRenderer:
+    """Render XPath 3.1 output from JSON events, mirroring ``_append_xpath31``."""
+
+    def __init__(self, events: _EventReader) -> None:
+        self._events = events
+
+    def render_into(self, output: _XMLWriter) -> None:
+        output.write('<?xml version="1.0" encoding="UTF-8" ?>')
+        if self._events.peek()[0] in {"start_map", "start_array"}:
+            self._append(output, self._events.next(), None, namespace=True)
+        else:
+            output.start_element(f'<map xmlns="{XPATH_FUNCTIONS_NS}">')
+            self._append(output, self._events.next(), None)
+            output.end_element("</map>")
+
+    def _append(
+        self,
+        output: _XMLWriter,
+        event: JSONEvent,
+        parent_key: str | None,
+        namespace: bool = False,
+    ) -> None:
+        kind, value = event
+        key_attr = f' key="{escape_xml(parent_key)}"' if parent_key is not None else ""
+        namespace_attr = f' xmlns="{XPATH_FUNCTIONS_NS}"' if namespace else ""
+        if kind == "null":
+            output.write(f"<null{namespace_attr}{key_attr}/>")
+        elif kind == "boolean":
+            output.write(f"<boolean{namespace_attr}{key_attr}>{str(value).lower()}</boolean>")
+        elif kind == "number":
+            output.write(f"<number{namespace_attr}{key_attr}>{value}</number>")
+        elif kind == "string":
+            output.write(f"<string{namespace_attr}{key_attr}>{escape_xml(str(value))}</string>")
+        elif kind == "start_map":
+            output.start_element(f"<map{namespace_attr}{key_attr}>")
+            while (child := self._events.next())[0] != "end_map":
+                self._append(output, self._events.next(), cast(str, child[1]))
+            output.end_element("</map>")
+        elif kind == "start_array":
+            output.start_element(f"<array{namespace_attr}{key_attr}>")
+            while (child := self._events.next())[0] != "end_array":
+                self._append(output, child, None)
+            output.end_element("</array>")
+        else:
+            raise _unexpected_event(kind)
+
+
+class _StandardEventRenderer:
+    """Render the standard document shape from JSON events.
+
+    Each method mirrors the ``_append_*`` helper of the same name for the JSON subset of
+    values, deciding every shape from the current event plus at most one event of
+    lookahead. Special ``@attrs``/``@val``/``@flat`` keys need the whole dict before its
+    element can be opened, so they are rejected instead.
+    """
+
+    def __init__(self, config: SerializerConfig, events: _EventReader) -> None:
+        self._config = config
+        self._events = events
+
+    def render_into(self, output: _XMLWriter) -> None:
+        config = self._config
+        if not config.root:
+            self._append_convert(output, self._events.next(), config.document_ids(), parent="")
+            return
+        custom_root, root_attr = make_valid_xml_name(config.custom_root, {})
+        namespace_str = _NamespaceFormatter.format(config.xml_namespaces)
+        output.write('<?xml version="1.0" encoding="UTF-8" ?>')
+        output.start_element(f"<{custom_root}{make_attrstring(root_attr)}{namespace_str}>")
+        self._append_convert(output, self._events.next(), config.document_ids(), parent=custom_root)
+        output.end_element(f"</{custom_root}>")
+
+    def _append_convert(
+        self, output: _XMLWriter, event: JSONEvent, ids: Any, parent: str
+    ) -> None:
+        config = self._config
+        kind, value = event
+        item_name = config.item_func(parent)
+        if kind == "boolean":
+            output.write(convert_bool(item_name, cast(bool, value), config.attr_type))
+        elif kind == "string" or kind == "number":
+            output.write(
+                convert_kv(item_name, cast(str, value), config.attr_type, {}, config.cdata)
+            )
+        elif kind == "null":
+            output.write(convert_none(item_name, config.attr_type))
+        elif kind == "start_map":
+            self._append_convert_dict(output, ids, parent)
+        elif kind == "start_array":
+            self._append_convert_list(output, ids, parent)
+        else:
+            raise _unexpected_event(kind)
+
+    def _append_dict2xml_str(
+        self,
+        output: _XMLWriter,
+        attr: dict[str, Any],
+        item_name: str,
+        parent_is_list: bool,
+        parent: str = "",
+    ) -> None:
+        config = self._config
+        attr = dict(attr)
+        if config.attr_type:
+            attr["type"] = "dict"
+        if parent_is_list and config.list_headers:
+            if attr and not config.item_wrap:
+                output.start_element(f"<{parent}{make_attrstring(attr)}>")
+            else:
+                output.start_element(f"<{parent}>")
+            self._append_convert_dict(output, None, item_name, nested=True)
+            output.end_element(f"</{parent}>")
+        elif parent_is_list and not config.item_wrap:
+            self._append_convert_dict(output, None, item_name, nested=True)
+        else:
+            output.start_element(f"<{item_name}{make_attrstring(attr)}>")
+            self._append_convert_dict(output, None, item_name, nested=True)
+            output.end_element(f"</{item_name}>")
+
+    def _append_list2xml_str(
+        self, output: _XMLWriter, attr: dict[str, Any], item_name: str
+    ) -> None:
+        config = self._config
+        attr = dict(attr)
+        if config.attr_type:
+            attr["type"] = "list"
+        flat = False
+        if item_name.endswith("@flat"):
+            item_name = item_name[0:-5]
+            flat = True
+
+        first_kind = self._events.peek()[0]
+        primitive_first = first_kind in _SCALAR_EVENTS
+        if flat or (primitive_first and not config.item_wrap) or config.list_headers:
+            self._append_convert_list(output, None, item_name)
+            return
+
+        output.start_element(f"<{item_name}{make_attrstring(attr)}>")
+        self._append_convert_list(output, None, item_name)
+        output.end_element(f"</{item_name}>")
+
+    def _append_convert_dict(
+        self, output: _XMLWriter, ids: Any, parent: str, nested: bool = False
+    ) -> None:
+        config = self._config
+        while True:
+            kind, raw_key = self._events.next()
+            if kind == "end_map":
+                return
+            if kind != "map_key":
+                raise _unexpected_event(kind)
+            key = cast(str, raw_key)
+            if nested and key in _SPECIAL_KEYS:
+                raise ValueError(f"Special key {key} is not supported for incremental JSON input")
+            key_is_flat = key.endswith("@flat")
+            xml_key = key[:-5] if key_is_flat else key
+            value_kind, value = self._events.next()
+            if not ids and value_kind in _SCALAR_EVENTS:
+                _append_scalar(output, xml_key, value, config.attr_type, config.cdata)
+                continue
+            attr = {} if not ids else {"id": _element_id(ids, parent, key)}
+            key, attr = make_valid_xml_name(xml_key, attr)
+
+            if value_kind == "boolean":
+                output.write(convert_bool_valid_name(key, cast(bool, value), config.attr_type, attr))
+            elif value_kind == "string" or value_kind == "number":
+                output.write(
+                    convert_kv_valid_name(
+                        key, cast(str, value), config.attr_type, attr, config.cdata
+                    )
+                )
+            elif value_kind == "null":
+                output.write(convert_none_valid_name(key, config.attr_type, attr))
+            elif value_kind == "start_map":
+                self._append_dict2xml_str(output, attr, key, False)
+            elif value_kind == "start_array":
+                self._append_list2xml_str(output, attr, f"{key}@flat" if key_is_flat else key)
+            else:
+                raise _unexpected_event(value_kind)
+
+    def _append_convert_list(self, output: _XMLWriter, ids: Any, parent: str) -> None:
+        config = self._config
+        raw_item_name = config.item_func(parent)
+        if raw_item_name.endswith("@flat"):
+            raw_item_name = raw_item_name[:-5]
+        item_name, item_name_attr = make_valid_xml_name(raw_item_name, {})
+        raw_scalar_key = item_name if config.item_wrap else parent
+        scalar_key, scalar_key_attr = make_valid_xml_name(raw_scalar_key, {})
+        this_id = _element_id(ids, parent) if ids else None
+
+        index = 0
+        while True:
+            kind, value = self._events.next()
+            if kind == "end_array":
+                return
+            if not ids and kind in _SCALAR_EVENTS:
+                tag_key = raw_scalar_key if kind == "string" or kind == "number" else raw_item_name
+                _append_scalar(output, tag_key, value, config.attr_type, config.cdata)
+                continue
+            index += 1
+            attr: dict[str, Any] = {"id": f"{this_id}_{index}"} if ids else {}
+            if kind == "boolean":
+                attr.update(item_name_attr)
+                output.write(
+                    convert_bool_valid_name(item_name, cast(bool, value), config.attr_type, attr)
+                )
+            elif kind == "string" or kind == "number":
+                attr.update(scalar_key_attr)
+                output.write(
+                    convert_kv_valid_name(
+                        scalar_key, cast(str, value), config.attr_type, attr, config.cdata
+                    )
+                )
+            elif kind == "null":
+                attr.update(item_name_attr)
+                output.write(convert_none_valid_name(item_name, config.attr_type, attr))
+            elif kind == "start_map":
+                self._append_dict2xml_str(output, attr, item_name, True, parent)
+            elif kind == "start_array":
+                self._append_list2xml_str(output, attr, item_name)
+            else:
+                raise _unexpected_event(kind)
+
+
 class _SerializerEngine:
     """Choose the document renderer while keeping helper semantics local."""
 
-    def __init__(self, config: SerializerConfig) -> None:
+    def __init__(
+        self, config: SerializerConfig, events: Iterable[JSONEvent] | None = None
+    ) -> None:
+        _validate_indent(config.indent)
+        _validate_ids(config.id_strategy, config.id_seed)
         self._config = config
+        self._events = events
 
     def render(self) -> bytes:
-        if self._config.xpath_format:
-            return _XPathDocumentRenderer(self._config).render()
-        return _StandardDocumentRenderer(self._config).render()
+        return self.render_counted()[1]
+
+    def render_counted(self) -> tuple[int, bytes]:
+        """Render the document and count the values charged against ``max_items``.
+
+        Without limits nothing is charged and the count is ``0``.
+        """
+        limits = self._config.limits
+        output = _XMLWriter() if limits is None else _BoundedXMLWriter(limits.max_output_bytes)
+        budget = self.render_into(output)
+        return 0 if budget is None else budget.items, output.to_bytes()
+
+    def render_into(self, output: _XMLWriter) -> _ConversionBudget | None:
+        pretty = _PrettyXMLWriter(output, self._config.indent) if self._config.pretty else None
+        if pretty is not None:
+            output = pretty
+        budget = None if self._config.limits is None else _ConversionBudget(self._config.limits)
+        output.budget = budget
+        if self._events is not None:
+            events = _EventReader(self._events)
+            if self._config.xpath_format:
+                _XPathEventRenderer(events).render_into(output)
+            else:
+                _StandardEventRenderer(self._config, events).render_into(output)
+        elif self._config.xpath_format:
+            _XPathDocumentRenderer(self._config).render_into(output)
+        else:
+            _StandardDocumentRenderer(self._config).render_into(output)
+        if pretty is not None:
+            pretty.finish()
+        return budget
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        limits = self._config.limits
+        max_output_bytes = None if limits is None else limits.max_output_bytes
+        return _iter_rendered_chunks(self.render_into, chunk_size, max_output_bytes)
+
+    def write_to(self, sink: XMLSink, chunk_size: int) -> None:
+        write = sink_writer(sink)
+        if self._config.limits is not None:
+            write = _limit_output(write, self._config.limits.max_output_bytes)
+        output = _ChunkedXMLWriter(chunk_size, write)
+        self.render_into(output)
+        output.close()
+
+
+@overload
+def dicttoxml(
+    obj: ELEMENT,
+    root: bool = ...,
+    custom_root: str = ...,
+    ids: list[int] | bool | None = ...,
+    attr_type: bool = ...,
+    item_wrap: bool = ...,
+    item_func: Callable[[str], str] = ...,
+    cdata: bool = ...,
+    xml_namespaces: dict[str, Any] | None = ...,
+    list_headers: bool = ...,
+    xpath_format: bool = ...,
+    sink: None = None,
+    limits: ConversionLimits | None = ...,
+    pretty: bool = ...,
+    indent: int = ...,
+    id_strategy: str = ...,
+    id_seed: int = ...,
+) -> bytes: ...
+
+
+@overload
+def dicttoxml(
+    obj: ELEMENT,
+    root: bool = ...,
+    custom_root: str = ...,
+    ids: list[int] | bool | None = ...,
+    attr_type: bool = ...,
+    item_wrap: bool = ...,
+    item_func: Callable[[str], str] = ...,
+    cdata: bool = ...,
+    xml_namespaces: dict[str, Any] | None = ...,
+    list_headers: bool = ...,
+    xpath_format: bool = ...,
+    *,
+    sink: XMLSink,
+    limits: ConversionLimits | None = ...,
+    pretty: bool = ...,
+    indent: int = ...,
+    id_strategy: str = ...,
+    id_seed: int = ...,
+) -> None: ...
 
 
 # @lat: [[architecture#Conversion engine]]
@@ -1245,7 +2415,7 @@ def dicttoxml(
     obj: ELEMENT,
     root: bool = True,
     custom_root: str = "root",
-    ids: list[int] | None = None,
+    ids: list[int] | bool | None = None,
     attr_type: bool = True,
     item_wrap: bool = True,
     item_func: Callable[[str], str] = default_item_func,
@@ -1253,7 +2423,13 @@ def dicttoxml(
     xml_namespaces: dict[str, Any] | None = None,
     list_headers: bool = False,
     xpath_format: bool = False,
-) -> bytes:
+    sink: XMLSink | None = None,
+    limits: ConversionLimits | None = None,
+    pretty: bool = False,
+    indent: int = DEFAULT_INDENT,
+    id_strategy: str = "random",
+    id_seed: int = 0,
+) -> bytes | None:
     """
     Converts a python object into XML.
 
@@ -1272,6 +2448,17 @@ def dicttoxml(
         Default is False
         specifies whether elements get unique ids.
 
+    :param str id_strategy:
+        Default is 'random'
+        how ``ids`` are generated: 'random' draws a random six-digit suffix per ID,
+        'counter' numbers IDs through the document, 'path' joins the parent tag and the
+        dict key or list position, and 'seeded' draws reproducible six-digit suffixes from ``id_seed``. Every strategy but
+        'random' gives the same output on every run.
+
+    :param int id_seed:
+        Default is 0
+        seed of the 'seeded' strategy, between 0 and 2**64 - 1.
+
     :param bool attr_type:
         Default is True
         specifies whether elements get a data type attribute.
@@ -1363,6 +2550,29 @@ def dicttoxml(
               <number key="age">30</number>
             </map>
 
+    :param sink:
+        Default is None
+        a binary file object, raw file descriptor, or socket. When given, XML is written to
+        the sink through a 64 KiB buffer while the object is walked and nothing is returned,
+        so output memory stays bounded by the buffer instead of the document size.
+
+    :param limits:
+        Default is None
+        a :class:`ConversionLimits`. Nesting depth and item counts are charged as each
+        container is entered and output bytes as they are written, so an oversized input
+        raises ``InvalidDataError`` without a separate validation pass and without rendering
+        the rest of the document.
+
+    :param bool pretty:
+        Default is False
+        indents nested elements by two spaces per level while they are written, one element
+        per line. Elements holding only text keep it on the same line, and the output ends
+        with a newline. Costs about the same as compact output because nothing is re-parsed.
+
+    :param int indent:
+        Default is 2
+        number of spaces per nesting level when ``pretty`` is enabled.
+
     Dictionaries-keys with special char '@' has special meaning:
     @attrs: This allows custom xml attributes:
 
@@ -1404,5 +2614,169 @@ def dicttoxml(
         xml_namespaces=xml_namespaces,
         list_headers=list_headers,
         xpath_format=xpath_format,
+        limits=limits,
+        pretty=pretty,
+        indent=indent,
+        id_strategy=id_strategy,
+        id_seed=id_seed,
+    )
+    engine = _SerializerEngine(config)
+    if sink is not None:
+        engine.write_to(sink, DEFAULT_CHUNK_SIZE)
+        return None
+    return engine.render()
+
+
+def iter_dicttoxml(
+    obj: ELEMENT,
+    root: bool = True,
+    custom_root: str = "root",
+    ids: list[int] | bool | None = None,
+    attr_type: bool = True,
+    item_wrap: bool = True,
+    item_func: Callable[[str], str] = default_item_func,
+    cdata: bool = False,
+    xml_namespaces: dict[str, Any] | None = None,
+    list_headers: bool = False,
+    xpath_format: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    limits: ConversionLimits | None = None,
+    pretty: bool = False,
+    indent: int = DEFAULT_INDENT,
+    id_strategy: str = "random",
+    id_seed: int = 0,
+) -> Iterator[bytes]:
+    """
+    Converts a python object into XML and yields it as UTF-8 byte chunks.
+
+    Accepts the same options as :func:`dicttoxml`; joining the chunks gives exactly the bytes
+    :func:`dicttoxml` returns. Chunks are produced while the serializer walks the object, so
+    only about ``chunk_size`` bytes of output are held in memory at once.
+
+    :param int chunk_size:
+        Default is 64 KiB
+        size of every yielded chunk except the last, which may be shorter.
+
+    Serializer errors such as ``ValueError`` for XML 1.0-forbidden characters are raised from
+    the iteration that reaches the offending value. Closing the iterator early stops the
+    serializer.
+    """
+    _validate_chunk_size(chunk_size)
+    config = SerializerConfig(
+        obj=obj,
+        root=root,
+        custom_root=custom_root,
+        ids=ids,
+        attr_type=attr_type,
+        item_wrap=item_wrap,
+        item_func=item_func,
+        cdata=cdata,
+        xml_namespaces=xml_namespaces,
+        list_headers=list_headers,
+        xpath_format=xpath_format,
+        limits=limits,
+        pretty=pretty,
+        indent=indent,
+        id_strategy=id_strategy,
+        id_seed=id_seed,
+    )
+    return _SerializerEngine(config).iter_chunks(chunk_size)
+
+
+# @lat: [[behavior#Incremental JSON input]]
+def eventstoxml(
+    events: Iterable[JSONEvent],
+    root: bool = True,
+    custom_root: str = "root",
+    ids: list[int] | bool | None = None,
+    attr_type: bool = True,
+    item_wrap: bool = True,
+    item_func: Callable[[str], str] = default_item_func,
+    cdata: bool = False,
+    xml_namespaces: dict[str, Any] | None = None,
+    list_headers: bool = False,
+    xpath_format: bool = False,
+    sink: XMLSink | None = None,
+    pretty: bool = False,
+    indent: int = DEFAULT_INDENT,
+    id_strategy: str = "random",
+    id_seed: int = 0,
+) -> bytes | None:
+    """
+    Converts incremental JSON events into XML without building the decoded document.
+
+    ``events`` are ``(event, value)`` pairs as produced by
+    :func:`json2xml.utils.iter_json_events`. Output matches :func:`dicttoxml` for the
+    equivalent decoded value, and every option has the same meaning. Combined with ``sink``
+    memory stays bounded by the nesting depth and the largest scalar.
+
+    Special ``@attrs``, ``@val`` and ``@flat`` keys in nested dicts raise ``ValueError``
+    because they change how a dict's element opens before its keys have been read. Keys
+    ending in ``@flat`` are supported.
+    """
+    config = SerializerConfig(
+        obj=None,
+        root=root,
+        custom_root=custom_root,
+        ids=ids,
+        attr_type=attr_type,
+        item_wrap=item_wrap,
+        item_func=item_func,
+        cdata=cdata,
+        xml_namespaces=xml_namespaces,
+        list_headers=list_headers,
+        xpath_format=xpath_format,
+        pretty=pretty,
+        indent=indent,
+        id_strategy=id_strategy,
+        id_seed=id_seed,
+    )
+    engine = _SerializerEngine(config, events)
+    if sink is not None:
+        engine.write_to(sink, DEFAULT_CHUNK_SIZE)
+        return None
+    return engine.render()
+
+
+def iter_eventstoxml(
+    events: Iterable[JSONEvent],
+    root: bool = True,
+    custom_root: str = "root",
+    ids: list[int] | bool | None = None,
+    attr_type: bool = True,
+    item_wrap: bool = True,
+    item_func: Callable[[str], str] = default_item_func,
+    cdata: bool = False,
+    xml_namespaces: dict[str, Any] | None = None,
+    list_headers: bool = False,
+    xpath_format: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pretty: bool = False,
+    indent: int = DEFAULT_INDENT,
+    id_strategy: str = "random",
+    id_seed: int = 0,
+) -> Iterator[bytes]:
+    """
+    Converts incremental JSON events into XML and yields it as UTF-8 byte chunks.
+
+    Combines :func:`eventstoxml` with the chunking of :func:`iter_dicttoxml`.
+    """
+    _validate_chunk_size(chunk_size)
+    config = SerializerConfig(
+        obj=None,
+        root=root,
+        custom_root=custom_root,
+        ids=ids,
+        attr_type=attr_type,
+        item_wrap=item_wrap,
+        item_func=item_func,
+        cdata=cdata,
+        xml_namespaces=xml_namespaces,
+        list_headers=list_headers,
+        xpath_format=xpath_format,
+        pretty=pretty,
+        indent=indent,
+        id_strategy=id_strategy,
+        id_seed=id_seed,
     )
-    return _SerializerEngine(config).render()
+    return _SerializerEngine(config, events).iter_chunks(chunk_size)
@@ -13,22 +13,38 @@ Usage:
 """
 from __future__ import annotations
 
+import inspect
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, overload
 
-from .backend_selector import BackendSelector, ConversionRequest, has_special_keys
+from .backend_selector import (
+    BackendFallback,
+    BackendSelector,
+    ConversionRequest,
+    has_special_keys,
+)
+from .utils import InvalidDataError
+
+if TYPE_CHECKING:
+    from .dicttoxml import ConversionLimits
+    from .types import XMLSink
 
 RustStringTransform = Callable[[str], str]
+ItemNames = Callable[[str], str] | Mapping[str, str]
 
 LOG = logging.getLogger("dicttoxml_fast")
 
 # Try to import the Rust implementation
 _use_rust = False
 _rust_dicttoxml: Callable[..., bytes] | None = None
+_rust_json_to_xml: Callable[..., bytes] | None = None
 rust_escape_xml: RustStringTransform | None = None
 rust_wrap_cdata: RustStringTransform | None = None
+_rust_features: frozenset[str] = frozenset()
+_rust_limit_errors: tuple[type[Exception], ...] = ()
+_rust_fallback_errors: tuple[type[Exception], ...] = ()
 
 
 def _rejects_invalid_xml(escape: RustStringTransform) -> bool:
@@ -42,12 +58,31 @@ def _rejects_invalid_xml(escape: RustStringTransform) -> bool:
     return False
 
 
+def _keyword_parameters(func: Callable[..., Any]) -> frozenset[str]:
+    """Return the keyword names an optional backend function accepts."""
+    try:
+        return frozenset(inspect.signature(func).parameters)
+    except (TypeError, ValueError):
+        return frozenset()
+
+
 try:
     from json2xml_rs import dicttoxml as _rust_dicttoxml  # pragma: no cover
     from json2xml_rs import escape_xml_py as rust_escape_xml  # pragma: no cover
     from json2xml_rs import wrap_cdata_py as rust_wrap_cdata  # pragma: no cover
     if _rejects_invalid_xml(rust_escape_xml):  # pragma: no cover
         _use_rust = True  # pragma: no cover
+        import json2xml_rs  # pragma: no cover
+
+        # Keyword options are probed from the signature; other behaviour is listed in FEATURES.
+        _rust_features = _keyword_parameters(_rust_dicttoxml) | frozenset(  # pragma: no cover
+            getattr(json2xml_rs, "FEATURES", ())
+        )
+        if "max_depth" in _rust_features:  # pragma: no cover
+            _rust_limit_errors = (json2xml_rs.ConversionLimitError,)  # pragma: no cover
+        if "strict" in _rust_features:  # pragma: no cover
+            _rust_fallback_errors = (json2xml_rs.FallbackRequired,)  # pragma: no cover
+        _rust_json_to_xml = getattr(json2xml_rs, "json_to_xml", None)  # pragma: no cover
         LOG.debug("Using Rust backend for dicttoxml")  # pragma: no cover
     else:  # pragma: no cover
         LOG.warning(  # pragma: no cover
@@ -69,6 +104,50 @@ def get_backend() -> str:
     """Return the name of the current backend ('rust' or 'python')."""
     return "rust" if _use_rust else "python"
 
+
+@dataclass(frozen=True, slots=True)
+class _ItemNameTable:
+    """Item function for a static ``{parent: item_name}`` table; other parents get ``item``."""
+
+    names: Mapping[str, str]
+
+    def __call__(self, parent: str) -> str:
+        return self.names.get(parent, "item")
+
+
+def _python_item_func(item_func: ItemNames | None) -> Callable[[str], str]:
+    """Return the callable the Python serializer expects for an ``item_func`` argument."""
+    if item_func is None:
+        return _py_dicttoxml.default_item_func
+    if isinstance(item_func, Mapping):
+        return _ItemNameTable(item_func)
+    return item_func
+
+
+def _check_structure(obj: Any, limits: ConversionLimits) -> int:
+    """Apply the depth and item limits before handing a document to an older Rust backend.
+
+    Builds without ``max_depth`` cannot stop part-way through a document, so their input is
+    walked once up front; current builds charge the limits while they render instead.
+
+    :return: The number of values and containers in ``obj``, counting ``obj`` itself.
+    """
+    stack: list[tuple[Any, int]] = [(obj, 0)]
+    items = 0
+    while stack:
+        value, depth = stack.pop()
+        items += 1
+        if items > limits.max_items:
+            raise InvalidDataError("JSON item limit exceeded")
+        if depth > limits.max_depth:
+            raise InvalidDataError("JSON nesting depth limit exceeded")
+        if isinstance(value, Mapping):
+            stack.extend((child, depth + 1) for child in value.values())
+        elif isinstance(value, Sequence) and not isinstance(value, (str, bytes, bytearray)):
+            stack.extend((child, depth + 1) for child in value)
+    return items
+
+
 @dataclass(frozen=True, slots=True)
 class _RustBackendAdapter:
     """Adapter for the optional Rust backend."""
@@ -80,25 +159,75 @@ class _RustBackendAdapter:
             return False
 
         return not (
-            request.ids is not None
-            or request.item_func is not None
-            or request.xml_namespaces
-            or request.xpath_format
+            (request.ids and "id_strategy" not in _rust_features)
+            or (request.item_func is not None and "item_func" not in _rust_features)
+            or (request.xml_namespaces and "xml_namespaces" not in _rust_features)
+            or (request.xpath_format and "xpath_format" not in _rust_features)
+            or (request.pretty and "pretty" not in _rust_features)
             or not isinstance(request.obj, (dict, list))
-            or has_special_keys(request.obj)
+            or (
+                not request.xpath_format
+                and "special_keys" not in _rust_features
+                and has_special_keys(request.obj)
+            )
         )
 
     def render(self, request: ConversionRequest) -> bytes:
+        return self._render(request)
+
+    def render_counted(self, request: ConversionRequest) -> tuple[int, bytes]:
+        """Render with a build that accepts ``count_items``, returning its item count too."""
+        return self._render(request, count_items=True)
+
+    def _render(self, request: ConversionRequest, **extra: Any) -> Any:
         assert _rust_dicttoxml is not None
-        return _rust_dicttoxml(
-            request.obj,
-            root=request.root,
-            custom_root=request.custom_root,
-            attr_type=request.attr_type,
-            item_wrap=request.item_wrap,
-            cdata=request.cdata,
-            list_headers=request.list_headers,
-        )
+        options: dict[str, Any] = dict(extra)
+        if request.xpath_format:
+            options.update(xpath_format=True)
+        if request.pretty:
+            options.update(pretty=True, indent=request.indent)
+        if _rust_fallback_errors:
+            # Values outside JSON's shapes abort the native render, which the selector then
+            # retries in Python, so the payload is walked once on the common path.
+            options.update(strict=True)
+        if request.ids:
+            options.update(ids=True, id_strategy=request.id_strategy, id_seed=request.id_seed)
+        if request.xml_namespaces:
+            options.update(xml_namespaces=request.xml_namespaces)
+        if request.release_gil and "release_gil" in _rust_features:
+            options.update(release_gil=True)
+        if isinstance(request.item_func, Mapping):
+            options.update(item_func=dict(request.item_func))
+        elif request.item_func is not None:
+            options.update(item_func=request.item_func)
+        limits = request.limits
+        if limits is not None and _rust_limit_errors:
+            options.update(
+                max_depth=limits.max_depth,
+                max_items=limits.max_items,
+                max_output_bytes=limits.max_output_bytes,
+            )
+        elif limits is not None:
+            _check_structure(request.obj, limits)
+        try:
+            result = _rust_dicttoxml(
+                request.obj,
+                root=request.root,
+                custom_root=request.custom_root,
+                attr_type=request.attr_type,
+                item_wrap=request.item_wrap,
+                cdata=request.cdata,
+                list_headers=request.list_headers,
+                **options,
+            )
+        except _rust_limit_errors as error:
+            raise InvalidDataError(str(error)) from error
+        except _rust_fallback_errors as error:
+            raise BackendFallback(str(error)) from error
+        xml_data = result[1] if extra.get("count_items") else result
+        if limits is not None and len(xml_data) > limits.max_output_bytes:
+            raise InvalidDataError("XML output size limit exceeded")
+        return result
 
 
 @dataclass(frozen=True, slots=True)
@@ -106,7 +235,6 @@ class _PythonBackendAdapter:
     """Adapter for the compatibility-preserving Python backend."""
 
     python_dicttoxml: Callable[..., bytes]
-    default_item_func: Callable[[str], str]
 
     name: str = "python"
 
@@ -121,34 +249,94 @@ class _PythonBackendAdapter:
             ids=request.ids,
             attr_type=request.attr_type,
             item_wrap=request.item_wrap,
-            item_func=request.item_func or self.default_item_func,
+            item_func=_python_item_func(request.item_func),
             cdata=request.cdata,
             xml_namespaces=request.xml_namespaces,
             list_headers=request.list_headers,
             xpath_format=request.xpath_format,
+            limits=request.limits,
+            pretty=request.pretty,
+            indent=request.indent,
+            id_strategy=request.id_strategy,
+            id_seed=request.id_seed,
         )
 
 
+_RUST_BACKEND = _RustBackendAdapter()
 _BACKEND_SELECTOR = BackendSelector(
-    _RustBackendAdapter(),
-    _PythonBackendAdapter(_py_dicttoxml.dicttoxml, _py_dicttoxml.default_item_func),
+    _RUST_BACKEND,
+    _PythonBackendAdapter(_py_dicttoxml.dicttoxml),
 )
 
 
 # @lat: [[architecture#Backend selection]]
+@overload
+def dicttoxml(
+    obj: Any,
+    root: bool = ...,
+    custom_root: str = ...,
+    ids: list[int] | bool | None = ...,
+    attr_type: bool = ...,
+    item_wrap: bool = ...,
+    item_func: ItemNames | None = ...,
+    cdata: bool = ...,
+    xml_namespaces: dict[str, Any] | None = ...,
+    list_headers: bool = ...,
+    xpath_format: bool = ...,
+    sink: None = None,
+    limits: ConversionLimits | None = ...,
+    pretty: bool = ...,
+    indent: int = ...,
+    id_strategy: str = ...,
+    id_seed: int = ...,
+    release_gil: bool = ...,
+) -> bytes: ...
+
+
+@overload
+def dicttoxml(
+    obj: Any,
+    root: bool = ...,
+    custom_root: str = ...,
+    ids: list[int] | bool | None = ...,
+    attr_type: bool = ...,
+    item_wrap: bool = ...,
+    item_func: ItemNames | None = ...,
+    cdata: bool = ...,
+    xml_namespaces: dict[str, Any] | None = ...,
+    list_headers: bool = ...,
+    xpath_format: bool = ...,
+    *,
+    sink: XMLSink,
+    limits: ConversionLimits | None = ...,
+    pretty: bool = ...,
+    indent: int = ...,
+    id_strategy: str = ...,
+    id_seed: int = ...,
+    release_gil: bool = ...,
+) -> None: ...
+
+
 def dicttoxml(
     obj: Any,
     root: bool = True,
     custom_root: str = "root",
-    ids: list[int] | None = None,
+    ids: list[int] | bool | None = None,
     attr_type: bool = True,
     item_wrap: bool = True,
-    item_func: Callable[[str], str] | None = None,
+    item_func: ItemNames | None = None,
     cdata: bool = False,
     xml_namespaces: dict[str, Any] | None = None,
     list_headers: bool = False,
     xpath_format: bool = False,
-) -> bytes:
+    sink: XMLSink | None = None,
+    limits: ConversionLimits | None = None,
+    pretty: bool = False,
+    indent: int = _py_dicttoxml.DEFAULT_INDENT,
+    id_strategy: str = "random",
+    id_seed: int = 0,
+    release_gil: bool = False,
+) -> bytes | None:
     """
     Convert a Python dict or list to XML.
 
@@ -159,18 +347,52 @@ def dicttoxml(
         obj: The Python object to convert (dict or list)
         root: Include XML declaration and root element (default: True)
         custom_root: Name of the root element (default: "root")
-        ids: Generate unique IDs for elements (not supported in Rust)
+        ids: Generate unique IDs for elements (Rust needs a build with ``id_strategy``)
         attr_type: Include type attributes on elements (default: True)
         item_wrap: Wrap list items in <item> tags (default: True)
-        item_func: Custom function for item names (not supported in Rust)
+        item_func: Item names for list members, a function of the parent tag or a
+            ``{parent: item_name}`` mapping (Rust needs a build with ``item_func``)
         cdata: Wrap string values in CDATA sections (default: False)
-        xml_namespaces: XML namespace definitions (not supported in Rust)
+        xml_namespaces: XML namespace definitions (Rust needs a build with ``xml_namespaces``)
         list_headers: Repeat parent tag for each list item (default: False)
-        xpath_format: Use XPath 3.1 format (not supported in Rust)
+        xpath_format: Use XPath 3.1 format (Rust needs a build with ``xpath_format``)
+        sink: Binary file object, file descriptor, or socket to stream into
+            (always uses the pure Python serializer)
+        limits: Depth, item and output-size limits enforced during rendering
+        pretty: Indent elements while rendering (Rust needs a build with ``pretty``)
+        indent: Spaces per nesting level when ``pretty`` is enabled (default: 2)
+        id_strategy: How ``ids`` are generated: "random", "counter", "path" or "seeded"
+            (default: "random")
+        id_seed: Seed of the "seeded" strategy (default: 0)
+        release_gil: Let the Rust backend copy the data first and write the XML without
+            holding the GIL, so other threads run meanwhile, at the cost of a copy of the
+            data and the output (Rust needs a build with ``release_gil``; default: False)
 
     Returns:
-        UTF-8 encoded XML as bytes
+        UTF-8 encoded XML as bytes, or None when written to ``sink``
     """
+    _py_dicttoxml._validate_indent(indent)
+    _py_dicttoxml._validate_ids(id_strategy, id_seed)
+    if sink is not None:
+        return _py_dicttoxml.dicttoxml(
+            obj,
+            root=root,
+            custom_root=custom_root,
+            ids=ids,
+            attr_type=attr_type,
+            item_wrap=item_wrap,
+            item_func=_python_item_func(item_func),
+            cdata=cdata,
+            xml_namespaces=xml_namespaces,
+            list_headers=list_headers,
+            xpath_format=xpath_format,
+            sink=sink,
+            limits=limits,
+            pretty=pretty,
+            indent=indent,
+            id_strategy=id_strategy,
+            id_seed=id_seed,
+        )
     request = ConversionRequest(
         obj=obj,
         root=root,
@@ -183,10 +405,196 @@ def dicttoxml(
         xml_namespaces=xml_namespaces,
         list_headers=list_headers,
         xpath_format=xpath_format,
+        limits=limits,
+        pretty=pretty,
+        indent=indent,
+        id_strategy=id_strategy,
+        id_seed=id_seed,
+        release_gil=release_gil,
     )
     return _BACKEND_SELECTOR.render(request)
 
 
+def _render_counted(
+    obj: Any,
+    *,
+    root: bool,
+    custom_root: str,
+    attr_type: bool,
+    item_wrap: bool,
+    cdata: bool,
+    list_headers: bool,
+    pretty: bool,
+    limits: ConversionLimits,
+) -> tuple[int, bytes]:
+    """Serialize ``obj`` like :func:`dicttoxml` and count the values ``limits`` charged.
+
+    Callers that split one document into several sum the counts to hold ``max_items`` for the
+    whole. Rust builds that accept ``count_items`` count while they render, with the GIL
+    released when they can; older builds walk the data once more to count it.
+    """
+    request = ConversionRequest(
+        obj=obj,
+        root=root,
+        custom_root=custom_root,
+        ids=None,
+        attr_type=attr_type,
+        item_wrap=item_wrap,
+        item_func=None,
+        cdata=cdata,
+        xml_namespaces=None,
+        list_headers=list_headers,
+        xpath_format=False,
+        limits=limits,
+        pretty=pretty,
+        release_gil=True,
+    )
+    if _RUST_BACKEND.can_handle(request):
+        try:
+            if "count_items" in _rust_features:
+                return _RUST_BACKEND.render_counted(request)
+            return _check_structure(obj, limits), _RUST_BACKEND.render(request)
+        except BackendFallback:
+            pass
+    config = _py_dicttoxml.SerializerConfig(
+        obj=obj,
+        root=root,
+        custom_root=custom_root,
+        ids=None,
+        attr_type=attr_type,
+        item_wrap=item_wrap,
+        item_func=_py_dicttoxml.default_item_func,
+        cdata=cdata,
+        xml_namespaces=None,
+        list_headers=list_headers,
+        xpath_format=False,
+        limits=limits,
+        pretty=pretty,
+    )
+    return _py_dicttoxml._SerializerEngine(config).render_counted()
+
+
+def _renders_without_gil() -> bool:
+    """Return whether :func:`_render_counted` writes XML with the GIL released."""
+    return _use_rust and {"count_items", "release_gil"} <= _rust_features
+
+
+def json_to_xml(
+    data: str | bytes,
+    root: bool = True,
+    custom_root: str = "root",
+    attr_type: bool = True,
+    item_wrap: bool = True,
+    cdata: bool = False,
+    list_headers: bool = False,
+    limits: ConversionLimits | None = None,
+    pretty: bool = False,
+    indent: int = _py_dicttoxml.DEFAULT_INDENT,
+) -> bytes | None:
+    """
+    Convert JSON text to XML in the Rust backend, without decoding it into Python objects.
+
+    The result is what :func:`dicttoxml` gives for the decoded document. ``None`` means the
+    text needs Python: the extension is missing or predates ``json_to_xml``, or the text is
+    invalid JSON, a scalar, or uses repeated or special ``@`` keys. Decode it then instead.
+
+    Args:
+        data: JSON text, as ``str`` or UTF-8 ``bytes``
+
+    The remaining arguments match :func:`dicttoxml`.
+
+    Returns:
+        UTF-8 encoded XML as bytes, or None when the text needs the Python decoder
+
+    Raises:
+        InvalidDataError: If the document or its XML exceeds ``limits``
+        ValueError: If ``custom_root`` is not a valid XML name or the text holds characters
+            XML 1.0 excludes
+    """
+    _py_dicttoxml._validate_indent(indent)
+    if not _use_rust or _rust_json_to_xml is None:
+        return None
+    options: dict[str, Any] = {}
+    if limits is not None:
+        options.update(
+            max_depth=limits.max_depth,
+            max_items=limits.max_items,
+            max_output_bytes=limits.max_output_bytes,
+        )
+    try:
+        return _rust_json_to_xml(
+            data,
+            root=root,
+            custom_root=custom_root,
+            attr_type=attr_type,
+            item_wrap=item_wrap,
+            cdata=cdata,
+            list_headers=list_headers,
+            pretty=pretty,
+            indent=indent,
+            **options,
+        )
+    except _rust_limit_errors as error:
+        raise InvalidDataError(str(error)) from error
+    except _rust_fallback_errors:
+        return None
+
+
+def iter_dicttoxml(
+    obj: Any,
+    root: bool = True,
+    custom_root: str = "root",
+    ids: list[int] | bool | None = None,
+    attr_type: bool = True,
+    item_wrap: bool = True,
+    item_func: ItemNames | None = None,
+    cdata: bool = False,
+    xml_namespaces: dict[str, Any] | None = None,
+    list_headers: bool = False,
+    xpath_format: bool = False,
+    chunk_size: int = _py_dicttoxml.DEFAULT_CHUNK_SIZE,
+    limits: ConversionLimits | None = None,
+    pretty: bool = False,
+    indent: int = _py_dicttoxml.DEFAULT_INDENT,
+    id_strategy: str = "random",
+    id_seed: int = 0,
+) -> Iterator[bytes]:
+    """
+    Convert a Python dict or list to XML, yielding UTF-8 byte chunks.
+
+    The Rust backend renders whole documents, so chunked output always uses the streaming
+    pure Python serializer to keep output memory bounded by ``chunk_size``.
+
+    Args:
+        obj: The Python object to convert (dict or list)
+        chunk_size: Size of every yielded chunk except the last (default: 64 KiB)
+
+    The remaining arguments match :func:`dicttoxml`.
+
+    Returns:
+        An iterator of UTF-8 encoded XML chunks
+    """
+    return _py_dicttoxml.iter_dicttoxml(
+        obj,
+        root=root,
+        custom_root=custom_root,
+        ids=ids,
+        attr_type=attr_type,
+        item_wrap=item_wrap,
+        item_func=_python_item_func(item_func),
+        cdata=cdata,
+        xml_namespaces=xml_namespaces,
+        list_headers=list_headers,
+        xpath_format=xpath_format,
+        chunk_size=chunk_size,
+        limits=limits,
+        pretty=pretty,
+        indent=indent,
+        id_strategy=id_strategy,
+        id_seed=id_seed,
+    )
+
+
 # Re-export commonly used functions
 def escape_xml(s: str) -> str:
     """Escape special XML characters in a string."""
@@ -205,6 +613,8 @@ def wrap_cdata(s: str) -> str:
 # Export the same API as the original dicttoxml module
 __all__ = [
     "dicttoxml",
+    "iter_dicttoxml",
+    "json_to_xml",
     "escape_xml",
     "wrap_cdata",
     "is_rust_available",
@@ -1,13 +1,52 @@
-from collections.abc import Mapping, Sequence
-from typing import Any
+import asyncio
+import json
+import os
+import sys
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
+from functools import partial
+from io import BytesIO
+from itertools import islice
+from typing import Any, TypeVar
 
 from . import dicttoxml_fast as dicttoxml
-from .types import JSONValue
-from .utils import InvalidDataError
+from .dicttoxml import (
+    Columns,
+    ConversionLimits,
+    _validate_ids,
+    eventstoxml,
+    iter_eventstoxml,
+    make_attrstring,
+    make_valid_xml_name,
+    sink_writer,
+)
+from .types import JSONEvent, JSONValue, XMLSink
+from .utils import InvalidDataError, JSONEventStream, JSONReadError
+
+__lazy_modules__ = ["asyncio"]
 
 DEFAULT_MAX_DEPTH = 100
 DEFAULT_MAX_ITEMS = 100_000
 DEFAULT_MAX_OUTPUT_BYTES = 10 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+LINE_BATCH_SIZE = 256
+# Top-level members a container needs before workers split it.
+PARALLEL_MIN_MEMBERS = 1024
+# Chunks per worker, so an expensive chunk does not leave the other workers idle.
+PARALLEL_CHUNKS_PER_WORKER = 4
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8" ?>'
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
 
 
 def _positive_limit(name: str, value: int) -> int:
@@ -16,138 +55,75 @@ def _positive_limit(name: str, value: int) -> int:
     return value
 
 
-def _validate_conversion_budget(
-    data: JSONValue, max_depth: int, max_items: int, max_output_bytes: int
-) -> None:
-    """Reject inputs whose structure or conservative encoded size exceeds a limit."""
-    stack: list[tuple[Any, int]] = [(data, 0)]
+def _bounded_events(
+    events: Iterable[JSONEvent], max_depth: int, max_items: int
+) -> Iterator[JSONEvent]:
+    """Apply the structural budget to incremental input as its events are consumed."""
+    depth = 0
     items = 0
-    estimated_bytes = 128
-    while stack:
-        value, depth = stack.pop()
-        items += 1
-        if items > max_items:
-            raise InvalidDataError("JSON item limit exceeded")
-        if depth > max_depth:
-            raise InvalidDataError("JSON nesting depth limit exceeded")
-        if isinstance(value, Mapping):
-            estimated_bytes += 256 * len(value)
-            for key, child in value.items():
-                estimated_bytes += 6 * len(str(key).encode("utf-8"))
-                stack.append((child, depth + 1))
-        elif isinstance(value, Sequence) and not isinstance(value, (str, bytes, bytearray)):
-            estimated_bytes += 128 * len(value)
-            stack.extend((child, depth + 1) for child in value)
-        else:
-            estimated_bytes += 6 * len(str(value).encode("utf-8")) + 128
-        if estimated_bytes > max_output_bytes:
-            raise InvalidDataError("XML output size limit exceeded")
+    for event in events:
+        kind = event[0]
+        if kind == "end_map" or kind == "end_array":
+            depth -= 1
+        elif kind != "map_key":
+            items += 1
+            if items > max_items:
+                raise InvalidDataError("JSON item limit exceeded")
+            if depth > max_depth:
+                raise InvalidDataError("JSON nesting depth limit exceeded")
+            if kind == "start_map" or kind == "start_array":
+                depth += 1
+        yield event
 
 
-def _pretty_xml(xml_data: bytes, max_output_bytes: int) -> str:
-    """Indent generated XML without constructing or reparsing a DOM."""
-    text = xml_data.decode("utf-8")
-    if "<!DOCTYPE" in text.upper() or "<!ENTITY" in text.upper():
-        raise InvalidDataError("Unsafe XML declaration rejected")
-    tokens: list[str] = []
-    position = 0
-    while position < len(text):
-        opening = text.find("<", position)
-        if opening < 0:
-            tokens.append(text[position:])
-            break
-        if opening > position:
-            tokens.append(text[position:opening])
-        if text.startswith("<![CDATA[", opening):
-            terminator = text.find("]]>", opening)
-            closing = terminator + 3 if terminator >= 0 else -1
-        elif text.startswith("<!--", opening):
-            terminator = text.find("-->", opening)
-            closing = terminator + 3 if terminator >= 0 else -1
-        else:
-            quote: str | None = None
-            closing = opening + 1
-            terminated = False
-            while closing < len(text):
-                char = text[closing]
-                if char in {'"', "'"}:
-                    quote = None if quote == char else char if quote is None else quote
-                elif char == ">" and quote is None:
-                    closing += 1
-                    terminated = True
-                    break
-                closing += 1
-            if not terminated:
-                closing = -1
-        if closing < 0 or closing > len(text):
-            raise InvalidDataError("Malformed XML generated")
-        tokens.append(text[opening:closing])
-        position = closing
-
-    lines: list[str] = []
-    depth = 0
+def _bounded_chunks(chunks: Iterator[bytes], max_output_bytes: int) -> Iterator[bytes]:
+    """Enforce the output budget and public error type on a chunk stream."""
     output_bytes = 0
-    has_inline_content = False
-    open_elements: list[str] = []
-    for token in tokens:
-        if not token.startswith("<"):
-            if token.strip():
-                if not open_elements:
-                    raise InvalidDataError("Malformed XML generated")
-                lines[-1] += token
-                output_bytes += len(token.encode("utf-8"))
-                has_inline_content = True
-            continue
-        if token.startswith("<![CDATA["):
-            if not open_elements:
-                raise InvalidDataError("Malformed XML generated")
-            lines[-1] += token
-            output_bytes += len(token.encode("utf-8"))
-            has_inline_content = True
-            continue
-        closing_tag = token.startswith("</")
-        markup = token.startswith("<?") or token.startswith("<!--")
-        self_closing = token.endswith("/>") or markup or token.startswith("<![CDATA[")
-        if closing_tag:
-            element_name = token[2:-1].strip()
-            if not open_elements or open_elements.pop() != element_name:
-                raise InvalidDataError("Malformed XML generated")
-            depth -= 1
-            if lines and has_inline_content:
-                lines[-1] += token
-                output_bytes += len(token.encode("utf-8"))
-                has_inline_content = False
-            else:
-                line = "  " * depth + token
-                lines.append(line)
-                output_bytes += len(line.encode("utf-8")) + 1
-        else:
-            line = "  " * depth + token
-            lines.append(line)
-            output_bytes += len(line.encode("utf-8")) + 1
-            if not self_closing:
-                element_name = token[1:].split(None, 1)[0].rstrip(">")
-                if not element_name or token.startswith("<!"):
-                    raise InvalidDataError("Malformed XML generated")
-                open_elements.append(element_name)
-                depth += 1
-            has_inline_content = False
-        if output_bytes > max_output_bytes:
+    try:
+        for chunk in chunks:
+            output_bytes += len(chunk)
+            if output_bytes > max_output_bytes:
+                raise InvalidDataError("XML output size limit exceeded")
+            yield chunk
+    except ValueError as error:
+        raise InvalidDataError from error
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+class _BoundedSink:
+    """Forward chunks to a sink while enforcing the output budget."""
+
+    __slots__ = ("_write", "_max_output_bytes", "written")
+
+    def __init__(self, write: Callable[[bytes], None], max_output_bytes: int) -> None:
+        self._write = write
+        self._max_output_bytes = max_output_bytes
+        self.written = 0
+
+    def write(self, data: bytes) -> None:
+        self.written += len(data)
+        if self.written > self._max_output_bytes:
             raise InvalidDataError("XML output size limit exceeded")
-    if open_elements or depth != 0:
-        raise InvalidDataError("Malformed XML generated")
-    return "\n".join(lines) + "\n"
+        self._write(data)
 
 
 # @lat: [[architecture#Core pipeline]]
 class Json2xml:
     """Configure conversion of a decoded JSON value to XML.
 
-    :param data: The decoded JSON value. ``None`` represents absent input; other falsy values
-        are serialized.
+    :param data: The decoded JSON value, or a :class:`~json2xml.utils.JSONEventStream` from
+        ``streamfromjson``/``streamfromstring`` to convert without decoding the document.
+        With the Rust extension installed, ``to_xml`` and ``to_bytes`` parse such input
+        natively in one call unless ``ids`` or ``xpath_format`` is set.
+        ``None`` represents absent input; other falsy values are serialized.
+        A :class:`~json2xml.dicttoxml.Columns` container converts like the list of row dicts
+        it holds without building them.
     :param wrapper: The root element name used when ``root`` is enabled.
     :param root: Include the XML declaration and root element.
-    :param pretty: Indent serialized XML without a DOM, returning text instead of bytes.
+    :param pretty: Indent XML while it is serialized, returning text from ``to_xml``.
     :param attr_type: Add each value's JSON type as an XML attribute.
     :param item_wrap: Wrap list members in ``<item>`` elements.
     :param xpath_format: Emit the W3C XPath 3.1 JSON-to-XML representation.
@@ -156,10 +132,18 @@ class Json2xml:
     :param max_depth: Maximum JSON container nesting depth.
     :param max_items: Maximum total number of JSON values and containers.
     :param max_output_bytes: Maximum compact or pretty UTF-8 XML size.
+    :param ids: Give elements an ``id`` attribute.
+    :param id_strategy: How IDs are generated: ``random``, or the reproducible ``counter``,
+        ``path`` (parent tag plus key or position), and ``seeded`` strategies.
+    :param id_seed: Seed of the ``seeded`` strategy.
+    :param workers: Number of workers serializing the members of a large top-level list or
+        dict in parallel for ``to_xml``, ``to_bytes``, and ``write_to``. The output is
+        identical to a single-worker conversion. Conversions with ``ids`` or ``xpath_format``,
+        top-level ``@`` keys, or fewer than 1024 members stay in one worker.
     """
     def __init__(
         self,
-        data: JSONValue = None,
+        data: JSONValue | JSONEventStream | Columns = None,
         wrapper: str = "all",
         root: bool = True,
         pretty: bool = False,
@@ -171,6 +155,10 @@ class Json2xml:
         max_depth: int = DEFAULT_MAX_DEPTH,
         max_items: int = DEFAULT_MAX_ITEMS,
         max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        ids: bool = False,
+        id_strategy: str = "random",
+        id_seed: int = 0,
+        workers: int = 1,
     ):
         self.data = data
         self.pretty = pretty
@@ -184,6 +172,11 @@ class Json2xml:
         self.max_depth = _positive_limit("max_depth", max_depth)
         self.max_items = _positive_limit("max_items", max_items)
         self.max_output_bytes = _positive_limit("max_output_bytes", max_output_bytes)
+        _validate_ids(id_strategy, id_seed)
+        self.ids = ids
+        self.id_strategy = id_strategy
+        self.id_seed = id_seed
+        self.workers = _positive_limit("workers", workers)
 
     # @lat: [[behavior#Conversion output]]
     # @lat: [[behavior#Invalid XML payloads]]
@@ -192,16 +185,280 @@ class Json2xml:
 
         :return: Pretty-printed XML text when ``pretty`` is enabled, UTF-8 encoded XML bytes
             otherwise, or ``None`` when the configured data is ``None``.
-        :raises InvalidDataError: If a conversion limit is exceeded or serialization/formatting
-            rejects the data.
+        :raises InvalidDataError: If a conversion limit is exceeded or serialization rejects
+            the data.
+        """
+        xml_data = self.to_bytes()
+        if xml_data is not None and self.pretty:
+            return xml_data.decode("utf-8")
+        return xml_data
+
+    def to_bytes(self) -> bytes | None:
+        """Serialize the configured JSON value as UTF-8 bytes in both compact and pretty mode.
+
+        Pretty output is indented by the serializer as it renders, so this skips the text
+        decode that :meth:`to_xml` performs for pretty mode.
+
+        :return: UTF-8 encoded XML, or ``None`` when the configured data is ``None``.
+        :raises InvalidDataError: If a conversion limit is exceeded or serialization rejects
+            the data.
+        """
+        if self.data is None:
+            return None
+        if isinstance(self.data, JSONEventStream):
+            xml_data = self._native_xml(self.data)
+            if xml_data is not None:
+                return xml_data
+            output = BytesIO()
+            self._write(_BoundedSink(output.write, self.max_output_bytes))
+            return output.getvalue()
+        chunks = self._member_chunks()
+        try:
+            if chunks is not None:
+                return b"".join(self._iter_parallel(chunks))
+            return dicttoxml.dicttoxml(
+                self.data,
+                root=self.root,
+                custom_root=self.wrapper,
+                attr_type=self.attr_type,
+                item_wrap=self.item_wrap,
+                xpath_format=self.xpath_format,
+                cdata=self.cdata,
+                list_headers=self.list_headers,
+                limits=self._limits(),
+                pretty=self.pretty,
+                ids=self.ids,
+                id_strategy=self.id_strategy,
+                id_seed=self.id_seed,
+            )
+        except ValueError as error:
+            raise InvalidDataError from error
+
+    def iter_xml(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Serialize the configured JSON value as a stream of UTF-8 byte chunks.
+
+        Compact and pretty output are both produced while the serializer walks the data on a
+        render thread that stays at most two chunks ahead, so only about ``2 * chunk_size``
+        bytes of XML are buffered at once. Closing the iterator stops and joins the thread.
+
+        :param chunk_size: Size of every chunk except the last, which may be shorter.
+        :return: An iterator of XML chunks; empty when the configured data is ``None``.
+        :raises InvalidDataError: While iterating, once a depth, item, or output limit is
+            exceeded or serialization rejects the data.
         """
-        if self.data is not None:
-            _validate_conversion_budget(
-                self.data, self.max_depth, self.max_items, self.max_output_bytes
+        chunk_size = _positive_limit("chunk_size", chunk_size)
+        if self.data is None:
+            return iter(())
+        if isinstance(self.data, JSONEventStream):
+            chunks = iter_eventstoxml(
+                _bounded_events(self.data, self.max_depth, self.max_items),
+                root=self.root,
+                custom_root=self.wrapper,
+                attr_type=self.attr_type,
+                item_wrap=self.item_wrap,
+                xpath_format=self.xpath_format,
+                cdata=self.cdata,
+                list_headers=self.list_headers,
+                chunk_size=chunk_size,
+                pretty=self.pretty,
+                ids=self.ids,
+                id_strategy=self.id_strategy,
+                id_seed=self.id_seed,
             )
-            try:
-                xml_data = dicttoxml.dicttoxml(
-                    self.data,
+        else:
+            chunks = dicttoxml.iter_dicttoxml(
+                self.data,
+                root=self.root,
+                custom_root=self.wrapper,
+                attr_type=self.attr_type,
+                item_wrap=self.item_wrap,
+                xpath_format=self.xpath_format,
+                cdata=self.cdata,
+                list_headers=self.list_headers,
+                chunk_size=chunk_size,
+                limits=self._limits(),
+                pretty=self.pretty,
+                ids=self.ids,
+                id_strategy=self.id_strategy,
+                id_seed=self.id_seed,
+            )
+        return _bounded_chunks(chunks, self.max_output_bytes)
+
+    async def to_xml_async(self, executor: Executor | None = None) -> bytes | str | None:
+        """Serialize like :meth:`to_xml` in ``executor`` without blocking the event loop.
+
+        :param executor: Executor running the conversion; the loop's default when ``None``.
+            A process pool needs picklable data, so event streams need a thread pool.
+        :return: The result of :meth:`to_xml`.
+        :raises InvalidDataError: If a conversion limit is exceeded or serialization rejects
+            the data.
+        """
+        return await asyncio.get_running_loop().run_in_executor(executor, self.to_xml)
+
+    async def aiter_xml(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE, executor: Executor | None = None
+    ) -> AsyncIterator[bytes]:
+        """Serialize like :meth:`iter_xml`, fetching each chunk through ``executor``.
+
+        The render thread of :meth:`iter_xml` works at most two chunks ahead of the consumer,
+        so a slow reader holds the serializer back instead of letting output pile up in
+        memory. Closing the iterator, which ``contextlib.aclosing`` does when the loop is left
+        or the task cancelled, stops and joins that thread; an abandoned iterator is closed
+        once the event loop finalizes it.
+
+        :param chunk_size: Size of every chunk except the last, which may be shorter.
+        :param executor: Thread pool fetching the chunks; the loop's default when ``None``.
+        :return: An async iterator of XML chunks; empty when the configured data is ``None``.
+        :raises InvalidDataError: While iterating, once a depth, item, or output limit is
+            exceeded or serialization rejects the data.
+        """
+        chunks = self.iter_xml(chunk_size)
+        # A cancelled await leaves its ``next`` running, so closing waits for it.
+        lock = threading.Lock()
+
+        def step() -> bytes | None:
+            with lock:
+                return next(chunks, None)
+
+        def close() -> None:
+            with lock:
+                stop = getattr(chunks, "close", None)
+                if stop is not None:
+                    stop()
+
+        loop = asyncio.get_running_loop()
+        try:
+            while (chunk := await loop.run_in_executor(executor, step)) is not None:
+                yield chunk
+        finally:
+            await loop.run_in_executor(executor, close)
+
+    def write_to(self, sink: XMLSink) -> int:
+        """Serialize the configured JSON value directly into an output sink.
+
+        Output is written in 64 KiB chunks while the serializer walks the data, in both
+        compact and pretty mode, so the whole document is never held in memory. Output
+        already written stays in the sink if an error is raised.
+
+        :param sink: A binary file object, raw file descriptor, or connected socket.
+        :return: Number of bytes written; ``0`` when the configured data is ``None``.
+        :raises InvalidDataError: If a conversion limit is exceeded or serialization rejects
+            the data.
+        :raises TypeError: If ``sink`` is not a supported output.
+        """
+        bounded = _BoundedSink(sink_writer(sink), self.max_output_bytes)
+        if self.data is None:
+            return 0
+        self._write(bounded)
+        return bounded.written
+
+    def _native_xml(self, stream: JSONEventStream) -> bytes | None:
+        """Convert the whole text of event-stream input in the Rust backend, if it can.
+
+        The text is parsed natively, so no Python objects are built for it, and the parser
+        stops at the first value over the depth or item limit. The text, its parsed tree and
+        the XML are all held at once, so a source larger than ``max_output_bytes`` is not read
+        here. ``None`` leaves the stream to the event serializer, which gives the same XML.
+        """
+        if self.ids or self.xpath_format or not dicttoxml.is_rust_available():
+            return None
+        text = stream.read_text(self.max_output_bytes)
+        if text is None:
+            return None
+        try:
+            return dicttoxml.json_to_xml(
+                text,
+                root=self.root,
+                custom_root=self.wrapper,
+                attr_type=self.attr_type,
+                item_wrap=self.item_wrap,
+                cdata=self.cdata,
+                list_headers=self.list_headers,
+                limits=self._limits(),
+                pretty=self.pretty,
+            )
+        except ValueError as error:
+            raise InvalidDataError from error
+
+    def _limits(self) -> ConversionLimits:
+        return ConversionLimits(self.max_depth, self.max_items, self.max_output_bytes)
+
+    def _with_data(self, data: Any) -> "Json2xml":
+        """Return a single-worker converter with these options for other data."""
+        converter = Json2xml.__new__(Json2xml)
+        converter.__dict__.update(self.__dict__, data=data, workers=1)
+        return converter
+
+    def _member_chunks(self) -> list[Any] | None:
+        """Split the top-level container for the workers, or return None to convert serially.
+
+        IDs and XPath output depend on a member's position in the whole document, and
+        top-level special keys change the root element, so those documents stay serial.
+        """
+        data = self.data
+        if self.workers == 1 or self.ids or self.xpath_format:
+            return None
+        if type(data) is list:
+            members: list[Any] = data
+        elif type(data) is dict and not any(isinstance(key, str) and "@" in key for key in data):
+            members = list(data.items())
+        else:
+            return None
+        if len(members) < PARALLEL_MIN_MEMBERS:
+            return None
+        size = -(-len(members) // (self.workers * PARALLEL_CHUNKS_PER_WORKER))
+        chunks = [members[start:start + size] for start in range(0, len(members), size)]
+        return chunks if type(data) is list else [dict(chunk) for chunk in chunks]
+
+    def _iter_parallel(self, chunks: list[Any]) -> Iterator[bytes]:
+        """Serialize chunks of the top-level members in workers and yield the document in order.
+
+        Each chunk renders as a document of its own with the same options; the members are
+        cut out of it and framed by an empty document, which is the root element or, for
+        rootless pretty output, the final newline. Depth limits hold per member, and the item
+        and output limits are summed across chunks.
+        """
+        empty = self._with_data(type(self.data)()).to_bytes()
+        assert empty is not None
+        if self.root:
+            # Pretty members each start on a new line, and so does the closing root tag.
+            split = empty.rfind(b"\n</" if self.pretty else b"</")
+            head, tail = empty[:split], empty[split:]
+        else:
+            head, tail = b"", empty
+        # Rootless pretty members after the first chunk's start on a line of their own.
+        separator = b""
+        items = 1
+        output_bytes = len(head) + len(tail)
+        yield head
+        converters = (self._with_data(chunk) for chunk in chunks)
+        threads = dicttoxml._renders_without_gil()
+        results = _map_in_workers(_render_members, converters, self.workers, threads)
+        for chunk_items, document in results:
+            assert document.startswith(head) and document.endswith(tail)
+            items += chunk_items - 1
+            if items > self.max_items:
+                raise InvalidDataError("JSON item limit exceeded")
+            members = document[len(head):len(document) - len(tail)]
+            if not members:
+                continue
+            output_bytes += len(separator) + len(members)
+            if output_bytes > self.max_output_bytes:
+                raise InvalidDataError("XML output size limit exceeded")
+            yield separator + members
+            separator = b"" if self.root else tail
+        yield tail
+
+    def _write(self, sink: _BoundedSink) -> None:
+        try:
+            chunks = None if isinstance(self.data, JSONEventStream) else self._member_chunks()
+            if chunks is not None:
+                for part in self._iter_parallel(chunks):
+                    sink.write(part)
+                return
+            if isinstance(self.data, JSONEventStream):
+                eventstoxml(
+                    _bounded_events(self.data, self.max_depth, self.max_items),
                     root=self.root,
                     custom_root=self.wrapper,
                     attr_type=self.attr_type,
@@ -209,12 +466,240 @@ class Json2xml:
                     xpath_format=self.xpath_format,
                     cdata=self.cdata,
                     list_headers=self.list_headers,
+                    sink=sink,
+                    pretty=self.pretty,
+                    ids=self.ids,
+                    id_strategy=self.id_strategy,
+                    id_seed=self.id_seed,
                 )
-            except ValueError as error:
-                raise InvalidDataError from error
-            if len(xml_data) > self.max_output_bytes:
-                raise InvalidDataError("XML output size limit exceeded")
-            if self.pretty:
-                return _pretty_xml(xml_data, self.max_output_bytes)
-            return xml_data
-        return None
+                return
+            dicttoxml.dicttoxml(
+                self.data,
+                root=self.root,
+                custom_root=self.wrapper,
+                attr_type=self.attr_type,
+                item_wrap=self.item_wrap,
+                xpath_format=self.xpath_format,
+                cdata=self.cdata,
+                list_headers=self.list_headers,
+                sink=sink,
+                limits=self._limits(),
+                pretty=self.pretty,
+                ids=self.ids,
+                id_strategy=self.id_strategy,
+                id_seed=self.id_seed,
+            )
+        except ValueError as error:
+            raise InvalidDataError from error
+
+
+@dataclass(frozen=True, slots=True)
+class _LineOptions:
+    """Picklable per-record conversion options shared with worker processes."""
+
+    wrapper: str
+    root: bool
+    attr_type: bool
+    item_wrap: bool
+    xpath_format: bool
+    cdata: bool
+    list_headers: bool
+    strip_declaration: bool
+    max_depth: int
+    max_items: int
+    max_output_bytes: int
+
+
+def _convert_line_batch(
+    batch: list[tuple[int, str | bytes]], options: _LineOptions
+) -> list[bytes]:
+    """Decode and serialize one batch of JSON lines, skipping blank lines and nulls."""
+    records: list[bytes] = []
+    for line_number, line in batch:
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as error:
+            raise JSONReadError(f"Invalid JSON on line {line_number}") from error
+        converter = Json2xml(
+            data,
+            wrapper=options.wrapper,
+            root=options.root,
+            attr_type=options.attr_type,
+            item_wrap=options.item_wrap,
+            xpath_format=options.xpath_format,
+            cdata=options.cdata,
+            list_headers=options.list_headers,
+            max_depth=options.max_depth,
+            max_items=options.max_items,
+            max_output_bytes=options.max_output_bytes,
+        )
+        try:
+            xml_data = converter.to_xml()
+        except InvalidDataError as error:
+            raise InvalidDataError(f"Invalid data on line {line_number}: {error}") from error
+        if xml_data is None:
+            continue
+        assert isinstance(xml_data, bytes)
+        if options.strip_declaration:
+            xml_data = xml_data.removeprefix(XML_DECLARATION)
+        records.append(xml_data)
+    return records
+
+
+def _line_batches(lines: Iterable[str | bytes]) -> Iterator[list[tuple[int, str | bytes]]]:
+    numbered = enumerate(lines, start=1)
+    while batch := list(islice(numbered, LINE_BATCH_SIZE)):
+        yield batch
+
+
+def _render_members(converter: Json2xml) -> tuple[int, bytes]:
+    """Serialize one chunk of top-level members as a document, counting its values as it goes."""
+    return dicttoxml._render_counted(
+        converter.data,
+        root=converter.root,
+        custom_root=converter.wrapper,
+        attr_type=converter.attr_type,
+        item_wrap=converter.item_wrap,
+        cdata=converter.cdata,
+        list_headers=converter.list_headers,
+        pretty=converter.pretty,
+        limits=converter._limits(),
+    )
+
+
+_POOLS: dict[tuple[int, bool, int], Executor] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _worker_pool(workers: int, threads: bool = False) -> Executor:
+    """Return the shared pool of ``workers`` threads or processes, starting it on first use.
+
+    Threads serve tasks that release the GIL themselves and free-threaded builds running
+    without it; processes serve everything else. Pools last for the life of the process, so
+    repeated conversions do not start new workers.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    threads = threads or (is_gil_enabled is not None and not is_gil_enabled())
+    # A forked child inherits the parent's pools without their workers.
+    key = (os.getpid(), threads, workers)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ThreadPoolExecutor(workers) if threads else ProcessPoolExecutor(workers)
+            _POOLS[key] = pool
+        return pool
+
+
+def _discard_pool(pool: Executor) -> None:
+    """Forget a broken pool so the next conversion starts a new one."""
+    with _POOLS_LOCK:
+        for key in [key for key, shared in _POOLS.items() if shared is pool]:
+            del _POOLS[key]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _map_in_workers(
+    function: Callable[[_T], _R], tasks: Iterator[_T], workers: int, threads: bool = False
+) -> Iterator[_R]:
+    """Run tasks in workers and yield results in order, with at most two per worker in flight."""
+    executor = _worker_pool(workers, threads)
+    pending: deque[Future[_R]] = deque()
+    try:
+        for task in tasks:
+            pending.append(executor.submit(function, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    except BrokenExecutor:
+        _discard_pool(executor)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _iter_line_records(
+    lines: Iterable[str | bytes],
+    options: _LineOptions,
+    workers: int,
+    stream_root: tuple[bytes, bytes] | None,
+) -> Iterator[bytes]:
+    if stream_root is not None:
+        yield stream_root[0]
+    batches = _line_batches(lines)
+    if workers == 1:
+        results: Iterator[list[bytes]] = (
+            _convert_line_batch(batch, options) for batch in batches
+        )
+    else:
+        results = _map_in_workers(partial(_convert_line_batch, options=options), batches, workers)
+    for records in results:
+        yield from records
+    if stream_root is not None:
+        yield stream_root[1]
+
+
+# @lat: [[behavior#JSON Lines conversion]]
+def convert_lines(
+    lines: Iterable[str | bytes],
+    *,
+    wrapper: str = "all",
+    root: bool = True,
+    attr_type: bool = True,
+    item_wrap: bool = True,
+    xpath_format: bool = False,
+    cdata: bool = False,
+    list_headers: bool = False,
+    stream_root: str | None = None,
+    workers: int = 1,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_items: int = DEFAULT_MAX_ITEMS,
+    max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+) -> Iterator[bytes]:
+    """Convert newline-delimited JSON records, yielding one compact XML record at a time.
+
+    Each non-blank line is decoded and serialized exactly like ``Json2xml(record).to_xml()``
+    with the given options; ``null`` records produce no output. Lines are read lazily in
+    batches, so memory stays constant per record regardless of input length.
+
+    :param lines: JSON lines as ``str`` or ``bytes``, such as an open file.
+    :param stream_root: When set, the output opens with an XML declaration and this element,
+        records follow without their own declarations, and the element is closed at the end.
+    :param workers: Number of processes converting batches of lines in parallel. Output order
+        always matches input order.
+    :param max_depth: Maximum nesting depth of each record.
+    :param max_items: Maximum number of JSON values in each record.
+    :param max_output_bytes: Maximum XML size of each record.
+    :return: An iterator of UTF-8 XML byte strings, one per record plus the stream root tags.
+    :raises JSONReadError: While iterating, when a line is not valid JSON.
+    :raises InvalidDataError: While iterating, when a record cannot be converted.
+    """
+    workers = _positive_limit("workers", workers)
+    options = _LineOptions(
+        wrapper=wrapper,
+        root=root,
+        attr_type=attr_type,
+        item_wrap=item_wrap,
+        xpath_format=xpath_format,
+        cdata=cdata,
+        list_headers=list_headers,
+        strip_declaration=stream_root is not None,
+        max_depth=_positive_limit("max_depth", max_depth),
+        max_items=_positive_limit("max_items", max_items),
+        max_output_bytes=_positive_limit("max_output_bytes", max_output_bytes),
+    )
+    root_tags = None
+    if stream_root is not None:
+        try:
+            root_name, root_attr = make_valid_xml_name(stream_root, {})
+            opening = f"<{root_name}{make_attrstring(root_attr)}>"
+        except ValueError as error:
+            raise InvalidDataError from error
+        root_tags = (
+            XML_DECLARATION + opening.encode("utf-8"),
+            f"</{root_name}>".encode(),
+        )
+    return _iter_line_records(lines, options, workers, root_tags)
@@ -1,8 +1,19 @@
-"""Shared JSON type aliases used by reader and converter APIs."""
+"""Shared type aliases used by reader, converter, and output APIs."""
 from __future__ import annotations
 
-from typing import TypeAlias
+import socket
+from typing import Protocol, TypeAlias
+
+
+class BinaryWriter(Protocol):
+    """Object accepting UTF-8 output through a binary ``write`` method."""
+
+    def write(self, data: bytes, /) -> int | None: ...
+
 
 JSONValue: TypeAlias = None | bool | int | float | str | list["JSONValue"] | dict[str, "JSONValue"]
+JSONScalar: TypeAlias = None | bool | int | float | str
+JSONEvent: TypeAlias = tuple[str, JSONScalar]
+XMLSink: TypeAlias = "int | socket.socket | BinaryWriter"
 
-__all__ = ["JSONValue"]
+__all__ = ["BinaryWriter", "JSONEvent", "JSONScalar", "JSONValue", "XMLSink"]
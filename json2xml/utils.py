@@ -1,32 +1,56 @@
 """Utility methods for reading JSON data from various sources."""
 from __future__ import annotations
 
+import asyncio
+import codecs
 import json
+import mmap
+import os
+import re
 import socket
+import stat
+import threading
+import time
 import zlib
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from ipaddress import ip_address
-from typing import Any
+from json.decoder import scanstring
+from typing import IO, Any
 from urllib.parse import SplitResult, urlsplit, urlunsplit
 
-__lazy_modules__ = ["urllib3"]
+__lazy_modules__ = ["asyncio", "urllib3"]
 
-from .types import JSONValue
+from .types import JSONEvent, JSONValue
 
 DEFAULT_URL_TIMEOUT: Any | None = None
 DEFAULT_MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+DEFAULT_URL_CONCURRENCY = 8
+DEFAULT_CONNECTIONS_PER_HOST = 2
+# getaddrinfo does not report record TTLs, so validated addresses are kept this long.
+DNS_CACHE_TTL_SECONDS = 60.0
+DNS_CACHE_MAXSIZE = 256
 COMPRESSED_READ_CHUNK_BYTES = 64 * 1024
+JSON_READ_CHUNK_CHARS = 64 * 1024
 _HTTP: Any | None = None
+_HTTP_LOCK = threading.Lock()
 
 
 def _get_http_client() -> tuple[Any, Any, Any]:
-    """Import and initialize urllib3 only for URL reads."""
+    """Import and initialize urllib3 only for URL reads.
+
+    Threads reading URLs at once share one pool manager; the lock keeps two first calls
+    from each building one, and is skipped once the pool exists.
+    """
     import urllib3
 
     global DEFAULT_URL_TIMEOUT, _HTTP
-    if DEFAULT_URL_TIMEOUT is None:
-        DEFAULT_URL_TIMEOUT = urllib3.Timeout(connect=5.0, read=30.0)
     if _HTTP is None:
-        _HTTP = urllib3.PoolManager()
+        with _HTTP_LOCK:
+            if _HTTP is None:
+                DEFAULT_URL_TIMEOUT = urllib3.Timeout(connect=5.0, read=30.0)
+                _HTTP = urllib3.PoolManager()
     return urllib3, _HTTP, DEFAULT_URL_TIMEOUT
 
 
@@ -51,11 +75,51 @@ class StringReadError(Exception):
 
 
 # @lat: [[behavior#Input readers]]
-def readfromjson(filename: str) -> JSONValue:
-    """Read JSON data from a file."""
+def _read_json_file_text(jsondata: IO[bytes], max_file_bytes: int | None) -> str:
+    """Decode a binary file, mapping regular files instead of reading them.
+
+    The size check uses the file's metadata, so an oversized regular file is
+    rejected before any of it is read. Pipes and empty-looking special files
+    are read normally, stopping one byte past the limit.
+    """
+    status = os.fstat(jsondata.fileno())
+    if stat.S_ISREG(status.st_mode) and status.st_size:
+        if max_file_bytes is not None and status.st_size > max_file_bytes:
+            raise JSONReadError("JSON file exceeds maximum size")
+        # Map the checked size, not the file's size at mapping time, so growth cannot
+        # slip past the limit.
+        with mmap.mmap(
+            jsondata.fileno(), status.st_size, access=mmap.ACCESS_READ
+        ) as mapped:
+            text = str(mapped, "utf-8")
+        if os.fstat(jsondata.fileno()).st_size != status.st_size:
+            raise JSONReadError("JSON file changed while reading")
+        return text
+    data = jsondata.read() if max_file_bytes is None else jsondata.read(max_file_bytes + 1)
+    if max_file_bytes is not None and len(data) > max_file_bytes:
+        raise JSONReadError("JSON file exceeds maximum size")
+    return data.decode("utf-8")
+
+
+def readfromjson(filename: str, max_file_bytes: int | None = None) -> JSONValue:
+    """Read JSON data from a file.
+
+    Regular files are memory-mapped and decoded from the mapping into one
+    ``str``, skipping the intermediate bytes buffer of a text-mode read. Files
+    larger than ``max_file_bytes`` are rejected before they are read. Mapped
+    pages fault if another process truncates the file during decoding, so use
+    :func:`streamfromjson` for files that may shrink while they are read.
+    """
+    if max_file_bytes is not None and (
+        isinstance(max_file_bytes, bool)
+        or not isinstance(max_file_bytes, int)
+        or max_file_bytes <= 0
+    ):
+        raise JSONReadError("Maximum file size must be a positive integer")
     try:
-        with open(filename, encoding="utf-8") as jsondata:
-            return json.load(jsondata)
+        with open(filename, "rb") as jsondata:
+            text = _read_json_file_text(jsondata, max_file_bytes)
+        return json.loads(text)
     except (ValueError, OSError) as error:
         raise JSONReadError("Invalid JSON File") from error
 
@@ -78,19 +142,117 @@ def _validate_url(url: str) -> SplitResult:
     return parsed
 
 
+@dataclass(frozen=True, slots=True)
+class DNSCacheInfo:
+    """Hit and miss counts and occupancy of the validated DNS cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _DNSCache:
+    """Public addresses of recently resolved hosts, each kept for a limited time.
+
+    Only addresses that passed the public-network check are stored, so a hit
+    connects exactly where a fresh, validated lookup did.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, int], tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, hostname: str, port: int) -> str | None:
+        key = (hostname, port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, hostname: str, port: int, address: str) -> None:
+        if DNS_CACHE_TTL_SECONDS <= 0 or DNS_CACHE_MAXSIZE <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop((hostname, port), None)
+            if len(self._entries) >= DNS_CACHE_MAXSIZE:
+                for key, (expires, _) in list(self._entries.items()):
+                    if expires <= now:
+                        del self._entries[key]
+            while len(self._entries) >= DNS_CACHE_MAXSIZE:
+                del self._entries[next(iter(self._entries))]
+            self._entries[(hostname, port)] = (now + DNS_CACHE_TTL_SECONDS, address)
+
+    def clear(self, hostname: str | None) -> None:
+        with self._lock:
+            if hostname is None:
+                self._entries.clear()
+                self._hits = self._misses = 0
+                return
+            hostname = hostname.lower()
+            for key in [key for key in self._entries if key[0] == hostname]:
+                del self._entries[key]
+
+    def info(self) -> DNSCacheInfo:
+        with self._lock:
+            return DNSCacheInfo(
+                self._hits, self._misses, DNS_CACHE_MAXSIZE, len(self._entries)
+            )
+
+
+_DNS_CACHE = _DNSCache()
+
+
+def clear_dns_cache(hostname: str | None = None) -> None:
+    """Forget cached addresses for ``hostname``, or every address and the stats."""
+    _DNS_CACHE.clear(hostname)
+
+
+def dns_cache_info() -> DNSCacheInfo:
+    """Report hits, misses, and size of the validated DNS cache."""
+    return _DNS_CACHE.info()
+
+
+def _host_and_port(parsed: SplitResult) -> tuple[str, int]:
+    assert parsed.hostname is not None
+    return parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80)
+
+
+def _public_address(addresses: list[Any]) -> str:
+    if not addresses or any(not address.is_global for address in addresses):
+        raise URLReadError("URL must resolve only to a public network address")
+    return str(addresses[0])
+
+
+def _resolved_addresses(address_info: list[Any]) -> list[Any]:
+    return [ip_address(str(info[4][0]).split("%", 1)[0]) for info in address_info]
+
+
 def _resolve_validated_address(
     parsed: SplitResult, allow_private_networks: bool
 ) -> str | None:
-    """Resolve and validate the public address used for the connection."""
+    """Resolve and validate the public address used for the connection.
+
+    Validated addresses of DNS names are cached for ``DNS_CACHE_TTL_SECONDS``.
+    """
     if allow_private_networks:
         return None
 
-    assert parsed.hostname is not None
-    hostname = parsed.hostname
-    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    hostname, port = _host_and_port(parsed)
     try:
         addresses = [ip_address(hostname)]
     except ValueError:
+        cached = _DNS_CACHE.get(hostname, port)
+        if cached is not None:
+            return cached
         try:
             address_info = socket.getaddrinfo(
                 hostname,
@@ -99,14 +261,38 @@ def _resolve_validated_address(
             )
         except (OSError, UnicodeError) as error:
             raise URLReadError("URL hostname could not be resolved") from error
-        addresses = [
-            ip_address(str(info[4][0]).split("%", 1)[0])
-            for info in address_info
-        ]
+        address = _public_address(_resolved_addresses(address_info))
+        _DNS_CACHE.put(hostname, port, address)
+        return address
+    return _public_address(addresses)
 
-    if not addresses or any(not address.is_global for address in addresses):
-        raise URLReadError("URL must resolve only to a public network address")
-    return str(addresses[0])
+
+async def _resolve_validated_address_async(
+    parsed: SplitResult, allow_private_networks: bool
+) -> str | None:
+    """Resolve the connection address like the sync reader, without blocking the loop."""
+    if allow_private_networks:
+        return None
+
+    hostname, port = _host_and_port(parsed)
+    try:
+        addresses = [ip_address(hostname)]
+    except ValueError:
+        cached = _DNS_CACHE.get(hostname, port)
+        if cached is not None:
+            return cached
+        try:
+            address_info = await asyncio.get_running_loop().getaddrinfo(
+                hostname,
+                port,
+                type=socket.SOCK_STREAM,
+            )
+        except (OSError, UnicodeError) as error:
+            raise URLReadError("URL hostname could not be resolved") from error
+        address = _public_address(_resolved_addresses(address_info))
+        _DNS_CACHE.put(hostname, port, address)
+        return address
+    return _public_address(addresses)
 
 
 def _request_via_validated_address(
@@ -117,13 +303,12 @@ def _request_via_validated_address(
     timeout: Any,
 ) -> Any:
     """Issue a GET directly to an address already validated as public."""
-    assert parsed.hostname is not None
+    hostname, port = _host_and_port(parsed)
     try:
-        hostname = parsed.hostname.encode("idna").decode("ascii")
+        hostname = hostname.encode("idna").decode("ascii")
     except UnicodeError as error:
         raise URLReadError("URL hostname could not be resolved") from error
 
-    port = parsed.port or (443 if parsed.scheme == "https" else 80)
     authority = f"[{hostname}]" if ":" in hostname else hostname
     if parsed.port is not None:
         authority = f"{authority}:{parsed.port}"
@@ -274,18 +459,7 @@ def _validated_content_length(response: Any, max_response_bytes: int) -> int | N
     return parsed_length
 
 
-def readfromurl(
-    url: str,
-    params: dict[str, str] | None = None,
-    *,
-    max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
-    allow_private_networks: bool = False,
-) -> JSONValue:
-    """Load bounded JSON data from a public URL.
-
-    Private-network access is available only through the explicit trusted-caller
-    opt-in. Redirects and embedded credentials are always rejected.
-    """
+def _validate_url_options(max_response_bytes: int, allow_private_networks: bool) -> None:
     if not isinstance(allow_private_networks, bool):
         raise URLReadError("allow_private_networks must be a boolean")
     if (
@@ -294,13 +468,29 @@ def readfromurl(
         or max_response_bytes <= 0
     ):
         raise URLReadError("Maximum response size must be a positive integer")
-    parsed = _validate_url(url)
-    validated_address = _resolve_validated_address(
-        parsed,
-        allow_private_networks,
-    )
 
-    urllib3, http, timeout = _get_http_client()
+
+def _validate_url_request(
+    url: str, max_response_bytes: int, allow_private_networks: bool
+) -> SplitResult:
+    _validate_url_options(max_response_bytes, allow_private_networks)
+    return _validate_url(url)
+
+
+def _fetch_url_json(
+    parsed: SplitResult,
+    validated_address: str | None,
+    params: dict[str, str] | None,
+    max_response_bytes: int,
+    http: Any | None = None,
+) -> JSONValue:
+    """Request a validated URL and decode its bounded JSON body.
+
+    ``http`` overrides the shared pool manager the request is sent through.
+    """
+    urllib3, shared_http, timeout = _get_http_client()
+    if http is None:
+        http = shared_http
     response = None
     try:
         if validated_address is None:
@@ -345,6 +535,164 @@ def readfromurl(
         raise URLReadError("URL did not return valid JSON") from error
 
 
+def readfromurl(
+    url: str,
+    params: dict[str, str] | None = None,
+    *,
+    max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+    allow_private_networks: bool = False,
+) -> JSONValue:
+    """Load bounded JSON data from a public URL.
+
+    Private-network access is available only through the explicit trusted-caller
+    opt-in. Redirects and embedded credentials are always rejected.
+    """
+    parsed = _validate_url_request(url, max_response_bytes, allow_private_networks)
+    validated_address = _resolve_validated_address(
+        parsed,
+        allow_private_networks,
+    )
+    return _fetch_url_json(parsed, validated_address, params, max_response_bytes)
+
+
+def _fetch_pooled_url(
+    http: Any,
+    url: str,
+    params: dict[str, str] | None,
+    max_response_bytes: int,
+    allow_private_networks: bool,
+) -> JSONValue:
+    parsed = _validate_url(url)
+    validated_address = _resolve_validated_address(parsed, allow_private_networks)
+    return _fetch_url_json(parsed, validated_address, params, max_response_bytes, http)
+
+
+def _completed_urls(
+    pending: dict[Future[JSONValue], str],
+) -> Iterator[tuple[str, JSONValue | URLReadError]]:
+    """Wait for at least one request and yield every finished one.
+
+    Any failure of a request becomes its URL's result, so one unexpected error
+    cannot end the iteration for the other URLs.
+    """
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        url = pending.pop(future)
+        error = future.exception()
+        if error is None:
+            yield url, future.result()
+        elif isinstance(error, URLReadError):
+            yield url, error
+        else:
+            wrapped = URLReadError("URL could not be read")
+            wrapped.__cause__ = error
+            yield url, wrapped
+
+
+def _iter_url_results(
+    urls: Iterable[str],
+    params: dict[str, str] | None,
+    max_concurrency: int,
+    per_host: int,
+    max_response_bytes: int,
+    allow_private_networks: bool,
+) -> Iterator[tuple[str, JSONValue | URLReadError]]:
+    urllib3, _, _ = _get_http_client()
+    # Blocking pools hold each host to per_host connections, which finished reads
+    # return for the host's next request.
+    http = urllib3.PoolManager(
+        num_pools=max(max_concurrency, 10),
+        maxsize=per_host,
+        block=True,
+    )
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    pending: dict[Future[JSONValue], str] = {}
+    finished = False
+    try:
+        for url in urls:
+            if len(pending) >= max_concurrency:
+                yield from _completed_urls(pending)
+            future = executor.submit(
+                _fetch_pooled_url,
+                http,
+                url,
+                params,
+                max_response_bytes,
+                allow_private_networks,
+            )
+            pending[future] = url
+        while pending:
+            yield from _completed_urls(pending)
+        finished = True
+    finally:
+        # Closing early must not wait for requests already in flight; they finish
+        # in the background within the URL timeouts.
+        executor.shutdown(wait=finished, cancel_futures=True)
+        http.clear()
+
+
+def readfromurls(
+    urls: Iterable[str],
+    params: dict[str, str] | None = None,
+    *,
+    max_concurrency: int = DEFAULT_URL_CONCURRENCY,
+    per_host: int = DEFAULT_CONNECTIONS_PER_HOST,
+    max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+    allow_private_networks: bool = False,
+) -> Iterator[tuple[str, JSONValue | URLReadError]]:
+    """Load bounded JSON data from many public URLs concurrently.
+
+    Every URL gets the checks and limits of :func:`readfromurl`. At most
+    ``max_concurrency`` requests run at once, URLs are taken from ``urls`` only as
+    requests finish, and each host keeps up to ``per_host`` keep-alive connections
+    for its later URLs.
+
+    :return: An iterator of ``(url, data)`` pairs in completion order. A URL that
+        cannot be read yields its :class:`URLReadError` in place of the data.
+    """
+    _validate_url_options(max_response_bytes, allow_private_networks)
+    for name, value in (("max_concurrency", max_concurrency), ("per_host", per_host)):
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            raise URLReadError(f"{name} must be a positive integer")
+    return _iter_url_results(
+        urls,
+        params,
+        max_concurrency,
+        per_host,
+        max_response_bytes,
+        allow_private_networks,
+    )
+
+
+async def readfromurl_async(
+    url: str,
+    params: dict[str, str] | None = None,
+    *,
+    max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+    allow_private_networks: bool = False,
+    executor: Executor | None = None,
+) -> JSONValue:
+    """Load bounded JSON data from a public URL without blocking the event loop.
+
+    The hostname is resolved through the running loop, and the request, the bounded
+    read, and JSON decoding run in ``executor`` (the loop's default when ``None``).
+    Validation and errors are those of :func:`readfromurl`.
+    """
+    parsed = _validate_url_request(url, max_response_bytes, allow_private_networks)
+    validated_address = await _resolve_validated_address_async(
+        parsed,
+        allow_private_networks,
+    )
+    return await asyncio.get_running_loop().run_in_executor(
+        executor,
+        _fetch_url_json,
+        parsed,
+        validated_address,
+        params,
+        max_response_bytes,
+    )
+
+
 def readfromstring(jsondata: object) -> JSONValue:
     """Load JSON data from a string."""
     if not isinstance(jsondata, str):
@@ -353,3 +701,276 @@ def readfromstring(jsondata: object) -> JSONValue:
         return json.loads(jsondata)
     except ValueError as error:
         raise StringReadError("Input is not a proper JSON string") from error
+
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_NUMBER = re.compile(r"(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?")
+_JSON_CONSTANTS = (
+    ("null", None),
+    ("true", True),
+    ("false", False),
+    ("NaN", float("nan")),
+    ("Infinity", float("inf")),
+    ("-Infinity", float("-inf")),
+)
+
+
+class _JSONEventParser:
+    """Pull parser that tokenizes JSON text from a buffer refilled on demand."""
+
+    __slots__ = ("_buffer", "_position", "_offset", "_read", "_eof")
+
+    def __init__(self, read: Callable[[], str] | None, text: str = "") -> None:
+        self._buffer = text
+        self._position = 0
+        self._offset = 0
+        self._read = read
+        self._eof = read is None
+
+    def _fill(self) -> bool:
+        """Append the next chunk of input, dropping consumed text; False at end of input."""
+        if self._eof:
+            return False
+        assert self._read is not None
+        data = self._read()
+        if not data:
+            self._eof = True
+            return False
+        self._offset += self._position
+        self._buffer = self._buffer[self._position:] + data
+        self._position = 0
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"{message}: char {self._offset + self._position}")
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at end of input."""
+        while True:
+            self._position = _JSON_WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ""
+
+    def _expect(self, character: str, message: str) -> None:
+        if self._peek() != character:
+            raise self._error(message)
+        self._position += 1
+
+    def _string(self) -> str:
+        search = self._position + 1
+        while True:
+            quote = self._buffer.find('"', search)
+            if quote < 0:
+                search = len(self._buffer) - self._position
+                if not self._fill():
+                    raise self._error("Unterminated string starting at")
+                search += self._position
+                continue
+            backslashes = quote - 1
+            while self._buffer[backslashes] == "\\":
+                backslashes -= 1
+            if (quote - 1 - backslashes) % 2 == 0:
+                break
+            search = quote + 1
+        value, self._position = scanstring(self._buffer, self._position + 1, True)
+        return value
+
+    def _ensure(self, size: int) -> None:
+        while len(self._buffer) - self._position < size and self._fill():
+            pass
+
+    def _number(self) -> int | float:
+        # A number is complete only once text after its longest partial tail ("e+") is
+        # buffered, so "1." and "1e" are never split across reads.
+        while True:
+            match = _JSON_NUMBER.match(self._buffer, self._position)
+            end = match.end() if match else self._position
+            if len(self._buffer) - end > 2 or not self._fill():
+                break
+        if match is None:
+            raise self._error("Expecting value")
+        self._position = match.end()
+        integer, fraction, exponent = match.groups()
+        if fraction or exponent:
+            return float(integer + (fraction or "") + (exponent or ""))
+        return int(integer)
+
+    def _scalar(self, character: str) -> JSONEvent:
+        if character == '"':
+            return "string", self._string()
+        self._ensure(9)
+        for literal, value in _JSON_CONSTANTS:
+            if self._buffer.startswith(literal, self._position):
+                self._position += len(literal)
+                if value is None:
+                    return "null", None
+                if isinstance(value, bool):
+                    return "boolean", value
+                return "number", value
+        return "number", self._number()
+
+    def _key(self) -> str:
+        if self._peek() != '"':
+            raise self._error("Expecting property name enclosed in double quotes")
+        key = self._string()
+        self._expect(":", "Expecting ':' delimiter")
+        return key
+
+    def events(self) -> Iterator[JSONEvent]:
+        in_map: list[bool] = []
+        expect_value = True
+        while True:
+            character = self._peek()
+            if expect_value:
+                if character == "{":
+                    self._position += 1
+                    yield "start_map", None
+                    if self._peek() == "}":
+                        self._position += 1
+                        yield "end_map", None
+                    else:
+                        in_map.append(True)
+                        yield "map_key", self._key()
+                        continue
+                elif character == "[":
+                    self._position += 1
+                    yield "start_array", None
+                    if self._peek() == "]":
+                        self._position += 1
+                        yield "end_array", None
+                    else:
+                        in_map.append(False)
+                        continue
+                elif character:
+                    yield self._scalar(character)
+                else:
+                    raise self._error("Expecting value")
+                expect_value = False
+            elif not in_map:
+                if character:
+                    raise self._error("Extra data")
+                return
+            elif character == ",":
+                self._position += 1
+                if in_map[-1]:
+                    yield "map_key", self._key()
+                expect_value = True
+            elif character == ("}" if in_map[-1] else "]"):
+                self._position += 1
+                yield ("end_map" if in_map.pop() else "end_array"), None
+            else:
+                raise self._error(
+                    "Expecting ',' delimiter" if character else "Unexpected end of JSON input"
+                )
+
+
+def _chunk_reader(source: IO[Any]) -> Callable[[], str]:
+    """Return a callable that reads text chunks from a text or binary file object."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def read() -> str:
+        data = source.read(JSON_READ_CHUNK_CHARS)
+        if isinstance(data, str):
+            return data
+        return decoder.decode(data, final=not data)
+
+    return read
+
+
+# @lat: [[behavior#Incremental JSON input]]
+def iter_json_events(source: str | IO[Any]) -> Iterator[JSONEvent]:
+    """Parse JSON incrementally into ``(event, value)`` pairs.
+
+    Events are ``start_map``, ``map_key``, ``end_map``, ``start_array``, ``end_array``,
+    ``string``, ``number``, ``boolean`` and ``null``. Scalars carry the value ``json.loads``
+    would produce; container events carry ``None``. Memory is bounded by the read buffer,
+    the nesting depth and the largest single scalar.
+
+    :param source: JSON text, or a text or binary (UTF-8) file object read in chunks.
+    :raises ValueError: While iterating, when the input is not valid JSON.
+    """
+    if isinstance(source, str):
+        return _JSONEventParser(None, source).events()
+    return _JSONEventParser(_chunk_reader(source)).events()
+
+
+class JSONEventStream:
+    """Re-iterable incremental JSON events that ``Json2xml`` converts without decoding.
+
+    Each iteration re-reads the source, so a converter can serialize it more than once.
+    Parse and read failures raise the reader's error type while iterating.
+    """
+
+    __slots__ = ("_open_events", "_error_type", "_message", "_read_text")
+
+    def __init__(
+        self,
+        open_events: Callable[[], Iterator[JSONEvent]],
+        error_type: type[Exception],
+        message: str,
+        read_text: Callable[[int | None], str | bytes | None] | None = None,
+    ) -> None:
+        self._open_events = open_events
+        self._error_type = error_type
+        self._message = message
+        self._read_text = read_text
+
+    def __iter__(self) -> Iterator[JSONEvent]:
+        try:
+            yield from self._open_events()
+        except (ValueError, OSError) as error:
+            raise self._error_type(self._message) from error
+
+    def read_text(self, max_size: int | None = None) -> str | bytes | None:
+        """Return the whole JSON text for a native parser, or None if the source has none.
+
+        :param max_size: Also return None, without reading it, for a source larger than
+            this many bytes (characters for string input).
+        :raises: The reader's error type if the source cannot be read.
+        """
+        if self._read_text is None:
+            return None
+        try:
+            return self._read_text(max_size)
+        except OSError as error:
+            raise self._error_type(self._message) from error
+
+
+def _iter_json_file_events(filename: str) -> Iterator[JSONEvent]:
+    with open(filename, encoding="utf-8") as jsondata:
+        yield from iter_json_events(jsondata)
+
+
+def _read_json_file_bytes(filename: str, max_size: int | None) -> bytes | None:
+    with open(filename, "rb") as jsondata:
+        if max_size is not None and os.fstat(jsondata.fileno()).st_size > max_size:
+            return None
+        return jsondata.read()
+
+
+def _sized_text(text: str, max_size: int | None) -> str | None:
+    return None if max_size is not None and len(text) > max_size else text
+
+
+def streamfromjson(filename: str) -> JSONEventStream:
+    """Read a JSON file incrementally instead of decoding it into Python objects."""
+    return JSONEventStream(
+        lambda: _iter_json_file_events(filename),
+        JSONReadError,
+        "Invalid JSON File",
+        lambda max_size: _read_json_file_bytes(filename, max_size),
+    )
+
+
+def streamfromstring(jsondata: object) -> JSONEventStream:
+    """Parse a JSON string incrementally instead of decoding it into Python objects."""
+    if not isinstance(jsondata, str):
+        raise StringReadError("Input is not a proper JSON string")
+    return JSONEventStream(
+        lambda: iter_json_events(jsondata),
+        StringReadError,
+        "Input is not a proper JSON string",
+        lambda max_size: _sized_text(jsondata, max_size),
+    )
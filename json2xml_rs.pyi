@@ -1,5 +1,14 @@
+from collections.abc import Callable
 from typing import Any
 
+FEATURES: tuple[str, ...]
+
+class ConversionLimitError(ValueError): ...
+
+
+class FallbackRequired(Exception): ...
+
+
 def dicttoxml(
     obj: Any,
     root: bool = True,
@@ -8,6 +17,35 @@ def dicttoxml(
     item_wrap: bool = True,
     cdata: bool = False,
     list_headers: bool = False,
+    xpath_format: bool = False,
+    pretty: bool = False,
+    indent: int = 2,
+    xml_namespaces: dict[str, Any] | None = None,
+    item_func: dict[str, str] | Callable[[str], str] | None = None,
+    ids: bool = False,
+    id_strategy: str = "random",
+    id_seed: int = 0,
+    strict: bool = False,
+    max_depth: int | None = None,
+    max_items: int | None = None,
+    max_output_bytes: int | None = None,
+    release_gil: bool = False,
+) -> bytes: ...
+
+
+def json_to_xml(
+    data: str | bytes,
+    root: bool = True,
+    custom_root: str = "root",
+    attr_type: bool = True,
+    item_wrap: bool = True,
+    cdata: bool = False,
+    list_headers: bool = False,
+    pretty: bool = False,
+    indent: int = 2,
+    max_depth: int | None = None,
+    max_items: int | None = None,
+    max_output_bytes: int | None = None,
 ) -> bytes: ...
 
 
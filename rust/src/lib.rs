@@ -4,15 +4,28 @@
 //! preserve. Unsupported features remain on the compatibility-focused Python serializer.
 
 #[cfg(feature = "python")]
-use pyo3::exceptions::PyValueError;
+use pyo3::create_exception;
+#[cfg(feature = "python")]
+use pyo3::exceptions::{PyException, PyValueError};
 #[cfg(feature = "python")]
 use pyo3::prelude::*;
 #[cfg(feature = "python")]
-use pyo3::types::{PyBool, PyBytes, PyDict, PyFloat, PyInt, PyList, PyString};
+use pyo3::types::{PyBool, PyByteArray, PyBytes, PyDict, PyFloat, PyInt, PyList, PyString, PyTuple};
+#[cfg(feature = "python")]
+use std::cell::RefCell;
+#[cfg(feature = "python")]
+use std::collections::HashMap;
+#[cfg(feature = "python")]
+use std::hash::BuildHasherDefault;
 #[cfg(feature = "python")]
-use std::io::{BufWriter, Write};
+use std::io::BufWriter;
+#[cfg(feature = "python")]
+use std::sync::Arc;
 
 use std::borrow::Cow;
+use std::cmp::Ordering;
+use std::hash::{BuildHasher, Hasher, RandomState};
+use std::io::{self, Write};
 
 #[cfg(feature = "python")]
 const OUTPUT_BUFFER_SIZE: usize = 16 * 1024;
@@ -220,34 +233,783 @@ pub fn push_cdata(out: &mut String, s: &str) {
     out.push_str("]]>");
 }
 
-/// Check if a key is a valid XML element name (simplified check)
-/// Full validation would require XML parsing, but this catches common issues
-pub fn is_valid_xml_name(key: &str) -> bool {
-    if key.is_empty() {
-        return false;
+/// Format a float as Python's `repr` does, so floats can be written without calling `str()`.
+///
+/// Python prints the shortest digits that round-trip and, when several do, the ones closest
+/// to the value; Rust's shortest form does not always break that tie the same way, so the
+/// value is printed again, correctly rounded, at the shortest length. Python places the
+/// decimal point itself for exponents from -4 to 15 (`0.0001`, `1e+16`) and adds `.0` to
+/// integral values.
+pub fn python_float_repr(value: f64) -> String {
+    if value.is_nan() {
+        return "nan".to_owned();
+    }
+    if value.is_infinite() {
+        return if value > 0.0 { "inf" } else { "-inf" }.to_owned();
+    }
+    let shortest = format!("{value:e}");
+    let precision = shortest.bytes().take_while(|&b| b != b'e').filter(u8::is_ascii_digit).count();
+    let scientific = format!("{value:.*e}", precision.saturating_sub(1));
+    let (mantissa, exponent) = scientific.split_once('e').unwrap_or((&scientific, "0"));
+    let exponent: i32 = exponent.parse().unwrap_or(0);
+    let (sign, mantissa) = match mantissa.strip_prefix('-') {
+        Some(unsigned) => ("-", unsigned),
+        None => ("", mantissa),
+    };
+    let digits = mantissa.replace('.', "");
+    let mut out = String::with_capacity(digits.len() + 8);
+    out.push_str(sign);
+    // Position of the decimal point after the first digit, as in Python's `format_float_short`.
+    let point = exponent + 1;
+    if !(-4 < point && point <= 16) {
+        out.push_str(&digits[..1]);
+        if digits.len() > 1 {
+            out.push('.');
+            out.push_str(&digits[1..]);
+        }
+        let exponent_sign = if exponent < 0 { '-' } else { '+' };
+        out.push_str(&format!("e{exponent_sign}{:02}", exponent.unsigned_abs()));
+    } else if point <= 0 {
+        out.push_str("0.");
+        out.extend(std::iter::repeat_n('0', point.unsigned_abs() as usize));
+        out.push_str(&digits);
+    } else {
+        let point = point as usize;
+        if point >= digits.len() {
+            out.push_str(&digits);
+            out.extend(std::iter::repeat_n('0', point - digits.len()));
+            out.push_str(".0");
+        } else {
+            out.push_str(&digits[..point]);
+            out.push('.');
+            out.push_str(&digits[point..]);
+        }
+    }
+    out
+}
+
+/// Deepest array and object nesting `parse_json` accepts; deeper documents are left to
+/// Python, whose decoder raises its own error for them.
+const JSON_MAX_NESTING: usize = 512;
+
+/// Most digits Python converts an integer string with by default (`sys.int_info`).
+const PYTHON_INT_MAX_STR_DIGITS: usize = 4300;
+
+/// A JSON document parsed without creating Python objects.
+#[derive(Debug, PartialEq)]
+pub enum JsonValue {
+    Null,
+    Bool(bool),
+    Int(i64),
+    /// An integer outside `i64`, spelled as Python prints it.
+    BigInt(String),
+    Float(f64),
+    Str(String),
+    Array(Vec<JsonValue>),
+    /// Members in document order, with unique keys.
+    Object(Vec<(String, JsonValue)>),
+}
+
+/// Why `parse_json` left a document to the Python decoder.
+#[derive(Debug, PartialEq, Eq)]
+pub enum JsonTextError {
+    /// The text is not JSON that `json.loads` accepts.
+    Invalid,
+    /// Valid JSON whose Python decoding or rendering differs from the native one: repeated
+    /// keys, keys starting with `@`, lone surrogates, integers longer than Python's digit
+    /// limit, or nesting deeper than `JSON_MAX_NESTING`.
+    Unsupported,
+    /// The document has more values or deeper nesting than `parse_json_limited` allows.
+    Limit(LimitExceeded),
+}
+
+/// Parse JSON text as `json.loads` does, `NaN` and `Infinity` included.
+pub fn parse_json(text: &str) -> Result<JsonValue, JsonTextError> {
+    parse_json_limited(text, None, None)
+}
+
+/// Parse JSON text like `parse_json`, stopping at the first value over a limit.
+///
+/// Values are counted in document order as the Python event path counts them: a container
+/// when it opens and a scalar once it is read, the item limit before the depth limit. So an
+/// oversized document fails without the rest of it being parsed.
+pub fn parse_json_limited(
+    text: &str,
+    max_depth: Option<usize>,
+    max_items: Option<usize>,
+) -> Result<JsonValue, JsonTextError> {
+    let mut parser = JsonParser {
+        text,
+        bytes: text.as_bytes(),
+        pos: 0,
+        depth: 0,
+        items: 0,
+        max_depth: max_depth.unwrap_or(usize::MAX),
+        max_items: max_items.unwrap_or(usize::MAX),
+    };
+    parser.skip_whitespace();
+    let value = parser.value()?;
+    parser.skip_whitespace();
+    if parser.pos != text.len() {
+        return Err(JsonTextError::Invalid);
+    }
+    Ok(value)
+}
+
+struct JsonParser<'a> {
+    text: &'a str,
+    bytes: &'a [u8],
+    pos: usize,
+    depth: usize,
+    items: usize,
+    max_depth: usize,
+    max_items: usize,
+}
+
+impl JsonParser<'_> {
+    #[inline]
+    fn peek(&self) -> Option<u8> {
+        self.bytes.get(self.pos).copied()
+    }
+
+    #[inline]
+    fn skip_whitespace(&mut self) {
+        while let Some(b' ' | b'\t' | b'\n' | b'\r') = self.peek() {
+            self.pos += 1;
+        }
+    }
+
+    /// Consume `literal` if the text continues with it.
+    fn eat(&mut self, literal: &str) -> bool {
+        let found = self.bytes[self.pos..].starts_with(literal.as_bytes());
+        if found {
+            self.pos += literal.len();
+        }
+        found
+    }
+
+    fn expect(&mut self, byte: u8) -> Result<(), JsonTextError> {
+        if self.peek() != Some(byte) {
+            return Err(JsonTextError::Invalid);
+        }
+        self.pos += 1;
+        Ok(())
+    }
+
+    fn value(&mut self) -> Result<JsonValue, JsonTextError> {
+        let value = match self.peek() {
+            Some(b'{') => return self.object(),
+            Some(b'[') => return self.array(),
+            Some(b'"') => JsonValue::Str(self.string()?),
+            Some(b'-' | b'0'..=b'9') => self.number()?,
+            _ if self.eat("null") => JsonValue::Null,
+            _ if self.eat("true") => JsonValue::Bool(true),
+            _ if self.eat("false") => JsonValue::Bool(false),
+            _ if self.eat("NaN") => JsonValue::Float(f64::NAN),
+            _ if self.eat("Infinity") => JsonValue::Float(f64::INFINITY),
+            _ => return Err(JsonTextError::Invalid),
+        };
+        self.charge()?;
+        Ok(value)
+    }
+
+    /// Count one value at the current depth against the limits.
+    #[inline]
+    fn charge(&mut self) -> Result<(), JsonTextError> {
+        self.items += 1;
+        if self.items > self.max_items {
+            return Err(JsonTextError::Limit(LimitExceeded::Items));
+        }
+        if self.depth > self.max_depth {
+            return Err(JsonTextError::Limit(LimitExceeded::Depth));
+        }
+        Ok(())
+    }
+
+    fn enter(&mut self) -> Result<(), JsonTextError> {
+        self.charge()?;
+        self.depth += 1;
+        if self.depth > JSON_MAX_NESTING {
+            return Err(JsonTextError::Unsupported);
+        }
+        self.pos += 1;
+        self.skip_whitespace();
+        Ok(())
+    }
+
+    fn object(&mut self) -> Result<JsonValue, JsonTextError> {
+        self.enter()?;
+        let mut members: Vec<(String, JsonValue)> = Vec::new();
+        if self.peek() == Some(b'}') {
+            self.pos += 1;
+            self.depth -= 1;
+            return Ok(JsonValue::Object(members));
+        }
+        loop {
+            if self.peek() != Some(b'"') {
+                return Err(JsonTextError::Invalid);
+            }
+            let key = self.string()?;
+            // Checked before the value, as the event serializer rejects special keys on sight.
+            if key.starts_with('@') {
+                return Err(JsonTextError::Unsupported);
+            }
+            self.skip_whitespace();
+            self.expect(b':')?;
+            self.skip_whitespace();
+            let value = self.value()?;
+            members.push((key, value));
+            self.skip_whitespace();
+            match self.peek() {
+                Some(b',') => {
+                    self.pos += 1;
+                    self.skip_whitespace();
+                }
+                Some(b'}') => break,
+                _ => return Err(JsonTextError::Invalid),
+            }
+        }
+        self.pos += 1;
+        self.depth -= 1;
+        if has_repeated_keys(&members) {
+            return Err(JsonTextError::Unsupported);
+        }
+        Ok(JsonValue::Object(members))
+    }
+
+    fn array(&mut self) -> Result<JsonValue, JsonTextError> {
+        self.enter()?;
+        let mut items = Vec::new();
+        if self.peek() == Some(b']') {
+            self.pos += 1;
+            self.depth -= 1;
+            return Ok(JsonValue::Array(items));
+        }
+        loop {
+            items.push(self.value()?);
+            self.skip_whitespace();
+            match self.peek() {
+                Some(b',') => {
+                    self.pos += 1;
+                    self.skip_whitespace();
+                }
+                Some(b']') => break,
+                _ => return Err(JsonTextError::Invalid),
+            }
+        }
+        self.pos += 1;
+        self.depth -= 1;
+        Ok(JsonValue::Array(items))
+    }
+
+    /// Parse a number with the grammar of Python's `NUMBER_RE`; a fraction or exponent
+    /// without digits ends the number, leaving the rest to fail as extra data.
+    fn number(&mut self) -> Result<JsonValue, JsonTextError> {
+        if self.eat("-Infinity") {
+            return Ok(JsonValue::Float(f64::NEG_INFINITY));
+        }
+        let start = self.pos;
+        if self.peek() == Some(b'-') {
+            self.pos += 1;
+        }
+        match self.peek() {
+            Some(b'0') => self.pos += 1,
+            Some(b'1'..=b'9') => self.skip_digits(),
+            _ => return Err(JsonTextError::Invalid),
+        }
+        let mut is_float = false;
+        if self.peek() == Some(b'.') && self.digit_at(self.pos + 1) {
+            self.pos += 1;
+            self.skip_digits();
+            is_float = true;
+        }
+        if let Some(b'e' | b'E') = self.peek() {
+            let sign = usize::from(matches!(self.bytes.get(self.pos + 1), Some(b'+' | b'-')));
+            if self.digit_at(self.pos + 1 + sign) {
+                self.pos += 1 + sign;
+                self.skip_digits();
+                is_float = true;
+            }
+        }
+        let number = &self.text[start..self.pos];
+        if is_float {
+            return number.parse().map(JsonValue::Float).map_err(|_| JsonTextError::Invalid);
+        }
+        if let Ok(value) = number.parse() {
+            return Ok(JsonValue::Int(value));
+        }
+        if number.trim_start_matches('-').len() > PYTHON_INT_MAX_STR_DIGITS {
+            return Err(JsonTextError::Unsupported);
+        }
+        Ok(JsonValue::BigInt(number.to_owned()))
+    }
+
+    #[inline]
+    fn digit_at(&self, pos: usize) -> bool {
+        self.bytes.get(pos).is_some_and(u8::is_ascii_digit)
+    }
+
+    #[inline]
+    fn skip_digits(&mut self) {
+        while self.digit_at(self.pos) {
+            self.pos += 1;
+        }
+    }
+
+    /// Parse a string, rejecting raw control characters like `json.loads(strict=True)`.
+    fn string(&mut self) -> Result<String, JsonTextError> {
+        self.pos += 1;
+        let mut out = String::new();
+        loop {
+            let start = self.pos;
+            while let Some(byte) = self.peek() {
+                if byte == b'"' || byte == b'\\' || byte < 0x20 {
+                    break;
+                }
+                self.pos += 1;
+            }
+            // The scan stops at ASCII bytes, so both ends are character boundaries.
+            out.push_str(&self.text[start..self.pos]);
+            match self.peek() {
+                Some(b'"') => {
+                    self.pos += 1;
+                    return Ok(out);
+                }
+                Some(b'\\') => {
+                    self.pos += 1;
+                    out.push(self.escape()?);
+                }
+                _ => return Err(JsonTextError::Invalid),
+            }
+        }
+    }
+
+    fn escape(&mut self) -> Result<char, JsonTextError> {
+        let Some(byte) = self.peek() else {
+            return Err(JsonTextError::Invalid);
+        };
+        self.pos += 1;
+        Ok(match byte {
+            b'"' => '"',
+            b'\\' => '\\',
+            b'/' => '/',
+            b'b' => '\u{8}',
+            b'f' => '\u{c}',
+            b'n' => '\n',
+            b'r' => '\r',
+            b't' => '\t',
+            b'u' => {
+                let unit = self.hex_unit()?;
+                if (0xDC00..0xE000).contains(&unit) {
+                    return Err(JsonTextError::Unsupported);
+                }
+                if !(0xD800..0xDC00).contains(&unit) {
+                    return char::from_u32(unit).ok_or(JsonTextError::Invalid);
+                }
+                // Python joins a high surrogate only with a low one escaped right after it.
+                if !self.eat("\\u") {
+                    return Err(JsonTextError::Unsupported);
+                }
+                let low = self.hex_unit()?;
+                if !(0xDC00..0xE000).contains(&low) {
+                    return Err(JsonTextError::Unsupported);
+                }
+                let code = 0x10000 + ((unit - 0xD800) << 10) + (low - 0xDC00);
+                return char::from_u32(code).ok_or(JsonTextError::Invalid);
+            }
+            _ => return Err(JsonTextError::Invalid),
+        })
+    }
+
+    /// Parse the four hex digits of a `\u` escape.
+    fn hex_unit(&mut self) -> Result<u32, JsonTextError> {
+        let digits = self.bytes.get(self.pos..self.pos + 4).ok_or(JsonTextError::Invalid)?;
+        let mut unit = 0;
+        for &digit in digits {
+            let value = (digit as char).to_digit(16).ok_or(JsonTextError::Invalid)?;
+            unit = unit * 16 + value;
+        }
+        self.pos += 4;
+        Ok(unit)
+    }
+}
+
+/// Return whether an object repeats a key, which `json.loads` would collapse into one member.
+fn has_repeated_keys(members: &[(String, JsonValue)]) -> bool {
+    if members.len() <= 8 {
+        return members.iter().enumerate().any(|(index, (key, _))| {
+            members[..index].iter().any(|(earlier, _)| earlier == key)
+        });
+    }
+    let mut keys: Vec<&str> = members.iter().map(|(key, _)| key.as_str()).collect();
+    keys.sort_unstable();
+    keys.windows(2).any(|pair| pair[0] == pair[1])
+}
+
+const SPACES: &[u8; 64] = b"                                                                ";
+
+/// Line layout for pretty output, matching the Python serializer's `_PrettyXMLWriter`.
+///
+/// Compact output keeps everything on one line and every method is a no-op. Pretty output
+/// starts each element on its own line, indented `width` spaces per nesting level, and the
+/// caller decides when text stays on the line of its element.
+#[derive(Debug)]
+pub struct Layout {
+    width: Option<usize>,
+    depth: usize,
+    started: bool,
+    inline: bool,
+}
+
+impl Layout {
+    /// Layout for single-line output.
+    pub fn compact() -> Self {
+        Self { width: None, depth: 0, started: false, inline: false }
+    }
+
+    /// Layout indenting each nesting level by `width` spaces.
+    pub fn pretty(width: usize) -> Self {
+        Self { width: Some(width), depth: 0, started: false, inline: false }
+    }
+
+    /// Whether an element named `tag` may be written: pretty output only places XML names,
+    /// as the Python serializer's `_PrettyXMLWriter` checks.
+    pub fn accepts(&self, tag: &str) -> bool {
+        self.width.is_none() || is_valid_tag_name(tag)
+    }
+
+    /// Start a new line at the current depth.
+    #[inline]
+    pub fn line<W: Write + ?Sized>(&mut self, out: &mut W) -> io::Result<()> {
+        let Some(width) = self.width else {
+            return Ok(());
+        };
+        if self.started {
+            out.write_all(b"\n")?;
+        }
+        self.started = true;
+        self.inline = false;
+        let mut remaining = width * self.depth;
+        while remaining > 0 {
+            let chunk = remaining.min(SPACES.len());
+            out.write_all(&SPACES[..chunk])?;
+            remaining -= chunk;
+        }
+        Ok(())
+    }
+
+    /// Indent the lines of an element's children one level deeper.
+    #[inline]
+    pub fn push(&mut self) {
+        self.depth += 1;
+    }
+
+    /// Return to the indentation of the enclosing element.
+    #[inline]
+    pub fn pop(&mut self) {
+        self.depth -= 1;
+    }
+
+    /// Record that text was written straight after an element's opening tag.
+    #[inline]
+    pub fn text(&mut self) {
+        self.inline = true;
+    }
+
+    /// Return to the enclosing element and start the line for its closing tag, unless the
+    /// element only held text, in which case the closing tag stays on the same line.
+    #[inline]
+    pub fn close<W: Write + ?Sized>(&mut self, out: &mut W) -> io::Result<()> {
+        self.pop();
+        if self.inline {
+            self.inline = false;
+            return Ok(());
+        }
+        self.line(out)
+    }
+
+    /// Terminate the last line of pretty output.
+    pub fn finish<W: Write + ?Sized>(&mut self, out: &mut W) -> io::Result<()> {
+        if self.width.is_some() {
+            out.write_all(b"\n")?;
+        }
+        Ok(())
+    }
+}
+
+/// A conversion limit exceeded while rendering.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum LimitExceeded {
+    Depth,
+    Items,
+    OutputBytes,
+}
+
+impl LimitExceeded {
+    /// Error message shared with the Python serializer.
+    pub fn message(self) -> &'static str {
+        match self {
+            Self::Depth => "JSON nesting depth limit exceeded",
+            Self::Items => "JSON item limit exceeded",
+            Self::OutputBytes => "XML output size limit exceeded",
+        }
+    }
+}
+
+/// Per-render depth and item counters, matching the Python serializer's `_ConversionBudget`.
+///
+/// Children are charged when their container opens, so an oversized container fails before
+/// any of its members are rendered.
+#[derive(Debug)]
+pub struct Budget {
+    max_depth: usize,
+    max_items: usize,
+    depth: usize,
+    items: usize,
+}
+
+impl Budget {
+    /// Budget with optional limits; `None` leaves that counter unbounded.
+    pub fn new(max_depth: Option<usize>, max_items: Option<usize>) -> Self {
+        Self {
+            max_depth: max_depth.unwrap_or(usize::MAX),
+            max_items: max_items.unwrap_or(usize::MAX),
+            depth: 0,
+            items: 1,
+        }
+    }
+
+    /// Charge a container holding `size` children.
+    #[inline]
+    pub fn enter(&mut self, size: usize) -> Result<(), LimitExceeded> {
+        self.depth += 1;
+        self.items = self.items.saturating_add(size);
+        if self.items > self.max_items {
+            return Err(LimitExceeded::Items);
+        }
+        if size > 0 && self.depth > self.max_depth {
+            return Err(LimitExceeded::Depth);
+        }
+        Ok(())
+    }
+
+    /// Leave the most recently entered container.
+    #[inline]
+    pub fn leave(&mut self) {
+        self.depth -= 1;
+    }
+
+    /// Values charged so far, counting the document itself.
+    pub fn items(&self) -> usize {
+        self.items
     }
+}
+
+/// Writer that fails once more than `max` bytes have been written through it.
+///
+/// The failure is also remembered, so callers can tell a limit error apart from other I/O
+/// errors after it has been converted on its way up.
+#[derive(Debug)]
+pub struct LimitedWriter<W> {
+    inner: W,
+    written: usize,
+    max: usize,
+    exceeded: bool,
+}
 
-    let mut chars = key.chars();
+impl<W: Write> LimitedWriter<W> {
+    /// Wrap `inner`; `None` disables the limit.
+    pub fn new(inner: W, max: Option<usize>) -> Self {
+        Self { inner, written: 0, max: max.unwrap_or(usize::MAX), exceeded: false }
+    }
 
-    // First character must be letter or underscore
-    match chars.next() {
-        Some(c) if c.is_alphabetic() || c == '_' => {}
-        _ => return false,
+    /// Whether a write was rejected by the limit.
+    pub fn exceeded(&self) -> bool {
+        self.exceeded
     }
+}
 
-    // Remaining characters can be letters, digits, hyphens, underscores, or periods
-    for c in chars {
-        if !(c.is_alphanumeric() || c == '-' || c == '_' || c == '.' || c == ':') {
-            return false;
+impl<W: Write> Write for LimitedWriter<W> {
+    #[inline]
+    fn write(&mut self, buf: &[u8]) -> io::Result<usize> {
+        self.written = self.written.saturating_add(buf.len());
+        if self.written > self.max {
+            self.exceeded = true;
+            return Err(io::Error::other(LimitExceeded::OutputBytes.message()));
         }
+        self.inner.write_all(buf)?;
+        Ok(buf.len())
+    }
+
+    fn flush(&mut self) -> io::Result<()> {
+        self.inner.flush()
+    }
+}
+
+/// Non-ASCII name start characters of XML 1.0 (Fourth Edition) Appendix B, limited to the Basic
+/// Multilingual Plane like expat, whose answers the Python serializer's validators reproduce.
+const NAME_START_RANGES: &[(char, char)] = &[
+    ('\u{C0}', '\u{D6}'), ('\u{D8}', '\u{F6}'), ('\u{F8}', '\u{131}'), ('\u{134}', '\u{13E}'),
+    ('\u{141}', '\u{148}'), ('\u{14A}', '\u{17E}'), ('\u{180}', '\u{1C3}'), ('\u{1CD}', '\u{1F0}'),
+    ('\u{1F4}', '\u{1F5}'), ('\u{1FA}', '\u{217}'), ('\u{250}', '\u{2A8}'), ('\u{2BB}', '\u{2C1}'),
+    ('\u{386}', '\u{386}'), ('\u{388}', '\u{38A}'), ('\u{38C}', '\u{38C}'), ('\u{38E}', '\u{3A1}'),
+    ('\u{3A3}', '\u{3CE}'), ('\u{3D0}', '\u{3D6}'), ('\u{3DA}', '\u{3DA}'), ('\u{3DC}', '\u{3DC}'),
+    ('\u{3DE}', '\u{3DE}'), ('\u{3E0}', '\u{3E0}'), ('\u{3E2}', '\u{3F3}'), ('\u{401}', '\u{40C}'),
+    ('\u{40E}', '\u{44F}'), ('\u{451}', '\u{45C}'), ('\u{45E}', '\u{481}'), ('\u{490}', '\u{4C4}'),
+    ('\u{4C7}', '\u{4C8}'), ('\u{4CB}', '\u{4CC}'), ('\u{4D0}', '\u{4EB}'), ('\u{4EE}', '\u{4F5}'),
+    ('\u{4F8}', '\u{4F9}'), ('\u{531}', '\u{556}'), ('\u{559}', '\u{559}'), ('\u{561}', '\u{586}'),
+    ('\u{5D0}', '\u{5EA}'), ('\u{5F0}', '\u{5F2}'), ('\u{621}', '\u{63A}'), ('\u{641}', '\u{64A}'),
+    ('\u{671}', '\u{6B7}'), ('\u{6BA}', '\u{6BE}'), ('\u{6C0}', '\u{6CE}'), ('\u{6D0}', '\u{6D3}'),
+    ('\u{6D5}', '\u{6D5}'), ('\u{6E5}', '\u{6E6}'), ('\u{905}', '\u{939}'), ('\u{93D}', '\u{93D}'),
+    ('\u{958}', '\u{961}'), ('\u{985}', '\u{98C}'), ('\u{98F}', '\u{990}'), ('\u{993}', '\u{9A8}'),
+    ('\u{9AA}', '\u{9B0}'), ('\u{9B2}', '\u{9B2}'), ('\u{9B6}', '\u{9B9}'), ('\u{9DC}', '\u{9DD}'),
+    ('\u{9DF}', '\u{9E1}'), ('\u{9F0}', '\u{9F1}'), ('\u{A05}', '\u{A0A}'), ('\u{A0F}', '\u{A10}'),
+    ('\u{A13}', '\u{A28}'), ('\u{A2A}', '\u{A30}'), ('\u{A32}', '\u{A33}'), ('\u{A35}', '\u{A36}'),
+    ('\u{A38}', '\u{A39}'), ('\u{A59}', '\u{A5C}'), ('\u{A5E}', '\u{A5E}'), ('\u{A72}', '\u{A74}'),
+    ('\u{A85}', '\u{A8B}'), ('\u{A8D}', '\u{A8D}'), ('\u{A8F}', '\u{A91}'), ('\u{A93}', '\u{AA8}'),
+    ('\u{AAA}', '\u{AB0}'), ('\u{AB2}', '\u{AB3}'), ('\u{AB5}', '\u{AB9}'), ('\u{ABD}', '\u{ABD}'),
+    ('\u{AE0}', '\u{AE0}'), ('\u{B05}', '\u{B0C}'), ('\u{B0F}', '\u{B10}'), ('\u{B13}', '\u{B28}'),
+    ('\u{B2A}', '\u{B30}'), ('\u{B32}', '\u{B33}'), ('\u{B36}', '\u{B39}'), ('\u{B3D}', '\u{B3D}'),
+    ('\u{B5C}', '\u{B5D}'), ('\u{B5F}', '\u{B61}'), ('\u{B85}', '\u{B8A}'), ('\u{B8E}', '\u{B90}'),
+    ('\u{B92}', '\u{B95}'), ('\u{B99}', '\u{B9A}'), ('\u{B9C}', '\u{B9C}'), ('\u{B9E}', '\u{B9F}'),
+    ('\u{BA3}', '\u{BA4}'), ('\u{BA8}', '\u{BAA}'), ('\u{BAE}', '\u{BB5}'), ('\u{BB7}', '\u{BB9}'),
+    ('\u{C05}', '\u{C0C}'), ('\u{C0E}', '\u{C10}'), ('\u{C12}', '\u{C28}'), ('\u{C2A}', '\u{C33}'),
+    ('\u{C35}', '\u{C39}'), ('\u{C60}', '\u{C61}'), ('\u{C85}', '\u{C8C}'), ('\u{C8E}', '\u{C90}'),
+    ('\u{C92}', '\u{CA8}'), ('\u{CAA}', '\u{CB3}'), ('\u{CB5}', '\u{CB9}'), ('\u{CDE}', '\u{CDE}'),
+    ('\u{CE0}', '\u{CE1}'), ('\u{D05}', '\u{D0C}'), ('\u{D0E}', '\u{D10}'), ('\u{D12}', '\u{D28}'),
+    ('\u{D2A}', '\u{D39}'), ('\u{D60}', '\u{D61}'), ('\u{E01}', '\u{E2E}'), ('\u{E30}', '\u{E30}'),
+    ('\u{E32}', '\u{E33}'), ('\u{E40}', '\u{E45}'), ('\u{E81}', '\u{E82}'), ('\u{E84}', '\u{E84}'),
+    ('\u{E87}', '\u{E88}'), ('\u{E8A}', '\u{E8A}'), ('\u{E8D}', '\u{E8D}'), ('\u{E94}', '\u{E97}'),
+    ('\u{E99}', '\u{E9F}'), ('\u{EA1}', '\u{EA3}'), ('\u{EA5}', '\u{EA5}'), ('\u{EA7}', '\u{EA7}'),
+    ('\u{EAA}', '\u{EAB}'), ('\u{EAD}', '\u{EAE}'), ('\u{EB0}', '\u{EB0}'), ('\u{EB2}', '\u{EB3}'),
+    ('\u{EBD}', '\u{EBD}'), ('\u{EC0}', '\u{EC4}'), ('\u{F40}', '\u{F47}'), ('\u{F49}', '\u{F69}'),
+    ('\u{10A0}', '\u{10C5}'), ('\u{10D0}', '\u{10F6}'), ('\u{1100}', '\u{1100}'),
+    ('\u{1102}', '\u{1103}'), ('\u{1105}', '\u{1107}'), ('\u{1109}', '\u{1109}'),
+    ('\u{110B}', '\u{110C}'), ('\u{110E}', '\u{1112}'), ('\u{113C}', '\u{113C}'),
+    ('\u{113E}', '\u{113E}'), ('\u{1140}', '\u{1140}'), ('\u{114C}', '\u{114C}'),
+    ('\u{114E}', '\u{114E}'), ('\u{1150}', '\u{1150}'), ('\u{1154}', '\u{1155}'),
+    ('\u{1159}', '\u{1159}'), ('\u{115F}', '\u{1161}'), ('\u{1163}', '\u{1163}'),
+    ('\u{1165}', '\u{1165}'), ('\u{1167}', '\u{1167}'), ('\u{1169}', '\u{1169}'),
+    ('\u{116D}', '\u{116E}'), ('\u{1172}', '\u{1173}'), ('\u{1175}', '\u{1175}'),
+    ('\u{119E}', '\u{119E}'), ('\u{11A8}', '\u{11A8}'), ('\u{11AB}', '\u{11AB}'),
+    ('\u{11AE}', '\u{11AF}'), ('\u{11B7}', '\u{11B8}'), ('\u{11BA}', '\u{11BA}'),
+    ('\u{11BC}', '\u{11C2}'), ('\u{11EB}', '\u{11EB}'), ('\u{11F0}', '\u{11F0}'),
+    ('\u{11F9}', '\u{11F9}'), ('\u{1E00}', '\u{1E9B}'), ('\u{1EA0}', '\u{1EF9}'),
+    ('\u{1F00}', '\u{1F15}'), ('\u{1F18}', '\u{1F1D}'), ('\u{1F20}', '\u{1F45}'),
+    ('\u{1F48}', '\u{1F4D}'), ('\u{1F50}', '\u{1F57}'), ('\u{1F59}', '\u{1F59}'),
+    ('\u{1F5B}', '\u{1F5B}'), ('\u{1F5D}', '\u{1F5D}'), ('\u{1F5F}', '\u{1F7D}'),
+    ('\u{1F80}', '\u{1FB4}'), ('\u{1FB6}', '\u{1FBC}'), ('\u{1FBE}', '\u{1FBE}'),
+    ('\u{1FC2}', '\u{1FC4}'), ('\u{1FC6}', '\u{1FCC}'), ('\u{1FD0}', '\u{1FD3}'),
+    ('\u{1FD6}', '\u{1FDB}'), ('\u{1FE0}', '\u{1FEC}'), ('\u{1FF2}', '\u{1FF4}'),
+    ('\u{1FF6}', '\u{1FFC}'), ('\u{2126}', '\u{2126}'), ('\u{212A}', '\u{212B}'),
+    ('\u{212E}', '\u{212E}'), ('\u{2180}', '\u{2182}'), ('\u{3007}', '\u{3007}'),
+    ('\u{3021}', '\u{3029}'), ('\u{3041}', '\u{3094}'), ('\u{30A1}', '\u{30FA}'),
+    ('\u{3105}', '\u{312C}'), ('\u{4E00}', '\u{9FA5}'), ('\u{AC00}', '\u{D7A3}'),
+];
+
+/// Non-ASCII characters that may follow the first one in a name, besides the start characters.
+const NAME_EXTRA_RANGES: &[(char, char)] = &[
+    ('\u{B7}', '\u{B7}'), ('\u{2D0}', '\u{2D1}'), ('\u{300}', '\u{345}'), ('\u{360}', '\u{361}'),
+    ('\u{387}', '\u{387}'), ('\u{483}', '\u{486}'), ('\u{591}', '\u{5A1}'), ('\u{5A3}', '\u{5B9}'),
+    ('\u{5BB}', '\u{5BD}'), ('\u{5BF}', '\u{5BF}'), ('\u{5C1}', '\u{5C2}'), ('\u{5C4}', '\u{5C4}'),
+    ('\u{640}', '\u{640}'), ('\u{64B}', '\u{652}'), ('\u{660}', '\u{669}'), ('\u{670}', '\u{670}'),
+    ('\u{6D6}', '\u{6E4}'), ('\u{6E7}', '\u{6E8}'), ('\u{6EA}', '\u{6ED}'), ('\u{6F0}', '\u{6F9}'),
+    ('\u{901}', '\u{903}'), ('\u{93C}', '\u{93C}'), ('\u{93E}', '\u{94D}'), ('\u{951}', '\u{954}'),
+    ('\u{962}', '\u{963}'), ('\u{966}', '\u{96F}'), ('\u{981}', '\u{983}'), ('\u{9BC}', '\u{9BC}'),
+    ('\u{9BE}', '\u{9C4}'), ('\u{9C7}', '\u{9C8}'), ('\u{9CB}', '\u{9CD}'), ('\u{9D7}', '\u{9D7}'),
+    ('\u{9E2}', '\u{9E3}'), ('\u{9E6}', '\u{9EF}'), ('\u{A02}', '\u{A02}'), ('\u{A3C}', '\u{A3C}'),
+    ('\u{A3E}', '\u{A42}'), ('\u{A47}', '\u{A48}'), ('\u{A4B}', '\u{A4D}'), ('\u{A66}', '\u{A71}'),
+    ('\u{A81}', '\u{A83}'), ('\u{ABC}', '\u{ABC}'), ('\u{ABE}', '\u{AC5}'), ('\u{AC7}', '\u{AC9}'),
+    ('\u{ACB}', '\u{ACD}'), ('\u{AE6}', '\u{AEF}'), ('\u{B01}', '\u{B03}'), ('\u{B3C}', '\u{B3C}'),
+    ('\u{B3E}', '\u{B43}'), ('\u{B47}', '\u{B48}'), ('\u{B4B}', '\u{B4D}'), ('\u{B56}', '\u{B57}'),
+    ('\u{B66}', '\u{B6F}'), ('\u{B82}', '\u{B83}'), ('\u{BBE}', '\u{BC2}'), ('\u{BC6}', '\u{BC8}'),
+    ('\u{BCA}', '\u{BCD}'), ('\u{BD7}', '\u{BD7}'), ('\u{BE7}', '\u{BEF}'), ('\u{C01}', '\u{C03}'),
+    ('\u{C3E}', '\u{C44}'), ('\u{C46}', '\u{C48}'), ('\u{C4A}', '\u{C4D}'), ('\u{C55}', '\u{C56}'),
+    ('\u{C66}', '\u{C6F}'), ('\u{C82}', '\u{C83}'), ('\u{CBE}', '\u{CC4}'), ('\u{CC6}', '\u{CC8}'),
+    ('\u{CCA}', '\u{CCD}'), ('\u{CD5}', '\u{CD6}'), ('\u{CE6}', '\u{CEF}'), ('\u{D02}', '\u{D03}'),
+    ('\u{D3E}', '\u{D43}'), ('\u{D46}', '\u{D48}'), ('\u{D4A}', '\u{D4D}'), ('\u{D57}', '\u{D57}'),
+    ('\u{D66}', '\u{D6F}'), ('\u{E31}', '\u{E31}'), ('\u{E34}', '\u{E3A}'), ('\u{E46}', '\u{E4E}'),
+    ('\u{E50}', '\u{E59}'), ('\u{EB1}', '\u{EB1}'), ('\u{EB4}', '\u{EB9}'), ('\u{EBB}', '\u{EBC}'),
+    ('\u{EC6}', '\u{EC6}'), ('\u{EC8}', '\u{ECD}'), ('\u{ED0}', '\u{ED9}'), ('\u{F18}', '\u{F19}'),
+    ('\u{F20}', '\u{F29}'), ('\u{F35}', '\u{F35}'), ('\u{F37}', '\u{F37}'), ('\u{F39}', '\u{F39}'),
+    ('\u{F3E}', '\u{F3F}'), ('\u{F71}', '\u{F84}'), ('\u{F86}', '\u{F8B}'), ('\u{F90}', '\u{F95}'),
+    ('\u{F97}', '\u{F97}'), ('\u{F99}', '\u{FAD}'), ('\u{FB1}', '\u{FB7}'), ('\u{FB9}', '\u{FB9}'),
+    ('\u{20D0}', '\u{20DC}'), ('\u{20E1}', '\u{20E1}'), ('\u{3005}', '\u{3005}'),
+    ('\u{302A}', '\u{302F}'), ('\u{3031}', '\u{3035}'), ('\u{3099}', '\u{309A}'),
+    ('\u{309D}', '\u{309E}'), ('\u{30FC}', '\u{30FE}'),
+];
+
+/// Return true when `c` lies in one of the sorted, disjoint `ranges`.
+fn in_ranges(c: char, ranges: &[(char, char)]) -> bool {
+    ranges
+        .binary_search_by(|&(lo, hi)| {
+            if hi < c {
+                Ordering::Less
+            } else if lo > c {
+                Ordering::Greater
+            } else {
+                Ordering::Equal
+            }
+        })
+        .is_ok()
+}
+
+/// Check if a character may start an XML name without a namespace prefix.
+pub fn is_name_start_char(c: char) -> bool {
+    if c.is_ascii() {
+        c.is_ascii_alphabetic() || c == '_'
+    } else {
+        in_ranges(c, NAME_START_RANGES)
+    }
+}
+
+/// Check if a character may follow the first one in an XML name without a namespace prefix.
+pub fn is_name_char(c: char) -> bool {
+    if c.is_ascii() {
+        c.is_ascii_alphanumeric() || matches!(c, '-' | '_' | '.')
+    } else {
+        in_ranges(c, NAME_START_RANGES) || in_ranges(c, NAME_EXTRA_RANGES)
+    }
+}
+
+/// Check if a key is a valid XML element name, like the Python `key_is_valid_xml`.
+///
+/// Colons are rejected; `make_valid_xml_name` decides whether a prefixed key is kept.
+pub fn is_valid_xml_name(key: &str) -> bool {
+    is_ncname(key)
+}
+
+/// Check for an element name pretty output accepts: an NCName, optionally prefixed by one.
+pub fn is_valid_tag_name(name: &str) -> bool {
+    match name.split_once(':') {
+        None => is_ncname(name),
+        Some((prefix, local)) => is_ncname(prefix) && is_ncname(local),
     }
+}
 
-    // Names starting with "xml" (case-insensitive) are reserved
-    if key.len() >= 3 && key.as_bytes()[..3].eq_ignore_ascii_case(b"xml") {
-        return false;
+/// Check if a key can be written as an XML attribute name.
+///
+/// Matches the namespace-aware parser the Python serializer validates with: an NCName, or an
+/// `xml:` or `xmlns:` prefixed NCName. Other prefixes are unbound and `xmlns` may not rebind
+/// `xml` or `xmlns`.
+pub fn is_valid_xml_attr_name(key: &str) -> bool {
+    match key.split_once(':') {
+        None => is_ncname(key),
+        Some((prefix, local)) => {
+            is_ncname(local)
+                && match prefix {
+                    "xml" => true,
+                    "xmlns" => local != "xml" && local != "xmlns",
+                    _ => false,
+                }
+        }
     }
+}
 
-    true
+/// Check for a name without colons.
+fn is_ncname(name: &str) -> bool {
+    let mut chars = name.chars();
+    chars.next().is_some_and(is_name_start_char) && chars.all(is_name_char)
 }
 
 /// Make a valid XML name from a key, returning the tag name and the raw
@@ -273,10 +1035,127 @@ pub fn make_valid_xml_name<'a>(
         return (Cow::Owned(with_underscores), None);
     }
 
+    // Keep a prefixed name whose parts form a valid name
+    if key.contains(':') && is_valid_xml_name(&key.replace(':', "")) {
+        return (Cow::Borrowed(key), None);
+    }
+
     // Fall back to using "key" with name attribute (raw value, escaped later)
     (Cow::Borrowed("key"), Some(("name", Cow::Borrowed(key))))
 }
 
+/// Check a namespace prefix the way the Python `_NamespaceFormatter` does: an NCName that does
+/// not start with the reserved `xml` letters in any case.
+pub fn is_valid_namespace_prefix(prefix: &str) -> bool {
+    is_ncname(prefix) && !(prefix.len() >= 3 && prefix.as_bytes()[..3].eq_ignore_ascii_case(b"xml"))
+}
+
+/// Turn an item name chosen for a list into its element name and optional `name` attribute,
+/// dropping a `@flat` suffix first like the Python `_append_convert_list`.
+pub fn item_element_name(item_name: &str) -> (String, Option<String>) {
+    let item_name = item_name.strip_suffix("@flat").unwrap_or(item_name);
+    let (tag, name_attr) = make_valid_xml_name(item_name);
+    (tag.into_owned(), name_attr.map(|(_, name)| name.into_owned()))
+}
+
+/// Ways of generating element `id` attributes, the Python `ID_STRATEGIES`.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum IdStrategy {
+    Random,
+    Counter,
+    Path,
+    Seeded,
+}
+
+impl IdStrategy {
+    /// Parse a strategy name, or return `None` for names the Python serializer rejects.
+    pub fn parse(name: &str) -> Option<Self> {
+        match name {
+            "random" => Some(Self::Random),
+            "counter" => Some(Self::Counter),
+            "path" => Some(Self::Path),
+            "seeded" => Some(Self::Seeded),
+            _ => None,
+        }
+    }
+}
+
+/// The `id` attributes of one document, like the Python `_IdGenerator`.
+///
+/// `Path` percent-encodes `%` and `_` in keys so a key cannot spell another member's ID.
+/// `Seeded` and `Random` draw six-digit suffixes from a SplitMix64 stream; `Random` seeds it
+/// from the standard library's per-process hash keys instead of calling the OS per ID.
+pub struct IdGenerator {
+    strategy: IdStrategy,
+    count: u64,
+    state: u64,
+}
+
+impl IdGenerator {
+    pub fn new(strategy: IdStrategy, seed: u64) -> Self {
+        let state = match strategy {
+            IdStrategy::Random => RandomState::new().hash_one(seed),
+            _ => seed,
+        };
+        Self { strategy, count: 0, state }
+    }
+
+    /// Return the ID of a dict member named `key`, or the base ID of a list's members.
+    pub fn next_id(&mut self, parent: &str, key: Option<&str>) -> String {
+        match (self.strategy, key) {
+            (IdStrategy::Counter, _) => {
+                self.count += 1;
+                format!("{parent}_{}", self.count)
+            }
+            (IdStrategy::Path, Some(key)) => {
+                format!("{parent}_{}", key.replace('%', "%25").replace('_', "%5F"))
+            }
+            (IdStrategy::Path, None) => parent.to_owned(),
+            (IdStrategy::Random | IdStrategy::Seeded, _) => {
+                format!("{parent}_{}", 100_000 + self.splitmix64() % 900_000)
+            }
+        }
+    }
+
+    fn splitmix64(&mut self) -> u64 {
+        self.state = self.state.wrapping_add(0x9E37_79B9_7F4A_7C15);
+        let mut value = self.state;
+        value = (value ^ (value >> 30)).wrapping_mul(0xBF58_476D_1CE4_E5B9);
+        value = (value ^ (value >> 27)).wrapping_mul(0x94D0_49BB_1331_11EB);
+        value ^ (value >> 31)
+    }
+}
+
+/// Hasher for object addresses, which are unique but share their low alignment bits.
+#[derive(Default)]
+pub struct AddressHasher(u64);
+
+impl Hasher for AddressHasher {
+    fn finish(&self) -> u64 {
+        self.0
+    }
+
+    fn write(&mut self, bytes: &[u8]) {
+        for &byte in bytes {
+            self.write_u8(byte);
+        }
+    }
+
+    fn write_u8(&mut self, byte: u8) {
+        self.write_u64(self.0.rotate_left(8) ^ u64::from(byte));
+    }
+
+    fn write_u64(&mut self, value: u64) {
+        // Fold the high half of the full product into the low bits, which pick the bucket.
+        let product = u128::from(value) * 0x9E37_79B9_7F4A_7C15;
+        self.0 = (product as u64) ^ ((product >> 64) as u64);
+    }
+
+    fn write_usize(&mut self, value: usize) {
+        self.write_u64(value as u64);
+    }
+}
+
 /// Build an attribute string from key-value pairs (allocating convenience wrapper).
 pub fn make_attr_string(attrs: &[(String, String)]) -> String {
     let mut out = String::new();
@@ -296,18 +1175,38 @@ fn push_attrs(out: &mut String, attrs: &[(String, String)]) {
     }
 }
 
-/// Write opening tag with optional name and type attributes directly to buffer.
+/// Generated `id` and `name` attributes of an element, written before its `type`.
+#[cfg(feature = "python")]
+#[derive(Clone, Copy, Default)]
+struct KeyAttrs<'a> {
+    id: Option<&'a str>,
+    name: Option<&'a str>,
+}
+
+#[cfg(feature = "python")]
+impl KeyAttrs<'_> {
+    fn is_empty(&self) -> bool {
+        self.id.is_none() && self.name.is_none()
+    }
+}
+
+/// Write opening tag with optional id, name and type attributes directly to buffer.
 #[cfg(feature = "python")]
 #[inline]
 fn write_open_tag<W: Write + ?Sized>(
     out: &mut W,
     tag: &str,
-    name_attr: Option<&str>,
+    key_attrs: KeyAttrs<'_>,
     type_attr: Option<&str>,
 ) -> PyResult<()> {
     write_byte(out, b'<')?;
     write_str(out, tag)?;
-    if let Some(name) = name_attr {
+    if let Some(id) = key_attrs.id {
+        write_str(out, " id=\"")?;
+        write_escaped_attr(out, id)?;
+        write_byte(out, b'"')?;
+    }
+    if let Some(name) = key_attrs.name {
         write_str(out, " name=\"")?;
         write_escaped_attr(out, name)?;
         write_byte(out, b'"')?;
@@ -329,178 +1228,601 @@ fn write_close_tag<W: Write + ?Sized>(out: &mut W, tag: &str) -> PyResult<()> {
     write_byte(out, b'>')
 }
 
-/// Configuration for XML conversion
+/// Hand an element name pretty output cannot place to the Python serializer, which reports
+/// the malformed document.
 #[cfg(feature = "python")]
-#[derive(Copy, Clone)]
-struct ConvertConfig {
-    attr_type: bool,
-    cdata: bool,
-    item_wrap: bool,
-    list_headers: bool,
+#[inline]
+fn check_tag(layout: &Layout, tag: &str) -> PyResult<()> {
+    if layout.accepts(tag) {
+        Ok(())
+    } else {
+        Err(FallbackRequired::new_err("element name needs the Python serializer"))
+    }
 }
 
-#[cfg(feature = "python")]
-use pyo3::PyResult;
-
-/// Return `Some(type_name)` when `attr_type` is enabled.
+/// Write a complete element on its own line.
+///
+/// Pretty output splits an element with `empty` content over two lines, as the Python
+/// serializer does.
 #[cfg(feature = "python")]
 #[inline]
-fn type_attr<'a>(cfg: &ConvertConfig, ty: &'a str) -> Option<&'a str> {
-    if cfg.attr_type { Some(ty) } else { None }
+fn write_leaf<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    tag: &str,
+    key_attrs: KeyAttrs<'_>,
+    type_attr: Option<&str>,
+    empty: bool,
+    content: impl FnOnce(&mut W) -> PyResult<()>,
+) -> PyResult<()> {
+    check_tag(layout, tag)?;
+    layout.line(out)?;
+    write_open_tag(out, tag, key_attrs, type_attr)?;
+    content(out)?;
+    if empty {
+        layout.line(out)?;
+    }
+    write_close_tag(out, tag)
 }
 
-/// Single unified type-dispatch writer. Every Python value goes through here
-/// exactly once, writing directly into the shared output buffer.
+/// Write the opening tag of an element whose children follow on deeper lines.
 #[cfg(feature = "python")]
-fn write_value<W: Write + ?Sized>(
-    py: Python<'_>,
+#[inline]
+fn write_container_open<W: Write + ?Sized>(
     out: &mut W,
-    obj: &Bound<'_, PyAny>,
+    layout: &mut Layout,
     tag: &str,
-    name_attr: Option<&str>,
-    cfg: &ConvertConfig,
-    wrap_container: bool,
+    key_attrs: KeyAttrs<'_>,
+    type_attr: Option<&str>,
 ) -> PyResult<()> {
-    // None
-    if obj.is_none() {
-        write_open_tag(out, tag, name_attr, type_attr(cfg, "null"))?;
-        write_close_tag(out, tag)?;
-        return Ok(());
+    check_tag(layout, tag)?;
+    layout.line(out)?;
+    write_open_tag(out, tag, key_attrs, type_attr)?;
+    layout.push();
+    Ok(())
+}
+
+/// Write the closing tag matching `write_container_open`.
+#[cfg(feature = "python")]
+#[inline]
+fn write_container_close<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    tag: &str,
+) -> PyResult<()> {
+    layout.close(out)?;
+    write_close_tag(out, tag)
+}
+
+#[cfg(feature = "python")]
+create_exception!(
+    json2xml_rs,
+    ConversionLimitError,
+    PyValueError,
+    "Raised when a conversion exceeds max_depth, max_items or max_output_bytes."
+);
+
+#[cfg(feature = "python")]
+impl From<LimitExceeded> for PyErr {
+    fn from(limit: LimitExceeded) -> Self {
+        ConversionLimitError::new_err(limit.message())
+    }
+}
+
+#[cfg(feature = "python")]
+create_exception!(
+    json2xml_rs,
+    FallbackRequired,
+    PyException,
+    "Raised when the data, or a pretty element name, needs the Python serializer."
+);
+
+/// Options that decide the shape of the written XML, shared by the live and snapshot writers.
+#[cfg(feature = "python")]
+#[derive(Clone, Copy)]
+struct Shape {
+    attr_type: bool,
+    cdata: bool,
+    item_wrap: bool,
+    list_headers: bool,
+}
+
+#[cfg(feature = "python")]
+impl Shape {
+    /// Return `Some(type_name)` when `attr_type` is enabled.
+    #[inline]
+    fn type_attr(self, ty: &str) -> Option<&str> {
+        if self.attr_type { Some(ty) } else { None }
+    }
+
+    /// Whether a list is written without its own element, like the Python
+    /// `_append_list2xml_str`.
+    #[inline]
+    fn drops_list_element(self, flat: bool, first_is_scalar: bool) -> bool {
+        flat || (first_is_scalar && !self.item_wrap) || self.list_headers
+    }
+}
+
+/// Configuration for XML conversion
+#[cfg(feature = "python")]
+struct ConvertConfig<'py> {
+    shape: Shape,
+    strict: bool,
+    item_names: ItemNames<'py>,
+    key_names: KeyNames,
+}
+
+/// Element name of a dict key, after dropping a `@flat` suffix.
+#[cfg(feature = "python")]
+#[derive(Default)]
+struct KeyName {
+    tag: String,
+    name_attr: Option<String>,
+    flat: bool,
+}
+
+#[cfg(feature = "python")]
+impl KeyName {
+    /// Name the element of `key`; only string keys have a `@flat` suffix.
+    fn new(key: &str, is_str: bool) -> Self {
+        let flat = is_str && key.ends_with("@flat");
+        let key = if flat { &key[..key.len() - "@flat".len()] } else { key };
+        let (tag, name_attr) = make_valid_xml_name(key);
+        let name_attr = name_attr.map(|(_, name)| name.into_owned());
+        Self { tag: tag.into_owned(), name_attr, flat }
+    }
+}
+
+/// Most distinct keys whose element names one document caches.
+#[cfg(feature = "python")]
+const KEY_NAME_CACHE_SIZE: usize = 4096;
+
+/// Element names of dict keys, cached for one document by key object.
+///
+/// `json.loads` gives equal keys of a document the same str object, so record-shaped data
+/// validates each distinct key once and then costs one lookup by address. The cache holds a
+/// reference to every key it stores, so no other string can take over a cached address while
+/// the document renders.
+#[cfg(feature = "python")]
+#[derive(Default)]
+struct KeyNames {
+    cache: RefCell<HashMap<usize, (Py<PyString>, Arc<KeyName>), BuildHasherDefault<AddressHasher>>>,
+}
+
+#[cfg(feature = "python")]
+impl KeyNames {
+    /// Return the element name of `key`, whose `str()` is `text`.
+    fn get(&self, key: &Bound<'_, PyAny>, text: &Bound<'_, PyString>) -> PyResult<Arc<KeyName>> {
+        // Only exact strings are their own `str()`; other keys get a new string every time.
+        let cacheable = key.is_exact_instance_of::<PyString>();
+        let address = key.as_ptr() as usize;
+        if cacheable {
+            if let Some((_, name)) = self.cache.borrow().get(&address) {
+                return Ok(Arc::clone(name));
+            }
+        }
+        let name = Arc::new(KeyName::new(text.to_str()?, key.is_instance_of::<PyString>()));
+        let mut cache = self.cache.borrow_mut();
+        if cacheable && cache.len() < KEY_NAME_CACHE_SIZE {
+            cache.insert(address, (text.clone().unbind(), Arc::clone(&name)));
+        }
+        Ok(name)
+    }
+}
+
+/// Element name and optional `name` attribute of the members of one list.
+#[cfg(feature = "python")]
+struct ItemName {
+    tag: String,
+    name_attr: Option<String>,
+}
+
+/// Item names for list members, the Rust side of the Python `item_func`.
+///
+/// The source is either a dict mapping parent tags to item names, with `item` for parents it
+/// does not list, or a callable taking the parent tag. Each distinct parent is looked up or
+/// called once per document and the validated element name is cached.
+#[cfg(feature = "python")]
+struct ItemNames<'py> {
+    source: Option<Bound<'py, PyAny>>,
+    cache: RefCell<HashMap<String, Arc<ItemName>>>,
+    default: Arc<ItemName>,
+}
+
+#[cfg(feature = "python")]
+impl<'py> ItemNames<'py> {
+    fn new(source: Option<Bound<'py, PyAny>>) -> Self {
+        Self {
+            source,
+            cache: RefCell::new(HashMap::new()),
+            default: Arc::new(ItemName { tag: "item".to_owned(), name_attr: None }),
+        }
+    }
+
+    /// Return the item name for the members of a list written under `parent`.
+    fn get(&self, parent: &str) -> PyResult<Arc<ItemName>> {
+        let Some(source) = &self.source else {
+            return Ok(Arc::clone(&self.default));
+        };
+        let cached = self.cache.borrow().get(parent).cloned();
+        if let Some(name) = cached {
+            return Ok(name);
+        }
+        let item_name: String = match source.cast::<PyDict>() {
+            Ok(table) => match table.get_item(parent)? {
+                Some(name) => name.extract()?,
+                None => return Ok(Arc::clone(&self.default)),
+            },
+            Err(_) => source.call1((parent,))?.extract()?,
+        };
+        let (tag, name_attr) = item_element_name(&item_name);
+        let name = Arc::new(ItemName { tag, name_attr });
+        self.cache.borrow_mut().insert(parent.to_owned(), Arc::clone(&name));
+        Ok(name)
+    }
+}
+
+#[cfg(feature = "python")]
+use pyo3::PyResult;
+
+/// Return true for the JSON-shaped values the writers render natively: `None`, exact
+/// booleans, integers, floats, strings, lists and tuples, and dicts.
+#[cfg(feature = "python")]
+#[inline]
+fn is_native_value(obj: &Bound<'_, PyAny>) -> bool {
+    obj.is_none()
+        || obj.is_exact_instance_of::<PyString>()
+        || obj.is_exact_instance_of::<PyInt>()
+        || obj.is_exact_instance_of::<PyFloat>()
+        || obj.is_exact_instance_of::<PyBool>()
+        || obj.is_exact_instance_of::<PyList>()
+        || obj.is_exact_instance_of::<PyTuple>()
+        || obj.is_instance_of::<PyDict>()
+}
+
+/// Single type-dispatch writer for scalar elements, like the Python `convert_kv`,
+/// `convert_bool` and `convert_none` helpers. Containers that reach it (tuples and other
+/// iterables) are written as list elements.
+///
+/// In strict mode any other value (dates, decimals, sets, subclasses of the scalar types)
+/// aborts the render with `FallbackRequired` instead of being approximated.
+#[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
+fn write_value<W: Write + ?Sized>(
+    py: Python<'_>,
+    out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
+    obj: &Bound<'_, PyAny>,
+    tag: &str,
+    key_attrs: KeyAttrs<'_>,
+    cfg: &ConvertConfig,
+) -> PyResult<()> {
+    if cfg.strict && !is_native_value(obj) {
+        return Err(FallbackRequired::new_err("value needs the Python serializer"));
+    }
+
+    // None
+    if obj.is_none() {
+        return write_leaf(out, layout, tag, key_attrs, cfg.shape.type_attr("null"), true, |_| Ok(()));
     }
 
     // Bool (must check before int since bool is subclass of int in Python)
     if obj.is_instance_of::<PyBool>() {
         let v: bool = obj.extract()?;
-        write_open_tag(out, tag, name_attr, type_attr(cfg, "bool"))?;
-        write_str(out, if v { "true" } else { "false" })?;
-        write_close_tag(out, tag)?;
-        return Ok(());
+        return write_leaf(out, layout, tag, key_attrs, cfg.shape.type_attr("bool"), false, |out| {
+            write_str(out, if v { "true" } else { "false" })
+        });
     }
 
     // Int - try i64 first, fall back to string for large integers
     if obj.is_instance_of::<PyInt>() {
-        write_open_tag(out, tag, name_attr, type_attr(cfg, "int"))?;
-        match obj.extract::<i64>() {
-            Ok(v) => {
-                write_str(out, &v.to_string())?;
-            }
-            Err(_) => {
-                write_str(out, obj.str()?.to_str()?)?;
+        return write_leaf(out, layout, tag, key_attrs, cfg.shape.type_attr("int"), false, |out| {
+            match obj.extract::<i64>() {
+                Ok(v) => write_str(out, &v.to_string()),
+                Err(_) => write_str(out, obj.str()?.to_str()?),
             }
-        }
-        write_close_tag(out, tag)?;
-        return Ok(());
+        });
     }
 
     // Float - use Python's str() for parity (Rust renders 1.0 as "1")
     if obj.is_instance_of::<PyFloat>() {
-        write_open_tag(out, tag, name_attr, type_attr(cfg, "float"))?;
-        write_str(out, obj.str()?.to_str()?)?;
-        write_close_tag(out, tag)?;
-        return Ok(());
+        return write_leaf(out, layout, tag, key_attrs, cfg.shape.type_attr("float"), false, |out| {
+            write_str(out, obj.str()?.to_str()?)
+        });
     }
 
     // String
     if let Ok(py_str) = obj.cast::<PyString>() {
-        let s = py_str.to_str()?;
-        write_open_tag(out, tag, name_attr, type_attr(cfg, "str"))?;
-        if cfg.cdata {
-            write_cdata(out, s)?;
-        } else {
-            write_escaped_text(out, s)?;
-        }
-        write_close_tag(out, tag)?;
-        return Ok(());
+        return write_text_leaf(out, layout, tag, key_attrs, cfg.shape, py_str.to_str()?);
     }
 
     // Dict
     if let Ok(dict) = obj.cast::<PyDict>() {
-        if wrap_container {
-            write_open_tag(out, tag, name_attr, type_attr(cfg, "dict"))?;
+        return write_dict_element(py, out, layout, budget, dict, tag, key_attrs, None, cfg);
+    }
+
+    // Lists, tuples and other iterables
+    if let Some(list) = as_list(py, obj)? {
+        return write_list_element(py, out, layout, budget, &list, tag, key_attrs, false, cfg);
+    }
+
+    // Fallback: convert to string via Python's str()
+    let py_str = obj.str()?;
+    write_text_leaf(out, layout, tag, key_attrs, cfg.shape, py_str.to_str()?)
+}
+
+/// Return a list for lists, tuples and other iterables, or `None` for anything else.
+#[cfg(feature = "python")]
+#[inline]
+fn as_list<'py>(py: Python<'py>, obj: &Bound<'py, PyAny>) -> PyResult<Option<Bound<'py, PyList>>> {
+    if let Ok(list) = obj.cast::<PyList>() {
+        return Ok(Some(list.clone()));
+    }
+    if obj.is_instance_of::<PyString>() {
+        return Ok(None);
+    }
+    match obj.try_iter() {
+        Ok(iter) => {
+            let items: Vec<Bound<'py, PyAny>> = iter.collect::<PyResult<_>>()?;
+            Ok(Some(PyList::new(py, &items)?))
         }
-        write_dict_contents(py, out, dict, cfg)?;
-        if wrap_container {
-            write_close_tag(out, tag)?;
+        Err(_) => Ok(None),
+    }
+}
+
+/// Write a string element, escaped or wrapped in CDATA.
+#[cfg(feature = "python")]
+#[inline]
+fn write_text_leaf<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    tag: &str,
+    key_attrs: KeyAttrs<'_>,
+    shape: Shape,
+    s: &str,
+) -> PyResult<()> {
+    let empty = s.is_empty() && !shape.cdata;
+    write_leaf(out, layout, tag, key_attrs, shape.type_attr("str"), empty, |out| {
+        if shape.cdata {
+            write_cdata(out, s)
+        } else {
+            write_escaped_text(out, s)
+        }
+    })
+}
+
+/// Attributes of a dict element: the generated `id`/`name`/`type` ones, or the caller's
+/// `@attrs`.
+#[cfg(feature = "python")]
+enum ElementAttrs<'a, 'py> {
+    Generated { key: KeyAttrs<'a>, ty: Option<&'static str> },
+    Custom(Bound<'py, PyDict>),
+}
+
+#[cfg(feature = "python")]
+impl ElementAttrs<'_, '_> {
+    fn is_empty(&self) -> bool {
+        match self {
+            Self::Generated { key, ty } => key.is_empty() && ty.is_none(),
+            Self::Custom(attrs) => attrs.is_empty(),
         }
-        return Ok(());
     }
+}
 
-    // List
-    if let Ok(list) = obj.cast::<PyList>() {
-        if wrap_container {
-            write_open_tag(out, tag, name_attr, type_attr(cfg, "list"))?;
+/// Write `@attrs` the way the Python `make_attrstring` does: every name is validated before
+/// any value is escaped, and a lone `type` attribute skips validation.
+#[cfg(feature = "python")]
+fn write_custom_attrs<W: Write + ?Sized>(out: &mut W, attrs: &Bound<'_, PyDict>) -> PyResult<()> {
+    let names = attrs
+        .keys()
+        .iter()
+        .map(|key| key.str())
+        .collect::<PyResult<Vec<_>>>()?;
+    if !(names.len() == 1 && names[0].to_str()? == "type") {
+        for name in &names {
+            let name = name.to_str()?;
+            if !is_valid_xml_attr_name(name) {
+                return Err(PyValueError::new_err(format!("Invalid XML attribute name: {name}")));
+            }
         }
-        write_list_contents(py, out, list, tag, cfg)?;
-        if wrap_container {
-            write_close_tag(out, tag)?;
+    }
+    for (name, value) in names.iter().zip(attrs.values().iter()) {
+        write_byte(out, b' ')?;
+        write_str(out, name.to_str()?)?;
+        write_str(out, "=\"")?;
+        match value.cast::<PyString>() {
+            Ok(text) => write_escaped_attr(out, text.to_str()?)?,
+            Err(_) => write_escaped_attr(out, value.str()?.to_str()?)?,
+        }
+        write_byte(out, b'"')?;
+    }
+    Ok(())
+}
+
+/// Open a dict element whose content follows on deeper lines.
+#[cfg(feature = "python")]
+fn write_element_open<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    tag: &str,
+    attrs: Option<&ElementAttrs<'_, '_>>,
+) -> PyResult<()> {
+    match attrs {
+        None => write_container_open(out, layout, tag, KeyAttrs::default(), None),
+        Some(ElementAttrs::Generated { key, ty }) => write_container_open(out, layout, tag, *key, *ty),
+        Some(ElementAttrs::Custom(custom)) => {
+            check_tag(layout, tag)?;
+            layout.line(out)?;
+            write_byte(out, b'<')?;
+            write_str(out, tag)?;
+            write_custom_attrs(out, custom)?;
+            write_byte(out, b'>')?;
+            layout.push();
+            Ok(())
         }
-        return Ok(());
     }
+}
 
-    // Other iterables (tuples, generators, etc.)
-    if let Ok(iter) = obj.try_iter() {
-        let items: Vec<Bound<'_, PyAny>> = iter.collect::<PyResult<_>>()?;
-        let list = PyList::new(py, &items)?;
-        if wrap_container {
-            write_open_tag(out, tag, name_attr, type_attr(cfg, "list"))?;
+/// Write a dict value, like the Python `_append_dict2xml_str`.
+///
+/// `@attrs` replaces the generated attributes, `@val` replaces the content, and a truthy
+/// `@flat` (or a list parent without item wrapping) drops the element itself. `list_parent`
+/// is the enclosing list's tag when the dict is a list member. The caller's dicts are never
+/// modified; content without `@attrs` is rendered from a copy.
+#[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
+fn write_dict_element<W: Write + ?Sized>(
+    py: Python<'_>,
+    out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
+    dict: &Bound<'_, PyDict>,
+    tag: &str,
+    key_attrs: KeyAttrs<'_>,
+    list_parent: Option<&str>,
+    cfg: &ConvertConfig,
+) -> PyResult<()> {
+    let custom = match dict.get_item("@attrs")? {
+        Some(raw) => Some(match raw.cast::<PyDict>() {
+            Ok(attrs) => attrs.clone(),
+            Err(_) => py.get_type::<PyDict>().call1((&raw,))?.cast_into::<PyDict>()?,
+        }),
+        None => None,
+    };
+    let rawitem = match (dict.get_item("@val")?, &custom) {
+        (Some(val), _) => val,
+        (None, Some(_)) => {
+            let content = dict.copy()?;
+            content.del_item("@attrs")?;
+            content.into_any()
         }
-        write_list_contents(py, out, &list, tag, cfg)?;
-        if wrap_container {
-            write_close_tag(out, tag)?;
+        (None, None) => dict.clone().into_any(),
+    };
+    let attrs = match custom {
+        Some(attrs) => ElementAttrs::Custom(attrs),
+        None => ElementAttrs::Generated { key: key_attrs, ty: cfg.shape.type_attr("dict") },
+    };
+
+    if let (Some(parent), true) = (list_parent, cfg.shape.list_headers) {
+        let header_attrs = (!attrs.is_empty() && !cfg.shape.item_wrap).then_some(&attrs);
+        write_element_open(out, layout, parent, header_attrs)?;
+        write_rawitem(py, out, layout, budget, &rawitem, tag, cfg)?;
+        return write_container_close(out, layout, parent);
+    }
+    let flat = match dict.get_item("@flat")? {
+        Some(flat) => flat.is_truthy()?,
+        None => false,
+    };
+    if flat || (list_parent.is_some() && !cfg.shape.item_wrap) {
+        return write_rawitem(py, out, layout, budget, &rawitem, tag, cfg);
+    }
+    write_element_open(out, layout, tag, Some(&attrs))?;
+    write_rawitem(py, out, layout, budget, &rawitem, tag, cfg)?;
+    write_container_close(out, layout, tag)
+}
+
+/// Write the content of a dict element, like the Python `_append_rawitem`.
+///
+/// Scalars become escaped text (never CDATA), dicts and lists are written as children, and
+/// `None` writes nothing.
+#[cfg(feature = "python")]
+fn write_rawitem<W: Write + ?Sized>(
+    py: Python<'_>,
+    out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
+    rawitem: &Bound<'_, PyAny>,
+    tag: &str,
+    cfg: &ConvertConfig,
+) -> PyResult<()> {
+    if rawitem.is_none() {
+        return Ok(());
+    }
+    if rawitem.is_instance_of::<PyBool>() {
+        write_str(out, if rawitem.is_truthy()? { "true" } else { "false" })?;
+        layout.text();
+        return Ok(());
+    }
+    if let Ok(dict) = rawitem.cast::<PyDict>() {
+        return write_dict_contents(py, out, layout, budget, dict, tag, None, cfg);
+    }
+    let is_text = rawitem.is_instance_of::<PyString>()
+        || rawitem.is_instance_of::<PyInt>()
+        || rawitem.is_instance_of::<PyFloat>()
+        || AbstractTypes::default().is_number(rawitem)?;
+    if is_text {
+        let text = rawitem.str()?;
+        let text = text.to_str()?;
+        write_escaped_text(out, text)?;
+        if !text.is_empty() {
+            layout.text();
         }
         return Ok(());
     }
-
-    // Fallback: convert to string via Python's str()
-    let py_str = obj.str()?;
-    let s = py_str.to_str()?;
-    write_open_tag(out, tag, name_attr, type_attr(cfg, "str"))?;
-    if cfg.cdata {
-        write_cdata(out, s)?;
-    } else {
-        write_escaped_text(out, s)?;
+    let list = if cfg.strict { sequence_as_list(py, rawitem)? } else { as_list(py, rawitem)? };
+    if let Some(list) = list {
+        return write_list_contents(py, out, layout, budget, &list, tag, None, cfg);
     }
-    write_close_tag(out, tag)?;
-    Ok(())
+    write_value(py, out, layout, budget, rawitem, "item", KeyAttrs::default(), cfg)
 }
 
-/// Write all key-value pairs of a dict into the buffer.
+/// Write all key-value pairs of a dict, like the Python `_append_convert_dict`.
+///
+/// A `@flat` suffix is stripped from the key; on a list value it drops the list element.
+/// With `ids`, every member draws an ID from the unstripped key under `parent`, even when its
+/// element is dropped, so the sequence matches Python's.
 #[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
 fn write_dict_contents<W: Write + ?Sized>(
     py: Python<'_>,
     out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
     dict: &Bound<'_, PyDict>,
+    parent: &str,
+    mut ids: Option<&mut IdGenerator>,
     cfg: &ConvertConfig,
 ) -> PyResult<()> {
+    budget.enter(dict.len())?;
     for (key, val) in dict.iter() {
         let key_py_str = key.str()?;
-        let key_str = key_py_str.to_str()?;
-        let (xml_key, name_attr_pair) = make_valid_xml_name(key_str);
-        let name_attr = name_attr_pair.as_ref().map(|(_, v)| v.as_ref());
-        // Python's historical list shape depends only on the first member. Preserve that rule
-        // for mixed lists rather than reclassifying the container from every value.
-        if let Ok(list) = val.cast::<PyList>() {
-            let first_is_scalar = list
-                .get_item(0)
-                .ok()
-                .map(|item| is_python_scalar(&item))
-                .unwrap_or(false);
-            let wrap_list_container = (cfg.item_wrap || !first_is_scalar) && !cfg.list_headers;
-
-            if wrap_list_container {
-                write_open_tag(out, &xml_key, name_attr, type_attr(cfg, "list"))?;
-                write_list_contents(py, out, list, &xml_key, cfg)?;
-                write_close_tag(out, &xml_key)?;
-            } else {
-                write_list_contents(py, out, list, &xml_key, cfg)?;
-            }
+        let id = match ids.as_deref_mut() {
+            Some(ids) => Some(ids.next_id(parent, Some(key_py_str.to_str()?))),
+            None => None,
+        };
+        let name = cfg.key_names.get(&key, &key_py_str)?;
+        let xml_key = name.tag.as_str();
+        let key_attrs = KeyAttrs { id: id.as_deref(), name: name.name_attr.as_deref() };
+        if let Ok(dict) = val.cast::<PyDict>() {
+            write_dict_element(py, out, layout, budget, dict, xml_key, key_attrs, None, cfg)?;
+        } else if let Some(list) = sequence_as_list(py, &val)? {
+            write_list_element(py, out, layout, budget, &list, xml_key, key_attrs, name.flat, cfg)?;
         } else {
-            write_value(py, out, &val, &xml_key, name_attr, cfg, true)?;
+            write_value(py, out, layout, budget, &val, xml_key, key_attrs, cfg)?;
         }
     }
+    budget.leave();
     Ok(())
 }
 
+/// Return a list for lists and tuples, the sequences the Python serializer treats as lists
+/// on its fast path.
+#[cfg(feature = "python")]
+#[inline]
+fn sequence_as_list<'py>(
+    py: Python<'py>,
+    obj: &Bound<'py, PyAny>,
+) -> PyResult<Option<Bound<'py, PyList>>> {
+    if let Ok(list) = obj.cast::<PyList>() {
+        return Ok(Some(list.clone()));
+    }
+    if let Ok(tuple) = obj.cast::<PyTuple>() {
+        return Ok(Some(PyList::new(py, tuple.iter())?));
+    }
+    Ok(None)
+}
+
 /// Return true when a Python object is treated as a primitive scalar by the
 /// pure-Python serializer for list-wrapper decisions.
 #[cfg(feature = "python")]
@@ -513,52 +1835,779 @@ fn is_python_scalar(obj: &Bound<'_, PyAny>) -> bool {
         || obj.is_instance_of::<PyString>()
 }
 
-/// Write all items of a list into the buffer.
+/// Write a list value, like the Python `_append_list2xml_str`.
+///
+/// The list element is dropped for `@flat` keys, with `list_headers`, and when item wrapping
+/// is off and the first member is a scalar; Python's historical shape depends only on the
+/// first member, so mixed lists are not reclassified.
+#[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
+fn write_list_element<W: Write + ?Sized>(
+    py: Python<'_>,
+    out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
+    list: &Bound<'_, PyList>,
+    tag: &str,
+    key_attrs: KeyAttrs<'_>,
+    flat: bool,
+    cfg: &ConvertConfig,
+) -> PyResult<()> {
+    let first_is_scalar = list
+        .get_item(0)
+        .ok()
+        .map(|item| is_python_scalar(&item))
+        .unwrap_or(false);
+    if cfg.shape.drops_list_element(flat, first_is_scalar) {
+        return write_list_contents(py, out, layout, budget, list, tag, None, cfg);
+    }
+    write_container_open(out, layout, tag, key_attrs, cfg.shape.type_attr("list"))?;
+    write_list_contents(py, out, layout, budget, list, tag, None, cfg)?;
+    write_container_close(out, layout, tag)
+}
+
+/// Write all items of a list, like the Python `_append_convert_list`.
+///
+/// The item tag comes from `cfg.item_names`. Strings and numbers use the parent tag when item
+/// wrapping is off; booleans, `None` and containers always use the item tag, and only scalars
+/// carry its `name` attribute. With `ids`, the list draws one ID and its members are numbered
+/// from it.
 #[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
 fn write_list_contents<W: Write + ?Sized>(
     py: Python<'_>,
     out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
     list: &Bound<'_, PyList>,
     parent: &str,
+    ids: Option<&mut IdGenerator>,
     cfg: &ConvertConfig,
 ) -> PyResult<()> {
-    // `list_headers` changes the tag policy only for dictionary members; primitive members
-    // continue to follow `item_wrap`.
-    let scalar_tag_name = if cfg.item_wrap { "item" } else { parent };
-    let dict_tag_name = if cfg.list_headers {
-        parent
-    } else if cfg.item_wrap {
-        "item"
+    let member = cfg.item_names.get(parent)?;
+    let item_tag = member.tag.as_str();
+    let item_name = member.name_attr.as_deref();
+    let (scalar_tag, scalar_name_pair) = make_valid_xml_name(if cfg.shape.item_wrap { item_tag } else { parent });
+    let scalar_name = scalar_name_pair.as_ref().map(|(_, v)| v.as_ref());
+    let list_id = ids.map(|ids| ids.next_id(parent, None));
+
+    budget.enter(list.len())?;
+    for (index, item) in list.iter().enumerate() {
+        let id = list_id.as_ref().map(|list_id| format!("{list_id}_{}", index + 1));
+        let id = id.as_deref();
+        if let Ok(dict) = item.cast::<PyDict>() {
+            let key_attrs = KeyAttrs { id, name: None };
+            write_dict_element(py, out, layout, budget, dict, item_tag, key_attrs, Some(parent), cfg)?;
+        } else if let Some(list) = sequence_as_list(py, &item)? {
+            let key_attrs = KeyAttrs { id, name: None };
+            write_list_element(py, out, layout, budget, &list, item_tag, key_attrs, false, cfg)?;
+        } else if item.is_none() || item.is_instance_of::<PyBool>() {
+            let key_attrs = KeyAttrs { id, name: item_name };
+            write_value(py, out, layout, budget, &item, item_tag, key_attrs, cfg)?;
+        } else {
+            let key_attrs = KeyAttrs { id, name: scalar_name };
+            write_value(py, out, layout, budget, &item, &scalar_tag, key_attrs, cfg)?;
+        }
+    }
+    budget.leave();
+    Ok(())
+}
+
+/// Namespace of the W3C XPath 3.1 json-to-xml mapping.
+#[cfg(feature = "python")]
+const XPATH_FUNCTIONS_NS: &str = "http://www.w3.org/2005/xpath-functions";
+
+/// Element kinds of the XPath 3.1 mapping, matching the Python `get_xpath31_tag_name`.
+#[cfg(feature = "python")]
+#[derive(Copy, Clone, PartialEq, Eq)]
+enum XPathKind {
+    Null,
+    Boolean,
+    Map,
+    Number,
+    String,
+    Array,
+}
+
+#[cfg(feature = "python")]
+impl XPathKind {
+    fn tag(self) -> &'static str {
+        match self {
+            Self::Null => "null",
+            Self::Boolean => "boolean",
+            Self::Map => "map",
+            Self::Number => "number",
+            Self::String => "string",
+            Self::Array => "array",
+        }
+    }
+}
+
+/// `numbers.Number` and `collections.abc.Sequence`, imported the first time a value is not
+/// one of the built-in JSON types.
+#[cfg(feature = "python")]
+#[derive(Default)]
+struct AbstractTypes<'py> {
+    types: Option<(Bound<'py, PyAny>, Bound<'py, PyAny>)>,
+}
+
+#[cfg(feature = "python")]
+impl<'py> AbstractTypes<'py> {
+    /// Classify a value with the same checks, in the same order, as the Python serializer.
+    fn xpath_kind(&mut self, obj: &Bound<'py, PyAny>) -> PyResult<XPathKind> {
+        if obj.is_none() {
+            return Ok(XPathKind::Null);
+        }
+        if obj.is_instance_of::<PyBool>() {
+            return Ok(XPathKind::Boolean);
+        }
+        if obj.is_instance_of::<PyDict>() {
+            return Ok(XPathKind::Map);
+        }
+        if obj.is_instance_of::<PyInt>() || obj.is_instance_of::<PyFloat>() {
+            return Ok(XPathKind::Number);
+        }
+        if obj.is_instance_of::<PyString>() {
+            return Ok(XPathKind::String);
+        }
+        if obj.is_instance_of::<PyList>() || obj.is_instance_of::<PyTuple>() {
+            return Ok(XPathKind::Array);
+        }
+        if self.types.is_none() {
+            let py = obj.py();
+            let number = py.import("numbers")?.getattr("Number")?;
+            let sequence = py.import("collections.abc")?.getattr("Sequence")?;
+            self.types = Some((number, sequence));
+        }
+        let Some((number, sequence)) = &self.types else {
+            unreachable!("abstract types are imported above");
+        };
+        if obj.is_instance(number)? {
+            return Ok(XPathKind::Number);
+        }
+        if obj.is_instance_of::<PyBytes>() || obj.is_instance_of::<PyByteArray>() {
+            return Ok(XPathKind::String);
+        }
+        if obj.is_instance(sequence)? {
+            return Ok(XPathKind::Array);
+        }
+        Ok(XPathKind::String)
+    }
+
+    /// Whether a value is a `numbers.Number` other than `bool`.
+    fn is_number(&mut self, obj: &Bound<'py, PyAny>) -> PyResult<bool> {
+        Ok(self.xpath_kind(obj)? == XPathKind::Number)
+    }
+}
+
+/// Write an XPath 3.1 start tag, ending it with `close` (`">"` or `"/>"`).
+#[cfg(feature = "python")]
+#[inline]
+fn write_xpath_tag<W: Write + ?Sized>(
+    out: &mut W,
+    kind: XPathKind,
+    namespace: bool,
+    key: Option<&str>,
+    close: &str,
+) -> PyResult<()> {
+    write_byte(out, b'<')?;
+    write_str(out, kind.tag())?;
+    if namespace {
+        write_str(out, " xmlns=\"")?;
+        write_str(out, XPATH_FUNCTIONS_NS)?;
+        write_byte(out, b'"')?;
+    }
+    if let Some(key) = key {
+        write_str(out, " key=\"")?;
+        write_escaped_attr(out, key)?;
+        write_byte(out, b'"')?;
+    }
+    write_str(out, close)
+}
+
+/// Write one value in the XPath 3.1 json-to-xml shape, like the Python `_append_xpath31`.
+#[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
+fn write_xpath_value<'py, W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
+    types: &mut AbstractTypes<'py>,
+    obj: &Bound<'py, PyAny>,
+    kind: XPathKind,
+    key: Option<&str>,
+    namespace: bool,
+) -> PyResult<()> {
+    layout.line(out)?;
+    match kind {
+        XPathKind::Null => return write_xpath_tag(out, kind, namespace, key, "/>"),
+        XPathKind::Map => {
+            let dict = obj.cast::<PyDict>()?;
+            write_xpath_tag(out, kind, namespace, key, ">")?;
+            layout.push();
+            budget.enter(dict.len())?;
+            for (child_key, child) in dict.iter() {
+                let child_key = child_key.str()?;
+                let child_kind = types.xpath_kind(&child)?;
+                write_xpath_value(
+                    out,
+                    layout,
+                    budget,
+                    types,
+                    &child,
+                    child_kind,
+                    Some(child_key.to_str()?),
+                    false,
+                )?;
+            }
+        }
+        XPathKind::Array => {
+            write_xpath_tag(out, kind, namespace, key, ">")?;
+            layout.push();
+            budget.enter(obj.len()?)?;
+            for child in obj.try_iter()? {
+                let child = child?;
+                let child_kind = types.xpath_kind(&child)?;
+                write_xpath_value(out, layout, budget, types, &child, child_kind, None, false)?;
+            }
+        }
+        _ => {
+            write_xpath_tag(out, kind, namespace, key, ">")?;
+            let empty = match kind {
+                XPathKind::Boolean => {
+                    write_str(out, if obj.is_truthy()? { "true" } else { "false" })?;
+                    false
+                }
+                XPathKind::Number if obj.is_exact_instance_of::<PyInt>() => match obj.extract::<i64>() {
+                    Ok(v) => {
+                        write_str(out, &v.to_string())?;
+                        false
+                    }
+                    Err(_) => write_number_text(out, obj)?,
+                },
+                XPathKind::Number => write_number_text(out, obj)?,
+                _ => {
+                    let text = obj.str()?;
+                    let text = text.to_str()?;
+                    write_escaped_text(out, text)?;
+                    text.is_empty()
+                }
+            };
+            if empty {
+                layout.line(out)?;
+            }
+            return write_close_tag(out, kind.tag());
+        }
+    }
+    budget.leave();
+    layout.pop();
+    layout.line(out)?;
+    write_close_tag(out, kind.tag())
+}
+
+/// Write `str(obj)` unescaped, as the Python serializer does for numbers, and report whether
+/// it was empty.
+#[cfg(feature = "python")]
+#[inline]
+fn write_number_text<W: Write + ?Sized>(out: &mut W, obj: &Bound<'_, PyAny>) -> PyResult<bool> {
+    let text = obj.str()?;
+    let text = text.to_str()?;
+    write_str(out, text)?;
+    Ok(text.is_empty())
+}
+
+/// Write a whole XPath 3.1 document, like the Python `_XPathDocumentRenderer`.
+///
+/// Maps and arrays become the namespaced document element; any other value is wrapped in a
+/// namespaced `<map>`.
+#[cfg(feature = "python")]
+fn write_xpath_document<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
+    obj: &Bound<'_, PyAny>,
+) -> PyResult<()> {
+    let mut types = AbstractTypes::default();
+    layout.line(out)?;
+    write_str(out, "<?xml version=\"1.0\" encoding=\"UTF-8\" ?>")?;
+    let kind = types.xpath_kind(obj)?;
+    if matches!(kind, XPathKind::Map | XPathKind::Array) {
+        write_xpath_value(out, layout, budget, &mut types, obj, kind, None, true)?;
     } else {
-        parent
+        layout.line(out)?;
+        write_xpath_tag(out, XPathKind::Map, true, None, ">")?;
+        layout.push();
+        write_xpath_value(out, layout, budget, &mut types, obj, kind, None, false)?;
+        layout.pop();
+        layout.line(out)?;
+        write_close_tag(out, "map")?;
+    }
+    layout.finish(out)?;
+    out.flush()?;
+    Ok(())
+}
+
+/// A JSON value copied out of the Python object graph, so it can be written without the GIL.
+///
+/// An error the live writers would raise part-way through a document is kept where they would
+/// raise it, and nothing after it is copied, so the detached writer stops with the same error
+/// after the same output.
+#[cfg(feature = "python")]
+enum Node {
+    Null,
+    Bool(bool),
+    Int(i64),
+    /// `str()` of an integer outside `i64`, or its error, raised after the opening tag.
+    BigInt(PyResult<String>),
+    Float(f64),
+    Str(String),
+    /// Members with their key names, or the error raised entering the dict.
+    Dict(PyResult<Vec<(Arc<KeyName>, Node)>>),
+    /// Members with their item name, or the error raised naming or entering the list.
+    List { first_is_scalar: bool, members: PyResult<(Arc<ItemName>, Vec<Node>)> },
+    /// An error raised before anything of the value is written.
+    Fail(PyErr),
+}
+
+/// A value the snapshot cannot hold, such as a date or a dict with special keys; the document
+/// is then rendered by the live writers instead.
+#[cfg(feature = "python")]
+struct Unsupported;
+
+/// Copies a document into a `Node` tree, charging the budget and looking up names exactly
+/// where the live writers do.
+///
+/// The name caches are the live writers' own, so if the copy gives up, the live render that
+/// replaces it does not call `item_func` again for parents it already named.
+#[cfg(feature = "python")]
+struct Snapshot<'a, 'py> {
+    cfg: &'a ConvertConfig<'py>,
+    budget: Budget,
+    failed: bool,
+}
+
+#[cfg(feature = "python")]
+impl Snapshot<'_, '_> {
+    /// Record an error; the loops copying containers stop after it.
+    fn fail(&mut self, error: PyErr) -> PyErr {
+        self.failed = true;
+        error
+    }
+
+    /// Copy the top-level dict or list of a document.
+    fn document(&mut self, obj: &Bound<'_, PyAny>, parent: &str) -> Result<Node, Unsupported> {
+        if let Ok(dict) = obj.cast::<PyDict>() {
+            return Ok(Node::Dict(self.dict_members(dict)?));
+        }
+        if let Ok(list) = obj.cast::<PyList>() {
+            return self.list(list, parent);
+        }
+        Err(Unsupported)
+    }
+
+    /// Copy a dict member or list member that is written as an element named `tag`.
+    fn value(&mut self, obj: &Bound<'_, PyAny>, tag: &str) -> Result<Node, Unsupported> {
+        if let Ok(dict) = obj.cast::<PyDict>() {
+            for key in ["@attrs", "@val", "@flat"] {
+                match dict.contains(key) {
+                    Ok(false) => {}
+                    Ok(true) => return Err(Unsupported),
+                    Err(error) => return Ok(Node::Fail(self.fail(error))),
+                }
+            }
+            return Ok(Node::Dict(self.dict_members(dict)?));
+        }
+        match sequence_as_list(obj.py(), obj) {
+            Ok(Some(list)) => return self.list(&list, tag),
+            Ok(None) => {}
+            Err(error) => return Ok(Node::Fail(self.fail(error))),
+        }
+        if obj.is_none() {
+            return Ok(Node::Null);
+        }
+        if obj.is_exact_instance_of::<PyBool>() {
+            return Ok(match obj.extract::<bool>() {
+                Ok(value) => Node::Bool(value),
+                Err(error) => Node::Fail(self.fail(error)),
+            });
+        }
+        if obj.is_exact_instance_of::<PyInt>() {
+            return Ok(match obj.extract::<i64>() {
+                Ok(value) => Node::Int(value),
+                Err(_) => Node::BigInt(obj.str().and_then(|text| Ok(text.to_str()?.to_owned()))),
+            });
+        }
+        if obj.is_exact_instance_of::<PyFloat>() {
+            return Ok(match obj.extract::<f64>() {
+                Ok(value) => Node::Float(value),
+                Err(error) => Node::Fail(self.fail(error)),
+            });
+        }
+        if obj.is_exact_instance_of::<PyString>() {
+            let text = obj.cast::<PyString>().map_err(PyErr::from);
+            return Ok(match text.and_then(|text| Ok(text.to_str()?.to_owned())) {
+                Ok(text) => Node::Str(text),
+                Err(error) => Node::Fail(self.fail(error)),
+            });
+        }
+        if self.cfg.strict {
+            let error = FallbackRequired::new_err("value needs the Python serializer");
+            return Ok(Node::Fail(self.fail(error)));
+        }
+        Err(Unsupported)
+    }
+
+    /// Copy the members of a dict, like `write_dict_contents` without `ids`.
+    fn dict_members(
+        &mut self,
+        dict: &Bound<'_, PyDict>,
+    ) -> Result<PyResult<Vec<(Arc<KeyName>, Node)>>, Unsupported> {
+        if let Err(limit) = self.budget.enter(dict.len()) {
+            return Ok(Err(self.fail(limit.into())));
+        }
+        let cfg = self.cfg;
+        let mut members = Vec::with_capacity(dict.len());
+        for (key, val) in dict.iter() {
+            let member = match key.str().and_then(|text| cfg.key_names.get(&key, &text)) {
+                Ok(name) => {
+                    let node = self.value(&val, &name.tag)?;
+                    (name, node)
+                }
+                Err(error) => (Arc::default(), Node::Fail(self.fail(error))),
+            };
+            members.push(member);
+            if self.failed {
+                break;
+            }
+        }
+        self.budget.leave();
+        Ok(Ok(members))
+    }
+
+    /// Copy a list written under `parent`, like `write_list_element` and `write_list_contents`.
+    fn list(&mut self, list: &Bound<'_, PyList>, parent: &str) -> Result<Node, Unsupported> {
+        let first_is_scalar = list
+            .get_item(0)
+            .ok()
+            .map(|item| is_python_scalar(&item))
+            .unwrap_or(false);
+        let member = match self.cfg.item_names.get(parent) {
+            Ok(member) => member,
+            Err(error) => return Ok(Node::List { first_is_scalar, members: Err(self.fail(error)) }),
+        };
+        if let Err(limit) = self.budget.enter(list.len()) {
+            return Ok(Node::List { first_is_scalar, members: Err(self.fail(limit.into())) });
+        }
+        let mut items = Vec::with_capacity(list.len());
+        for item in list.iter() {
+            items.push(self.value(&item, &member.tag)?);
+            if self.failed {
+                break;
+            }
+        }
+        self.budget.leave();
+        Ok(Node::List { first_is_scalar, members: Ok((member, items)) })
+    }
+}
+
+/// Write a copied scalar, like `write_value`.
+#[cfg(feature = "python")]
+fn write_node_value<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    node: Node,
+    tag: &str,
+    key_attrs: KeyAttrs<'_>,
+    shape: Shape,
+) -> PyResult<()> {
+    let (ty, text) = match node {
+        Node::Null => {
+            let ty = shape.type_attr("null");
+            return write_leaf(out, layout, tag, key_attrs, ty, true, |_| Ok(()));
+        }
+        Node::Str(s) => return write_text_leaf(out, layout, tag, key_attrs, shape, &s),
+        Node::Fail(error) => return Err(error),
+        Node::Bool(v) => ("bool", Ok(if v { "true" } else { "false" }.to_owned())),
+        Node::Int(v) => ("int", Ok(v.to_string())),
+        Node::BigInt(text) => ("int", text),
+        Node::Float(v) => ("float", Ok(python_float_repr(v))),
+        Node::Dict(_) | Node::List { .. } => unreachable!("containers are written by their parent"),
+    };
+    let ty = shape.type_attr(ty);
+    write_leaf(out, layout, tag, key_attrs, ty, false, |out| write_str(out, &text?))
+}
+
+/// Write a copied dict, like `write_dict_element` for a dict without special keys.
+#[cfg(feature = "python")]
+fn write_node_dict_element<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    members: PyResult<Vec<(Arc<KeyName>, Node)>>,
+    tag: &str,
+    key_attrs: KeyAttrs<'_>,
+    list_parent: Option<&str>,
+    shape: Shape,
+) -> PyResult<()> {
+    let ty = shape.type_attr("dict");
+    if let (Some(parent), true) = (list_parent, shape.list_headers) {
+        if (key_attrs.is_empty() && ty.is_none()) || shape.item_wrap {
+            write_container_open(out, layout, parent, KeyAttrs::default(), None)?;
+        } else {
+            write_container_open(out, layout, parent, key_attrs, ty)?;
+        }
+        write_node_dict_contents(out, layout, members, shape)?;
+        return write_container_close(out, layout, parent);
+    }
+    if list_parent.is_some() && !shape.item_wrap {
+        return write_node_dict_contents(out, layout, members, shape);
+    }
+    write_container_open(out, layout, tag, key_attrs, ty)?;
+    write_node_dict_contents(out, layout, members, shape)?;
+    write_container_close(out, layout, tag)
+}
+
+/// Write the members of a copied dict, like `write_dict_contents`.
+#[cfg(feature = "python")]
+fn write_node_dict_contents<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    members: PyResult<Vec<(Arc<KeyName>, Node)>>,
+    shape: Shape,
+) -> PyResult<()> {
+    for (name, node) in members? {
+        let tag = name.tag.as_str();
+        let key_attrs = KeyAttrs { id: None, name: name.name_attr.as_deref() };
+        match node {
+            Node::Dict(members) => {
+                write_node_dict_element(out, layout, members, tag, key_attrs, None, shape)?;
+            }
+            Node::List { first_is_scalar, members } => {
+                write_node_list_element(
+                    out, layout, first_is_scalar, members, tag, key_attrs, name.flat, shape,
+                )?;
+            }
+            scalar => write_node_value(out, layout, scalar, tag, key_attrs, shape)?,
+        }
+    }
+    Ok(())
+}
+
+/// Write a copied list, like `write_list_element`.
+#[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
+fn write_node_list_element<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    first_is_scalar: bool,
+    members: PyResult<(Arc<ItemName>, Vec<Node>)>,
+    tag: &str,
+    key_attrs: KeyAttrs<'_>,
+    flat: bool,
+    shape: Shape,
+) -> PyResult<()> {
+    if shape.drops_list_element(flat, first_is_scalar) {
+        return write_node_list_contents(out, layout, members, tag, shape);
+    }
+    write_container_open(out, layout, tag, key_attrs, shape.type_attr("list"))?;
+    write_node_list_contents(out, layout, members, tag, shape)?;
+    write_container_close(out, layout, tag)
+}
+
+/// Write the members of a copied list, like `write_list_contents` without `ids`.
+#[cfg(feature = "python")]
+fn write_node_list_contents<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    members: PyResult<(Arc<ItemName>, Vec<Node>)>,
+    parent: &str,
+    shape: Shape,
+) -> PyResult<()> {
+    let (member, items) = members?;
+    let item_tag = member.tag.as_str();
+    let item_name = member.name_attr.as_deref();
+    let scalar_parent = if shape.item_wrap { item_tag } else { parent };
+    let (scalar_tag, scalar_name_pair) = make_valid_xml_name(scalar_parent);
+    let scalar_name = scalar_name_pair.as_ref().map(|(_, v)| v.as_ref());
+    for item in items {
+        match item {
+            Node::Dict(members) => {
+                let key_attrs = KeyAttrs::default();
+                write_node_dict_element(
+                    out, layout, members, item_tag, key_attrs, Some(parent), shape,
+                )?;
+            }
+            Node::List { first_is_scalar, members } => {
+                let key_attrs = KeyAttrs::default();
+                write_node_list_element(
+                    out, layout, first_is_scalar, members, item_tag, key_attrs, false, shape,
+                )?;
+            }
+            Node::Null | Node::Bool(_) => {
+                let key_attrs = KeyAttrs { id: None, name: item_name };
+                write_node_value(out, layout, item, item_tag, key_attrs, shape)?;
+            }
+            scalar => {
+                let key_attrs = KeyAttrs { id: None, name: scalar_name };
+                write_node_value(out, layout, scalar, &scalar_tag, key_attrs, shape)?;
+            }
+        }
+    }
+    Ok(())
+}
+
+/// Render a document in two phases, or return `None` when it needs the live writers.
+///
+/// The root tag and a `Node` copy of the data are made while attached to the interpreter;
+/// escaping, CDATA and tag writing then run detached, so other Python threads keep running.
+/// The XML is collected in a Rust buffer and copied into the returned bytes once the writer
+/// is attached again.
+#[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
+fn render_detached(
+    py: Python<'_>,
+    obj: &Bound<'_, PyAny>,
+    root: bool,
+    custom_root: &str,
+    xml_namespaces: Option<&Bound<'_, PyDict>>,
+    mut layout: Layout,
+    budget: Budget,
+    max_output_bytes: Option<usize>,
+    config: &ConvertConfig,
+) -> PyResult<Option<(Py<PyBytes>, usize)>> {
+    let mut buffer = Vec::new();
+    let mut out = LimitedWriter::new(&mut buffer, max_output_bytes);
+    if root {
+        if let Err(error) = write_root_open(&mut out, &mut layout, custom_root, xml_namespaces) {
+            return Err(if out.exceeded() { LimitExceeded::OutputBytes.into() } else { error });
+        }
+    }
+    // Like the live writers, a fragment's list members have no parent tag to repeat.
+    let parent = if root { custom_root } else { "" };
+    let mut snapshot = Snapshot { cfg: config, budget, failed: false };
+    let Ok(tree) = snapshot.document(obj, parent) else {
+        return Ok(None);
     };
+    let items = snapshot.budget.items();
+    let shape = config.shape;
+    let rendered = py.detach(|| -> PyResult<()> {
+        match tree {
+            Node::Dict(members) => write_node_dict_contents(&mut out, &mut layout, members, shape)?,
+            Node::List { members, .. } => {
+                write_node_list_contents(&mut out, &mut layout, members, parent, shape)?;
+            }
+            _ => unreachable!("documents are dicts or lists"),
+        }
+        if root {
+            write_container_close(&mut out, &mut layout, custom_root)?;
+        }
+        layout.finish(&mut out)?;
+        Ok(())
+    });
+    if out.exceeded() {
+        return Err(LimitExceeded::OutputBytes.into());
+    }
+    rendered?;
+    Ok(Some((PyBytes::new(py, &buffer).unbind(), items)))
+}
+
+/// Turns a parsed JSON document into a `Node` tree, charging the budget in the order the
+/// live writers would, like `Snapshot` does for Python objects.
+#[cfg(feature = "python")]
+struct JsonNodes {
+    budget: Budget,
+    key_names: HashMap<String, Arc<KeyName>>,
+    item_name: Arc<ItemName>,
+    failed: bool,
+}
+
+#[cfg(feature = "python")]
+impl JsonNodes {
+    fn new(budget: Budget) -> Self {
+        Self {
+            budget,
+            key_names: HashMap::new(),
+            item_name: Arc::new(ItemName { tag: "item".to_owned(), name_attr: None }),
+            failed: false,
+        }
+    }
 
-    for item in list.iter() {
-        // Dicts inside lists have special wrapping logic
-        if let Ok(dict) = item.cast::<PyDict>() {
-            if cfg.item_wrap || cfg.list_headers {
-                let dict_type_attr = if cfg.list_headers {
-                    None
-                } else {
-                    type_attr(cfg, "dict")
-                };
-                write_open_tag(out, dict_tag_name, None, dict_type_attr)?;
-                write_dict_contents(py, out, dict, cfg)?;
-                write_close_tag(out, dict_tag_name)?;
-            } else {
-                write_dict_contents(py, out, dict, cfg)?;
+    /// Convert the top-level object or array; other documents are left to Python.
+    fn document(&mut self, value: JsonValue) -> Option<Node> {
+        match value {
+            JsonValue::Object(_) | JsonValue::Array(_) => Some(self.value(value)),
+            _ => None,
+        }
+    }
+
+    fn value(&mut self, value: JsonValue) -> Node {
+        match value {
+            JsonValue::Null => Node::Null,
+            JsonValue::Bool(value) => Node::Bool(value),
+            JsonValue::Int(value) => Node::Int(value),
+            JsonValue::BigInt(text) => Node::BigInt(Ok(text)),
+            JsonValue::Float(value) => Node::Float(value),
+            JsonValue::Str(text) => Node::Str(text),
+            JsonValue::Object(members) => Node::Dict(self.members(members)),
+            JsonValue::Array(items) => self.list(items),
+        }
+    }
+
+    fn members(
+        &mut self,
+        members: Vec<(String, JsonValue)>,
+    ) -> PyResult<Vec<(Arc<KeyName>, Node)>> {
+        if let Err(limit) = self.budget.enter(members.len()) {
+            self.failed = true;
+            return Err(limit.into());
+        }
+        let mut nodes = Vec::with_capacity(members.len());
+        for (key, value) in members {
+            let name = self.key_name(&key);
+            nodes.push((name, self.value(value)));
+            if self.failed {
+                break;
             }
-        } else {
-            write_value(py, out, &item, scalar_tag_name, None, cfg, true)?;
         }
+        self.budget.leave();
+        Ok(nodes)
+    }
+
+    fn list(&mut self, items: Vec<JsonValue>) -> Node {
+        let first_is_scalar =
+            !matches!(items.first(), None | Some(JsonValue::Object(_) | JsonValue::Array(_)));
+        if let Err(limit) = self.budget.enter(items.len()) {
+            self.failed = true;
+            return Node::List { first_is_scalar, members: Err(limit.into()) };
+        }
+        let mut nodes = Vec::with_capacity(items.len());
+        for item in items {
+            nodes.push(self.value(item));
+            if self.failed {
+                break;
+            }
+        }
+        self.budget.leave();
+        Node::List { first_is_scalar, members: Ok((Arc::clone(&self.item_name), nodes)) }
+    }
+
+    /// Return the element name of a key, validating each distinct key once per document.
+    fn key_name(&mut self, key: &str) -> Arc<KeyName> {
+        if let Some(name) = self.key_names.get(key) {
+            return Arc::clone(name);
+        }
+        let name = Arc::new(KeyName::new(key, true));
+        if self.key_names.len() < KEY_NAME_CACHE_SIZE {
+            self.key_names.insert(key.to_owned(), Arc::clone(&name));
+        }
+        name
     }
-    Ok(())
 }
 
 /// Convert a Python value to UTF-8 encoded XML bytes.
 ///
 /// The direct extension accepts scalars and iterables, while the automatic backend selector
-/// dispatches only supported dict/list requests here.
+/// dispatches only supported dict/list requests here, in strict mode so that documents with
+/// other values are re-rendered by the Python serializer.
 ///
 /// Args:
 ///     obj: The Python object to convert.
@@ -569,16 +2618,50 @@ fn write_list_contents<W: Write + ?Sized>(
 ///     cdata: Whether to wrap string values in CDATA sections (default: False).
 ///     list_headers: Suppress the outer list container and repeat the parent tag for nested
 ///         dictionary items; primitive tags continue to follow `item_wrap` (default: False).
+///     xpath_format: Emit the W3C XPath 3.1 json-to-xml mapping instead; `root`,
+///         `custom_root`, `attr_type`, `item_wrap`, `cdata` and `list_headers` are then
+///         ignored (default: False).
+///     pretty: Put each element on its own line, indenting nested elements (default: False).
+///     indent: Spaces per nesting level when `pretty` is enabled (default: 2).
+///     xml_namespaces: Namespace declarations for the root element, like the Python
+///         serializer's: `xmlns` sets the default namespace, `xsi` takes a dict with
+///         `schemaInstance` and `schemaLocation`, and other keys are prefixes (default: None).
+///     item_func: Names the members of each list from the parent tag, either a dict of
+///         parent tags to item names or a callable called once per distinct parent
+///         (default: None, every member is `item`).
+///     ids: Give the members of the top-level dict or list `id` attributes (default: False).
+///     id_strategy: How `ids` are generated: "random", "counter", "path" or "seeded", as in
+///         the Python serializer (default: "random").
+///     id_seed: Start of the "seeded" SplitMix64 stream, from 0 to 2**64 - 1 (default: 0).
+///     strict: Raise `FallbackRequired` for values outside JSON's shapes, such as dates,
+///         decimals and sets, instead of approximating them, so a caller can retry with the
+///         Python serializer (default: False).
+///     max_depth: Maximum container nesting depth, or None for no limit (default: None).
+///     max_items: Maximum number of JSON values, or None for no limit (default: None).
+///     max_output_bytes: Maximum size of the returned XML, or None for no limit
+///         (default: None).
+///     release_gil: Copy a dict or list document into Rust first and write the XML with the
+///         GIL released, so other Python threads run meanwhile. It costs a copy of the data
+///         and of the output; documents with `ids`, `xpath_format`, special keys, or, outside
+///         strict mode, non-JSON values are rendered in place instead (default: False).
+///     count_items: Return the number of values charged against `max_items`, counting the
+///         document itself, with the XML (default: False).
 ///
 /// Returns:
-///     bytes: The XML representation of the input object.
+///     bytes: The XML representation of the input object, or an `(items, bytes)` tuple
+///         with `count_items`.
 ///
 /// Raises:
-///     ValueError: If `custom_root` is not a supported XML name or data contains characters
-///         excluded by XML 1.0.
+///     FallbackRequired: In strict mode, if the data holds a value only the Python serializer
+///         renders exactly, and in pretty mode if an element name is not an XML name, which
+///         the Python serializer reports as malformed output.
+///     ConversionLimitError: If the data or the output exceeds one of the limits. It is a
+///         `ValueError` subclass, and rendering stops as soon as a limit is crossed.
+///     ValueError: If `custom_root` or a namespace prefix is not a supported XML name,
+///         `id_strategy` is unknown, or data contains characters excluded by XML 1.0.
 #[cfg(feature = "python")]
 #[pyfunction]
-#[pyo3(signature = (obj, root=true, custom_root="root", attr_type=true, item_wrap=true, cdata=false, list_headers=false))]
+#[pyo3(signature = (obj, root=true, custom_root="root", attr_type=true, item_wrap=true, cdata=false, list_headers=false, xpath_format=false, pretty=false, indent=2, xml_namespaces=None, item_func=None, ids=false, id_strategy="random", id_seed=0, strict=false, max_depth=None, max_items=None, max_output_bytes=None, release_gil=false, count_items=false))]
 #[allow(clippy::too_many_arguments)]
 fn dicttoxml(
     py: Python<'_>,
@@ -589,51 +2672,311 @@ fn dicttoxml(
     item_wrap: bool,
     cdata: bool,
     list_headers: bool,
-) -> PyResult<Py<PyBytes>> {
-    if !is_valid_xml_name(custom_root) {
-        return Err(PyValueError::new_err(format!(
-            "Invalid XML root element name: '{}'",
-            custom_root
-        )));
+    xpath_format: bool,
+    pretty: bool,
+    indent: usize,
+    xml_namespaces: Option<&Bound<'_, PyDict>>,
+    item_func: Option<Bound<'_, PyAny>>,
+    ids: bool,
+    id_strategy: &str,
+    id_seed: u64,
+    strict: bool,
+    max_depth: Option<usize>,
+    max_items: Option<usize>,
+    max_output_bytes: Option<usize>,
+    release_gil: bool,
+    count_items: bool,
+) -> PyResult<Py<PyAny>> {
+    if !xpath_format {
+        check_root_name(custom_root)?;
     }
+    let Some(id_strategy) = IdStrategy::parse(id_strategy) else {
+        return Err(PyValueError::new_err(
+            "id_strategy must be one of: random, counter, path, seeded",
+        ));
+    };
 
     let config = ConvertConfig {
-        attr_type,
-        cdata,
-        item_wrap,
-        list_headers,
+        shape: Shape { attr_type, cdata, item_wrap, list_headers },
+        strict,
+        item_names: ItemNames::new(item_func),
+        key_names: KeyNames::default(),
     };
 
-    // Stream into Python-owned bytes storage to avoid a complete Rust String and cross-language
-    // copy. The bounded buffer coalesces the serializer's many small writes.
-    PyBytes::new_with_writer(py, 0, |out| {
-        let mut out = BufWriter::with_capacity(OUTPUT_BUFFER_SIZE, out);
+    // With `count_items` the caller also gets the values the budget charged, so it can hold
+    // `max_items` across several documents without walking them again.
+    let result = |xml: Py<PyBytes>, items: usize| -> PyResult<Py<PyAny>> {
+        if count_items {
+            Ok((items, xml).into_pyobject(py)?.into_any().unbind())
+        } else {
+            Ok(xml.into_any())
+        }
+    };
 
-        if root {
-            write_str(&mut out, "<?xml version=\"1.0\" encoding=\"UTF-8\" ?>")?;
-            write_byte(&mut out, b'<')?;
-            write_str(&mut out, custom_root)?;
-            write_byte(&mut out, b'>')?;
+    if release_gil && !xpath_format && !ids {
+        let layout = if pretty { Layout::pretty(indent) } else { Layout::compact() };
+        let budget = Budget::new(max_depth, max_items);
+        let detached = render_detached(
+            py, obj, root, custom_root, xml_namespaces, layout, budget, max_output_bytes, &config,
+        )?;
+        if let Some((xml, items)) = detached {
+            return result(xml, items);
         }
+    }
 
-        if let Ok(dict) = obj.cast::<PyDict>() {
-            write_dict_contents(py, &mut out, dict, &config)?;
-        } else if let Ok(list) = obj.cast::<PyList>() {
-            write_list_contents(py, &mut out, list, custom_root, &config)?;
+    // Stream into Python-owned bytes storage to avoid a complete Rust String and cross-language
+    // copy. The bounded buffer coalesces the serializer's many small writes.
+    let mut budget = Budget::new(max_depth, max_items);
+    let xml = PyBytes::new_with_writer(py, 0, |out| {
+        // The limit sits in front of the buffer so it sees every byte as soon as it is written.
+        let mut out =
+            LimitedWriter::new(BufWriter::with_capacity(OUTPUT_BUFFER_SIZE, out), max_output_bytes);
+        let layout = &mut if pretty { Layout::pretty(indent) } else { Layout::compact() };
+        let budget = &mut budget;
+        let rendered = if xpath_format {
+            write_xpath_document(&mut out, layout, budget, obj)
         } else {
-            write_value(py, &mut out, obj, custom_root, None, &config, true)?;
+            let mut ids = ids.then(|| IdGenerator::new(id_strategy, id_seed));
+            write_document(
+                py, &mut out, layout, budget, obj, root, custom_root, xml_namespaces, ids.as_mut(),
+                &config,
+            )
+        };
+        if out.exceeded() {
+            return Err(LimitExceeded::OutputBytes.into());
         }
+        rendered
+    })?;
+    result(xml.unbind(), budget.items())
+}
 
+/// Convert JSON text to UTF-8 encoded XML bytes without creating Python objects.
+///
+/// The text is parsed and written in Rust with the GIL released, and the XML is the same as
+/// `dicttoxml(json.loads(data))` gives, with the same XML 1.0 character checks and limits.
+/// The depth and item limits are checked while the text is parsed, so an oversized document
+/// fails at its first value over a limit with the error the Python event path raises.
+///
+/// Args:
+///     data: JSON text, as `str` or UTF-8 `bytes`.
+///     root, custom_root, attr_type, item_wrap, cdata, list_headers, pretty, indent,
+///     max_depth, max_items, max_output_bytes: As for `dicttoxml`.
+///
+/// Returns:
+///     bytes: The XML representation of the decoded document.
+///
+/// Raises:
+///     FallbackRequired: If the text is not valid JSON or `json.loads` and the Python
+///         serializer would treat it differently: a top-level scalar, repeated keys, keys
+///         starting with `@`, lone surrogates, integers longer than Python's digit limit,
+///         or very deep nesting, or in pretty mode an element name that is not an XML name.
+///         Decoding the text in Python gives the exact result or error.
+///     ConversionLimitError: If the data or the output exceeds one of the limits.
+///     ValueError: If `custom_root` is not a supported XML name or the data contains
+///         characters excluded by XML 1.0.
+#[cfg(feature = "python")]
+#[pyfunction]
+#[pyo3(signature = (data, root=true, custom_root="root", attr_type=true, item_wrap=true, cdata=false, list_headers=false, pretty=false, indent=2, max_depth=None, max_items=None, max_output_bytes=None))]
+#[allow(clippy::too_many_arguments)]
+fn json_to_xml(
+    py: Python<'_>,
+    data: &Bound<'_, PyAny>,
+    root: bool,
+    custom_root: &str,
+    attr_type: bool,
+    item_wrap: bool,
+    cdata: bool,
+    list_headers: bool,
+    pretty: bool,
+    indent: usize,
+    max_depth: Option<usize>,
+    max_items: Option<usize>,
+    max_output_bytes: Option<usize>,
+) -> PyResult<Py<PyBytes>> {
+    check_root_name(custom_root)?;
+    let text = match data.cast::<PyBytes>() {
+        Ok(bytes) => std::str::from_utf8(bytes.as_bytes()).ok(),
+        Err(_) => data.cast::<PyString>()?.to_str().ok(),
+    };
+    let Some(text) = text else {
+        return Err(FallbackRequired::new_err("JSON text is not valid UTF-8"));
+    };
+    let shape = Shape { attr_type, cdata, item_wrap, list_headers };
+    let mut buffer = Vec::new();
+    let mut out = LimitedWriter::new(&mut buffer, max_output_bytes);
+    let rendered = py.detach(|| -> PyResult<()> {
+        let value = parse_json_limited(text, max_depth, max_items).map_err(|error| {
+            match error {
+                JsonTextError::Invalid => FallbackRequired::new_err("data is not valid JSON"),
+                JsonTextError::Unsupported => {
+                    FallbackRequired::new_err("JSON text needs the Python decoder")
+                }
+                JsonTextError::Limit(limit) => limit.into(),
+            }
+        })?;
+        let mut nodes = JsonNodes::new(Budget::new(max_depth, max_items));
+        let Some(document) = nodes.document(value) else {
+            return Err(FallbackRequired::new_err("JSON text needs the Python decoder"));
+        };
+        let mut layout = if pretty { Layout::pretty(indent) } else { Layout::compact() };
         if root {
-            write_str(&mut out, "</")?;
-            write_str(&mut out, custom_root)?;
-            write_byte(&mut out, b'>')?;
+            write_root_open(&mut out, &mut layout, custom_root, None)?;
         }
-
-        out.flush()?;
+        // Like the live writers, a fragment's list members have no parent tag to repeat.
+        let parent = if root { custom_root } else { "" };
+        match document {
+            Node::Dict(members) => write_node_dict_contents(&mut out, &mut layout, members, shape)?,
+            Node::List { members, .. } => {
+                write_node_list_contents(&mut out, &mut layout, members, parent, shape)?;
+            }
+            _ => unreachable!("documents are objects or arrays"),
+        }
+        if root {
+            write_container_close(&mut out, &mut layout, custom_root)?;
+        }
+        layout.finish(&mut out)?;
         Ok(())
-    })
-    .map(Bound::unbind)
+    });
+    if out.exceeded() {
+        return Err(LimitExceeded::OutputBytes.into());
+    }
+    rendered?;
+    Ok(PyBytes::new(py, &buffer).unbind())
+}
+
+/// Reject a `custom_root` the Python serializer would not write unchanged.
+#[cfg(feature = "python")]
+fn check_root_name(custom_root: &str) -> PyResult<()> {
+    // Prefixed names such as `ns:root` are accepted too.
+    if !matches!(make_valid_xml_name(custom_root), (Cow::Borrowed(_), None)) {
+        return Err(PyValueError::new_err(format!(
+            "Invalid XML root element name: '{}'",
+            custom_root
+        )));
+    }
+    Ok(())
+}
+
+/// Write the declaration, root element and data of a whole document.
+///
+/// Like the Python serializer, `ids` only number the members of the top-level dict or list.
+#[cfg(feature = "python")]
+#[allow(clippy::too_many_arguments)]
+fn write_document<W: Write + ?Sized>(
+    py: Python<'_>,
+    out: &mut W,
+    layout: &mut Layout,
+    budget: &mut Budget,
+    obj: &Bound<'_, PyAny>,
+    root: bool,
+    custom_root: &str,
+    xml_namespaces: Option<&Bound<'_, PyDict>>,
+    ids: Option<&mut IdGenerator>,
+    config: &ConvertConfig,
+) -> PyResult<()> {
+    if root {
+        write_root_open(out, layout, custom_root, xml_namespaces)?;
+    }
+
+    // Like the Python renderer, a fragment's list members have no parent tag to repeat.
+    let parent = if root { custom_root } else { "" };
+    if let Ok(dict) = obj.cast::<PyDict>() {
+        write_dict_contents(py, out, layout, budget, dict, parent, ids, config)?;
+    } else if let Ok(list) = obj.cast::<PyList>() {
+        write_list_contents(py, out, layout, budget, list, parent, ids, config)?;
+    } else {
+        write_value(py, out, layout, budget, obj, custom_root, KeyAttrs::default(), config)?;
+    }
+
+    if root {
+        write_container_close(out, layout, custom_root)?;
+    }
+
+    layout.finish(out)?;
+    out.flush()?;
+    Ok(())
+}
+
+/// Write the XML declaration and the opening tag of the root element.
+#[cfg(feature = "python")]
+fn write_root_open<W: Write + ?Sized>(
+    out: &mut W,
+    layout: &mut Layout,
+    custom_root: &str,
+    xml_namespaces: Option<&Bound<'_, PyDict>>,
+) -> PyResult<()> {
+    check_tag(layout, custom_root)?;
+    layout.line(out)?;
+    write_str(out, "<?xml version=\"1.0\" encoding=\"UTF-8\" ?>")?;
+    layout.line(out)?;
+    write_byte(out, b'<')?;
+    write_str(out, custom_root)?;
+    if let Some(namespaces) = xml_namespaces {
+        write_namespaces(out, namespaces)?;
+    }
+    write_byte(out, b'>')?;
+    layout.push();
+    Ok(())
+}
+
+/// Write namespace declarations on the root element, like the Python `_NamespaceFormatter`.
+///
+/// `xmlns` declares the default namespace and `xsi` is a dict whose `schemaInstance` and
+/// `schemaLocation` entries become `xmlns:xsi` and `xsi:schemaLocation`, in the dict's order.
+/// Every other key must be a valid prefix that does not start with `xml`.
+#[cfg(feature = "python")]
+fn write_namespaces<W: Write + ?Sized>(out: &mut W, namespaces: &Bound<'_, PyDict>) -> PyResult<()> {
+    for (prefix, value) in namespaces.iter() {
+        let prefix_str = match prefix.cast::<PyString>() {
+            Ok(text) => Some(text.to_str()?),
+            Err(_) => None,
+        };
+        match prefix_str {
+            Some("xsi") => {
+                let Ok(schema) = value.cast::<PyDict>() else {
+                    return Err(PyValueError::new_err("The xsi namespace value must be a mapping"));
+                };
+                if schema.contains("schemaLocation")? && !schema.contains("schemaInstance")? {
+                    return Err(PyValueError::new_err(
+                        "xsi schemaLocation requires a schemaInstance namespace",
+                    ));
+                }
+                for (schema_att, schema_value) in schema.iter() {
+                    let name = match schema_att.cast::<PyString>() {
+                        Ok(text) => text.to_str()?,
+                        Err(_) => continue,
+                    };
+                    let attr = match name {
+                        "schemaInstance" => " xmlns:xsi=\"",
+                        "schemaLocation" => " xsi:schemaLocation=\"",
+                        _ => continue,
+                    };
+                    write_str(out, attr)?;
+                    write_escaped_attr(out, schema_value.str()?.to_str()?)?;
+                    write_byte(out, b'"')?;
+                }
+            }
+            Some("xmlns") => {
+                write_str(out, " xmlns=\"")?;
+                write_escaped_attr(out, value.str()?.to_str()?)?;
+                write_byte(out, b'"')?;
+            }
+            Some(name) if is_valid_namespace_prefix(name) => {
+                write_str(out, " xmlns:")?;
+                write_str(out, name)?;
+                write_str(out, "=\"")?;
+                write_escaped_attr(out, value.str()?.to_str()?)?;
+                write_byte(out, b'"')?;
+            }
+            _ => {
+                return Err(PyValueError::new_err(format!(
+                    "Invalid XML namespace prefix: {}",
+                    prefix.str()?
+                )));
+            }
+        }
+    }
+    Ok(())
 }
 
 /// Fast XML string escaping.
@@ -655,12 +2998,21 @@ fn wrap_cdata_py(s: &str) -> PyResult<String> {
 }
 
 /// A Python module implemented in Rust.
+///
+/// The module holds no global state: name caches and writers live in each call's
+/// `ConvertConfig`, so free-threaded interpreters may run conversions in parallel threads
+/// without re-enabling the GIL on import.
 #[cfg(feature = "python")]
-#[pymodule]
+#[pymodule(gil_used = false)]
 fn json2xml_rs(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(dicttoxml, m)?)?;
+    m.add_function(wrap_pyfunction!(json_to_xml, m)?)?;
     m.add_function(wrap_pyfunction!(escape_xml_py, m)?)?;
     m.add_function(wrap_pyfunction!(wrap_cdata_py, m)?)?;
+    m.add("ConversionLimitError", m.py().get_type::<ConversionLimitError>())?;
+    m.add("FallbackRequired", m.py().get_type::<FallbackRequired>())?;
+    // Behaviour that has no keyword of its own, for the Python selector to probe.
+    m.add("FEATURES", ("special_keys",))?;
     Ok(())
 }
 
@@ -784,8 +3136,9 @@ mod tests {
         }
 
         #[test]
-        fn accepts_name_with_colons() {
-            assert!(is_valid_xml_name("ns:element"));
+        fn rejects_colons_like_python() {
+            assert!(!is_valid_xml_name("ns:element"));
+            assert!(!is_valid_xml_name(":element"));
         }
 
         #[test]
@@ -809,18 +3162,28 @@ mod tests {
         }
 
         #[test]
-        fn rejects_xml_prefix_lowercase() {
-            assert!(!is_valid_xml_name("xmlelement"));
+        fn accepts_xml_prefix_like_the_parser() {
+            assert!(is_valid_xml_name("xmlelement"));
+            assert!(is_valid_xml_name("XMLelement"));
+            assert!(is_valid_xml_name("XmLelement"));
         }
 
         #[test]
-        fn rejects_xml_prefix_uppercase() {
-            assert!(!is_valid_xml_name("XMLelement"));
+        fn follows_the_appendix_b_tables() {
+            for name in ["中文", "ก", "ı", "a·", "a々", "éclair", "a\u{300}"] {
+                assert!(is_valid_xml_name(name), "{name}");
+            }
+            for name in ["々", "ſ", "ǅ", "０", "·a", "\u{300}a", "a\u{2028}", "\u{10000}", "a\u{1D400}"] {
+                assert!(!is_valid_xml_name(name), "{name}");
+            }
         }
 
         #[test]
-        fn rejects_xml_prefix_mixed_case() {
-            assert!(!is_valid_xml_name("XmLelement"));
+        fn tables_are_sorted_and_disjoint() {
+            for ranges in [NAME_START_RANGES, NAME_EXTRA_RANGES] {
+                assert!(ranges.iter().all(|&(lo, hi)| lo <= hi));
+                assert!(ranges.windows(2).all(|pair| pair[0].1 < pair[1].0));
+            }
         }
     }
 
@@ -848,6 +3211,12 @@ mod tests {
             assert!(attr.is_none());
         }
 
+        #[test]
+        fn keeps_prefixed_names_like_python() {
+            assert_eq!(make_valid_xml_name("ns:element").0, "ns:element");
+            assert_eq!(make_valid_xml_name("a b:c").0, "key");
+        }
+
         #[test]
         fn falls_back_to_key_with_name_attr() {
             let (name, attr) = make_valid_xml_name("-invalid");
@@ -989,6 +3358,175 @@ mod tests {
         }
     }
 
+    mod layout_tests {
+        use super::*;
+
+        fn render(layout: &mut Layout, steps: &[&str]) -> String {
+            let mut out = Vec::new();
+            for step in steps {
+                match *step {
+                    "push" => layout.push(),
+                    close if close.starts_with("</") => {
+                        layout.close(&mut out).unwrap();
+                        out.extend_from_slice(close.as_bytes());
+                    }
+                    text if !text.starts_with('<') => {
+                        out.extend_from_slice(text.as_bytes());
+                        layout.text();
+                    }
+                    markup => {
+                        layout.line(&mut out).unwrap();
+                        out.extend_from_slice(markup.as_bytes());
+                    }
+                }
+            }
+            layout.finish(&mut out).unwrap();
+            String::from_utf8(out).unwrap()
+        }
+
+        #[test]
+        fn compact_layout_writes_no_whitespace() {
+            let steps = ["<a>", "push", "<b>1</b>", "</a>"];
+            assert_eq!(render(&mut Layout::compact(), &steps), "<a><b>1</b></a>");
+        }
+
+        #[test]
+        // @lat: [[tests#XML helper behavior#Rust pretty layout matches Python indentation]]
+        fn pretty_layout_indents_each_level() {
+            let steps = ["<?xml?>", "<a>", "push", "<b>1</b>", "<c>", "push", "<d/>", "</c>", "</a>"];
+            assert_eq!(
+                render(&mut Layout::pretty(2), &steps),
+                "<?xml?>\n<a>\n  <b>1</b>\n  <c>\n    <d/>\n  </c>\n</a>\n"
+            );
+        }
+
+        #[test]
+        fn text_keeps_the_closing_tag_inline() {
+            let steps = ["<a>", "push", "<b>", "push", "x", "</b>", "<c>", "push", "</c>", "</a>"];
+            assert_eq!(
+                render(&mut Layout::pretty(2), &steps),
+                "<a>\n  <b>x</b>\n  <c>\n  </c>\n</a>\n"
+            );
+            assert_eq!(render(&mut Layout::compact(), &steps), "<a><b>x</b><c></c></a>");
+        }
+
+        #[test]
+        fn pretty_layout_supports_any_width() {
+            let steps = ["<a>", "push", "push", "push", "<b/>"];
+            assert_eq!(render(&mut Layout::pretty(0), &steps), "<a>\n<b/>\n");
+            let deep = render(&mut Layout::pretty(40), &steps);
+            assert_eq!(deep, format!("<a>\n{}<b/>\n", " ".repeat(120)));
+        }
+
+        #[test]
+        fn pretty_layout_accepts_only_xml_names() {
+            let pretty = Layout::pretty(2);
+            assert!(pretty.accepts("item") && pretty.accepts("xsi:item"));
+            for tag in ["", "1a", "a b", ":a", "a:", "a:b:c"] {
+                assert!(!pretty.accepts(tag), "{tag:?}");
+            }
+            assert!(Layout::compact().accepts(""));
+        }
+    }
+
+    mod attr_name_tests {
+        use super::*;
+
+        #[test]
+        // @lat: [[tests#XML helper behavior#Rust special keys match Python]]
+        fn accepts_what_the_python_validator_accepts() {
+            for name in ["id", "_a", "a-b", "a.b", "xml:lang", "xmlns", "xmlns:foo", "xmlfoo", "XML", "名前", "a·b"] {
+                assert!(is_valid_xml_attr_name(name), "{name}");
+            }
+        }
+
+        #[test]
+        fn rejects_what_the_python_validator_rejects() {
+            for name in [
+                "", "1a", "-a", ".a", "a b", "xmlns:xml", "xmlns:xmlns", "xml:", "a:b", ":a", "a:", "·a",
+                "x=y", "a\"", "a>", "ns:a:b", "xml:a:b", "xmlns:", "xmlns:1a", "\u{10000}a",
+            ] {
+                assert!(!is_valid_xml_attr_name(name), "{name}");
+            }
+        }
+    }
+
+    mod name_table_tests {
+        use super::*;
+
+        #[test]
+        // @lat: [[tests#XML helper behavior#Rust namespaces and item names match Python]]
+        fn namespace_prefixes_follow_the_python_formatter() {
+            for prefix in ["soap", "a-b", "_x", "ns1", "名前"] {
+                assert!(is_valid_namespace_prefix(prefix), "{prefix}");
+            }
+            for prefix in ["", "1a", "a:b", "xml", "XmlFoo", "xmlns", "a b"] {
+                assert!(!is_valid_namespace_prefix(prefix), "{prefix}");
+            }
+        }
+
+        #[test]
+        fn item_names_drop_flat_and_fall_back_like_python() {
+            assert_eq!(item_element_name("user"), ("user".to_owned(), None));
+            assert_eq!(item_element_name("user@flat"), ("user".to_owned(), None));
+            assert_eq!(item_element_name("my item"), ("my_item".to_owned(), None));
+            assert_eq!(item_element_name("42"), ("n42".to_owned(), None));
+            assert_eq!(item_element_name("1x"), ("key".to_owned(), Some("1x".to_owned())));
+        }
+    }
+
+    mod limit_tests {
+        use super::*;
+
+        #[test]
+        // @lat: [[tests#XML helper behavior#Rust limits match the Python budget]]
+        fn budget_charges_children_when_containers_open() {
+            let mut budget = Budget::new(Some(2), Some(4));
+            assert_eq!(budget.enter(2), Ok(()));
+            assert_eq!(budget.enter(1), Ok(()));
+            assert_eq!(budget.enter(0), Ok(()));
+            budget.leave();
+            assert_eq!(budget.items(), 4);
+            assert_eq!(budget.enter(1), Err(LimitExceeded::Items));
+        }
+
+        #[test]
+        fn budget_only_rejects_deep_containers_with_children() {
+            let mut budget = Budget::new(Some(1), None);
+            assert_eq!(budget.enter(1), Ok(()));
+            assert_eq!(budget.enter(0), Ok(()));
+            budget.leave();
+            assert_eq!(budget.enter(1), Err(LimitExceeded::Depth));
+        }
+
+        #[test]
+        fn unlimited_budget_never_fails() {
+            let mut budget = Budget::new(None, None);
+            assert_eq!(budget.enter(usize::MAX), Ok(()));
+            assert_eq!(budget.enter(usize::MAX), Ok(()));
+        }
+
+        #[test]
+        fn limited_writer_stops_at_the_limit() {
+            let mut out = LimitedWriter::new(Vec::new(), Some(5));
+            out.write_all(b"<a>").unwrap();
+            out.write_all(b"</").unwrap();
+            assert!(!out.exceeded());
+            let error = out.write_all(b"a>").unwrap_err();
+            assert!(out.exceeded());
+            assert_eq!(error.to_string(), "XML output size limit exceeded");
+            assert_eq!(out.inner, b"<a></");
+        }
+
+        #[test]
+        fn limited_writer_without_limit_passes_everything_through() {
+            let mut out = LimitedWriter::new(Vec::new(), None);
+            out.write_all(&[b'x'; 1024]).unwrap();
+            assert!(!out.exceeded());
+            assert_eq!(out.inner.len(), 1024);
+        }
+    }
+
     mod push_cdata_tests {
         use super::*;
 
@@ -1013,4 +3551,205 @@ mod tests {
             assert_eq!(out, "<![CDATA[a]]]]><![CDATA[>b]]]]><![CDATA[>c]]>");
         }
     }
+
+    mod parse_json_tests {
+        use super::*;
+
+        fn object(members: Vec<(&str, JsonValue)>) -> JsonValue {
+            JsonValue::Object(members.into_iter().map(|(k, v)| (k.to_owned(), v)).collect())
+        }
+
+        #[test]
+        fn parses_documents_like_json_loads() {
+            let text = " {\"a\": [1, -0, 2.5e1, 1E400, null, true, false],\n \"b\": {},\"c\":[ ]} ";
+            let expected = object(vec![
+                (
+                    "a",
+                    JsonValue::Array(vec![
+                        JsonValue::Int(1),
+                        JsonValue::Int(0),
+                        JsonValue::Float(25.0),
+                        JsonValue::Float(f64::INFINITY),
+                        JsonValue::Null,
+                        JsonValue::Bool(true),
+                        JsonValue::Bool(false),
+                    ]),
+                ),
+                ("b", object(vec![])),
+                ("c", JsonValue::Array(vec![])),
+            ]);
+            assert_eq!(parse_json(text), Ok(expected));
+            assert_eq!(
+                parse_json("[-Infinity, Infinity]"),
+                Ok(JsonValue::Array(vec![
+                    JsonValue::Float(f64::NEG_INFINITY),
+                    JsonValue::Float(f64::INFINITY),
+                ]))
+            );
+            assert!(matches!(parse_json("NaN"), Ok(JsonValue::Float(v)) if v.is_nan()));
+        }
+
+        #[test]
+        fn keeps_integers_beyond_i64_as_text() {
+            let big = "123456789012345678901234567890";
+            assert_eq!(parse_json(big), Ok(JsonValue::BigInt(big.to_owned())));
+            assert_eq!(parse_json(&format!("-{big}")), Ok(JsonValue::BigInt(format!("-{big}"))));
+            let too_long = "9".repeat(PYTHON_INT_MAX_STR_DIGITS + 1);
+            assert_eq!(parse_json(&too_long), Err(JsonTextError::Unsupported));
+        }
+
+        #[test]
+        fn decodes_string_escapes() {
+            let text = r#""a\"\\\/\b\f\n\r\t\u00e9\ud83d\ude00é""#;
+            let expected = "a\"\\/\u{8}\u{c}\n\r\t\u{e9}\u{1f600}é".to_owned();
+            assert_eq!(parse_json(text), Ok(JsonValue::Str(expected)));
+        }
+
+        #[test]
+        fn rejects_invalid_json() {
+            for text in [
+                "", "[1,]", "{\"a\":1,}", "{a:1}", "01", "1.", "1e", "+1", "[1 2]", "nul",
+                "\"a\nb\"", "\"\\x\"", "\"\\u12G4\"", "\"abc", "[", "{\"a\" 1}", "1 2",
+                "\u{feff}[]", "'a'",
+            ] {
+                assert_eq!(parse_json(text), Err(JsonTextError::Invalid), "{text:?}");
+            }
+        }
+
+        #[test]
+        fn leaves_python_only_documents_to_python() {
+            let nesting = |depth| format!("{}{}", "[".repeat(depth), "]".repeat(depth));
+            let deep = nesting(JSON_MAX_NESTING + 1);
+            for text in [
+                "{\"a\": 1, \"a\": 2}",
+                "{\"k0\":0,\"k1\":1,\"k2\":2,\"k3\":3,\"k4\":4,\"k5\":5,\"k6\":6,\"k7\":7,\"k3\":9}",
+                "{\"@attrs\": {}}",
+                "[{\"x\": {\"@val\": 1}}]",
+                "\"\\ud800\"",
+                "\"\\udc00\"",
+                "\"\\ud800\\u0041\"",
+                deep.as_str(),
+            ] {
+                assert_eq!(parse_json(text), Err(JsonTextError::Unsupported), "{text:?}");
+            }
+            assert!(parse_json(&nesting(JSON_MAX_NESTING)).is_ok());
+            assert!(parse_json("{\"tags@flat\": [1], \"a@b\": 2}").is_ok());
+        }
+
+        #[test]
+        fn stops_at_the_first_value_over_a_limit() {
+            let items = Err(JsonTextError::Limit(LimitExceeded::Items));
+            let depth = Err(JsonTextError::Limit(LimitExceeded::Depth));
+            // The document counts as a value, and the rest of the text is never read.
+            assert_eq!(parse_json_limited("[1, 2, oops", None, Some(2)), items);
+            assert!(parse_json_limited("[1, 2]", None, Some(3)).is_ok());
+            assert_eq!(parse_json_limited("[[1]", Some(1), None), depth);
+            assert!(parse_json_limited("[[]]", Some(1), None).is_ok());
+            // As in the Python event path, the item limit is checked first and a scalar is
+            // counted once it has been read.
+            assert_eq!(parse_json_limited("[[1]]", Some(1), Some(2)), items);
+            assert_eq!(parse_json_limited("[1, x]", None, Some(2)), Err(JsonTextError::Invalid));
+            let special = parse_json_limited("{\"@val\": [[1]]}", Some(1), None);
+            assert_eq!(special, Err(JsonTextError::Unsupported));
+            let deep = format!("{}{}", "[".repeat(JSON_MAX_NESTING + 1), "]".repeat(600));
+            assert_eq!(parse_json_limited(&deep, Some(100), None), depth);
+        }
+    }
+
+    mod python_float_repr_tests {
+        use super::*;
+
+        #[test]
+        fn places_the_point_like_python() {
+            let cases = [
+                (0.0, "0.0"),
+                (-0.0, "-0.0"),
+                (1.0, "1.0"),
+                (-1.5, "-1.5"),
+                (0.1, "0.1"),
+                (0.0001, "0.0001"),
+                (0.00001, "1e-05"),
+                (1.234e-5, "1.234e-05"),
+                (1e15, "1000000000000000.0"),
+                (1e16, "1e+16"),
+                (1.5e300, "1.5e+300"),
+                (5e-324, "5e-324"),
+                (f64::MAX, "1.7976931348623157e+308"),
+                (f64::INFINITY, "inf"),
+                (f64::NEG_INFINITY, "-inf"),
+                (f64::NAN, "nan"),
+            ];
+            for (value, expected) in cases {
+                assert_eq!(python_float_repr(value), expected);
+            }
+        }
+
+        #[test]
+        fn breaks_ties_toward_the_closest_shortest_digits() {
+            // Both ...10.2 and ...10.3 round-trip; Python prints the closer one.
+            assert_eq!(python_float_repr(779539845543410.2), "779539845543410.2");
+            assert_eq!(python_float_repr(-233891771783429.62), "-233891771783429.62");
+        }
+    }
+
+    mod address_hasher_tests {
+        use super::*;
+
+        fn hash_address(address: usize) -> u64 {
+            let mut hasher = AddressHasher::default();
+            hasher.write_usize(address);
+            hasher.finish()
+        }
+
+        #[test]
+        fn aligned_addresses_differ_in_low_bits() {
+            let buckets: std::collections::HashSet<u64> =
+                (0..64).map(|slot| hash_address(0x7F00_0000 + slot * 16) & 63).collect();
+            assert!(buckets.len() > 32, "{} buckets", buckets.len());
+        }
+    }
+
+    mod id_generator_tests {
+        use super::*;
+
+        #[test]
+        fn parses_the_python_strategy_names() {
+            assert_eq!(IdStrategy::parse("seeded"), Some(IdStrategy::Seeded));
+            assert_eq!(IdStrategy::parse("uuid"), None);
+        }
+
+        #[test]
+        fn seeded_ids_follow_splitmix64() {
+            let mut ids = IdGenerator::new(IdStrategy::Seeded, 0);
+            assert_eq!(ids.splitmix64(), 0xE220_A839_7B1D_CDAF);
+            assert_eq!(ids.splitmix64(), 0x6E78_9E6A_A1B9_65F4);
+            assert_eq!(ids.splitmix64(), 0x06C4_5D18_8009_454F);
+        }
+
+        #[test]
+        fn seeded_ids_match_python() {
+            let mut ids = IdGenerator::new(IdStrategy::Seeded, 7);
+            assert_eq!(ids.next_id("root", Some("users")), "root_174487");
+            assert_eq!(ids.next_id("root", Some("name")), "root_355804");
+        }
+
+        #[test]
+        fn counter_and_path_ids_match_python() {
+            let mut counter = IdGenerator::new(IdStrategy::Counter, 0);
+            assert_eq!(counter.next_id("root", Some("users")), "root_1");
+            assert_eq!(counter.next_id("root", None), "root_2");
+            let mut path = IdGenerator::new(IdStrategy::Path, 0);
+            assert_eq!(path.next_id("root", Some("users")), "root_users");
+            assert_eq!(path.next_id("root", None), "root");
+            assert_eq!(path.next_id("root", Some("a_b%")), "root_a%5Fb%25");
+        }
+
+        #[test]
+        fn random_ids_keep_the_six_digit_shape() {
+            let mut ids = IdGenerator::new(IdStrategy::Random, 0);
+            let id = ids.next_id("root", Some("a"));
+            let suffix: u64 = id.strip_prefix("root_").unwrap().parse().unwrap();
+            assert!((100_000..1_000_000).contains(&suffix));
+        }
+    }
 }
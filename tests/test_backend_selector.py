@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import sys
+from typing import Any
+
 import pytest
 
-from json2xml.backend_selector import BackendSelector, ConversionRequest, has_special_keys
+from json2xml.backend_selector import (
+    BackendFallback,
+    BackendSelector,
+    ConversionRequest,
+    has_special_keys,
+)
 
 
 class _NeverBackend:
@@ -15,16 +23,24 @@ class _NeverBackend:
         raise AssertionError("render should not be called")
 
 
-# @lat: [[tests#Conversion behavior#Backend selector detects Python-only payload markers]]
-def test_has_special_keys_detects_nested_python_only_markers() -> None:
-    assert has_special_keys({"items": [{"record": {"@attrs": {"id": "7"}}}]}) is True
-    assert has_special_keys({"items": [{"record@flat": [1, 2, 3]}]}) is True
-    assert has_special_keys({"items": [{"record": {"name": "Ada"}}]}) is False
+class _StaticBackend:
+    def __init__(self, name: str, result: bytes | BackendFallback) -> None:
+        self.name = name
+        self.result = result
+        self.calls = 0
 
+    def can_handle(self, request: ConversionRequest) -> bool:
+        return True
 
-# @lat: [[tests#Conversion behavior#Backend selector fails loudly with no compatible backend]]
-def test_backend_selector_raises_when_no_backend_can_handle_request() -> None:
-    request = ConversionRequest(
+    def render(self, request: ConversionRequest) -> bytes:
+        self.calls += 1
+        if isinstance(self.result, BackendFallback):
+            raise self.result
+        return self.result
+
+
+def _request() -> ConversionRequest:
+    return ConversionRequest(
         obj={"name": "Ada"},
         root=True,
         custom_root="root",
@@ -38,7 +54,36 @@ def test_backend_selector_raises_when_no_backend_can_handle_request() -> None:
         xpath_format=False,
     )
 
+
+# @lat: [[tests#Conversion behavior#Backend selector detects Python-only payload markers]]
+def test_has_special_keys_detects_nested_python_only_markers() -> None:
+    assert has_special_keys({"items": [{"record": {"@attrs": {"id": "7"}}}]}) is True
+    assert has_special_keys({"items": [{"record@flat": [1, 2, 3]}]}) is True
+    assert has_special_keys({"items": [{"record": {"name": "Ada"}}]}) is False
+
+
+def test_has_special_keys_handles_nesting_beyond_the_recursion_limit() -> None:
+    deep: list[Any] = [{"@val": 1}]
+    for _ in range(sys.getrecursionlimit() * 2):
+        deep = [deep]
+
+    assert has_special_keys(deep) is True
+
+
+# @lat: [[tests#Conversion behavior#Backend selector retries after a fallback signal]]
+def test_backend_selector_moves_on_when_a_backend_signals_fallback() -> None:
+    speculative = _StaticBackend("rust", BackendFallback("needs Python"))
+    exact = _StaticBackend("python", b"<root/>")
+
+    assert BackendSelector(speculative, exact).render(_request()) == b"<root/>"
+    assert (speculative.calls, exact.calls) == (1, 1)
+    with pytest.raises(RuntimeError, match="No XML backend can handle"):
+        BackendSelector(speculative).render(_request())
+
+
+# @lat: [[tests#Conversion behavior#Backend selector fails loudly with no compatible backend]]
+def test_backend_selector_raises_when_no_backend_can_handle_request() -> None:
     selector = BackendSelector(_NeverBackend())
 
     with pytest.raises(RuntimeError, match="No XML backend can handle"):
-        selector.render(request)
+        selector.render(_request())
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import argparse
+
+import pytest
+
+import benchmark_threads as benchmark
+
+
+# @lat: [[tests#Performance benchmarks#Threaded benchmark checks output and scales from one thread]]
+def test_benchmark_threads_reports_speedup_relative_to_first_count() -> None:
+    payload = benchmark.make_payload(5)
+
+    rows = benchmark.run(benchmark.converter("python"), payload, [1, 3], conversions=6)
+
+    assert payload == benchmark.make_payload(5)
+    assert [row["threads"] for row in rows] == [1, 3]
+    assert rows[0]["speedup"] == 1.0
+    assert rows[1]["speedup"] == rows[1]["throughput"] / rows[0]["throughput"]
+
+
+# @lat: [[tests#Performance benchmarks#Threaded benchmark checks output and scales from one thread]]
+def test_benchmark_threads_rejects_mismatched_threaded_output() -> None:
+    outputs = iter([b"<serial/>", b"<serial/>", b"<other/>"])
+
+    with pytest.raises(AssertionError, match="differs from serial output with 2 threads"):
+        benchmark.measure(lambda _: next(outputs), [], threads=2, conversions=2)
+
+
+@pytest.mark.parametrize("value", ["", "0,2", "two"])
+def test_benchmark_threads_rejects_bad_thread_counts(value: str) -> None:
+    with pytest.raises(argparse.ArgumentTypeError):
+        benchmark.parse_threads(value)
@@ -715,6 +715,181 @@ class TestCLIUnitTests:
             content = output_file.read_text()
             assert "<key" in content
 
+    # @lat: [[tests#CLI input resolution#Output files are streamed]]
+    def test_main_streams_output_file_without_buffering(self) -> None:
+        """File output is written through the converter sink, not built with to_xml."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_file = Path(tmpdir) / "output.xml"
+
+            with patch("json2xml.cli.Json2xml.to_xml") as to_xml:
+                exit_code = main(["-s", '{"key": "value"}', "-o", str(output_file)])
+
+            to_xml.assert_not_called()
+            assert exit_code == 0
+            assert output_file.read_bytes() == (
+                b'<?xml version="1.0" encoding="UTF-8" ?>'
+                b'<all><key type="str">value</key></all>'
+            )
+
+    def test_main_removes_partial_output_file_on_conversion_error(
+        self, capsys: CaptureFixture[str]
+    ) -> None:
+        """A failed conversion does not leave a truncated document on disk."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_file = Path(tmpdir) / "output.xml"
+
+            exit_code = main(["-s", '{"bad": "\\u0000"}', "-o", str(output_file)])
+
+            assert exit_code == 1
+            assert not output_file.exists()
+        assert "Error converting to XML" in capsys.readouterr().err
+
+    def test_main_reports_empty_data_for_output_file(self, capsys: CaptureFixture[str]) -> None:
+        """JSON null input is rejected before the output file is created."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_file = Path(tmpdir) / "output.xml"
+
+            exit_code = main(["-s", "null", "-o", str(output_file)])
+
+            assert exit_code == 1
+            assert not output_file.exists()
+        assert "Empty data" in capsys.readouterr().err
+
+    def test_main_reports_output_file_open_error(self, capsys: CaptureFixture[str]) -> None:
+        """Unopenable output paths exit with the file-writing error."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_file = Path(tmpdir) / "missing" / "output.xml"
+
+            with pytest.raises(SystemExit) as exc_info:
+                main(["-s", '{"key": "value"}', "-o", str(output_file)])
+
+        assert exc_info.value.code == 1
+        assert "Error writing to file" in capsys.readouterr().err
+
+    def test_main_reports_output_file_write_error(self, capsys: CaptureFixture[str]) -> None:
+        """Sink write failures exit with the file-writing error and remove the file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_file = Path(tmpdir) / "output.xml"
+
+            with patch("json2xml.cli.Json2xml.write_to", side_effect=OSError("disk full")):
+                with pytest.raises(SystemExit) as exc_info:
+                    main(["-s", '{"key": "value"}', "-o", str(output_file)])
+
+            assert not output_file.exists()
+        assert exc_info.value.code == 1
+        assert "Error writing to file: disk full" in capsys.readouterr().err
+
+    # @lat: [[tests#CLI input resolution#NDJSON mode converts each line]]
+    def test_main_ndjson_file_prints_one_record_per_line(
+        self, tmp_path: Path, capsys: CaptureFixture[str]
+    ) -> None:
+        """--ndjson prints one XML document per non-blank input line."""
+        input_file = tmp_path / "logs.jsonl"
+        input_file.write_text('{"a": 1}\n\n{"a": 2}\n', encoding="utf-8")
+
+        exit_code = main(["--ndjson", "--no-type", str(input_file)])
+
+        assert exit_code == 0
+        assert capsys.readouterr().out.splitlines() == [
+            '<?xml version="1.0" encoding="UTF-8" ?><all><a>1</a></all>',
+            '<?xml version="1.0" encoding="UTF-8" ?><all><a>2</a></all>',
+        ]
+
+    def test_main_ndjson_streams_root_to_output_file(self, tmp_path: Path) -> None:
+        """--stream-root and -o produce a single document written record by record."""
+        output_file = tmp_path / "out.xml"
+
+        exit_code = main([
+            "--ndjson", "--stream-root", "records", "-j", "2", "--no-type",
+            "-s", '{"a": 1}\n{"a": 2}', "-o", str(output_file),
+        ])
+
+        assert exit_code == 0
+        assert output_file.read_bytes() == (
+            b'<?xml version="1.0" encoding="UTF-8" ?><records>\n'
+            b"<all><a>1</a></all>\n<all><a>2</a></all>\n</records>\n"
+        )
+
+    def test_main_jobs_split_a_large_top_level_array(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """-j gives Json2xml its worker count for regular conversions too."""
+        monkeypatch.setattr("json2xml.json2xml.PARALLEL_MIN_MEMBERS", 2)
+        output_file = tmp_path / "out.xml"
+
+        exit_code = main(["-j", "2", "--no-type", "-s", "[1, 2, 3]", "-o", str(output_file)])
+
+        assert exit_code == 0
+        assert output_file.read_bytes() == (
+            b'<?xml version="1.0" encoding="UTF-8" ?><all><item>1</item><item>2</item>'
+            b"<item>3</item></all>"
+        )
+
+    def test_main_ndjson_reads_stdin(self, capsys: CaptureFixture[str]) -> None:
+        """A dash or piped stdin feeds lines without reading them all first."""
+        with patch("sys.stdin", io.StringIO('[1]\n"x"\n')):
+            exit_code = main(["--ndjson", "--no-type", "-"])
+
+        assert exit_code == 0
+        assert capsys.readouterr().out.count("<?xml") == 2
+
+    def test_main_ndjson_reports_bad_lines_and_removes_output(
+        self, tmp_path: Path, capsys: CaptureFixture[str]
+    ) -> None:
+        """Invalid lines fail the run with their line number and leave no partial file."""
+        output_file = tmp_path / "out.xml"
+
+        exit_code = main(["--ndjson", "-s", '{"a": 1}\nnope', "-o", str(output_file)])
+
+        assert exit_code == 1
+        assert not output_file.exists()
+        assert "Invalid JSON on line 2" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        ("argv", "message"),
+        [
+            (["-u", "https://example.com/data.jsonl"], "not --url"),
+            (["-p", "-s", "{}"], "--pretty is not supported with --ndjson"),
+            (["missing.jsonl"], "JSON file not found: missing.jsonl"),
+        ],
+    )
+    def test_main_ndjson_rejects_unsupported_inputs(
+        self, argv: list[str], message: str, capsys: CaptureFixture[str]
+    ) -> None:
+        """Unsupported sources and options exit with an actionable message."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--ndjson", *argv])
+
+        assert exc_info.value.code == 1
+        assert message in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        ("argv", "message"),
+        [
+            (["-s", "{}", "--stream-root", "records"], "--stream-root requires --ndjson"),
+            (["-s", "{}", "-j", "0"], "must be a positive integer: '0'"),
+            (["-s", "{}", "--jobs", "-1"], "must be a positive integer: '-1'"),
+            (["-s", "{}", "-j", "two"], "must be a positive integer: 'two'"),
+        ],
+    )
+    def test_main_rejects_invalid_parallel_options_as_usage_errors(
+        self, argv: list[str], message: str, capsys: CaptureFixture[str]
+    ) -> None:
+        """Option mistakes are reported by argparse before any input is read."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(argv)
+
+        assert exc_info.value.code == 2
+        assert message in capsys.readouterr().err
+
+    def test_main_ndjson_requires_input(self, capsys: CaptureFixture[str]) -> None:
+        """Interactive stdin without a file or --string is rejected."""
+        with patch("sys.stdin.isatty", return_value=True):
+            with pytest.raises(SystemExit):
+                main(["--ndjson"])
+
+        assert "No input provided" in capsys.readouterr().err
+
     # @lat: [[tests#CLI input resolution#Dash argument reads stdin]]
     def test_read_input_stdin_dash_argument(self) -> None:
         """Test read_input with '-' as input_file reads from stdin."""
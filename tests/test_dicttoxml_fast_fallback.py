@@ -1,12 +1,18 @@
 """Tests for optional Rust backend selection in dicttoxml_fast."""
 from __future__ import annotations
 
+import datetime
+import io
+from types import MappingProxyType
 from typing import Any
 from unittest.mock import Mock
 
 import pytest
 
+import json2xml.dicttoxml as _py_dicttoxml
 import json2xml.dicttoxml_fast as fast_module
+from json2xml.dicttoxml import ConversionLimits
+from json2xml.utils import InvalidDataError
 
 
 def _force_rust_backend(monkeypatch: pytest.MonkeyPatch) -> Mock:
@@ -78,8 +84,10 @@ def test_fast_wrapper_uses_rust_when_available_for_supported_options(
     [
         ({"ids": [1]}, b'id="'),
         ({"item_func": lambda parent: "entry"}, b"<entry"),
+        ({"item_func": {"items": "entry"}}, b"<entry"),
         ({"xml_namespaces": {"demo": "https://example.com/demo"}}, b'xmlns:demo="https://example.com/demo"'),
         ({"xpath_format": True}, b'xmlns="http://www.w3.org/2005/xpath-functions"'),
+        ({"pretty": True}, b'\n  <items type="list">\n'),
     ],
 )
 def test_fast_wrapper_falls_back_to_python_for_unsupported_options(
@@ -96,6 +104,114 @@ def test_fast_wrapper_falls_back_to_python_for_unsupported_options(
     rust_backend.assert_not_called()
 
 
+# @lat: [[tests#XML helper behavior#Rust pretty layout matches Python indentation]]
+def test_fast_wrapper_sends_pretty_requests_to_capable_rust_builds(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Rust builds whose signature accepts ``pretty`` render indented output natively."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    monkeypatch.setattr(fast_module, "_rust_features", frozenset({"pretty", "indent"}))
+
+    assert fast_module.dicttoxml({"items": [1]}, pretty=True, indent=4) == b"<rust/>"
+    rust_backend.assert_called_once_with(
+        {"items": [1]},
+        root=True,
+        custom_root="root",
+        attr_type=True,
+        item_wrap=True,
+        cdata=False,
+        list_headers=False,
+        pretty=True,
+        indent=4,
+    )
+    with pytest.raises(ValueError, match="indent must be a non-negative integer"):
+        fast_module.dicttoxml({"items": [1]}, pretty=True, indent=-1)
+
+
+# @lat: [[tests#Conversion behavior#Rust renders can release the GIL]]
+@pytest.mark.parametrize(
+    ("features", "expected"), [(frozenset({"release_gil"}), {"release_gil": True}), (frozenset(), {})]
+)
+def test_fast_wrapper_releases_the_gil_only_on_capable_rust_builds(
+    monkeypatch: pytest.MonkeyPatch, features: frozenset[str], expected: dict[str, Any]
+) -> None:
+    """``release_gil`` is forwarded to builds that accept it and ignored by older ones."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    monkeypatch.setattr(fast_module, "_rust_features", features)
+
+    assert fast_module.dicttoxml({"items": [1]}, release_gil=True) == b"<rust/>"
+    rust_backend.assert_called_once_with(
+        {"items": [1]},
+        root=True,
+        custom_root="root",
+        attr_type=True,
+        item_wrap=True,
+        cdata=False,
+        list_headers=False,
+        **expected,
+    )
+
+
+# @lat: [[tests#Conversion behavior#Workers split large top-level containers]]
+def test_render_counted_takes_the_item_count_from_the_render(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Capable Rust builds count as they render, older ones are walked, Python uses its budget."""
+    limits = ConversionLimits(max_depth=10, max_items=100, max_output_bytes=1_000)
+    options: dict[str, Any] = {
+        "root": True,
+        "custom_root": "all",
+        "attr_type": True,
+        "item_wrap": True,
+        "cdata": False,
+        "list_headers": False,
+        "pretty": False,
+        "limits": limits,
+    }
+    rust_backend = _force_rust_backend(monkeypatch)
+    rust_backend.return_value = (4, b"<rust/>")
+    monkeypatch.setattr(fast_module, "_rust_limit_errors", (OverflowError,))
+    monkeypatch.setattr(
+        fast_module, "_rust_features", frozenset({"count_items", "release_gil", "max_depth"})
+    )
+
+    assert fast_module._renders_without_gil()
+    assert fast_module._render_counted([1, [2]], **options) == (4, b"<rust/>")
+    assert rust_backend.call_args.kwargs == {
+        "root": True,
+        "custom_root": "all",
+        "attr_type": True,
+        "item_wrap": True,
+        "cdata": False,
+        "list_headers": False,
+        "release_gil": True,
+        "max_depth": 10,
+        "max_items": 100,
+        "max_output_bytes": 1_000,
+        "count_items": True,
+    }
+
+    rust_backend.return_value = b"<rust/>"
+    monkeypatch.setattr(fast_module, "_rust_features", frozenset({"release_gil", "max_depth"}))
+    assert not fast_module._renders_without_gil()
+    assert fast_module._render_counted([1, [2]], **options) == (4, b"<rust/>")
+
+    rust_backend.side_effect = LookupError("needs Python")
+    monkeypatch.setattr(fast_module, "_rust_fallback_errors", (LookupError,))
+    python = _py_dicttoxml.dicttoxml([1, [2]], custom_root="all")
+    assert fast_module._render_counted([1, [2]], **options) == (4, python)
+
+
+def test_rust_keyword_probe_tolerates_missing_signatures() -> None:
+    """Extensions without introspectable signatures are treated as supporting no new options."""
+
+    def backend(obj: Any, pretty: bool = False, indent: int = 2) -> bytes:
+        return b""
+
+    assert fast_module._keyword_parameters(backend) == frozenset({"obj", "pretty", "indent"})
+    assert fast_module._keyword_parameters(Mock(side_effect=None, __signature__=1)) == frozenset()
+
+
 # @lat: [[tests#Conversion behavior#Special keys force Python fallback]]
 def test_fast_wrapper_falls_back_to_python_for_special_keys(
     monkeypatch: pytest.MonkeyPatch,
@@ -151,3 +267,197 @@ def test_fast_helper_functions_use_python_fallback(
 
     assert fast_module.escape_xml("Ada & <XML>") == "Ada &amp; &lt;XML&gt;"
     assert fast_module.wrap_cdata("Ada <XML>") == "<![CDATA[Ada <XML>]]>"
+
+
+def test_fast_iter_dicttoxml_streams_with_python_engine(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Chunked output keeps memory bounded, so it never buffers a whole Rust document."""
+    rust_backend = _force_rust_backend(monkeypatch)
+
+    chunks = list(fast_module.iter_dicttoxml({"name": "Ada"}, chunk_size=4))
+
+    assert b"".join(chunks) == fast_module._py_dicttoxml.dicttoxml({"name": "Ada"})
+    rust_backend.assert_not_called()
+
+
+def test_fast_dicttoxml_streams_sink_output_with_python_engine(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Sinks get bounded-memory output, so the Rust whole-document renderer is skipped."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    sink = io.BytesIO()
+
+    assert fast_module.dicttoxml({"name": "Ada"}, sink=sink) is None
+
+    assert sink.getvalue() == fast_module._py_dicttoxml.dicttoxml({"name": "Ada"})
+    rust_backend.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("limits", "message"),
+    [
+        ((1, 100, 100), "JSON nesting depth limit exceeded"),
+        ((10, 3, 100), "JSON item limit exceeded"),
+        ((10, 100, 6), "XML output size limit exceeded"),
+    ],
+)
+def test_fast_wrapper_applies_limits_around_rust_render(
+    monkeypatch: pytest.MonkeyPatch, limits: tuple[int, int, int], message: str
+) -> None:
+    """The whole-document Rust renderer gets a structural pre-walk and an exact size check."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    data = {"name": "Ada", "tags": ["a", {"b": "c"}]}
+
+    with pytest.raises(InvalidDataError, match=message):
+        fast_module.dicttoxml(data, limits=ConversionLimits(*limits))
+    assert rust_backend.called is (message == "XML output size limit exceeded")
+    assert fast_module.dicttoxml(data, limits=ConversionLimits(3, 6, 7)) == b"<rust/>"
+
+
+class _RustLimitError(ValueError):
+    """Stand-in for ``json2xml_rs.ConversionLimitError``."""
+
+
+# @lat: [[tests#XML helper behavior#Rust limits match the Python budget]]
+def test_fast_wrapper_lets_capable_rust_builds_enforce_limits(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Builds that accept the limits skip the pre-walk and report limit errors as invalid data."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    monkeypatch.setattr(fast_module, "_rust_limit_errors", (_RustLimitError,))
+    data = {"name": "Ada", "tags": ["a", {"b": "c"}]}
+
+    assert fast_module.dicttoxml(data, limits=ConversionLimits(1, 3, 100)) == b"<rust/>"
+    kwargs = rust_backend.call_args.kwargs
+    assert (kwargs["max_depth"], kwargs["max_items"], kwargs["max_output_bytes"]) == (1, 3, 100)
+    rust_backend.side_effect = _RustLimitError("JSON item limit exceeded")
+    with pytest.raises(InvalidDataError, match="JSON item limit exceeded") as error:
+        fast_module.dicttoxml(data, limits=ConversionLimits(1, 3, 100))
+    assert isinstance(error.value.__cause__, _RustLimitError)
+
+
+# @lat: [[tests#XML helper behavior#Rust XPath output matches Python]]
+def test_fast_wrapper_sends_xpath_requests_to_capable_rust_builds(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """XPath output ignores special keys, so capable builds render it without the key scan."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    monkeypatch.setattr(fast_module, "_rust_features", frozenset({"xpath_format"}))
+    data = {"user": {"@attrs": {"id": 1}, "@val": "Ada"}}
+
+    assert fast_module.dicttoxml(data, xpath_format=True) == b"<rust/>"
+    assert rust_backend.call_args.kwargs["xpath_format"] is True
+    rust_backend.reset_mock()
+    assert b'id="1"' in fast_module.dicttoxml(data)
+    rust_backend.assert_not_called()
+
+
+# @lat: [[tests#XML helper behavior#Rust special keys match Python]]
+def test_fast_wrapper_sends_special_keys_to_capable_rust_builds(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Builds listing ``special_keys`` in FEATURES render @attrs/@val/@flat without the scan."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    monkeypatch.setattr(fast_module, "_rust_features", frozenset({"special_keys"}))
+
+    assert fast_module.dicttoxml({"user": {"@attrs": {"id": 1}, "@val": "Ada"}}) == b"<rust/>"
+    rust_backend.assert_called_once()
+
+
+# @lat: [[tests#XML helper behavior#Rust namespaces and item names match Python]]
+def test_fast_wrapper_sends_namespaces_and_item_names_to_capable_rust_builds(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Builds accepting ``xml_namespaces`` and ``item_func`` get them; mappings arrive as dicts."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    monkeypatch.setattr(fast_module, "_rust_features", frozenset({"xml_namespaces", "item_func"}))
+    namespaces = {"soap": "http://schemas.xmlsoap.org/soap/envelope/"}
+
+    def item_func(parent: str) -> str:
+        return parent[:-1]
+
+    fast_module.dicttoxml({"users": ["Ada"]}, xml_namespaces=namespaces, item_func=item_func)
+    fast_module.dicttoxml({"users": ["Ada"]}, item_func=MappingProxyType({"users": "user"}))
+
+    assert rust_backend.call_args_list[0].kwargs["xml_namespaces"] is namespaces
+    assert rust_backend.call_args_list[0].kwargs["item_func"] is item_func
+    assert rust_backend.call_args_list[1].kwargs["item_func"] == {"users": "user"}
+    assert type(rust_backend.call_args_list[1].kwargs["item_func"]) is dict
+    chunks = fast_module.iter_dicttoxml({"users": ["Ada"]}, item_func={"users": "user"})
+    assert b'<users type="list"><user type="str">Ada</user></users>' in b"".join(chunks)
+
+
+class _RustFallback(Exception):
+    """Stand-in for ``json2xml_rs.FallbackRequired``."""
+
+
+# @lat: [[tests#Conversion behavior#Backend selector retries after a fallback signal]]
+def test_fast_wrapper_rerenders_in_python_when_strict_rust_builds_give_up(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Strict builds render speculatively; a fallback signal hands the request to Python."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    monkeypatch.setattr(fast_module, "_rust_fallback_errors", (_RustFallback,))
+    data = {"when": datetime.date(2024, 1, 2)}
+
+    assert fast_module.dicttoxml({"name": "Ada"}) == b"<rust/>"
+    assert rust_backend.call_args.kwargs["strict"] is True
+    rust_backend.side_effect = _RustFallback("value needs the Python serializer")
+    assert fast_module.dicttoxml(data) == _py_dicttoxml.dicttoxml(data)
+
+
+# @lat: [[tests#Conversion behavior#JSON text converts natively when Rust is installed]]
+def test_json_to_xml_uses_capable_rust_builds(monkeypatch: pytest.MonkeyPatch) -> None:
+    """JSON text goes to builds with ``json_to_xml``; None asks the caller to decode it."""
+    native = Mock(return_value=b"<native/>")
+    assert fast_module.json_to_xml("{}") is None
+    _force_rust_backend(monkeypatch)
+    assert fast_module.json_to_xml("{}") is None
+    monkeypatch.setattr(fast_module, "_rust_json_to_xml", native)
+    monkeypatch.setattr(fast_module, "_rust_limit_errors", (_RustLimitError,))
+    monkeypatch.setattr(fast_module, "_rust_fallback_errors", (_RustFallback,))
+
+    assert fast_module.json_to_xml(b"[1]", pretty=True, limits=ConversionLimits(1, 2, 3)) == (
+        b"<native/>"
+    )
+    native.assert_called_once_with(
+        b"[1]",
+        root=True,
+        custom_root="root",
+        attr_type=True,
+        item_wrap=True,
+        cdata=False,
+        list_headers=False,
+        pretty=True,
+        indent=2,
+        max_depth=1,
+        max_items=2,
+        max_output_bytes=3,
+    )
+    native.side_effect = _RustLimitError("JSON item limit exceeded")
+    with pytest.raises(InvalidDataError, match="JSON item limit exceeded"):
+        fast_module.json_to_xml("[1]")
+    native.side_effect = _RustFallback("JSON text needs the Python decoder")
+    assert fast_module.json_to_xml('{"@attrs": {}}') is None
+    with pytest.raises(ValueError, match="indent must be a non-negative integer"):
+        fast_module.json_to_xml("[1]", indent=-1)
+
+
+# @lat: [[tests#XML helper behavior#Element ID strategies are reproducible]]
+def test_fast_wrapper_sends_id_strategies_to_capable_rust_builds(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Builds accepting ``id_strategy`` get ids; older builds leave them to Python."""
+    rust_backend = _force_rust_backend(monkeypatch)
+    data = {"name": "Ada"}
+
+    result = fast_module.dicttoxml(data, ids=True, id_strategy="counter")
+    assert b'<name id="root_1" type="str">Ada</name>' in result
+    rust_backend.assert_not_called()
+
+    monkeypatch.setattr(fast_module, "_rust_features", frozenset({"id_strategy"}))
+    assert fast_module.dicttoxml(data, ids=True, id_strategy="seeded", id_seed=3) == b"<rust/>"
+    assert rust_backend.call_args.kwargs["ids"] is True
+    assert rust_backend.call_args.kwargs["id_strategy"] == "seeded"
+    assert rust_backend.call_args.kwargs["id_seed"] == 3
@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import array
+import datetime
+import io
+import json
 import numbers
+import os
+import re
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from fractions import Fraction
+from types import SimpleNamespace
 from typing import Any
+from unittest.mock import Mock
 
 import pytest
 
 from json2xml import dicttoxml
+from json2xml.utils import InvalidDataError, iter_json_events
 
 
 class CustomNumber(numbers.Number):
@@ -24,6 +36,17 @@ class CustomNumber(numbers.Number):
         return 7
 
 
+class StructuredArray:
+    """Array with named fields, read one field at a time like a NumPy structured array."""
+
+    def __init__(self, fields: dict[str, Any]) -> None:
+        self._fields = fields
+        self.dtype = SimpleNamespace(names=tuple(fields))
+
+    def __getitem__(self, name: str) -> Any:
+        return self._fields[name]
+
+
 class StringSubclass(str):
     pass
 
@@ -311,7 +334,7 @@ def test_container_helpers_set_type_without_mutating_caller_attrs() -> None:
 
 
 # @lat: [[tests#XML helper behavior#XML name validity fast and cached paths]]
-def test_key_is_valid_xml_fast_and_parse_paths_are_stable_under_cache() -> None:
+def test_key_is_valid_xml_ascii_and_unicode_paths_are_stable_under_cache() -> None:
     dicttoxml.key_is_valid_xml.cache_clear()
 
     cases = {
@@ -319,9 +342,16 @@ def test_key_is_valid_xml_fast_and_parse_paths_are_stable_under_cache() -> None:
         "_bar-1": True,
         "café": True,
         "éclair": True,
+        "xmlfoo": True,
+        "名前": True,
+        "a々·\u0300": True,
         "1foo": False,
         "foo:bar": False,
         "": False,
+        "々": False,
+        "ǅ": False,
+        "０": False,
+        "\U00010000": False,
     }
 
     first = {key: dicttoxml.key_is_valid_xml(key) for key in cases}
@@ -331,6 +361,213 @@ def test_key_is_valid_xml_fast_and_parse_paths_are_stable_under_cache() -> None:
     assert second == cases
     cache_info = dicttoxml.key_is_valid_xml.cache_info()
     assert cache_info.hits >= len(cases)
+    assert cache_info.currsize == len(cases)
+
+
+# @lat: [[tests#XML helper behavior#Name caches are shared across threads]]
+def test_shared_cache_keys_keyword_calls_and_evicts_oldest_when_full() -> None:
+    calls: list[int] = []
+
+    @dicttoxml._shared_cache(maxsize=2)
+    def scale(value: int, factor: int = 2) -> int:
+        calls.append(value)
+        return value * factor
+
+    assert [scale(1), scale(1), scale(2, factor=3), scale(2, factor=3)] == [2, 2, 6, 6]
+    assert calls == [1, 2]
+    assert scale.cache_info() == (2, 2, 2, 2)
+    assert scale(3) == 6
+    assert scale(2, factor=3) == 6
+    assert calls == [1, 2, 3]
+    assert scale.cache_info() == (3, 3, 2, 2)
+    assert scale(1) == 2
+    assert calls == [1, 2, 3, 1]
+    scale.cache_clear()
+    assert scale.cache_info() == (0, 0, 2, 0)
+    assert scale.__name__ == "scale"
+
+
+# @lat: [[tests#XML helper behavior#Name caches are shared across threads]]
+def test_concurrent_conversions_match_serial_output() -> None:
+    data = {
+        "rows": [{"name": f"n{i}", "1st": i, "ok": i % 3 == 0, "note": None} for i in range(64)],
+        "extra": [{f"key {i % 5}": i, "caf\u00e9": float(i)} for i in range(64)],
+    }
+    expected = dicttoxml.dicttoxml(data)
+    barrier = threading.Barrier(8)
+
+    def convert(_: int) -> bytes:
+        barrier.wait(timeout=10)
+        for cached in (
+            dicttoxml.key_is_valid_xml,
+            dicttoxml._scalar_tags,
+            dicttoxml._record_emitter,
+        ):
+            cached.cache_clear()
+        return dicttoxml.dicttoxml(data)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(convert, range(32)))
+
+    assert results == [expected] * 32
+
+
+# @lat: [[tests#XML helper behavior#XML name validity fast and cached paths]]
+@pytest.mark.parametrize("key", ["a ", " a", "a\n", "\ta", ">", 'a="x" b'])
+def test_names_padded_to_fit_a_probe_document_are_rejected(key: str) -> None:
+    assert not dicttoxml.key_is_valid_xml(key)
+    assert not dicttoxml.key_is_valid_xml_attr(key)
+    with pytest.raises(ValueError, match="Invalid XML attribute name"):
+        dicttoxml.make_attrstring({key: "value", "id": 1})
+
+
+def test_make_valid_xml_name_replaces_trailing_spaces() -> None:
+    assert dicttoxml.make_valid_xml_name("a ", {}) == ("a_", {})
+
+
+# @lat: [[tests#XML helper behavior#Scalar tags are cached per key and type]]
+def test_scalar_tags_match_uncached_names_and_are_reused(monkeypatch: pytest.MonkeyPatch) -> None:
+    dicttoxml._scalar_tags.cache_clear()
+
+    records = [{"name": "Bike", "1st": 2, "price": 1.5, "sold": True, "note": None}] * 3
+    expected = "".join(
+        dicttoxml.convert_kv("name", "Bike", True, {}, False)
+        + dicttoxml.convert_kv("1st", 2, True, {}, False)
+        + dicttoxml.convert_kv("price", 1.5, True, {}, False)
+        + dicttoxml.convert_bool("sold", True, True, {}, False)
+        + dicttoxml.convert_none("note", True, {}, False)
+        for _ in records
+    )
+    names = Mock(wraps=dicttoxml.make_valid_xml_name)
+    monkeypatch.setattr(dicttoxml, "make_valid_xml_name", names)
+
+    output = "".join(
+        dicttoxml.convert_dict(record, [], "root", True, dicttoxml.default_item_func, False, True)
+        for record in records
+    )
+
+    assert output == expected
+    assert names.call_count == dicttoxml._scalar_tags.cache_info().currsize == 5
+    assert dicttoxml._scalar_tags("1st", None) == ('<key name="1st">', "</key>")
+
+
+RECORDS = [
+    {"id": 1, "name": "A&B", "active": True, "score": 1.5, "note": None, "1st": "]]>"},
+    {"id": 2, "name": "C", "active": False, "score": 2.0, "note": None, "1st": "x"},
+    {"id": 3, "name": 4, "active": False, "score": 2.0, "note": None, "1st": "x"},
+    {"name": "D", "id": 5, "active": True, "score": 0.5, "note": None, "1st": "y"},
+    "outlier",
+    {"@attrs": {"a": 1}, "@val": "v"},
+    {"id": 6, "name": "E", "active": True, "score": 3.5, "note": None, "1st": "z"},
+]
+
+
+# @lat: [[tests#XML helper behavior#Record lists use shape-specialized emitters]]
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"attr_type": False}, {"cdata": True}, {"pretty": True}, {"item_wrap": False}, {"list_headers": True}],
+)
+def test_record_emitter_output_matches_generic_walker(
+    monkeypatch: pytest.MonkeyPatch, options: dict[str, Any]
+) -> None:
+    dicttoxml._record_emitter.cache_clear()
+    data = {"rows": RECORDS}
+
+    specialized = dicttoxml.dicttoxml(data, **options)
+    monkeypatch.setattr(dicttoxml, "_SHAPE_SAMPLE_SIZE", 0)
+
+    assert dicttoxml.dicttoxml(data, **options) == specialized
+    emitters_built = 0 if options.get("item_wrap") is False or options.get("list_headers") else 1
+    assert dicttoxml._record_emitter.cache_info().currsize == emitters_built
+
+
+@pytest.mark.parametrize(
+    "items",
+    [
+        [{"a": 1}, {"b": 1}, {"a": [1]}, {"a": [1]}],
+        [{"a": 1, "k@flat": 2}, {"a": 1, "k@flat": 2}],
+        [{1: "a"}, {1: "a"}],
+        [1, 2, 3],
+    ],
+)
+def test_record_emitter_needs_a_repeated_plain_shape(items: list[Any]) -> None:
+    assert dicttoxml._infer_record_emitter(items, "item", True, False) is None
+
+
+COLUMNS = {
+    "id": array.array("q", [1, 2, 3, 4]),
+    "name": ["a<b", "]]>", None, "x"],
+    "ok": [True, False, True, 1],
+    "when": [datetime.date(2020, 1, 1), 1.5, 2.5, 3.5],
+    "1 bad": [[1], {"a": 1}, "s", 2.0],
+}
+COLUMN_ROWS = [dict(zip(COLUMNS, row)) for row in zip(*(list(column) for column in COLUMNS.values()))]
+
+
+# @lat: [[tests#XML helper behavior#Columnar input matches row dicts]]
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"attr_type": False},
+        {"cdata": True},
+        {"pretty": True},
+        {"root": False, "item_func": lambda _parent: "row"},
+        {"item_wrap": False},
+        {"list_headers": True},
+        {"ids": True, "id_strategy": "counter"},
+    ],
+)
+def test_columns_convert_like_the_equivalent_row_dicts(options: dict[str, Any]) -> None:
+    columns = dicttoxml.Columns(COLUMNS)
+
+    assert dicttoxml.dicttoxml(columns, **options) == dicttoxml.dicttoxml(COLUMN_ROWS, **options)
+    assert dicttoxml.dicttoxml({"rows": columns}, **options) == dicttoxml.dicttoxml(
+        {"rows": COLUMN_ROWS}, **options
+    )
+
+
+def test_columns_are_a_sequence_of_row_dicts() -> None:
+    columns = dicttoxml.Columns(COLUMNS)
+
+    assert len(columns) == 4
+    assert list(columns) == COLUMN_ROWS
+    assert columns[-1] == COLUMN_ROWS[-1]
+    assert columns[1:3] == COLUMN_ROWS[1:3]
+    assert columns[::2] == COLUMN_ROWS[::2]
+    assert len(dicttoxml.Columns({})) == 0
+    with pytest.raises(IndexError):
+        columns[4]
+    with pytest.raises(ValueError, match="same length"):
+        dicttoxml.Columns({"a": [1], "b": [1, 2]})
+
+
+def test_columns_with_special_keys_keep_the_generic_walker() -> None:
+    columns = {"@flat": [True, True], "a": [1, 2]}
+    rows = [{"@flat": True, "a": 1}, {"@flat": True, "a": 2}]
+
+    assert dicttoxml.dicttoxml(dicttoxml.Columns(columns)) == dicttoxml.dicttoxml(rows)
+
+
+def test_columns_wrap_arrays_with_named_fields() -> None:
+    structured = StructuredArray({"id": array.array("q", [1, 2]), "score": array.array("d", [0.5, 1e20])})
+
+    result = dicttoxml.dicttoxml(dicttoxml.Columns.from_array(structured))
+
+    assert result == dicttoxml.dicttoxml([{"id": 1, "score": 0.5}, {"id": 2, "score": 1e20}])
+    with pytest.raises(ValueError, match="no named fields"):
+        dicttoxml.Columns.from_array(SimpleNamespace(dtype=SimpleNamespace(names=None)))
+
+
+def test_columns_read_numpy_structured_arrays_as_python_values() -> None:
+    np = pytest.importorskip("numpy")
+    data = np.array(
+        [(1, "a", True, 0.5), (2, "b&c", False, 2.0)],
+        dtype=[("id", "i8"), ("name", "U8"), ("ok", "?"), ("score", "f8")],
+    )
+
+    expected = [dict(zip(data.dtype.names, row)) for row in data.tolist()]
+    assert dicttoxml.dicttoxml(dicttoxml.Columns.from_array(data)) == dicttoxml.dicttoxml(expected)
 
 
 # @lat: [[tests#XML helper behavior#XML attribute name validation]]
@@ -341,7 +578,13 @@ def test_xml_attribute_name_validation_accepts_only_parser_valid_names() -> None
         "a_b": True,
         "a-b": True,
         "xmlAttr": True,
+        "xml:lang": True,
+        "xmlns:foo": True,
+        "名前": True,
         "": False,
+        "xmlns:xml": False,
+        "xmlns:": False,
+        "foo:bar": False,
         "1foo": False,
         "foo>bar": False,
         'foo"bar': False,
@@ -358,3 +601,442 @@ def test_xml_attribute_name_validation_accepts_only_parser_valid_names() -> None
         if not is_valid:
             with pytest.raises(ValueError, match="Invalid XML attribute name"):
                 dicttoxml.validate_xml_attr_names({key: "value"})
+
+
+# @lat: [[tests#XML helper behavior#Chunked output matches buffered output]]
+@pytest.mark.parametrize("options", [{}, {"root": False}, {"xpath_format": True}, {"cdata": True}])
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_dicttoxml_chunks_join_to_buffered_output(options: dict[str, Any], chunk_size: int) -> None:
+    data = {"users": [{"name": "Ada & Grace", "id": 1}, {"name": None, "tags": ["x", "y"]}], "ok": True}
+
+    chunks = list(dicttoxml.iter_dicttoxml(data, chunk_size=chunk_size, **options))
+
+    assert b"".join(chunks) == dicttoxml.dicttoxml(data, **options)
+    assert all(len(chunk) == chunk_size for chunk in chunks[:-1])
+    assert 0 < len(chunks[-1]) <= chunk_size
+
+
+def test_iter_dicttoxml_raises_serializer_errors_while_iterating() -> None:
+    chunks = dicttoxml.iter_dicttoxml({"first": "ok" * 64, "bad": "\x00"}, chunk_size=16)
+
+    assert next(chunks).startswith(b"<?xml")
+    with pytest.raises(ValueError, match="not allowed in XML 1.0"):
+        list(chunks)
+
+
+def test_iter_dicttoxml_close_stops_background_serializer() -> None:
+    chunks = dicttoxml.iter_dicttoxml({"items": list(range(10_000))}, chunk_size=32)
+
+    assert len(next(chunks)) == 32
+    chunks.close()
+
+    assert all(thread.name != "json2xml-stream" for thread in threading.enumerate())
+
+
+def test_iter_dicttoxml_dropped_iterator_joins_its_render_thread() -> None:
+    chunks = dicttoxml.iter_dicttoxml({"items": list(range(10_000))}, chunk_size=32)
+
+    assert len(next(chunks)) == 32
+    del chunks
+
+    assert all(thread.name != "json2xml-stream" for thread in threading.enumerate())
+
+
+def test_iter_dicttoxml_close_after_final_partial_chunk() -> None:
+    chunks = dicttoxml.iter_dicttoxml({"a": 1}, chunk_size=1024)
+
+    assert next(chunks) == dicttoxml.dicttoxml({"a": 1})
+    chunks.close()
+
+    assert all(thread.name != "json2xml-stream" for thread in threading.enumerate())
+
+
+class PartialWriter:
+    """Binary writer that accepts at most three bytes per call, like a raw stream."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self.data.extend(data[:3])
+        return min(len(data), 3)
+
+
+class NoneReturningWriter:
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self.data.extend(data)
+
+
+# @lat: [[tests#XML helper behavior#Sinks receive the buffered output]]
+@pytest.mark.parametrize("writer_type", [io.BytesIO, PartialWriter, NoneReturningWriter])
+def test_dicttoxml_writes_to_file_like_sinks(writer_type: type[Any]) -> None:
+    data = {"users": [{"name": "Ada & Grace"}], "big": "x" * (dicttoxml.DEFAULT_CHUNK_SIZE + 5)}
+    sink = writer_type()
+
+    assert dicttoxml.dicttoxml(data, sink=sink) is None
+
+    written = sink.getvalue() if isinstance(sink, io.BytesIO) else bytes(sink.data)
+    assert written == dicttoxml.dicttoxml(data)
+
+
+def test_dicttoxml_writes_to_file_descriptor() -> None:
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, "rb") as reader:
+        with os.fdopen(write_fd, "wb", buffering=0) as writer:
+            dicttoxml.dicttoxml({"a": [1, 2]}, sink=writer.fileno())
+        assert reader.read() == dicttoxml.dicttoxml({"a": [1, 2]})
+
+
+def test_dicttoxml_writes_to_socket() -> None:
+    left, right = socket.socketpair()
+    with left, right:
+        dicttoxml.dicttoxml({"a": "b"}, root=False, sink=left)
+        left.shutdown(socket.SHUT_WR)
+        assert right.makefile("rb").read() == b'<a type="str">b</a>'
+
+
+class WouldBlockRawWriter(io.RawIOBase):
+    """Non-blocking raw stream that accepts two bytes, then reports it would block."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int | None:
+        if self.data:
+            return None
+        self.data.extend(bytes(data[:2]))
+        return 2
+
+
+class StalledWriter:
+    def write(self, data: bytes) -> int:
+        return 0
+
+
+def test_sink_writer_surfaces_blocked_and_stalled_writes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    raw = WouldBlockRawWriter()
+    with pytest.raises(BlockingIOError):
+        dicttoxml.sink_writer(raw)(b"<a>1</a>")
+    assert bytes(raw.data) == b"<a"
+
+    with pytest.raises(OSError, match="accepted no bytes"):
+        dicttoxml.sink_writer(StalledWriter())(b"<a/>")
+
+    monkeypatch.setattr(dicttoxml.os, "write", lambda fd, data: 0)
+    with pytest.raises(OSError, match="accepted no bytes"):
+        dicttoxml.sink_writer(7)(b"<a/>")
+
+
+@pytest.mark.parametrize("sink", [object(), True, "out.xml"])
+def test_sink_writer_rejects_unsupported_sinks(sink: Any) -> None:
+    with pytest.raises(TypeError, match="sink must be a binary file object"):
+        dicttoxml.sink_writer(sink)
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1, True, 1.5])
+def test_iter_dicttoxml_requires_positive_chunk_size(chunk_size: Any) -> None:
+    with pytest.raises(ValueError, match="chunk_size must be a positive integer"):
+        dicttoxml.iter_dicttoxml({}, chunk_size=chunk_size)
+
+
+EVENT_DOCUMENTS = [
+    '{"users": [{"name": "Ada & Grace", "id": 1}, {"name": null, "tags": ["x", 2.5, true]}], "ok": false}',
+    '[[1, [2]], [], {}, [{"a": {"b": [null, false]}}], "s"]',
+    '{"k@flat": [1, 2], "1": {"x y": [[true]]}, "empty": [], "nested": {"": "blank"}}',
+    '"root scalar"',
+    "false",
+    "null",
+]
+
+
+# @lat: [[tests#XML helper behavior#Event input matches decoded input]]
+@pytest.mark.parametrize("document", EVENT_DOCUMENTS)
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"root": False},
+        {"attr_type": False},
+        {"item_wrap": False},
+        {"list_headers": True},
+        {"list_headers": True, "item_wrap": False},
+        {"cdata": True},
+        {"xpath_format": True},
+        {"xml_namespaces": {"flex": "http://example.com/flex"}},
+    ],
+)
+def test_eventstoxml_matches_dicttoxml(document: str, options: dict[str, Any]) -> None:
+    expected = dicttoxml.dicttoxml(json.loads(document), **options)
+
+    assert dicttoxml.eventstoxml(iter_json_events(document), **options) == expected
+
+
+def test_eventstoxml_matches_dicttoxml_ids(monkeypatch: pytest.MonkeyPatch) -> None:
+    document = '{"a": [1, {"b": 2}], "c": {"d": [3]}}'
+    counter = iter(range(1000))
+    monkeypatch.setattr(dicttoxml, "make_id", lambda element, start=0, end=0: f"{element}_{next(counter)}")
+    expected = dicttoxml.dicttoxml(json.loads(document), ids=[1])
+    counter = iter(range(1000))
+
+    assert dicttoxml.eventstoxml(iter_json_events(document), ids=[1]) == expected
+
+
+def test_eventstoxml_matches_dicttoxml_custom_item_func() -> None:
+    document = '{"rows": [1, [2], {"a": 3}]}'
+
+    def item_func(parent: str) -> str:
+        return f"{parent}_row@flat"
+
+    expected = dicttoxml.dicttoxml(json.loads(document), item_func=item_func)
+
+    assert dicttoxml.eventstoxml(iter_json_events(document), item_func=item_func) == expected
+
+
+def test_eventstoxml_streams_to_sink_and_chunks() -> None:
+    document = EVENT_DOCUMENTS[0]
+    sink = io.BytesIO()
+
+    assert dicttoxml.eventstoxml(iter_json_events(document), sink=sink) is None
+
+    expected = dicttoxml.dicttoxml(json.loads(document))
+    assert sink.getvalue() == expected
+    assert b"".join(dicttoxml.iter_eventstoxml(iter_json_events(document), chunk_size=5)) == expected
+
+
+@pytest.mark.parametrize("key", ["@attrs", "@val", "@flat"])
+def test_eventstoxml_rejects_nested_special_keys(key: str) -> None:
+    with pytest.raises(ValueError, match="not supported for incremental JSON input"):
+        dicttoxml.eventstoxml(iter_json_events(f'{{"a": {{"{key}": 1}}}}'))
+
+
+@pytest.mark.parametrize(
+    ("events", "message"),
+    [
+        ([("end_map", None)], "Unexpected JSON event: end_map"),
+        ([("start_map", None), ("string", "x")], "Unexpected JSON event: string"),
+        ([("start_map", None), ("map_key", "a"), ("map_key", "b")], "Unexpected JSON event: map_key"),
+        ([("start_array", None), ("map_key", "a")], "Unexpected JSON event: map_key"),
+        ([("start_array", None), ("number", 1)], "Unexpected end of JSON events"),
+    ],
+)
+def test_eventstoxml_rejects_malformed_event_streams(
+    events: list[tuple[str, Any]], message: str
+) -> None:
+    with pytest.raises(ValueError, match=message):
+        dicttoxml.eventstoxml(events)
+
+
+def test_eventstoxml_xpath_rejects_malformed_event_streams() -> None:
+    with pytest.raises(ValueError, match="Unexpected JSON event: map_key"):
+        dicttoxml.eventstoxml([("map_key", "a")], xpath_format=True)
+
+
+LIMIT_DOCUMENT = {"records": [{"id": index, "tags": ["a", "b"], "note": None} for index in range(40)]}
+
+
+# @lat: [[tests#XML helper behavior#Limits are enforced while rendering]]
+@pytest.mark.parametrize("options", [{}, {"xpath_format": True}, {"item_wrap": False, "attr_type": False}])
+def test_limits_at_the_boundary_keep_output_unchanged(options: dict[str, Any]) -> None:
+    expected = dicttoxml.dicttoxml(LIMIT_DOCUMENT, **options)
+    limits = dicttoxml.ConversionLimits(max_depth=4, max_items=1 + 1 + 40 + 40 * 5, max_output_bytes=len(expected))
+    sink = io.BytesIO()
+
+    assert dicttoxml.dicttoxml(LIMIT_DOCUMENT, limits=limits, **options) == expected
+    assert b"".join(dicttoxml.iter_dicttoxml(LIMIT_DOCUMENT, chunk_size=100, limits=limits, **options)) == expected
+    assert dicttoxml.dicttoxml(LIMIT_DOCUMENT, sink=sink, limits=limits, **options) is None
+    assert sink.getvalue() == expected
+
+
+@pytest.mark.parametrize("options", [{}, {"xpath_format": True}])
+@pytest.mark.parametrize(
+    ("limits", "message"),
+    [
+        (dicttoxml.ConversionLimits(3, 10_000, 1 << 20), "JSON nesting depth limit exceeded"),
+        (dicttoxml.ConversionLimits(100, 1 + 1 + 40 + 40 * 5 - 1, 1 << 20), "JSON item limit exceeded"),
+    ],
+)
+def test_structural_limits_abort_the_render(
+    options: dict[str, Any], limits: dicttoxml.ConversionLimits, message: str
+) -> None:
+    with pytest.raises(InvalidDataError, match=message):
+        dicttoxml.dicttoxml(LIMIT_DOCUMENT, limits=limits, **options)
+
+
+def test_item_limit_is_charged_before_a_container_renders() -> None:
+    """An oversized container fails when it opens, before any member reaches the sink."""
+    sink = io.BytesIO()
+    limits = dicttoxml.ConversionLimits(max_depth=10, max_items=10, max_output_bytes=1 << 20)
+
+    with pytest.raises(InvalidDataError, match="JSON item limit exceeded"):
+        dicttoxml.dicttoxml(list(range(1_000)), sink=sink, limits=limits)
+    assert sink.getvalue() == b""
+
+
+def test_output_limit_stops_before_the_offending_bytes() -> None:
+    expected = dicttoxml.dicttoxml(LIMIT_DOCUMENT)
+    limits = dicttoxml.ConversionLimits(max_depth=10, max_items=10_000, max_output_bytes=len(expected) - 1)
+    sink = io.BytesIO()
+    chunks = dicttoxml.iter_dicttoxml(LIMIT_DOCUMENT, chunk_size=100, limits=limits)
+
+    with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
+        dicttoxml.dicttoxml(LIMIT_DOCUMENT, limits=limits)
+    with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
+        dicttoxml.dicttoxml(LIMIT_DOCUMENT, sink=sink, limits=limits)
+    assert expected.startswith(sink.getvalue())
+    assert len(sink.getvalue()) <= limits.max_output_bytes
+    received = b""
+    with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
+        for chunk in chunks:
+            received += chunk
+    assert received == expected[: len(received)]
+    assert len(received) <= limits.max_output_bytes
+
+
+PRETTY_DOCUMENT = {
+    "name": "Ada",
+    "empty": "",
+    "tags": ["a", {"k": None}, []],
+    "meta": {"@attrs": {"lang": "en"}, "@val": ""},
+    "flat@flat": [1, 2],
+}
+
+
+# @lat: [[tests#XML helper behavior#Pretty output matches across outputs]]
+@pytest.mark.parametrize("options", [{}, {"xpath_format": True}, {"root": False}, {"list_headers": True}])
+def test_pretty_output_matches_across_outputs(options: dict[str, Any]) -> None:
+    expected = dicttoxml.dicttoxml(PRETTY_DOCUMENT, pretty=True, **options)
+    sink = io.BytesIO()
+
+    dicttoxml.dicttoxml(PRETTY_DOCUMENT, sink=sink, pretty=True, **options)
+    assert sink.getvalue() == expected
+    assert b"".join(dicttoxml.iter_dicttoxml(PRETTY_DOCUMENT, chunk_size=16, pretty=True, **options)) == expected
+    assert expected.endswith(b"\n")
+    assert b"".join(line.strip() for line in expected.splitlines()) == dicttoxml.dicttoxml(PRETTY_DOCUMENT, **options)
+
+
+def test_pretty_output_splits_empty_elements() -> None:
+    result = dicttoxml.dicttoxml(PRETTY_DOCUMENT, attr_type=False, pretty=True).decode()
+
+    assert "\n  <empty>\n  </empty>\n" in result
+    assert '\n  <meta lang="en">\n  </meta>\n' in result
+    assert "\n    <item>\n    </item>\n" in result
+
+
+def test_pretty_event_output_matches_decoded_output() -> None:
+    document = {key: value for key, value in PRETTY_DOCUMENT.items() if key != "meta"}
+    for options in ({}, {"xpath_format": True}):
+        events = iter_json_events(json.dumps(document))
+        assert dicttoxml.eventstoxml(events, pretty=True, **options) == dicttoxml.dicttoxml(
+            document, pretty=True, **options
+        )
+        events = iter_json_events(json.dumps(document))
+        chunks = dicttoxml.iter_eventstoxml(events, chunk_size=8, pretty=True, **options)
+        assert b"".join(chunks) == dicttoxml.dicttoxml(document, pretty=True, **options)
+
+
+@pytest.mark.parametrize("indent", [0, 4])
+def test_pretty_output_uses_configured_indent(indent: int) -> None:
+    result = dicttoxml.dicttoxml({"a": {"b": 1}}, attr_type=False, pretty=True, indent=indent).decode()
+
+    pad = " " * indent
+    assert result.endswith(f"<root>\n{pad}<a>\n{pad * 2}<b>1</b>\n{pad}</a>\n</root>\n")
+
+
+@pytest.mark.parametrize("indent", [-1, True, 1.5])
+def test_pretty_output_rejects_invalid_indent(indent: Any) -> None:
+    with pytest.raises(ValueError, match="indent must be a non-negative integer"):
+        dicttoxml.dicttoxml({"a": 1}, pretty=True, indent=indent)
+
+
+# @lat: [[tests#XML helper behavior#Element ID strategies are reproducible]]
+@pytest.mark.parametrize(
+    ("strategy", "expected"),
+    [
+        ("counter", ["root_1", "root_2"]),
+        ("path", ["root_users", "root_name"]),
+        ("seeded", ["root_174487", "root_355804"]),
+    ],
+)
+def test_id_strategies_are_reproducible(
+    monkeypatch: pytest.MonkeyPatch, strategy: str, expected: list[str]
+) -> None:
+    monkeypatch.setattr(dicttoxml, "make_id", Mock(side_effect=AssertionError("random ID")))
+    data = {"users": [1], "name": "Ada"}
+    options: dict[str, Any] = {"ids": True, "id_strategy": strategy, "id_seed": 7}
+
+    result = dicttoxml.dicttoxml(data, **options)
+
+    assert re.findall(r'id="([^"]*)"', result.decode()) == expected
+    assert dicttoxml.dicttoxml(data, **options) == result
+    assert dicttoxml.eventstoxml(iter_json_events(json.dumps(data)), **options) == result
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        ({"on": True, "off": None}, '<on id="root_on" type="bool">true</on><off id="root_off" type="null"></off>'),
+        ([False, None, "x"], '<item id="root_1" type="bool">false</item><item id="root_2" type="null"></item>'),
+    ],
+)
+def test_id_strategies_cover_every_scalar_kind(data: Any, expected: str) -> None:
+    options: dict[str, Any] = {"ids": True, "id_strategy": "path"}
+
+    result = dicttoxml.dicttoxml(data, **options)
+
+    assert expected.encode() in result
+    assert dicttoxml.eventstoxml(iter_json_events(json.dumps(data)), **options) == result
+
+
+@pytest.mark.parametrize(
+    ("strategy", "expected"),
+    [("counter", ["root_1_1", "root_1_2"]), ("path", ["root_1", "root_2"])],
+)
+def test_list_member_ids_extend_the_list_id(strategy: str, expected: list[str]) -> None:
+    result = dicttoxml.dicttoxml([1, {"a": 2}], ids=True, id_strategy=strategy)
+
+    assert re.findall(r'id="([^"]*)"', result.decode()) == expected
+
+
+def test_path_ids_stay_unique_for_keys_spelling_the_separator() -> None:
+    data = {"a": {"b": 1}, "a_b": 2, "a%5Fb": 3, "a%b": 4, "a_1": [5], "_": 6, "%5F": 7}
+    options: dict[str, Any] = {"ids": True, "id_strategy": "path"}
+
+    result = dicttoxml.dicttoxml(data, **options)
+    found = re.findall(r'id="([^"]*)"', result.decode())
+
+    assert len(found) == len(set(found)) == len(data)
+    assert "root_a%5Fb" in found and "root_a%255Fb" in found
+    assert dicttoxml.eventstoxml(iter_json_events(json.dumps(data)), **options) == result
+
+
+def test_seeded_ids_follow_splitmix64() -> None:
+    generator = dicttoxml._IdGenerator("seeded", 0)
+
+    # Reference outputs of SplitMix64 seeded with 0, shared with the Rust backend's tests.
+    assert [generator._splitmix64() for _ in range(3)] == [
+        0xE220A8397B1DCDAF,
+        0x6E789E6AA1B965F4,
+        0x06C45D188009454F,
+    ]
+
+
+@pytest.mark.parametrize(
+    ("id_strategy", "id_seed", "message"),
+    [
+        ("uuid", 0, "id_strategy must be one of"),
+        ("seeded", -1, "id_seed must be an integer"),
+        ("seeded", 2**64, "id_seed must be an integer"),
+        ("seeded", True, "id_seed must be an integer"),
+    ],
+)
+def test_id_options_are_validated(id_strategy: str, id_seed: int, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        dicttoxml.dicttoxml({"a": 1}, ids=True, id_strategy=id_strategy, id_seed=id_seed)
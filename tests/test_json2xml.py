@@ -2,6 +2,11 @@
 
 """Tests for `json2xml` package."""
 
+import asyncio
+import contextlib
+import io
+import threading
+from concurrent.futures import BrokenExecutor, ThreadPoolExecutor
 from pyexpat import ExpatError
 from typing import Any, TypedDict
 from unittest.mock import Mock
@@ -10,13 +15,17 @@ import pytest
 import xmltodict
 
 from json2xml import json2xml
-from json2xml.json2xml import _positive_limit, _pretty_xml
+from json2xml.dicttoxml import ConversionLimits, _PrettyXMLWriter, _XMLWriter
+from json2xml.json2xml import _positive_limit
 from json2xml.utils import (
     InvalidDataError,
+    JSONEventStream,
     JSONReadError,
     StringReadError,
     readfromjson,
     readfromstring,
+    streamfromjson,
+    streamfromstring,
 )
 
 
@@ -89,7 +98,7 @@ class TestJson2xml:
     ) -> None:
         """Default conversion avoids reparsing attacker-controlled output into a DOM."""
         parse_string = Mock(side_effect=AssertionError("pretty parser should not run"))
-        monkeypatch.setattr("defusedxml.minidom.parseString", parse_string)
+        monkeypatch.setattr("xml.dom.minidom.parseString", parse_string)
 
         xmldata = json2xml.Json2xml({"name": "Ada"}).to_xml()
 
@@ -142,6 +151,15 @@ class TestJson2xml:
                 "xpath_format": False,
                 "cdata": False,
                 "list_headers": False,
+                "limits": ConversionLimits(
+                    json2xml.DEFAULT_MAX_DEPTH,
+                    json2xml.DEFAULT_MAX_ITEMS,
+                    json2xml.DEFAULT_MAX_OUTPUT_BYTES,
+                ),
+                "pretty": False,
+                "ids": False,
+                "id_strategy": "random",
+                "id_seed": 0,
             }
         ]
 
@@ -232,39 +250,6 @@ class TestJson2xml:
             json2xml.Json2xml({"bad": decoded}).to_xml()
         assert pytest_wrapped_e.type == InvalidDataError
 
-    def test_pretty_print_rejects_malformed_generated_xml(
-        self, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        """The streaming formatter rejects unterminated generated markup."""
-        monkeypatch.setattr(
-            "json2xml.json2xml.dicttoxml.dicttoxml",
-            Mock(return_value=b"<root><broken"),
-        )
-
-        with pytest.raises(InvalidDataError):
-            json2xml.Json2xml({"valid": "data"}, pretty=True).to_xml()
-
-    @pytest.mark.parametrize(
-        "malformed_xml",
-        [
-            b"<root><child></root>",
-            b"<root>",
-            b"<root><![CDATA[unterminated</root>",
-            b"<root><!-- unterminated</root>",
-        ],
-    )
-    def test_pretty_print_rejects_unbalanced_generated_xml(
-        self, monkeypatch: pytest.MonkeyPatch, malformed_xml: bytes
-    ) -> None:
-        """Lexical indentation rejects mismatched, unclosed, and unterminated markup."""
-        monkeypatch.setattr(
-            "json2xml.json2xml.dicttoxml.dicttoxml",
-            Mock(return_value=malformed_xml),
-        )
-
-        with pytest.raises(InvalidDataError, match="Malformed XML generated"):
-            json2xml.Json2xml({"valid": "data"}, pretty=True).to_xml()
-
     # @lat: [[tests#Conversion behavior#Conversion resource limits]]
     @pytest.mark.parametrize(
         ("data", "limits"),
@@ -277,10 +262,26 @@ class TestJson2xml:
     def test_conversion_resource_limits(
         self, data: Any, limits: _ConversionLimits
     ) -> None:
-        """Depth, item, and conservative output budgets reject work before rendering."""
+        """Depth, item, and output budgets reject the data while it is rendered."""
         with pytest.raises(InvalidDataError):
             json2xml.Json2xml(data, **limits).to_xml()
 
+    @pytest.mark.parametrize(
+        ("data", "limit"),
+        [
+            ({"a": {"b": {"c": 1}}}, "max_depth"),
+            ([1, [2, 3], {"x": None}], "max_items"),
+        ],
+    )
+    def test_structural_limits_accept_inputs_at_the_boundary(
+        self, data: Any, limit: str
+    ) -> None:
+        """Depth and item counts equal to their limits still convert."""
+        boundary = {"max_depth": 3, "max_items": 7}[limit]
+        assert json2xml.Json2xml(data, **{limit: boundary}).to_xml()
+        with pytest.raises(InvalidDataError):
+            json2xml.Json2xml(data, **{limit: boundary - 1}).to_xml()
+
     @pytest.mark.parametrize("value", [0, -1, True, 1.5, "10"])
     def test_conversion_resource_limits_require_positive_integers(
         self, value: Any
@@ -289,68 +290,90 @@ class TestJson2xml:
         with pytest.raises(ValueError, match="max_depth must be a positive integer"):
             json2xml.Json2xml({}, max_depth=value)  # type: ignore[arg-type]
 
+    def test_id_strategies_apply_to_every_output_mode(self) -> None:
+        """Deterministic IDs come out the same from bytes, chunks, sinks and event streams."""
+        options: dict[str, Any] = {"wrapper": "all", "ids": True, "id_strategy": "path"}
+        converter = json2xml.Json2xml({"name": "Ada"}, **options)
+        expected = b'<all><name id="all_name" type="str">Ada</name></all>'
+        sink = io.BytesIO()
+        converter.write_to(sink)
+
+        assert expected in converter.to_bytes()
+        assert expected in b"".join(converter.iter_xml())
+        assert expected in sink.getvalue()
+        assert expected in json2xml.Json2xml(streamfromstring('{"name": "Ada"}'), **options).to_bytes()
+        with pytest.raises(ValueError, match="id_strategy must be one of"):
+            json2xml.Json2xml({}, ids=True, id_strategy="uuid")
+
     def test_positive_limit_accepts_positive_integer(self) -> None:
         """The common limit validator returns valid integer budgets unchanged."""
         assert _positive_limit("limit", 1) == 1
 
-    def test_exact_compact_output_limit_is_enforced_after_backend_render(
-        self, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        """Backend output cannot bypass the exact encoded-byte limit."""
-        monkeypatch.setattr(
-            "json2xml.json2xml.dicttoxml.dicttoxml",
-            Mock(return_value=b"x" * 201),
-        )
-
-        with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
-            json2xml.Json2xml({}, max_output_bytes=200).to_xml()
-
-    def test_pretty_output_limit_counts_indentation(
-        self, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_exact_compact_output_limit_is_enforced_while_rendering(self) -> None:
+        """The serializer stops at the first byte past the exact encoded-byte limit."""
+        data = {"records": [{"id": index, "name": "é" * index} for index in range(50)]}
+        size = len(json2xml.Json2xml(data).to_xml())
+
+        assert len(json2xml.Json2xml(data, max_output_bytes=size).to_xml()) == size
+        for convert in (
+            lambda converter: converter.to_xml(),
+            lambda converter: b"".join(converter.iter_xml(chunk_size=64)),
+            lambda converter: converter.write_to(io.BytesIO()),
+        ):
+            with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
+                convert(json2xml.Json2xml(data, max_output_bytes=size - 1))
+
+    def test_pretty_output_limit_counts_indentation(self) -> None:
         """Pretty-only whitespace is included in the exact output byte budget."""
-        compact = b"<r>" * 10 + b"</r>" * 10
-        monkeypatch.setattr(
-            "json2xml.json2xml.dicttoxml.dicttoxml", Mock(return_value=compact)
-        )
+        data = {"a": {"b": {"c": {"d": None}}}}
+        compact_size = len(json2xml.Json2xml(data).to_bytes() or b"")
+        pretty_size = len(json2xml.Json2xml(data, pretty=True).to_bytes() or b"")
 
+        assert compact_size < pretty_size
+        assert json2xml.Json2xml(data, pretty=True, max_output_bytes=pretty_size).to_xml()
         with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
-            json2xml.Json2xml({}, pretty=True, max_output_bytes=200).to_xml()
-
-    def test_pretty_formatter_handles_supported_markup(self) -> None:
-        """Declaration, quoted attributes, comments, CDATA, and empty tags stay intact."""
-        xml = (
-            b'<?xml version="1.0"?><root attr=">">'
-            b"<!--note--><value><![CDATA[a<b]]></value><empty/></root>"
+            json2xml.Json2xml(data, pretty=True, max_output_bytes=pretty_size - 1).to_xml()
+
+    # @lat: [[tests#Conversion behavior#Pretty printing indents while serializing]]
+    def test_pretty_output_indents_while_serializing(self) -> None:
+        """Nested elements, inline text, and empty elements keep the established layout."""
+        data = {"name": "Ada", "langs": ["en", "fr"], "meta": {}, "site": None}
+
+        assert json2xml.Json2xml(data, pretty=True, attr_type=False).to_xml() == (
+            '<?xml version="1.0" encoding="UTF-8" ?>\n'
+            "<all>\n"
+            "  <name>Ada</name>\n"
+            "  <langs>\n"
+            "    <item>en</item>\n"
+            "    <item>fr</item>\n"
+            "  </langs>\n"
+            "  <meta>\n"
+            "  </meta>\n"
+            "  <site>\n"
+            "  </site>\n"
+            "</all>\n"
         )
 
-        result = _pretty_xml(xml, 1_000)
+    def test_pretty_output_keeps_whitespace_text(self) -> None:
+        """Whitespace-only and attribute-wrapped values stay on their element's line."""
+        data = {"blank": "  ", "tagged": {"@attrs": {"lang": "en"}, "@val": "hi"}}
 
-        assert '<root attr=">">' in result
-        assert "  <!--note-->" in result
-        assert "<value><![CDATA[a<b]]></value>" in result
-        assert "  <empty/>" in result
+        result = json2xml.Json2xml(data, pretty=True, attr_type=False).to_xml()
 
-    def test_pretty_formatter_rejects_trailing_text_and_unknown_declarations(
-        self
-    ) -> None:
-        """Text outside the root and unsupported declarations cannot be formatted as XML."""
-        with pytest.raises(InvalidDataError, match="Malformed XML generated"):
-            _pretty_xml(b"<root/>trailing", 1_000)
-        with pytest.raises(InvalidDataError, match="Malformed XML generated"):
-            _pretty_xml(b"<!unsupported><root/>", 1_000)
-        with pytest.raises(InvalidDataError, match="Malformed XML generated"):
-            _pretty_xml(b"<![CDATA[outside-root]]><root/>", 1_000)
+        assert isinstance(result, str)
+        assert "\n  <blank>  </blank>\n" in result
+        assert '\n  <tagged lang="en">hi</tagged>\n' in result
 
-    @pytest.mark.parametrize(
-        "unsafe_xml", [b"<!DOCTYPE root><root/>", b"<!ENTITY x 'x'><root/>"]
-    )
-    def test_pretty_formatter_rejects_unsafe_declarations(
-        self, unsafe_xml: bytes
-    ) -> None:
-        """DTD and entity declarations are rejected case-insensitively."""
-        with pytest.raises(InvalidDataError, match="Unsafe XML declaration rejected"):
-            _pretty_xml(unsafe_xml.lower(), 1_000)
+    def test_to_bytes_returns_encoded_output_in_both_modes(self) -> None:
+        """to_bytes gives the encoded form of to_xml without a text round trip."""
+        data = {"name": "Ada", "city": "Zürich"}
+        pretty = json2xml.Json2xml(data, pretty=True)
+
+        assert json2xml.Json2xml(data).to_bytes() == json2xml.Json2xml(data).to_xml()
+        pretty_xml = pretty.to_xml()
+        assert isinstance(pretty_xml, str)
+        assert pretty.to_bytes() == pretty_xml.encode("utf-8")
+        assert json2xml.Json2xml(None).to_bytes() is None
 
     # @lat: [[tests#Conversion behavior#Pretty printing avoids DOM reparsing]]
     def test_pretty_print_does_not_reparse_a_dom(
@@ -358,7 +381,7 @@ class TestJson2xml:
     ) -> None:
         """Pretty output uses bounded lexical indentation without an XML DOM parser."""
         parse_string = Mock(side_effect=AssertionError("DOM parser must not run"))
-        monkeypatch.setattr("defusedxml.minidom.parseString", parse_string)
+        monkeypatch.setattr("xml.dom.minidom.parseString", parse_string)
 
         result = json2xml.Json2xml({"name": "Ada"}, pretty=True).to_xml()
 
@@ -367,26 +390,538 @@ class TestJson2xml:
         parse_string.assert_not_called()
 
     # @lat: [[tests#Conversion behavior#Pretty printing rejects unsafe XML constructs]]
-    def test_pretty_print_rejects_entity_expansion_payload(
-        self, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        """The bounded formatter rejects exponential entities before expansion."""
+    def test_pretty_print_escapes_markup_in_values(self) -> None:
+        """Declarations inside values are escaped text, never markup the output would carry."""
         entity_declarations = ['<!ENTITY lol0 "lol">']
         for level in range(1, 10):
             references = f"&lol{level - 1};" * 10
             entity_declarations.append(f'<!ENTITY lol{level} "{references}">')
-        malicious_xml = (
-            '<?xml version="1.0"?>'
-            f'<!DOCTYPE lolz [{"".join(entity_declarations)}]>'
-            '<lolz>&lol9;</lolz>'
-        ).encode()
+        payload = f'<!DOCTYPE lolz [{"".join(entity_declarations)}]><lolz>&lol9;</lolz>'
+
+        result = json2xml.Json2xml({"payload": payload}, pretty=True).to_xml()
+
+        assert isinstance(result, str)
+        assert "<!DOCTYPE" not in result and "<!ENTITY" not in result
+        assert xmltodict.parse(result)["all"]["payload"]["#text"] == payload
+
+    # @lat: [[tests#Conversion behavior#Pretty printing rejects malformed markup]]
+    @pytest.mark.parametrize(
+        ("data", "options"),
+        [
+            ([{"": {}}], {"list_headers": True}),
+            ([{}], {"list_headers": True, "item_wrap": False}),
+        ],
+    )
+    def test_pretty_print_rejects_malformed_generated_xml(
+        self, data: list[Any], options: dict[str, bool]
+    ) -> None:
+        """Element names compact output would leave empty stop pretty output."""
+        compact = json2xml.Json2xml(data, root=False, **options).to_xml()
+        assert isinstance(compact, bytes) and compact.endswith(b"</>")
+
+        with pytest.raises(InvalidDataError, match="Malformed XML generated"):
+            json2xml.Json2xml(data, root=False, pretty=True, **options).to_xml()
+
+    @pytest.mark.parametrize(
+        "markup",
+        [
+            [("start_element", "<root>"), ("end_element", "</child>")],
+            [("start_element", "<root>"), ("finish", None)],
+            [("end_element", "</root>")],
+            [("start_element", "< type=\"dict\">")],
+            [("write", "<root>text")],
+            [("write", "<root>text</child>")],
+            [("write", "<root")],
+            [("write", "<!-- unterminated")],
+            [("write", "<![CDATA[outside-root]]>")],
+        ],
+    )
+    def test_pretty_print_rejects_unbalanced_generated_xml(
+        self, markup: list[tuple[str, str | None]]
+    ) -> None:
+        """The pretty writer rejects mismatched, unclosed, and unnamed markup as it passes."""
+        writer = _PrettyXMLWriter(_XMLWriter())
+
+        with pytest.raises(InvalidDataError, match="Malformed XML generated"):
+            for method, value in markup:
+                getattr(writer, method)(*([] if value is None else [value]))
+
+    @pytest.mark.parametrize("declaration", ["<!DOCTYPE root>", "<!entity x 'x'>"])
+    def test_pretty_print_rejects_unsafe_declarations(self, declaration: str) -> None:
+        """DTD and entity declarations are rejected case-insensitively."""
+        writer = _PrettyXMLWriter(_XMLWriter())
+
+        with pytest.raises(InvalidDataError, match="Unsafe XML declaration rejected"):
+            writer.write(declaration)
+
+    def test_iter_xml_streams_compact_output(self) -> None:
+        """Chunked conversion yields exactly the compact bytes in bounded pieces."""
+        data = {"records": [{"id": index, "name": f"user {index}"} for index in range(50)]}
+        converter = json2xml.Json2xml(data)
+
+        chunks = list(converter.iter_xml(chunk_size=100))
+
+        assert b"".join(chunks) == converter.to_xml()
+        assert all(len(chunk) == 100 for chunk in chunks[:-1])
+
+    def test_iter_xml_streams_pretty_output(self) -> None:
+        """Pretty chunk streams encode the same text that to_xml returns."""
+        converter = json2xml.Json2xml({"name": "Ada", "langs": ["en", "fr"]}, pretty=True)
+
+        pretty_xml = converter.to_xml()
+
+        assert isinstance(pretty_xml, str)
+        assert b"".join(converter.iter_xml(chunk_size=8)) == pretty_xml.encode("utf-8")
+
+    def test_iter_xml_yields_nothing_for_absent_data(self) -> None:
+        """None data produces an empty chunk stream, mirroring to_xml returning None."""
+        assert list(json2xml.Json2xml(None).iter_xml()) == []
+
+    def test_iter_xml_enforces_output_limit_while_streaming(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The exact output budget stops a stream before the offending chunk is yielded."""
         monkeypatch.setattr(
-            "json2xml.json2xml.dicttoxml.dicttoxml",
-            Mock(return_value=malicious_xml),
+            "json2xml.json2xml.dicttoxml.iter_dicttoxml",
+            Mock(return_value=iter([b"x" * 150, b"x" * 51])),
+        )
+        chunks = json2xml.Json2xml({}, max_output_bytes=200).iter_xml()
+
+        assert next(chunks) == b"x" * 150
+        with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
+            next(chunks)
+
+    def test_iter_xml_wraps_serializer_errors(self) -> None:
+        """Serializer ValueErrors surface as the converter's public invalid-data error."""
+        with pytest.raises(InvalidDataError):
+            list(json2xml.Json2xml({"bad": "\x00"}).iter_xml())
+
+    def test_iter_xml_checks_structural_limits_while_streaming(self) -> None:
+        """Depth and item budgets are charged by the serializer as chunks are produced."""
+        chunks = json2xml.Json2xml([1, 2, 3], max_items=3).iter_xml()
+        with pytest.raises(InvalidDataError, match="JSON item limit exceeded"):
+            next(chunks)
+
+    # @lat: [[tests#Conversion behavior#Async conversion runs in an executor]]
+    def test_async_conversion_matches_sync_output(self) -> None:
+        """Async conversion and chunk streams give the sync results from executor threads."""
+        data = {"records": [{"id": index, "name": f"user {index}"} for index in range(50)]}
+
+        async def convert(converter: json2xml.Json2xml, executor: Any) -> tuple[Any, bytes]:
+            chunks = [chunk async for chunk in converter.aiter_xml(100, executor)]
+            assert all(len(chunk) == 100 for chunk in chunks[:-1])
+            return await converter.to_xml_async(executor), b"".join(chunks)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for converter in (json2xml.Json2xml(data), json2xml.Json2xml(data, pretty=True)):
+                expected = converter.to_xml()
+                result, streamed = asyncio.run(convert(converter, executor))
+                assert result == expected
+                assert streamed == converter.to_bytes()
+        assert asyncio.run(convert(json2xml.Json2xml(None), None)) == (None, b"")
+
+    def test_aiter_xml_stops_the_render_thread_when_abandoned(self) -> None:
+        """Leaving, closing, or cancelling an async stream joins its render thread."""
+        converter = json2xml.Json2xml({"items": list(range(50_000))})
+
+        def render_threads() -> list[threading.Thread]:
+            return [thread for thread in threading.enumerate() if thread.name == "json2xml-stream"]
+
+        async def close_early() -> None:
+            stream = converter.aiter_xml(64)
+            assert len(await anext(stream)) == 64
+            assert render_threads()
+            await stream.aclose()
+            assert render_threads() == []
+
+        async def leave_loop() -> bytes:
+            async for chunk in converter.aiter_xml(64):
+                return chunk
+            raise AssertionError("no chunks")  # pragma: no cover
+
+        async def cancel_consumer() -> None:
+            started = asyncio.Event()
+
+            async def consume() -> None:
+                async with contextlib.aclosing(converter.aiter_xml(64)) as stream:
+                    async for _ in stream:
+                        started.set()
+                        await asyncio.sleep(0)
+
+            task = asyncio.create_task(consume())
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert render_threads() == []
+
+        asyncio.run(close_early())
+        assert len(asyncio.run(leave_loop())) == 64
+        assert render_threads() == []
+        asyncio.run(cancel_consumer())
+
+    def test_async_conversion_raises_conversion_errors(self) -> None:
+        """Conversion errors reach the awaiting coroutine unchanged."""
+        converter = json2xml.Json2xml({"bad": "\x00"})
+
+        async def stream() -> list[bytes]:
+            return [chunk async for chunk in converter.aiter_xml()]
+
+        with pytest.raises(InvalidDataError):
+            asyncio.run(converter.to_xml_async())
+        with pytest.raises(InvalidDataError):
+            asyncio.run(stream())
+
+    def test_write_to_streams_compact_output(self) -> None:
+        """Writing to a sink produces the compact bytes and reports their length."""
+        converter = json2xml.Json2xml({"records": [{"id": index} for index in range(20)]})
+        sink = io.BytesIO()
+
+        written = converter.write_to(sink)
+
+        assert sink.getvalue() == converter.to_xml()
+        assert written == len(sink.getvalue())
+
+    def test_write_to_writes_pretty_output(self) -> None:
+        """Pretty conversion writes the encoded text that to_xml returns."""
+        converter = json2xml.Json2xml({"name": "Ada"}, pretty=True)
+        sink = io.BytesIO()
+
+        converter.write_to(sink)
+
+        pretty_xml = converter.to_xml()
+        assert isinstance(pretty_xml, str)
+        assert sink.getvalue() == pretty_xml.encode("utf-8")
+
+    def test_write_to_writes_nothing_for_absent_data(self) -> None:
+        """None data leaves the sink untouched."""
+        sink = io.BytesIO()
+
+        assert json2xml.Json2xml(None).write_to(sink) == 0
+        assert sink.getvalue() == b""
+
+    def test_write_to_enforces_output_limit(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The exact output budget stops writing before the offending chunk reaches the sink."""
+        def fake_dicttoxml(*args: Any, sink: Any, **kwargs: Any) -> None:
+            sink.write(b"x" * 150)
+            sink.write(b"x" * 51)
+
+        monkeypatch.setattr("json2xml.json2xml.dicttoxml.dicttoxml", fake_dicttoxml)
+        sink = io.BytesIO()
+
+        with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
+            json2xml.Json2xml({}, max_output_bytes=200).write_to(sink)
+        assert sink.getvalue() == b"x" * 150
+
+    def test_write_to_wraps_serializer_errors(self) -> None:
+        """Serializer ValueErrors surface as the converter's public invalid-data error."""
+        with pytest.raises(InvalidDataError):
+            json2xml.Json2xml({"bad": "\x00"}).write_to(io.BytesIO())
+
+    # @lat: [[tests#Conversion behavior#Incremental input converts without decoding]]
+    @pytest.mark.parametrize("pretty", [False, True])
+    def test_event_stream_input_matches_decoded_input(self, pretty: bool) -> None:
+        """Incremental input produces the same XML from every output method."""
+        document = '{"login": "mojombo", "repos": [{"id": 1, "tags": ["a", "b"]}], "site": null}'
+        expected = json2xml.Json2xml(readfromstring(document), pretty=pretty).to_xml()
+        converter = json2xml.Json2xml(streamfromstring(document), pretty=pretty)
+        expected_bytes = expected.encode("utf-8") if isinstance(expected, str) else expected
+        sink = io.BytesIO()
+
+        assert converter.to_xml() == expected
+        assert b"".join(converter.iter_xml(chunk_size=16)) == expected_bytes
+        assert converter.write_to(sink) == len(expected_bytes)
+        assert sink.getvalue() == expected_bytes
+
+    def test_event_stream_reads_files(self) -> None:
+        """File streams convert like readfromjson data."""
+        expected = json2xml.Json2xml(readfromjson("examples/bigexample.json")).to_xml()
+
+        assert json2xml.Json2xml(streamfromjson("examples/bigexample.json")).to_xml() == expected
+
+    @pytest.mark.parametrize(
+        ("data", "limits", "message"),
+        [
+            ("[[[1]]]", {"max_depth": 2}, "JSON nesting depth limit exceeded"),
+            ('{"a": [1, 2]}', {"max_items": 3}, "JSON item limit exceeded"),
+            ('{"a": "' + "x" * 300 + '"}', {"max_output_bytes": 200}, "XML output size limit exceeded"),
+        ],
+    )
+    def test_event_stream_enforces_limits_while_converting(
+        self, data: str, limits: dict[str, int], message: str
+    ) -> None:
+        """Incremental input applies every limit as events are consumed."""
+        converter = json2xml.Json2xml(streamfromstring(data), **limits)
+
+        with pytest.raises(InvalidDataError, match=message):
+            converter.to_xml()
+        with pytest.raises(InvalidDataError, match=message):
+            list(converter.iter_xml())
+        with pytest.raises(InvalidDataError, match=message):
+            converter.write_to(io.BytesIO())
+
+    def test_event_stream_limits_match_decoded_limits(self) -> None:
+        """Depth and item limits accept exactly what the decoded-input budget accepts."""
+        data = '{"a": [[1]], "b": 2}'
+        options = {"max_depth": 3, "max_items": 5}
+
+        assert json2xml.Json2xml(streamfromstring(data), **options).to_xml() == (
+            json2xml.Json2xml(readfromstring(data), **options).to_xml()
+        )
+
+    def test_event_stream_surfaces_reader_and_serializer_errors(self) -> None:
+        """Parse errors keep the reader's error type; XML errors become InvalidDataError."""
+        with pytest.raises(StringReadError):
+            json2xml.Json2xml(streamfromstring('{"a": ')).to_xml()
+        with pytest.raises(InvalidDataError):
+            json2xml.Json2xml(streamfromstring('{"bad": "\\u0000"}')).to_xml()
+
+    # @lat: [[tests#Conversion behavior#JSON text converts natively when Rust is installed]]
+    def test_event_stream_text_goes_to_native_parser(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Whole-document output parses stream text natively unless an option needs Python."""
+        native = Mock(return_value=b"<native/>")
+        monkeypatch.setattr(json2xml.dicttoxml, "is_rust_available", lambda: True)
+        monkeypatch.setattr(json2xml.dicttoxml, "json_to_xml", native)
+        document = '{"name": "Ada"}'
+        expected = json2xml.Json2xml(readfromstring(document), ids=True, id_strategy="counter")
+
+        assert json2xml.Json2xml(streamfromstring(document), wrapper="all").to_bytes() == b"<native/>"
+        native.assert_called_once_with(
+            document,
+            root=True,
+            custom_root="all",
+            attr_type=True,
+            item_wrap=True,
+            cdata=False,
+            list_headers=False,
+            limits=ConversionLimits(
+                json2xml.DEFAULT_MAX_DEPTH,
+                json2xml.DEFAULT_MAX_ITEMS,
+                json2xml.DEFAULT_MAX_OUTPUT_BYTES,
+            ),
+            pretty=False,
+        )
+        stream = json2xml.Json2xml(streamfromstring(document), ids=True, id_strategy="counter")
+        assert stream.to_bytes() == expected.to_bytes()
+        assert native.call_count == 1
+        native.return_value = None
+        assert json2xml.Json2xml(streamfromstring(document)).to_xml() == (
+            json2xml.Json2xml(readfromstring(document)).to_xml()
         )
+        native.side_effect = ValueError("Invalid XML character")
+        with pytest.raises(InvalidDataError):
+            json2xml.Json2xml(streamfromstring(document)).to_bytes()
+        events = JSONEventStream(lambda: iter(streamfromstring(document)), StringReadError, "bad")
+        assert json2xml.Json2xml(events).to_bytes() == json2xml.Json2xml(readfromstring(document)).to_bytes()
+        assert native.call_count == 3
+        oversized = json2xml.Json2xml(streamfromstring(document), max_output_bytes=len(document) - 1)
+        with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
+            oversized.to_bytes()
+        assert native.call_count == 3
+
+    def test_iter_xml_requires_positive_chunk_size(self) -> None:
+        """Chunk sizes use the same validation as the other numeric budgets."""
+        with pytest.raises(ValueError, match="chunk_size must be a positive integer"):
+            json2xml.Json2xml({}).iter_xml(chunk_size=0)
 
+    # @lat: [[tests#Conversion behavior#JSON Lines convert record by record]]
+    def test_convert_lines_matches_per_record_conversion(self) -> None:
+        """Each record converts exactly like a standalone Json2xml call; blanks and nulls vanish."""
+        lines = ['{"id": 1, "tags": ["a"]}\n', "\n", "null\n", b'[true, 2.5]\n', '"last"']
+
+        records = list(json2xml.convert_lines(lines, wrapper="event", attr_type=False))
+
+        assert records == [
+            json2xml.Json2xml(data, wrapper="event", attr_type=False).to_xml()
+            for data in ({"id": 1, "tags": ["a"]}, [True, 2.5], "last")
+        ]
+
+    def test_convert_lines_wraps_records_in_stream_root(self) -> None:
+        """A stream root yields one document with per-record declarations removed."""
+        output = b"".join(json2xml.convert_lines(['{"a": 1}', '{"a": 2}'], stream_root="log entries"))
+
+        assert output == (
+            b'<?xml version="1.0" encoding="UTF-8" ?><log_entries>'
+            b'<all><a type="int">1</a></all><all><a type="int">2</a></all></log_entries>'
+        )
+        assert xmltodict.parse(output)["log_entries"]["all"][1]["a"]["#text"] == "2"
+
+    def test_convert_lines_with_workers_preserves_order(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Process-parallel conversion yields the serial output in input order."""
+        monkeypatch.setattr(json2xml, "LINE_BATCH_SIZE", 3)
+        lines = [f'{{"n": {index}}}' for index in range(20)]
+
+        parallel = list(json2xml.convert_lines(lines, workers=2))
+
+        assert parallel == list(json2xml.convert_lines(lines))
+
+    def test_convert_lines_worker_errors_propagate(self) -> None:
+        """A failing batch in a worker process surfaces its line-numbered error."""
+        with pytest.raises(JSONReadError, match="Invalid JSON on line 2"):
+            list(json2xml.convert_lines(['{"ok": 1}', "{bad"], workers=2))
+
+    # @lat: [[tests#Conversion behavior#Workers split large top-level containers]]
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"pretty": True}, {"root": False}, {"root": False, "pretty": True}, {"wrapper": "my root"}],
+    )
+    def test_workers_split_top_level_members_without_changing_output(
+        self, monkeypatch: pytest.MonkeyPatch, options: dict[str, Any]
+    ) -> None:
+        """Chunks of a top-level list or dict convert in workers and join to the serial output."""
+        monkeypatch.setattr(json2xml, "PARALLEL_MIN_MEMBERS", 4)
+        monkeypatch.setattr(json2xml.sys, "_is_gil_enabled", lambda: False, raising=False)
+        members = [{"id": index, "tags": ["a", None]} if index % 3 else index for index in range(10)]
+
+        for data in (members, {f"k{index}": value for index, value in enumerate(members)}):
+            serial = json2xml.Json2xml(data, **options).to_bytes()
+            converter = json2xml.Json2xml(data, workers=2, **options)
+            sink = io.BytesIO()
+
+            assert converter._member_chunks() is not None
+            assert converter.to_bytes() == serial
+            assert converter.write_to(sink) == len(serial)
+            assert sink.getvalue() == serial
+
+    @pytest.mark.parametrize("pretty", [False, True])
+    @pytest.mark.parametrize("root", [False, True])
+    @pytest.mark.parametrize("list_headers", [False, True])
+    @pytest.mark.parametrize("item_wrap", [False, True])
+    def test_workers_match_serial_output_when_members_render_empty(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        pretty: bool,
+        root: bool,
+        list_headers: bool,
+        item_wrap: bool,
+    ) -> None:
+        """Chunks whose members render nothing add nothing, not a line of their own."""
+        monkeypatch.setattr(json2xml, "PARALLEL_MIN_MEMBERS", 4)
+        monkeypatch.setattr(json2xml.sys, "_is_gil_enabled", lambda: False, raising=False)
+        options = {
+            "pretty": pretty,
+            "root": root,
+            "list_headers": list_headers,
+            "item_wrap": item_wrap,
+        }
+
+        def render(data: Any, workers: int) -> bytes | str | None:
+            # Rootless list headers of dicts are unnamed, which pretty output rejects.
+            try:
+                return json2xml.Json2xml(data, workers=workers, **options).to_bytes()
+            except InvalidDataError as error:
+                return str(error)
+
+        mixed = [[]] * 5 + ["", None, [1], {"a": []}] + [{}] * 5
+        for data in ([[]] * 11, [{}] * 11, mixed, {f"k{index}": [] for index in range(11)}):
+            assert render(data, workers=2) == render(data, workers=1)
+
+    def test_workers_use_processes_while_the_gil_is_enabled(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """GIL builds hand chunks to worker processes."""
+        monkeypatch.setattr(json2xml, "PARALLEL_MIN_MEMBERS", 2)
+        monkeypatch.setattr(json2xml.sys, "_is_gil_enabled", lambda: True, raising=False)
+        data = [{"n": index} for index in range(8)]
+
+        assert isinstance(json2xml._worker_pool(2), json2xml.ProcessPoolExecutor)
+        assert json2xml.Json2xml(data, workers=2).to_xml() == json2xml.Json2xml(data).to_xml()
+
+    def test_workers_render_each_chunk_once_in_a_shared_pool(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Chunks count their items while they render, in a pool later conversions reuse."""
+        monkeypatch.setattr(json2xml, "PARALLEL_MIN_MEMBERS", 4)
+        monkeypatch.setattr(json2xml.sys, "_is_gil_enabled", lambda: True, raising=False)
+        walk = Mock(side_effect=AssertionError("chunks must not be walked again"))
+        monkeypatch.setattr(json2xml.dicttoxml, "_check_structure", walk)
+        monkeypatch.setattr(json2xml.dicttoxml, "_renders_without_gil", lambda: True)
+        data = [{"n": index} for index in range(16)]
+        pool = json2xml._worker_pool(2, threads=True)
+
+        assert isinstance(pool, ThreadPoolExecutor)
+        assert json2xml._worker_pool(2) is not pool
+        assert json2xml.Json2xml(data, workers=2).to_bytes() == json2xml.Json2xml(data).to_bytes()
+        assert json2xml._worker_pool(2, threads=True) is pool
+        with pytest.raises(InvalidDataError, match="JSON item limit exceeded"):
+            json2xml.Json2xml(data, workers=2, max_items=32).to_bytes()
+
+    def test_broken_worker_pools_are_replaced(self) -> None:
+        """A pool whose workers died is dropped, so the next conversion starts a new one."""
+        pool = json2xml._worker_pool(2, threads=True)
+
+        def broken(task: int) -> int:
+            raise BrokenExecutor("worker died")
+
+        with pytest.raises(BrokenExecutor):
+            list(json2xml._map_in_workers(broken, iter(range(3)), 2, threads=True))
+        assert json2xml._worker_pool(2, threads=True) is not pool
+
+    def test_workers_sum_item_and_output_limits_across_chunks(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Limits that every chunk meets on its own still apply to the whole document."""
+        monkeypatch.setattr(json2xml, "PARALLEL_MIN_MEMBERS", 4)
+        monkeypatch.setattr(json2xml.sys, "_is_gil_enabled", lambda: False, raising=False)
+        data = list(range(16))
+        size = len(json2xml.Json2xml(data).to_bytes() or b"")
+
+        assert json2xml.Json2xml(data, workers=2, max_items=17, max_output_bytes=size).to_bytes()
+        with pytest.raises(InvalidDataError, match="JSON item limit exceeded"):
+            json2xml.Json2xml(data, workers=2, max_items=16).to_bytes()
+        with pytest.raises(InvalidDataError, match="XML output size limit exceeded"):
+            json2xml.Json2xml(data, workers=2, max_output_bytes=size - 1).to_bytes()
+
+    def test_workers_raise_invalid_data_error_for_invalid_members(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Serializer errors in a chunk surface as InvalidDataError, as they do serially."""
+        monkeypatch.setattr(json2xml.sys, "_is_gil_enabled", lambda: False, raising=False)
+        converter = json2xml.Json2xml(["a"] * 2000 + ["\x01"], workers=2)
+
+        assert converter._member_chunks() is not None
+        with pytest.raises(InvalidDataError):
+            converter.to_bytes()
+
+    @pytest.mark.parametrize(
+        ("data", "options"),
+        [
+            (list(range(8)), {"ids": True}),
+            (list(range(8)), {"xpath_format": True}),
+            ({"@attrs": {"a": 1}, **{f"k{index}": index for index in range(8)}}, {}),
+            (list(range(3)), {}),
+            (tuple(range(8)), {}),
+            (list(range(8)), {"workers": 1}),
+        ],
+    )
+    def test_workers_leave_position_dependent_documents_serial(
+        self, monkeypatch: pytest.MonkeyPatch, data: Any, options: dict[str, Any]
+    ) -> None:
+        """IDs, XPath output, root special keys and small containers are not split."""
+        monkeypatch.setattr(json2xml, "PARALLEL_MIN_MEMBERS", 4)
+
+        assert json2xml.Json2xml(data, **{"workers": 2, **options})._member_chunks() is None
+
+    def test_workers_must_be_positive(self) -> None:
+        """Worker counts are validated like the other numeric options."""
+        with pytest.raises(ValueError, match="workers must be a positive integer"):
+            json2xml.Json2xml([], workers=0)
+
+    def test_convert_lines_reports_line_numbers(self) -> None:
+        """Decode and conversion failures name the offending line."""
+        with pytest.raises(JSONReadError, match="Invalid JSON on line 2"):
+            list(json2xml.convert_lines(['{"ok": 1}', "{bad"]))
+        with pytest.raises(InvalidDataError, match="Invalid data on line 1: JSON item limit"):
+            list(json2xml.convert_lines(["[1, 2, 3]"], max_items=2))
+
+    def test_convert_lines_validates_options_eagerly(self) -> None:
+        """Invalid worker counts and stream roots fail before any line is read."""
+        with pytest.raises(ValueError, match="workers must be a positive integer"):
+            json2xml.convert_lines([], workers=0)
         with pytest.raises(InvalidDataError):
-            json2xml.Json2xml({"valid": "data"}, pretty=True).to_xml()
+            json2xml.convert_lines([], stream_root="\x00")
 
     def test_read_boolean_data_from_json(self) -> None:
         """Test correct return for boolean types."""
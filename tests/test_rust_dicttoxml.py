@@ -6,12 +6,20 @@ and matches the Python implementation for supported features.
 """
 from __future__ import annotations
 
+import copy
+import datetime
+import enum
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 from typing import Any
 
 import pytest
 
 # Check if Rust extension is available
 try:
+    import json2xml_rs  # type: ignore[import-not-found]
     from json2xml_rs import dicttoxml as rust_dicttoxml  # type: ignore[import-not-found]
     from json2xml_rs import escape_xml_py, wrap_cdata_py  # type: ignore[import-not-found]
     RUST_AVAILABLE = True
@@ -33,6 +41,17 @@ from json2xml.dicttoxml_fast import (
 from json2xml.dicttoxml_fast import (
     wrap_cdata as fast_wrap_cdata,
 )
+from json2xml.json2xml import Json2xml
+from json2xml.utils import InvalidDataError, readfromjson, streamfromjson
+
+
+class _Label(str, enum.Enum):
+    ADA = "Ada"
+
+
+class _Count(int):
+    pass
+
 
 # Skip all tests if Rust is not available
 pytestmark = pytest.mark.skipif(not RUST_AVAILABLE, reason="Rust extension not installed")
@@ -314,9 +333,10 @@ class TestRustVsPythonCompatibility:
         rust, python = self.compare_outputs(data, root=False)
         assert rust == python
 
-    def test_custom_root_matches(self):
+    @pytest.mark.parametrize("custom_root", ["custom", "xmlroot", "ns:root", "名前"])
+    def test_custom_root_matches(self, custom_root: str):
         data = {"key": "value"}
-        rust, python = self.compare_outputs(data, custom_root="custom")
+        rust, python = self.compare_outputs(data, custom_root=custom_root)
         assert rust == python
 
     def test_no_attr_type_matches(self):
@@ -388,6 +408,13 @@ class TestRustVsPythonCompatibility:
             {"名前": "太郎"},
             {"-bad": "value"},
             {"": "value"},
+            {"xmlfoo": "value"},
+            {"a b:c": "value"},
+            {"trailing ": "value"},
+            {"々": "value"},
+            {"a々": "value"},
+            {"ǅ": "value"},
+            {"\U00010000": "value"},
         ],
     )
     def test_xml_name_normalization_matches(self, data: dict[str, str]):
@@ -395,6 +422,475 @@ class TestRustVsPythonCompatibility:
         rust, python = self.compare_outputs(data, root=False, attr_type=False)
         assert rust == python
 
+    # @lat: [[tests#XML helper behavior#Rust pretty layout matches Python indentation]]
+    @pytest.mark.parametrize("indent", [0, 2, 4])
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"root": False}, {"attr_type": False}, {"item_wrap": False}, {"list_headers": True}, {"cdata": True}],
+    )
+    def test_pretty_output_matches(self, options: dict[str, Any], indent: int):
+        data = {"name": "Ada", "empty": "", "tags": ["a", {"k": None}, []], "meta": {}, "n": 1.5}
+        rust, python = self.compare_outputs(data, pretty=True, indent=indent, **options)
+        assert rust == python
+
+    def test_pretty_fast_path_uses_rust(self):
+        data = {"items": [1, {"a": "b"}]}
+        assert fast_dicttoxml(data, pretty=True, indent=3) == py_dicttoxml.dicttoxml(data, pretty=True, indent=3)
+        assert "pretty" in fast_module._rust_features
+
+
+    @pytest.mark.parametrize(
+        ("data", "options"),
+        [
+            ([{"": {}}], {"list_headers": True}),
+            ([{}], {"list_headers": True, "item_wrap": False}),
+        ],
+    )
+    def test_pretty_invalid_names_fall_back_to_python(self, data: Any, options: dict[str, Any]):
+        assert rust_dicttoxml(data, root=False, **options).endswith(b"</>")
+        with pytest.raises(json2xml_rs.FallbackRequired):
+            rust_dicttoxml(data, root=False, pretty=True, **options)
+        with pytest.raises(InvalidDataError, match="Malformed XML generated"):
+            fast_dicttoxml(data, root=False, pretty=True, **options)
+
+class TestRustXPathFormat:
+    """Test that the Rust XPath 3.1 mode is byte-identical to the Python renderer."""
+
+    DOCUMENT = {
+        "name": "Ada & <Lovelace>",
+        "empty": "",
+        "count": 3,
+        "big": 10**30,
+        "ratio": 1.0,
+        "price": Decimal("1.50"),
+        "active": False,
+        "missing": None,
+        "raw": b"bytes",
+        "tags": ["a", ("b", 2), [], {}],
+        "nested": {'q"k': {"deep": [None, True]}},
+        7: "int key",
+    }
+
+    # @lat: [[tests#XML helper behavior#Rust XPath output matches Python]]
+    @pytest.mark.parametrize("pretty", [False, True])
+    @pytest.mark.parametrize("data", [DOCUMENT, [DOCUMENT, 1], {}, []])
+    def test_output_matches_python(self, data: Any, pretty: bool):
+        expected = py_dicttoxml.dicttoxml(data, xpath_format=True, pretty=pretty)
+        assert rust_dicttoxml(data, xpath_format=True, pretty=pretty) == expected
+        assert fast_dicttoxml(data, xpath_format=True, pretty=pretty) == expected
+
+    @pytest.mark.parametrize("data", ["text", 1.5, None, True])
+    def test_scalar_documents_are_wrapped_in_a_map(self, data: Any):
+        expected = py_dicttoxml.dicttoxml(data, xpath_format=True)
+        assert rust_dicttoxml(data, xpath_format=True, custom_root="not valid") == expected
+
+    def test_special_keys_are_plain_keys(self):
+        data = {"@attrs": {"id": 1}, "@val": "x", "flat@flat": [1]}
+        assert rust_dicttoxml(data, xpath_format=True) == py_dicttoxml.dicttoxml(data, xpath_format=True)
+
+    def test_limits_apply_to_maps_and_arrays(self):
+        with pytest.raises(json2xml_rs.ConversionLimitError, match="JSON item limit exceeded"):
+            rust_dicttoxml({"a": [1, 2, 3]}, xpath_format=True, max_items=4)
+        with pytest.raises(json2xml_rs.ConversionLimitError, match="JSON nesting depth limit exceeded"):
+            rust_dicttoxml({"a": [1]}, xpath_format=True, max_depth=1)
+
+
+class TestRustSpecialKeys:
+    """Test that Rust renders @attrs, @val and @flat exactly like the Python serializer."""
+
+    DOCUMENT = {
+        "user": {"@attrs": {"id": 7, "lang": "en & fr"}, "@val": "Ada"},
+        "empty": {"@attrs": {"id": 1}, "@val": ""},
+        "nothing": {"@val": None},
+        "pairs": {"@attrs": [("a", "1")], "child": {"x": 1}},
+        "typed": {"@attrs": {"type": "custom"}, "@val": [1, "two"]},
+        "flat@flat": [1, {"b": 2}],
+        "flatdict": {"@flat": True, "inner": "x"},
+        "members": [{"@attrs": {"role": "admin"}, "@val": True}, {"name": "Grace"}, [1, 2], None, False],
+        "nested": {"@val": {"deep": {"@attrs": {"k": "v"}, "leaf": 1.5}}},
+    }
+
+    # @lat: [[tests#XML helper behavior#Rust special keys match Python]]
+    @pytest.mark.parametrize("pretty", [False, True])
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"root": False}, {"attr_type": False}, {"item_wrap": False}, {"list_headers": True},
+         {"item_wrap": False, "list_headers": True}, {"cdata": True}],
+    )
+    def test_output_matches_python(self, options: dict[str, Any], pretty: bool):
+        original = copy.deepcopy(self.DOCUMENT)
+        expected = py_dicttoxml.dicttoxml(self.DOCUMENT, pretty=pretty, **options)
+        assert rust_dicttoxml(self.DOCUMENT, pretty=pretty, **options) == expected
+        assert fast_dicttoxml(self.DOCUMENT, pretty=pretty, **options) == expected
+        assert self.DOCUMENT == original
+
+    def test_val_text_stays_inline_when_pretty(self):
+        result = rust_dicttoxml({"user": {"@attrs": {"id": 1}, "@val": "Ada"}}, pretty=True)
+        assert b'\n  <user id="1">Ada</user>\n' in result
+
+    @pytest.mark.parametrize("name", ["1a", "a b", "a:b", "xmlns:xml"])
+    def test_invalid_attribute_names_are_rejected(self, name: str):
+        data = {"user": {"@attrs": {name: "x"}, "@val": "Ada"}}
+        with pytest.raises(ValueError, match="Invalid XML attribute name"):
+            py_dicttoxml.dicttoxml(data)
+        with pytest.raises(ValueError, match="Invalid XML attribute name"):
+            rust_dicttoxml(data)
+
+
+class TestRustNamespacesAndItemNames:
+    """Test that Rust renders namespaces and custom item names like the Python serializer."""
+
+    NAMESPACES = {
+        "xmlns": "http://example.com/default",
+        "soap": "http://schemas.xmlsoap.org/soap/envelope/",
+        "xsi": {
+            "schemaInstance": "http://www.w3.org/2001/XMLSchema-instance",
+            "schemaLocation": "http://example.com/a & b.xsd",
+            "ignored": "x",
+        },
+    }
+    DOCUMENT = {
+        "users": [{"name": "Ada"}, "Grace", None, True, [1, 2]],
+        "groups": {"admins": ["root"], "flags@flat": [1]},
+    }
+
+    @staticmethod
+    def singular(parent: str) -> str:
+        return parent[:-1] if parent.endswith("s") else "entry"
+
+    # @lat: [[tests#XML helper behavior#Rust namespaces and item names match Python]]
+    @pytest.mark.parametrize("pretty", [False, True])
+    @pytest.mark.parametrize(
+        "options",
+        [{}, {"item_wrap": False}, {"list_headers": True}, {"attr_type": False}, {"cdata": True}],
+    )
+    def test_output_matches_python(self, options: dict[str, Any], pretty: bool):
+        expected = py_dicttoxml.dicttoxml(
+            self.DOCUMENT,
+            xml_namespaces=self.NAMESPACES,
+            item_func=self.singular,
+            pretty=pretty,
+            **options,
+        )
+        result = rust_dicttoxml(
+            self.DOCUMENT,
+            xml_namespaces=self.NAMESPACES,
+            item_func=self.singular,
+            pretty=pretty,
+            **options,
+        )
+        assert result == expected
+
+    @pytest.mark.parametrize("item_name", ["my item", "1x", "42", "row@flat"])
+    def test_item_names_are_made_valid_like_python(self, item_name: str):
+        data = {"rows": [1, True, {"a": 1}]}
+        expected = py_dicttoxml.dicttoxml(data, item_func=lambda parent: item_name)
+        assert rust_dicttoxml(data, item_func=lambda parent: item_name) == expected
+
+    def test_item_func_runs_once_per_distinct_parent(self):
+        calls: list[str] = []
+
+        def item_func(parent: str) -> str:
+            calls.append(parent)
+            return "entry"
+
+        rust_dicttoxml({"a": [[1], [2]], "b": [3]}, item_func=item_func)
+        assert sorted(calls) == ["a", "b", "entry"]
+
+    def test_static_table_matches_callable(self):
+        table = {"users": "user", "admins": "admin"}
+        expected = py_dicttoxml.dicttoxml(
+            self.DOCUMENT, item_func=lambda parent: table.get(parent, "item")
+        )
+        assert rust_dicttoxml(self.DOCUMENT, item_func=table) == expected
+        assert fast_dicttoxml(self.DOCUMENT, item_func=table) == expected
+
+    def test_namespaces_are_ignored_without_root(self):
+        result = rust_dicttoxml({"a": 1}, root=False, xml_namespaces={"1bad": "x"})
+        assert result == py_dicttoxml.dicttoxml({"a": 1}, root=False, xml_namespaces={"1bad": "x"})
+
+    @pytest.mark.parametrize(
+        ("namespaces", "message"),
+        [
+            ({"xml": "x"}, "Invalid XML namespace prefix"),
+            ({"a:b": "x"}, "Invalid XML namespace prefix"),
+            ({1: "x"}, "Invalid XML namespace prefix"),
+            ({"xsi": "x"}, "The xsi namespace value must be a mapping"),
+            ({"xsi": {"schemaLocation": "x"}}, "xsi schemaLocation requires a schemaInstance"),
+        ],
+    )
+    def test_invalid_namespaces_are_rejected(self, namespaces: dict[Any, Any], message: str):
+        with pytest.raises(ValueError, match=message):
+            py_dicttoxml.dicttoxml({"a": 1}, xml_namespaces=namespaces)
+        with pytest.raises(ValueError, match=message):
+            rust_dicttoxml({"a": 1}, xml_namespaces=namespaces)
+
+    def test_fast_path_uses_rust(self):
+        options: dict[str, Any] = {"xml_namespaces": self.NAMESPACES, "item_func": self.singular}
+        assert fast_dicttoxml(self.DOCUMENT, **options) == py_dicttoxml.dicttoxml(self.DOCUMENT, **options)
+        assert {"xml_namespaces", "item_func"} <= fast_module._rust_features
+
+
+class TestRustIds:
+    """Test that Rust numbers elements like the Python serializer's ID strategies."""
+
+    DOCUMENT = {
+        "users": [{"name": "Ada"}, "Grace", None, True, [1, 2]],
+        "profile": {"@attrs": {"lang": "en"}, "@val": "x"},
+        "flags@flat": [1],
+        "my key": 1,
+    }
+
+    # @lat: [[tests#XML helper behavior#Element ID strategies are reproducible]]
+    @pytest.mark.parametrize("pretty", [False, True])
+    @pytest.mark.parametrize("root", [True, False])
+    @pytest.mark.parametrize("data", [DOCUMENT, [DOCUMENT, "x", [1]]])
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"id_strategy": "counter"},
+            {"id_strategy": "path"},
+            {"id_strategy": "seeded", "id_seed": 7},
+            {"id_strategy": "seeded", "id_seed": 2**64 - 1, "item_wrap": False},
+            {"id_strategy": "counter", "list_headers": True, "attr_type": False},
+        ],
+    )
+    def test_output_matches_python(
+        self, options: dict[str, Any], data: Any, root: bool, pretty: bool
+    ):
+        options = {"ids": True, "root": root, "pretty": pretty, **options}
+        expected = py_dicttoxml.dicttoxml(data, **options)
+        assert rust_dicttoxml(data, **options) == expected
+        assert fast_dicttoxml(data, **options) == expected
+
+    def test_random_ids_keep_the_python_shape(self):
+        assert re.search(rb'<a id="root_[1-9][0-9]{5}" type="int">', rust_dicttoxml({"a": 1}, ids=True))
+        assert re.search(rb'<item id="root_[1-9][0-9]{5}_1" type="int">', rust_dicttoxml([1], ids=True))
+        assert "id_strategy" in fast_module._rust_features
+
+    def test_unknown_strategy_is_rejected(self):
+        with pytest.raises(ValueError, match="id_strategy must be one of"):
+            rust_dicttoxml({"a": 1}, ids=True, id_strategy="uuid")
+
+
+class TestRustStrictFallback:
+    """Test that strict Rust renders give up on non-JSON values and Python takes over."""
+
+    # @lat: [[tests#Conversion behavior#Backend selector retries after a fallback signal]]
+    @pytest.mark.parametrize(
+        "value",
+        [
+            datetime.date(2024, 1, 2),
+            Decimal("1.5"),
+            {1, 2},
+            range(2),
+            _Count(3),
+            _Label.ADA,
+            {"@val": datetime.date(2024, 1, 2)},
+            {"@val": range(2)},
+        ],
+    )
+    def test_non_json_values_signal_fallback(self, value: Any):
+        data = {"items": [value], "value": value}
+        with pytest.raises(json2xml_rs.FallbackRequired):
+            rust_dicttoxml(data, strict=True)
+        try:
+            expected = py_dicttoxml.dicttoxml(data)
+        except TypeError:
+            with pytest.raises(TypeError):
+                fast_dicttoxml(data)
+        else:
+            assert fast_dicttoxml(data) == expected
+
+    def test_json_values_render_without_fallback(self):
+        data = {"a": [1, 2.5, "x", None, True, (3,)], "b": {"@attrs": {"id": 1}, "@val": 4}}
+        assert rust_dicttoxml(data, strict=True) == py_dicttoxml.dicttoxml(data)
+        assert "strict" in fast_module._rust_features
+
+
+class TestRustLimits:
+    """Test that the Rust extension enforces the same limits as the Python serializer."""
+
+    DOCUMENT = {"name": "Ada", "tags": ["a", {"b": "c"}], "meta": {}}
+
+    # @lat: [[tests#XML helper behavior#Rust limits match the Python budget]]
+    @pytest.mark.parametrize(
+        ("limits", "message"),
+        [
+            ((1, 100, 1 << 20), "JSON nesting depth limit exceeded"),
+            ((10, 6, 1 << 20), "JSON item limit exceeded"),
+            ((10, 100, 50), "XML output size limit exceeded"),
+        ],
+    )
+    def test_limits_match_python(self, limits: tuple[int, int, int], message: str):
+        max_depth, max_items, max_output_bytes = limits
+        with pytest.raises(json2xml_rs.ConversionLimitError, match=message):
+            rust_dicttoxml(
+                self.DOCUMENT, max_depth=max_depth, max_items=max_items, max_output_bytes=max_output_bytes
+            )
+        with pytest.raises(InvalidDataError, match=message):
+            py_dicttoxml.dicttoxml(self.DOCUMENT, limits=py_dicttoxml.ConversionLimits(*limits))
+        with pytest.raises(InvalidDataError, match=message):
+            fast_dicttoxml(self.DOCUMENT, limits=py_dicttoxml.ConversionLimits(*limits))
+
+    def test_exact_limits_pass(self):
+        expected = py_dicttoxml.dicttoxml(self.DOCUMENT)
+        assert rust_dicttoxml(self.DOCUMENT, max_depth=3, max_items=7, max_output_bytes=len(expected)) == expected
+        assert issubclass(json2xml_rs.ConversionLimitError, ValueError)
+
+
+class TestRustReleaseGil:
+    """Test that rendering from a detached copy matches rendering in place."""
+
+    DOCUMENT = {
+        "name": "Ada & <co>",
+        "big": 2**80,
+        "ratio": 0.1 + 0.2,
+        "tiny": 1e-7,
+        "flags": [True, None, 3, "x"],
+        "rows": [{"id": 1, "tags": ("a", "b")}, [1, [2]], {}],
+        "tags@flat": ["p", "q"],
+        7: {"nested": {"deep": [1.0, -0.0, float("inf")]}},
+    }
+
+    # @lat: [[tests#Conversion behavior#Rust renders can release the GIL]]
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"root": False},
+            {"attr_type": False, "item_wrap": False},
+            {"list_headers": True},
+            {"list_headers": True, "item_wrap": False, "attr_type": False},
+            {"cdata": True, "pretty": True, "indent": 3},
+            {"item_func": {"rows": "row", "flags": "flag"}},
+            {"xml_namespaces": {"xmlns": "http://example.com", "ns": "http://ns.example.com"}},
+            {"strict": True, "max_depth": 10, "max_items": 100, "max_output_bytes": 4096},
+        ],
+    )
+    def test_detached_render_matches_live_render(self, options: dict[str, Any]):
+        for data in (self.DOCUMENT, [self.DOCUMENT, 1, "two"], {}, []):
+            assert rust_dicttoxml(data, release_gil=True, **options) == rust_dicttoxml(data, **options)
+
+    @pytest.mark.parametrize(
+        ("data", "options", "error_name"),
+        [
+            ({"a": [[[1]]]}, {"max_depth": 2}, "ConversionLimitError"),
+            ({"a": list(range(10))}, {"max_items": 5}, "ConversionLimitError"),
+            ({"a": "x" * 200}, {"max_output_bytes": 100}, "ConversionLimitError"),
+            ({"a": "ok", "b": "\x00"}, {}, "ValueError"),
+            ({"a": [datetime.date(2024, 1, 2)]}, {"strict": True}, "FallbackRequired"),
+        ],
+    )
+    def test_detached_render_raises_live_errors(
+        self, data: Any, options: dict[str, Any], error_name: str
+    ):
+        error = getattr(json2xml_rs, error_name, ValueError)
+        with pytest.raises(error) as live:
+            rust_dicttoxml(data, **options)
+        with pytest.raises(error) as detached:
+            rust_dicttoxml(data, release_gil=True, **options)
+        assert str(detached.value) == str(live.value)
+
+    def test_unsupported_documents_render_in_place(self):
+        calls: list[str] = []
+
+        def item_func(parent: str) -> str:
+            calls.append(parent)
+            return "entry"
+
+        # The copy names "list" before giving up at the date; the live render reuses the name.
+        data = {"list": [1], "when": datetime.date(2024, 1, 2), "box": {"@attrs": {"id": "1"}}}
+        assert rust_dicttoxml(data, release_gil=True, item_func=item_func) == rust_dicttoxml(
+            data, item_func=item_func
+        )
+        assert calls == ["list", "list"]
+        assert rust_dicttoxml(data, release_gil=True, ids=True, id_strategy="counter") == rust_dicttoxml(
+            data, ids=True, id_strategy="counter"
+        )
+        assert "release_gil" in fast_module._rust_features
+
+    def test_threads_render_in_parallel(self):
+        data = [self.DOCUMENT] * 200
+        expected = rust_dicttoxml(data)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: rust_dicttoxml(data, release_gil=True), range(8)))
+        assert results == [expected] * 8
+        assert fast_dicttoxml(data, release_gil=True) == py_dicttoxml.dicttoxml(data)
+
+
+    def test_count_items_reports_the_values_the_budget_charged(self):
+        data = {"rows": [{"id": 1, "tags": ["a", "b"]}, [1, [2]], {}], "name": "Ada"}
+        xml = rust_dicttoxml(data, max_items=100)
+        for release_gil in (False, True):
+            counted = rust_dicttoxml(data, max_items=100, release_gil=release_gil, count_items=True)
+            assert counted == (13, xml)
+        assert "count_items" in fast_module._rust_features
+
+class TestRustJsonToXml:
+    """Test that converting JSON text natively matches decoding it first."""
+
+    DOCUMENTS = [
+        '{"name": "Ada & <co>", "n": -0, "big": 123456789012345678901234567890, "f": 1e16}',
+        '{"rows": [{"id": 1, "tags": ["a", "b"]}, [1, [2]], {}], "tags@flat": ["p"], "x": null}',
+        '[1.5, "\\u00e9\\ud83d\\ude00", true, {"a": [NaN, Infinity, -Infinity, 1E-7]}]',
+        "[]",
+        " {} ",
+    ]
+
+    # @lat: [[tests#Conversion behavior#JSON text converts natively when Rust is installed]]
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"root": False, "custom_root": "all"},
+            {"attr_type": False, "item_wrap": False},
+            {"list_headers": True, "cdata": True},
+            {"pretty": True, "indent": 4},
+        ],
+    )
+    def test_json_text_matches_decoded_conversion(self, options: dict[str, Any]):
+        for document in self.DOCUMENTS:
+            expected = rust_dicttoxml(json.loads(document), **options)
+            assert json2xml_rs.json_to_xml(document, **options) == expected
+            assert json2xml_rs.json_to_xml(document.encode(), **options) == expected
+
+    @pytest.mark.parametrize(
+        "document",
+        ["[1,", "5", "null", '{"a": 1, "a": 2}', '{"a": {"@val": 1}}', '["\\ud800"]', b"[\xff]"],
+    )
+    def test_python_only_text_signals_fallback(self, document: str | bytes):
+        with pytest.raises(json2xml_rs.FallbackRequired):
+            json2xml_rs.json_to_xml(document)
+        assert fast_module.json_to_xml(document) is None
+
+    @pytest.mark.parametrize(
+        ("document", "options"),
+        [
+            ('{"a": [[[1]]]}', {"max_depth": 2}),
+            ('{"a": [1, 2, 3, 4, 5]}', {"max_items": 5}),
+            ('{"a": "' + "x" * 200 + '"}', {"max_output_bytes": 100}),
+            ('{"a": "ok", "b": "\\u0000"}', {}),
+        ],
+    )
+    def test_json_text_raises_decoded_errors(self, document: str, options: dict[str, Any]):
+        with pytest.raises(ValueError) as decoded:
+            rust_dicttoxml(json.loads(document), **options)
+        with pytest.raises(type(decoded.value), match=re.escape(str(decoded.value))):
+            json2xml_rs.json_to_xml(document, **options)
+
+    def test_json_text_limits_stop_the_parse(self):
+        with pytest.raises(json2xml_rs.ConversionLimitError, match="JSON item limit exceeded"):
+            json2xml_rs.json_to_xml("[1, 2, 3, oops", max_items=2)
+        with pytest.raises(json2xml_rs.ConversionLimitError, match="depth limit exceeded"):
+            json2xml_rs.json_to_xml('{"a": [[1]], "b": oops', max_depth=2)
+
+    def test_json2xml_converts_stream_text_natively(self, tmp_path: Any):
+        path = tmp_path / "data.json"
+        path.write_text(self.DOCUMENTS[1], encoding="utf-8")
+        expected = Json2xml(readfromjson(str(path)), pretty=True).to_xml()
+        assert Json2xml(streamfromjson(str(path)), pretty=True).to_xml() == expected
+
 
 class TestFastDicttoxmlWrapper:
     """Test the dicttoxml_fast wrapper module."""
@@ -411,27 +907,22 @@ class TestFastDicttoxmlWrapper:
         assert b"<name" in result
         assert b">John</name>" in result
 
-    def test_falls_back_for_xpath_format(self):
-        """xpath_format requires Python fallback."""
+    def test_handles_xpath_format(self):
         data = {"name": "John"}
         result = fast_dicttoxml(data, xpath_format=True)
-        # Should still work (uses Python)
         assert b"<string" in result  # XPath format uses <string> tags
 
-    def test_falls_back_for_namespaces(self):
-        """xml_namespaces requires Python fallback."""
+    def test_handles_namespaces(self):
         data = {"name": "John"}
         result = fast_dicttoxml(data, xml_namespaces={"ns": "http://example.com"})
         assert b'xmlns:ns="http://example.com"' in result
 
-    def test_falls_back_for_item_func(self):
-        """Custom item_func requires Python fallback."""
+    def test_handles_item_func(self):
         data = {"items": [1, 2, 3]}
         result = fast_dicttoxml(data, item_func=lambda p: "element")
         assert b"<element" in result
 
-    def test_falls_back_for_special_keys(self):
-        """@attrs and other special keys require Python fallback."""
+    def test_handles_special_keys(self):
         data = {"key": {"@attrs": {"id": "123"}, "@val": "value"}}
         result = fast_dicttoxml(data)
         assert b'id="123"' in result
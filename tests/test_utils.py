@@ -1,25 +1,39 @@
 """Test module for json2xml.utils functionality."""
+import asyncio
+import contextlib
 import gzip
+import io
 import json
+import os
 import socket
 import tempfile
 import threading
+import time
 import zlib
+from concurrent.futures import ThreadPoolExecutor
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import TYPE_CHECKING, Any, ClassVar, cast
 from unittest.mock import Mock, patch
+from urllib.parse import urlsplit
 
 import pytest
 import urllib3
 
+from json2xml import utils
 from json2xml.utils import (
     InvalidDataError,
+    JSONEventStream,
     JSONReadError,
     StringReadError,
     URLReadError,
+    iter_json_events,
     readfromjson,
     readfromstring,
     readfromurl,
+    readfromurl_async,
+    readfromurls,
+    streamfromjson,
+    streamfromstring,
 )
 
 if TYPE_CHECKING:
@@ -66,6 +80,39 @@ def json_server() -> "Iterator[str]":
         thread.join(timeout=1)
 
 
+class KeepAliveJsonHandler(JsonTestHandler):
+    """JSON handler that keeps connections open and records each one it accepts."""
+
+    protocol_version = "HTTP/1.1"
+    connections: ClassVar[list[object]] = []
+
+    def setup(self) -> None:
+        super().setup()
+        self.connections.append(self.client_address)
+
+
+@pytest.fixture
+def keep_alive_server() -> "Iterator[str]":
+    KeepAliveJsonHandler.connections.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveJsonHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=1)
+
+
+@pytest.fixture(autouse=True)
+def fresh_dns_cache() -> "Iterator[None]":
+    utils.clear_dns_cache()
+    yield
+    utils.clear_dns_cache()
+
+
 class TestExceptions:
     """Test custom exception classes."""
 
@@ -148,6 +195,80 @@ class TestReadFromJson:
         with pytest.raises(JSONReadError, match="Invalid JSON File"):
             readfromjson("some_file.json")
 
+    # @lat: [[tests#Input readers#File reader maps files and caps their size]]
+    def test_readfromjson_maps_files_and_caps_their_size(self, tmp_path: Any) -> None:
+        """Test mapped reads match text reads and oversized files fail before reading."""
+        path = tmp_path / "data.json"
+        path.write_bytes('{"name": "caf\u00e9",\r\n "items": [1, 2.5, null]}'.encode())
+        size = path.stat().st_size
+
+        assert readfromjson(str(path)) == {"name": "caf\u00e9", "items": [1, 2.5, None]}
+        assert readfromjson(str(path), max_file_bytes=size) == readfromjson(str(path))
+        with (
+            patch("json2xml.utils.mmap.mmap", side_effect=AssertionError("mapped")),
+            pytest.raises(JSONReadError, match="exceeds maximum size"),
+        ):
+            readfromjson(str(path), max_file_bytes=size - 1)
+
+        path.write_bytes(b"\xef\xbb\xbf{}")
+        with pytest.raises(JSONReadError, match="Invalid JSON File"):
+            readfromjson(str(path))
+        path.write_bytes(b"")
+        with pytest.raises(JSONReadError, match="Invalid JSON File"):
+            readfromjson(str(path))
+
+    def test_readfromjson_maps_only_the_checked_size(
+        self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a file growing after the size check is neither mapped past it nor accepted."""
+        path = tmp_path / "data.json"
+        path.write_bytes(b'{"a": 1}')
+        real_mmap = utils.mmap.mmap
+        lengths: list[int] = []
+
+        def grow_then_map(fileno: int, length: int, **kwargs: Any) -> Any:
+            with open(path, "ab") as jsondata:
+                jsondata.write(b" " * 4096)
+            lengths.append(length)
+            return real_mmap(fileno, length, **kwargs)
+
+        monkeypatch.setattr(utils.mmap, "mmap", grow_then_map)
+        with pytest.raises(JSONReadError, match="changed while reading"):
+            readfromjson(str(path), max_file_bytes=16)
+        assert lengths == [8]
+
+    @pytest.mark.parametrize("max_file_bytes", [0, -1, True, 1.5, "10"])
+    def test_readfromjson_rejects_invalid_size_limits(self, max_file_bytes: Any) -> None:
+        """Test the size limit must be a positive integer."""
+        with pytest.raises(JSONReadError, match="positive integer"):
+            readfromjson("unused.json", max_file_bytes=max_file_bytes)
+
+    @pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+    def test_readfromjson_caps_unmappable_files_while_reading(self, tmp_path: Any) -> None:
+        """Test pipes are read normally and stop one byte past the limit."""
+        path = tmp_path / "data.fifo"
+        os.mkfifo(path)
+
+        def feed(data: bytes) -> threading.Thread:
+            def write() -> None:
+                with open(path, "wb") as pipe, contextlib.suppress(BrokenPipeError):
+                    pipe.write(data)
+
+            writer = threading.Thread(target=write)
+            writer.start()
+            return writer
+
+        writer = feed(b'{"a": [1, 2]}')
+        assert readfromjson(str(path), max_file_bytes=13) == {"a": [1, 2]}
+        writer.join()
+        writer = feed(b'{"a": [1, 2]}')
+        with pytest.raises(JSONReadError, match="exceeds maximum size"):
+            readfromjson(str(path), max_file_bytes=12)
+        writer.join()
+        writer = feed(b"[true]")
+        assert readfromjson(str(path)) == [True]
+        writer.join()
+
 
 class TestReadFromUrl:
     """Test readfromurl function."""
@@ -201,6 +322,251 @@ class TestReadFromUrl:
                 f"http://127.0.0.1:{port}/data.json", allow_private_networks=True
             )
 
+    # @lat: [[tests#Input readers#Async URL reader keeps the loop free]]
+    def test_readfromurl_async_reads_like_readfromurl(self, json_server: str) -> None:
+        """Test the async reader returns the sync reader's data and errors."""
+        async def read(path: str) -> Any:
+            return await readfromurl_async(
+                f"{json_server}/{path}", {"param1": "value1"}, allow_private_networks=True
+            )
+
+        assert asyncio.run(read("data.json")) == {"key": "value", "number": 42}
+        with pytest.raises(URLReadError, match="URL did not return valid JSON"):
+            asyncio.run(read("invalid.json"))
+        with pytest.raises(URLReadError, match="Maximum response size"):
+            asyncio.run(readfromurl_async(f"{json_server}/data.json", max_response_bytes=0))
+        with pytest.raises(URLReadError, match="public network address"):
+            asyncio.run(readfromurl_async("http://127.0.0.1/private.json"))
+
+    @patch("json2xml.utils.socket.getaddrinfo")
+    def test_readfromurl_async_resolves_on_the_loop_and_fetches_in_executor(
+        self, mock_getaddrinfo: Mock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test DNS goes through the loop and the bounded fetch runs in the executor."""
+        mock_getaddrinfo.return_value = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("93.184.216.34", 443))
+        ]
+        fetches: list[tuple[Any, ...]] = []
+
+        def fetch(*args: Any) -> Any:
+            fetches.append((threading.current_thread().name, *args[1:]))
+            return {"ok": True}
+
+        monkeypatch.setattr(utils, "_fetch_url_json", fetch)
+        with ThreadPoolExecutor(thread_name_prefix="fetch") as executor:
+            result = asyncio.run(
+                readfromurl_async(
+                    "https://api.example/data.json",
+                    max_response_bytes=1024,
+                    executor=executor,
+                )
+            )
+
+        assert result == {"ok": True}
+        assert fetches[0][0].startswith("fetch")
+        assert fetches[0][1:] == ("93.184.216.34", None, 1024)
+        mock_getaddrinfo.assert_called_once_with(
+            "api.example", 443, 0, socket.SOCK_STREAM, 0, 0
+        )
+
+        mock_getaddrinfo.return_value = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.8", 443))
+        ]
+        with pytest.raises(URLReadError, match="public network address"):
+            asyncio.run(readfromurl_async("https://internal.example/data.json"))
+        mock_getaddrinfo.side_effect = socket.gaierror("no such host")
+        with pytest.raises(URLReadError, match="could not be resolved"):
+            asyncio.run(readfromurl_async("https://missing.example/data.json"))
+
+    # @lat: [[tests#Input readers#Multi-URL reader bounds concurrency and reuses connections]]
+    def test_readfromurls_reuses_bounded_connections_per_host(
+        self, keep_alive_server: str
+    ) -> None:
+        """Test concurrent reads share at most per_host keep-alive connections."""
+        urls = [f"{keep_alive_server}/data.json?n={index}" for index in range(24)]
+
+        results = list(
+            readfromurls(
+                urls, max_concurrency=6, per_host=2, allow_private_networks=True
+            )
+        )
+
+        assert sorted(url for url, _ in results) == sorted(urls)
+        assert all(data == {"key": "value", "number": 42} for _, data in results)
+        assert 1 <= len(KeepAliveJsonHandler.connections) <= 2
+
+    def test_readfromurls_yields_errors_in_place_of_data(self, json_server: str) -> None:
+        """Test failing URLs yield their error while the other URLs still complete."""
+        urls = [
+            f"{json_server}/data.json",
+            f"{json_server}/error.json",
+            f"{json_server}/invalid.json",
+            "ftp://example.com/data.json",
+            "http://127.0.0.1/private.json",
+        ]
+
+        results = dict(readfromurls(urls, allow_private_networks=False))
+        private_results = dict(readfromurls(urls[:3], allow_private_networks=True))
+
+        assert all(isinstance(results[url], URLReadError) for url in urls)
+        assert str(results[urls[3]]) == "URL must use HTTP or HTTPS"
+        assert "public network address" in str(results[urls[4]])
+        assert private_results[urls[0]] == {"key": "value", "number": 42}
+        assert str(private_results[urls[1]]) == "URL is not returning correct response"
+        assert str(private_results[urls[2]]) == "URL did not return valid JSON"
+
+    def test_readfromurls_takes_urls_only_as_requests_finish(self, json_server: str) -> None:
+        """Test the URL iterable is consumed lazily so pending work stays bounded."""
+        taken: list[int] = []
+
+        def urls() -> "Iterator[str]":
+            for index in range(10):
+                taken.append(index)
+                yield f"{json_server}/api?n={index}"
+
+        results = readfromurls(urls(), max_concurrency=2, allow_private_networks=True)
+        assert taken == []
+        _, first = next(results)
+        assert first == {"result": "success"}
+        assert len(taken) <= 3
+        results.close()
+        assert len(taken) <= 3
+
+    def test_readfromurls_reports_unexpected_errors_and_closes_without_waiting(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test worker crashes become results and an early close leaves slow requests behind."""
+        release = threading.Event()
+
+        def fetch(http: Any, url: str, *args: Any) -> Any:
+            if url == "crash":
+                raise RuntimeError("boom")
+            if url == "slow":
+                release.wait(timeout=10)
+            return {"url": url}
+
+        monkeypatch.setattr(utils, "_fetch_pooled_url", fetch)
+        results = dict(readfromurls(["crash", "ok"]))
+        assert results["ok"] == {"url": "ok"}
+        assert isinstance(results["crash"], URLReadError)
+        assert isinstance(results["crash"].__cause__, RuntimeError)
+
+        stream = readfromurls(["fast", "slow"], max_concurrency=2)
+        assert next(stream) == ("fast", {"url": "fast"})
+        started = time.monotonic()
+        stream.close()
+        assert time.monotonic() - started < 5
+        release.set()
+
+    @pytest.mark.parametrize(
+        ("options", "message"),
+        [
+            ({"max_concurrency": 0}, "max_concurrency must be a positive integer"),
+            ({"per_host": True}, "per_host must be a positive integer"),
+            ({"max_response_bytes": -1}, "Maximum response size"),
+            ({"allow_private_networks": "yes"}, "allow_private_networks must be a boolean"),
+        ],
+    )
+    def test_readfromurls_validates_options_before_iterating(
+        self, options: dict[str, Any], message: str
+    ) -> None:
+        """Test option errors are raised by the call, not by the first iteration."""
+        with pytest.raises(URLReadError, match=message):
+            readfromurls([], **options)
+
+    # @lat: [[tests#Input readers#URL reader caches validated DNS results]]
+    @patch("json2xml.utils.socket.getaddrinfo")
+    def test_dns_cache_reuses_only_validated_public_addresses(
+        self, mock_getaddrinfo: Mock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test public resolutions are reused until they expire or are invalidated."""
+        clock = Mock(monotonic=Mock(return_value=100.0))
+        monkeypatch.setattr(utils, "time", clock)
+        mock_getaddrinfo.return_value = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("93.184.216.34", 443))
+        ]
+        public = urlsplit("https://api.example/data.json")
+
+        assert utils._resolve_validated_address(public, False) == "93.184.216.34"
+        assert asyncio.run(utils._resolve_validated_address_async(public, False)) == (
+            "93.184.216.34"
+        )
+        assert utils.dns_cache_info() == utils.DNSCacheInfo(1, 1, 256, 1)
+        assert mock_getaddrinfo.call_count == 1
+
+        clock.monotonic.return_value = 100.0 + utils.DNS_CACHE_TTL_SECONDS
+        utils._resolve_validated_address(public, False)
+        utils.clear_dns_cache("API.example")
+        utils._resolve_validated_address(public, False)
+        assert mock_getaddrinfo.call_count == 3
+        assert utils.dns_cache_info() == utils.DNSCacheInfo(1, 3, 256, 1)
+
+        mock_getaddrinfo.return_value = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.8", 443))
+        ]
+        private = urlsplit("https://internal.example/data.json")
+        for _ in range(2):
+            with pytest.raises(URLReadError, match="public network address"):
+                utils._resolve_validated_address(private, False)
+        assert mock_getaddrinfo.call_count == 5
+        assert utils.dns_cache_info().currsize == 1
+
+        utils.clear_dns_cache()
+        assert utils.dns_cache_info() == utils.DNSCacheInfo(0, 0, 256, 0)
+
+    @patch("json2xml.utils.socket.getaddrinfo")
+    def test_dns_cache_stays_bounded(
+        self, mock_getaddrinfo: Mock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a full cache drops expired entries, then the oldest, and can be disabled."""
+        clock = Mock(monotonic=Mock(return_value=0.0))
+        monkeypatch.setattr(utils, "time", clock)
+        monkeypatch.setattr(utils, "DNS_CACHE_MAXSIZE", 2)
+        monkeypatch.setattr(utils, "DNS_CACHE_TTL_SECONDS", 10.0)
+        mock_getaddrinfo.return_value = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("93.184.216.34", 443))
+        ]
+
+        def resolve(host: str) -> None:
+            utils._resolve_validated_address(urlsplit(f"https://{host}/"), False)
+
+        resolve("old.example")
+        clock.monotonic.return_value = 5.0
+        resolve("a.example")
+        clock.monotonic.return_value = 12.0
+        resolve("b.example")
+        assert utils.dns_cache_info().currsize == 2
+        resolve("c.example")
+        resolve("b.example")
+        assert utils.dns_cache_info() == utils.DNSCacheInfo(1, 4, 2, 2)
+
+        monkeypatch.setattr(utils, "DNS_CACHE_TTL_SECONDS", 0)
+        utils.clear_dns_cache()
+        resolve("a.example")
+        assert utils.dns_cache_info().currsize == 0
+
+    # @lat: [[tests#Input readers#URL reader shares one pool across threads]]
+    def test_http_client_is_created_once_across_threads(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test threads racing on the first URL read share one pool manager."""
+        monkeypatch.setattr(utils, "_HTTP", None)
+        monkeypatch.setattr(utils, "DEFAULT_URL_TIMEOUT", None)
+        pool_manager = Mock(side_effect=lambda: object())
+        monkeypatch.setattr(urllib3, "PoolManager", pool_manager)
+        barrier = threading.Barrier(8)
+
+        def first_read() -> tuple[Any, Any, Any]:
+            barrier.wait(timeout=10)
+            return utils._get_http_client()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            clients = list(pool.map(lambda _: first_read(), range(8)))
+
+        assert pool_manager.call_count == 1
+        assert len({id(http) for _, http, _ in clients}) == 1
+        assert all(timeout is utils.DEFAULT_URL_TIMEOUT is not None for _, _, timeout in clients)
+
     # @lat: [[tests#Input readers#URL reader rejects unsafe destinations]]
     def test_readfromurl_rejects_private_networks_by_default(self) -> None:
         """Test URL reads cannot reach private or link-local services by default."""
@@ -771,6 +1137,136 @@ class TestReadFromString:
             readfromstring("this is just plain text")
 
 
+def _rebuild(events: "Iterator[tuple[str, Any]]") -> Any:
+    """Assemble decoded JSON from events to compare the parser against json.loads."""
+    stack: list[Any] = []
+    keys: list[str] = []
+    result: list[Any] = []
+
+    def add(value: Any) -> None:
+        if not stack:
+            result.append(value)
+        elif isinstance(stack[-1], list):
+            stack[-1].append(value)
+        else:
+            stack[-1][keys.pop()] = value
+
+    for kind, value in events:
+        if kind in {"start_map", "start_array"}:
+            container: Any = {} if kind == "start_map" else []
+            add(container)
+            stack.append(container)
+        elif kind in {"end_map", "end_array"}:
+            stack.pop()
+        elif kind == "map_key":
+            keys.append(value)
+        else:
+            add(value)
+    return result[0]
+
+
+class OneCharReader(io.StringIO):
+    """Text stream that returns a single character per read to split every token."""
+
+    def read(self, size: int | None = -1) -> str:
+        return super().read(1)
+
+
+class TestIterJsonEvents:
+    """Test the incremental JSON event parser."""
+
+    DOCUMENTS: ClassVar[list[str]] = [
+        '{"a": [1, 2.5, -3e2, true, false, null, "q\\"\\\\u00e9"], "b": {}, "c": []}',
+        ' [ {"nested": [[{}]]}, -0, 1E+2, 0.5e-1 ] ',
+        '"\\ud83d\\ude00"',
+        "12345678901234567890",
+        "[NaN, Infinity, -Infinity]",
+    ]
+
+    # @lat: [[tests#Input readers#Incremental JSON events match json.loads]]
+    @pytest.mark.parametrize("document", DOCUMENTS)
+    @pytest.mark.parametrize("source_type", ["str", "text", "bytes"])
+    def test_events_rebuild_json_loads_result(self, document: str, source_type: str) -> None:
+        """Events decode the same values from strings and text or binary streams split anywhere."""
+        source: Any = {
+            "str": document,
+            "text": OneCharReader(document),
+            "bytes": io.BytesIO(document.encode("utf-8")),
+        }[source_type]
+
+        rebuilt = _rebuild(iter_json_events(source))
+
+        assert repr(rebuilt) == repr(json.loads(document))
+
+    def test_events_are_emitted_in_document_order(self) -> None:
+        """Container events bracket their members and keys precede values."""
+        assert list(iter_json_events('{"a": [true, null]}')) == [
+            ("start_map", None),
+            ("map_key", "a"),
+            ("start_array", None),
+            ("boolean", True),
+            ("null", None),
+            ("end_array", None),
+            ("end_map", None),
+        ]
+
+    @pytest.mark.parametrize(
+        "document",
+        ["", "[1,]", '{"a": 1,}', "[1 2]", '{"a" 1}', "{1: 2}", "[1]x", '"abc', "[", "01", "1.", "tru", '"\\x"'],
+    )
+    def test_invalid_json_raises_value_error(self, document: str) -> None:
+        """Malformed documents fail while iterating, as json.loads would reject them."""
+        with pytest.raises(ValueError):
+            list(iter_json_events(OneCharReader(document)))
+
+
+class TestStreamReaders:
+    """Test the re-iterable incremental reader helpers."""
+
+    def test_streamfromjson_reads_file_lazily_and_repeatably(self, tmp_path: Any) -> None:
+        """Each iteration re-reads the file; nothing is parsed until iteration starts."""
+        path = tmp_path / "data.json"
+        path.write_text('{"key": [1, 2]}', encoding="utf-8")
+
+        stream = streamfromjson(str(path))
+
+        assert _rebuild(iter(stream)) == {"key": [1, 2]}
+        assert _rebuild(iter(stream)) == {"key": [1, 2]}
+
+    def test_streamfromjson_wraps_errors(self, tmp_path: Any) -> None:
+        """Missing files and invalid JSON surface as JSONReadError during iteration."""
+        path = tmp_path / "bad.json"
+        path.write_text('{"key": ', encoding="utf-8")
+
+        with pytest.raises(JSONReadError, match="Invalid JSON File"):
+            list(streamfromjson(str(path)))
+        with pytest.raises(JSONReadError, match="Invalid JSON File"):
+            list(streamfromjson(str(tmp_path / "missing.json")))
+
+    def test_streamfromstring_validates_and_wraps_errors(self) -> None:
+        """Non-strings are rejected eagerly and parse errors while iterating."""
+        with pytest.raises(StringReadError, match="Input is not a proper JSON string"):
+            streamfromstring(b"{}")
+        with pytest.raises(StringReadError, match="Input is not a proper JSON string"):
+            list(streamfromstring("[1,"))
+        assert list(streamfromstring("1")) == [("number", 1)]
+
+    def test_stream_readers_expose_their_whole_text(self, tmp_path: Any) -> None:
+        """Native parsers read strings as given and files as bytes, with the reader's errors."""
+        path = tmp_path / "data.json"
+        path.write_bytes('{"name": "Zoë"}'.encode())
+
+        assert streamfromstring("[1]").read_text() == "[1]"
+        assert streamfromstring("[1]").read_text(3) == "[1]"
+        assert streamfromstring("[1]").read_text(2) is None
+        assert streamfromjson(str(path)).read_text() == '{"name": "Zoë"}'.encode()
+        assert streamfromjson(str(path)).read_text(16) == '{"name": "Zoë"}'.encode()
+        assert streamfromjson(str(path)).read_text(15) is None
+        with pytest.raises(JSONReadError, match="Invalid JSON File"):
+            streamfromjson(str(tmp_path / "missing.json")).read_text()
+        assert JSONEventStream(lambda: iter(()), JSONReadError, "Invalid").read_text() is None
+
+
 class TestIntegration:
     """Integration tests combining multiple utilities."""
 